@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pluggable HTML parsing layer against the BeautifulSoup html.parser path.
+
+Runs both paths over saved HTML fixtures (the scraped FindLaw/Leagle pages in the
+repo root by default) for the two workloads the scrapers and URL ingestion use:
+
+- field lookups: title/court/date via CSS selectors (websearch/extractor.py)
+- visible text: script/style stripped get_text() (fetch_url_content)
+
+Usage:
+    python scripts/benchmark_html_parsing.py [fixture.html ...] [--repeat N] [--json out.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+from bs4 import BeautifulSoup
+
+from src.utils.html_parsing import extract_fields, html_to_text, get_parser_backend
+
+DEFAULT_FIXTURES = ['findlaw_response.html', 'findlaw_form.html', 'leagle_form.html']
+
+FIELD_SELECTORS = {
+    'title': '.case-title, h1',
+    'court': '.court, .jurisdiction',
+    'date': '.decision-date, .date',
+}
+
+
+def legacy_fields(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    values = {}
+    for name, selector in FIELD_SELECTORS.items():
+        element = soup.select_one(selector)
+        values[name] = element.get_text().strip() if element else ''
+    return values
+
+
+def legacy_text(html):
+    soup = BeautifulSoup(html, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+    return soup.get_text(separator=' ', strip=True)
+
+
+def time_call(func, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(html)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('fixtures', nargs='*', help='HTML files to benchmark')
+    parser.add_argument('--repeat', type=int, default=50, help='Iterations per fixture')
+    parser.add_argument('--json', dest='json_path', help='Write results as JSON to this path')
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or [os.path.join(PROJECT_ROOT, name) for name in DEFAULT_FIXTURES]
+    backend = get_parser_backend()
+    print(f"Parser backend: {backend} | repeat={args.repeat}")
+    print(f"{'fixture':<28}{'workload':<10}{'legacy ms':>12}{'new ms':>10}{'speedup':>10}  match")
+
+    results = []
+    for path in fixtures:
+        if not os.path.exists(path):
+            print(f"Skipping missing fixture: {path}")
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+
+        workloads = [
+            ('fields', legacy_fields, lambda h: extract_fields(h, FIELD_SELECTORS)),
+            ('text', legacy_text, html_to_text),
+        ]
+        for workload, legacy, fast in workloads:
+            legacy_time, legacy_result = time_call(legacy, html, args.repeat)
+            fast_time, fast_result = time_call(fast, html, args.repeat)
+            row = {
+                'fixture': os.path.basename(path),
+                'bytes': len(html.encode('utf-8')),
+                'workload': workload,
+                'backend': backend,
+                'legacy_ms': legacy_time * 1000,
+                'new_ms': fast_time * 1000,
+                'speedup': legacy_time / fast_time if fast_time else None,
+                'match': legacy_result == fast_result,
+            }
+            results.append(row)
+            print(f"{row['fixture']:<28}{workload:<10}{row['legacy_ms']:>12.3f}{row['new_ms']:>10.3f}"
+                  f"{row['speedup']:>9.1f}x  {row['match']}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json_path}")
+
+    return 0 if all(row['match'] for row in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
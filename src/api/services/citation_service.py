@@ -11,7 +11,6 @@ import os
 import time
 import uuid
 from typing import Any, Dict, List, Optional
-from src.redis_distributed_processor import DockerOptimizedProcessor
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +23,27 @@ class CitationService:
     ULTRA_FAST_THRESHOLD = 500  # 500 bytes - ultra fast processing
     CLUSTERING_THRESHOLD = 300  # 300 bytes - skip clustering for very short text
     
+    # Queued work at or above any of these goes to the bulk queue instead of the interactive one
+    BULK_TEXT_THRESHOLD = 100 * 1024  # 100KB of text - records and long briefs, not pastes
+    BULK_PAGE_THRESHOLD = 50
+    BULK_FILE_THRESHOLD = 1024 * 1024  # 1MB upload when the text is not extracted yet
+    CHARS_PER_PAGE = 3000
+    
     def __init__(self):
-        self.processor = DockerOptimizedProcessor()
+        self._processor = None
         self.cache_ttl = 3600  # 1 hour cache
         self._cache = {}  # Initialize cache
         self._last_cache_cleanup = time.time()
         self._cache_cleanup_interval = 300  # Clean cache every 5 minutes
     
+    @property
+    def processor(self):
+        """The distributed PDF processor, created on first file job so web startup stays light."""
+        if self._processor is None:
+            from src.redis_distributed_processor import DockerOptimizedProcessor
+            self._processor = DockerOptimizedProcessor()
+        return self._processor
+    
     def determine_processing_mode(self, text: str, force_mode: Optional[str] = None) -> str:
         """
         Unified function to determine processing mode based on text content size.
@@ -61,6 +74,29 @@ class CitationService:
             logger.info(f"Text size {text_size} bytes >= {self.SYNC_THRESHOLD} bytes - using ASYNC processing")
             return 'async'
     
+    def determine_job_class(self, text_length: Optional[int] = None, page_count: Optional[int] = None,
+                            file_size: Optional[int] = None) -> str:
+        """
+        Priority queue class for work that determine_processing_mode sends async.
+        
+        Args:
+            text_length: Characters of extracted text, when known
+            page_count: Pages, when known (estimated from text_length otherwise)
+            file_size: Upload size in bytes, for files queued before extraction
+            
+        Returns:
+            'interactive' or 'bulk' (see src.job_queues)
+        """
+        from src.job_queues import BULK, INTERACTIVE
+        
+        if page_count is None and text_length is not None:
+            page_count = text_length // self.CHARS_PER_PAGE
+        if ((text_length or 0) >= self.BULK_TEXT_THRESHOLD
+                or (page_count or 0) >= self.BULK_PAGE_THRESHOLD
+                or (file_size or 0) >= self.BULK_FILE_THRESHOLD):
+            return BULK
+        return INTERACTIVE
+    
     def extract_text_from_input(self, input_data: Dict) -> Optional[str]:
         """
         Extract text content from various input types.
@@ -101,6 +137,7 @@ class CitationService:
             import requests
             from requests.adapters import HTTPAdapter
             from urllib3.util.retry import Retry
+            from src.http_cache import get_http_cache, KIND_OPINION
             
             session = requests.Session()
             
@@ -114,36 +151,31 @@ class CitationService:
             session.mount("http://", adapter)
             session.mount("https://", adapter)
             
-            # Fetch with timeout and size limit
-            response = session.get(
+            max_size = 100 * 1024  # 100KB max
+            
+            # Fetch through the shared conditional-GET cache with timeout and size limit
+            response = get_http_cache().get(
                 url,
+                session=session,
                 timeout=10,  # Reasonable timeout for content fetch
                 headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 },
-                stream=True
+                kind=KIND_OPINION,
+                max_bytes=max_size
             )
             
             # Check content length header first
             content_length = response.headers.get('content-length')
-            if content_length and int(content_length) > 100 * 1024:  # 100KB limit
+            if content_length and int(content_length) > max_size:  # 100KB limit
                 logger.info(f"URL content too large: {content_length} bytes")
                 return None
             
-            # Download content with size limit
-            content = ""
-            downloaded = 0
-            max_size = 100 * 1024  # 100KB max
-            
-            for chunk in response.iter_content(chunk_size=1024, decode_unicode=True):
-                if chunk:
-                    content += chunk
-                    downloaded += len(chunk.encode('utf-8'))
-                    if downloaded > max_size:
-                        logger.info(f"URL content exceeded size limit: {downloaded} bytes")
-                        return None
+            if len(response.content) > max_size:
+                logger.info(f"URL content exceeded size limit: {len(response.content)} bytes")
+                return None
             
-            return content
+            return response.text
             
         except Exception as e:
             logger.warning(f"Failed to fetch URL content: {e}")
@@ -174,8 +206,14 @@ class CitationService:
         processing_mode = self.determine_processing_mode(text, force_mode=force_mode)
         return processing_mode == 'sync'
     
-    def process_immediately(self, input_data: Dict) -> Dict[str, Any]:
-        """Process input immediately using the unified citation processor."""
+    def process_immediately(self, input_data: Dict, defer_verification: bool = False) -> Dict[str, Any]:
+        """
+        Process input immediately using the unified citation processor.
+        
+        With ``defer_verification`` only extraction and clustering run here: the
+        result carries ``verification: 'pending'`` and citation/cluster dicts
+        ready for ``VerificationManager.start_deferred_verification``.
+        """
         try:
             from src.unified_citation_processor_v2 import UnifiedCitationProcessorV2
             from src.config import get_citation_config
@@ -186,7 +224,11 @@ class CitationService:
             
             logger.info("[CitationService] Using UnifiedCitationProcessorV2 for immediate processing")
             
-            processor = UnifiedCitationProcessorV2()
+            if defer_verification:
+                from src.models import ProcessingConfig
+                processor = UnifiedCitationProcessorV2(ProcessingConfig(enable_verification=False))
+            else:
+                processor = UnifiedCitationProcessorV2()
             
             # Extract text using unified approach
             text_content = self.extract_text_from_input(input_data)
@@ -204,6 +246,9 @@ class CitationService:
             
             result['processing_mode'] = 'immediate'
             result['success'] = True
+            if defer_verification:
+                result['citations'] = [c.to_dict() if hasattr(c, 'to_dict') else c for c in result.get('citations', [])]
+                result['verification'] = 'pending'
             
             if 'progress_data' not in result:
                 result['progress_data'] = {
@@ -221,6 +266,11 @@ class CitationService:
                     ]
                 }
             
+            if defer_verification:
+                for step in result['progress_data'].get('steps', []):
+                    if step.get('name') == 'Verify':
+                        step.update(progress=0, status='pending', message='Verification continues in the background')
+            
             logger.info(f"[CitationService] Immediate processing completed via UnifiedCitationProcessorV2 in {result.get('processing_time', 0):.3f}s")
             return result
             
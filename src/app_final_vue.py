@@ -39,7 +39,6 @@ if str(src_dir) not in sys.path:
 
 print(f"Python path: {sys.path}", file=sys.stderr)
 
-from src.case_name_extraction_core import extract_case_name_and_date
 try:
     from src.rate_limiter import rate_limit, validate_input
     rate_limiter_available = True
@@ -90,6 +89,8 @@ def verify_citation_with_extraction(citation_text: str, document_text: str = "",
             logger.info(f"  citation_text: '{citation_text}'")
             logger.info(f"  document_text: '{document_text[:100]}...'")
             
+            # Imported on first use: the extraction engine is not needed to serve routes
+            from src.case_name_extraction_core import extract_case_name_and_date
             extraction_result = extract_case_name_and_date(text=document_text,
                 citation=citation_text)
             
@@ -750,11 +751,25 @@ class ApplicationFactory:
     
     def _register_middleware(self, app: Any) -> None:
         """Register middleware"""
-        from flask import request
+        import time
+        from flask import request, g
+        from src.metrics import HTTP_REQUEST_SECONDS
+        from src import sampling_profiler
+        
+        def start_request_timer() -> None:
+            g.request_started = time.perf_counter()
+            sampling_profiler.join_web_window()
+            if sampling_profiler.get_profiler().active:
+                sampling_profiler.set_thread_tag('endpoint', request.endpoint)
         
         def log_response_wrapper(response: Any) -> Any:
+            started = g.pop('request_started', None)
+            if started is not None:
+                HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=request.endpoint or 'unmatched',
+                                             method=request.method, status=response.status_code)
             return self.response_manager.log_response(response, request)
         
+        app.before_request(start_request_timer)
         app.after_request(log_response_wrapper)
     
     def _get_database_manager(self) -> Any:
@@ -1,3 +1,4 @@
+import json
 import time
 from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
 
@@ -6,7 +7,6 @@ import os
 import logging
 from redis import Redis
 from rq import Queue
-from src.unified_citation_processor_v2 import UnifiedCitationProcessorV2 as UnifiedCitationProcessor
 from src.database_manager import get_database_manager
 from datetime import datetime, timedelta
 
@@ -14,11 +14,17 @@ logger = logging.getLogger(__name__)
 
 CHECK_INTERVAL = int(os.environ.get('REPROCESS_CHECK_INTERVAL', 60))  # seconds between checks (default: 1 min)
 BATCH_SIZE = int(os.environ.get('REPROCESS_BATCH_SIZE', 100))
-SLEEP_BETWEEN = int(os.environ.get('REPROCESS_SLEEP_BETWEEN', 1))
+SLEEP_BETWEEN = int(os.environ.get('REPROCESS_SLEEP_BETWEEN', 1))  # wait when no lookup budget is spare
+REPROCESS_MAX_ATTEMPTS = int(os.environ.get('REPROCESS_MAX_ATTEMPTS', 3))
+REPROCESS_MAX_RUNTIME = int(os.environ.get('REPROCESS_MAX_RUNTIME', 600))
+# Share of the CourtListener lookup rate kept for interactive traffic
+REPROCESS_RESERVED_SHARE = float(os.environ.get('REPROCESS_RESERVED_SHARE', 0.5))
+LOOKUP_CITATIONS_PER_CALL = 50  # citations per batch lookup request
 
 BACKUP_INTERVAL = int(os.environ.get('BACKUP_INTERVAL', 3600))  # 1 hour
 CLEANUP_INTERVAL = int(os.environ.get('CLEANUP_INTERVAL', 300))  # 5 minutes
 MONITORING_INTERVAL = int(os.environ.get('MONITORING_INTERVAL', 60))  # 1 minute
+DB_MAINTENANCE_INTERVAL = int(os.environ.get('DB_MAINTENANCE_INTERVAL', 6 * 3600))  # 6 hours
 
 REDIS_HOST = os.environ.get('REDIS_HOST', 'localhost')
 REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
@@ -28,46 +34,113 @@ QUEUE_NAME = os.environ.get('RQ_QUEUE_NAME', 'casestrainer')
 TASK_TTL = int(os.environ.get('TASK_TTL', 3600))  # 1 hour default TTL for tasks
 
 
+LOOKUP_METHOD = 'citation_lookup_v4_batch'  # set on every result the lookup answered
+
+
+def _parallels_from(citation, result):
+    """Parallel citations of a CourtListener lookup match; None for anything else."""
+    if result is None or not result.verified or result.method != LOOKUP_METHOD:
+        return None
+    own = ' '.join(citation.split())
+    parallels = []
+    for cite in (result.raw_data or {}).get('citations') or []:
+        if isinstance(cite, dict) and cite.get('volume') and cite.get('reporter') and cite.get('page'):
+            text = f"{cite['volume']} {cite['reporter']} {cite['page']}"
+            if text != own and text not in parallels:
+                parallels.append(text)
+    return parallels
+
+
+def _spare_lookup_calls(verifier):
+    """CourtListener lookups this job may make now: what interactive traffic leaves above its reserve."""
+    from src.unified_verification_master import VerificationSource, remaining_call_budget
+    limit = verifier.rate_limits[VerificationSource.COURTLISTENER_LOOKUP]['calls_per_minute']
+    return remaining_call_budget(VerificationSource.COURTLISTENER_LOOKUP, limit) - limit * REPROCESS_RESERVED_SHARE
+
+
 def reprocess_parallel_citations(batch_size=BATCH_SIZE, sleep_time=SLEEP_BETWEEN, max_batches=None):
-    """Reprocess citations missing parallel citations."""
-    from src.models import ProcessingConfig
-    config = ProcessingConfig(enable_verification=True, debug_mode=True)
-    verifier = UnifiedCitationProcessor(config)
+    """
+    Reprocess citations missing parallel citations.
+
+    Rows are read a keyset page at a time (by rowid), looked up with the
+    CourtListener batch citation lookup only (never the fallback scrapers, so
+    every request is covered by the budget) and written back in one
+    executemany transaction. The page size follows the lookup budget left
+    over from interactive traffic; with none to spare the job waits
+    ``sleep_time`` seconds and looks again. Rows the lookup reports as not
+    found are retried on later runs, up to REPROCESS_MAX_ATTEMPTS times;
+    rows it never answered (transport errors, rate limiting) are left
+    untouched and do not use up an attempt.
+    """
+    import asyncio
+    from src.unified_verification_master import get_master_verifier
+
+    verifier = get_master_verifier()
     db_manager = get_database_manager()
+    deadline = time.time() + REPROCESS_MAX_RUNTIME
     processed = 0
+    updated = 0
     batch_num = 0
-    while True:
-        rows = db_manager.execute_query(
-            "SELECT citation_text FROM citations WHERE (parallel_citations IS NULL OR parallel_citations = '') LIMIT ?", (batch_size,)
-        )
-        if not rows:
-            logger.info("[REPROCESS] No more citations to reprocess.")
-            break
-        for row in rows:
-            citation = row['citation_text']
-            logger.info(f"[REPROCESS] Reprocessing: {citation}")
-            
-            try:
-                import asyncio
-                result = asyncio.run(verifier.process_document_citations(citation))
-                if result and result.get('citations'):
-                    for citation_result in result['citations']:
-                        if hasattr(citation_result, 'parallel_citations') and citation_result.parallel_citations:
-                            db_manager.execute_query(
-                                "UPDATE citations SET parallel_citations = ? WHERE citation_text = ?",
-                                (str(citation_result.parallel_citations), citation)
-                            )
-                            logger.info(f"[REPROCESS] Updated parallel citations for {citation}")
-            except Exception as e:
-                logger.error(f"[REPROCESS] Error processing {citation}: {e}")
-            
-            processed += 1
-            time.sleep(sleep_time)
-        batch_num += 1
-        if max_batches and batch_num >= max_batches:
-            break
-        time.sleep(5)
-    logger.info(f"[REPROCESS] Reprocessing complete. Total processed: {processed}")
+    last_rowid = 0
+
+    async def run():
+        nonlocal processed, updated, batch_num, last_rowid
+        while time.time() < deadline:
+            spare = _spare_lookup_calls(verifier)
+            if spare < 1:
+                logger.debug("[REPROCESS] No spare lookup budget, waiting")
+                await asyncio.sleep(max(sleep_time, 1))
+                continue
+            page_size = min(batch_size, int(spare) * LOOKUP_CITATIONS_PER_CALL)
+            rows = db_manager.execute_query(
+                "SELECT rowid AS row_id, citation_text FROM citations "
+                "WHERE (parallel_citations IS NULL OR parallel_citations = '') AND COALESCE(error_count, 0) < ? "
+                "AND rowid > ? ORDER BY rowid LIMIT ?",
+                (REPROCESS_MAX_ATTEMPTS, last_rowid, page_size)
+            )
+            if not rows:
+                logger.info("[REPROCESS] No more citations to reprocess.")
+                return
+            last_rowid = rows[-1]['row_id']
+
+            citations = [row['citation_text'] for row in rows]
+            results = []
+            for start in range(0, len(citations), LOOKUP_CITATIONS_PER_CALL):
+                chunk = citations[start:start + LOOKUP_CITATIONS_PER_CALL]
+                try:
+                    results.extend(await verifier._verify_with_courtlistener_lookup_batch(
+                        chunk, fallback_on_rate_limit=False))
+                except Exception as e:
+                    logger.error(f"[REPROCESS] Batch lookup failed for {len(chunk)} citations: {e}")
+                    results.extend([None] * len(chunk))
+
+            params = []
+            for row, result in zip(rows, results):
+                if result is None or result.method != LOOKUP_METHOD:
+                    continue  # not answered; try again on a later run
+                parallels = _parallels_from(row['citation_text'], result)
+                if parallels is None:
+                    params.append((None, 1, row['row_id']))
+                else:
+                    params.append((json.dumps(parallels), 0, row['row_id']))
+                    updated += 1
+            if params:
+                db_manager.execute_many(
+                    "UPDATE citations SET parallel_citations = COALESCE(?, parallel_citations), "
+                    "error_count = COALESCE(error_count, 0) + ?, "
+                    "verification_count = COALESCE(verification_count, 0) + 1, "
+                    "last_verified_at = CURRENT_TIMESTAMP WHERE rowid = ?",
+                    params
+                )
+            processed += len(params)
+            batch_num += 1
+            logger.info(f"[REPROCESS] Page {batch_num}: {len(params)}/{len(rows)} citations answered "
+                        f"(page size {page_size})")
+            if max_batches and batch_num >= max_batches:
+                return
+
+    asyncio.run(run())
+    logger.info(f"[REPROCESS] Reprocessing complete. Total processed: {processed}, parallels stored: {updated}")
 
 
 def database_backup_task():
@@ -90,6 +163,19 @@ def database_backup_task():
         logger.error(f"[BACKUP] Error in database backup task: {e}")
 
 
+def database_maintenance_task():
+    """Release free pages and refresh planner statistics in small, throttled steps."""
+    try:
+        db_manager = get_database_manager()
+        if db_manager.maintain_database():
+            logger.info(f"[DB_MAINTENANCE] Completed: {db_manager.stats['vacuumed_pages']} pages released so far, "
+                        f"write stall max {db_manager.stats['write_stall_max_seconds']}s")
+        else:
+            logger.warning("[DB_MAINTENANCE] Database maintenance failed")
+    except Exception as e:
+        logger.error(f"[DB_MAINTENANCE] Error in database maintenance task: {e}")
+
+
 def cleanup_old_tasks():
     """Clean up old completed/failed tasks from memory and Redis."""
     try:
@@ -128,19 +214,21 @@ def monitoring_task():
 
 
 def is_queue_idle(redis_conn, queue_name=QUEUE_NAME):
-    """Return True if the RQ queue is idle (no jobs in queue or started)."""
-    from rq import Queue
-    queue = Queue(queue_name, connection=redis_conn)
-    return queue.count == 0 and queue.started_job_registry.count == 0
+    """Return True if no user work (interactive or bulk) is queued or running."""
+    from src.job_queues import JobScheduler
+    return JobScheduler(redis_conn).is_idle()
 
 
 def background_maintenance_loop():
     """Main background thread that coordinates all maintenance tasks."""
+    from src.job_queues import MAINTENANCE, JobScheduler
     redis_conn = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
-    queue = Queue(QUEUE_NAME, connection=redis_conn)
+    # Maintenance work has its own low-weight queue so it never sits in front of user requests
+    scheduler = JobScheduler(redis_conn)
     
     last_reprocess_check = 0
     last_backup = 0
+    last_db_maintenance = time.time()
     last_cleanup = 0
     last_monitoring = 0
     
@@ -155,35 +243,50 @@ def background_maintenance_loop():
                 
                 db_manager = get_database_manager()
                 rows = db_manager.execute_query(
-                    "SELECT COUNT(*) as cnt FROM citations WHERE (parallel_citations IS NULL OR parallel_citations = '')"
+                    "SELECT COUNT(*) as cnt FROM citations WHERE (parallel_citations IS NULL OR parallel_citations = '') "
+                    "AND COALESCE(error_count, 0) < ?", (REPROCESS_MAX_ATTEMPTS,)
                 )
                 count = rows[0]['cnt'] if rows else 0
                 
                 if count > 0 and is_queue_idle(redis_conn, QUEUE_NAME):
                     logger.info(f"[MAINTENANCE] Enqueuing reprocessing job for {count} citations")
-                    queue.enqueue(reprocess_parallel_citations, batch_size=BATCH_SIZE, sleep_time=SLEEP_BETWEEN)
+                    scheduler.enqueue(reprocess_parallel_citations, batch_size=BATCH_SIZE, sleep_time=SLEEP_BETWEEN,
+                                      job_class=MAINTENANCE, job_timeout=REPROCESS_MAX_RUNTIME + 120)
                 elif count == 0:
+                    logger.debug("[MAINTENANCE] No citations need reprocessing")
                 else:
+                    logger.debug("[MAINTENANCE] Queue busy, deferring reprocessing")
             
             if current_time - last_backup >= BACKUP_INTERVAL:
                 last_backup = current_time
                 if is_queue_idle(redis_conn, QUEUE_NAME):
                     logger.info("[MAINTENANCE] Enqueuing database backup task")
-                    queue.enqueue(database_backup_task)
+                    scheduler.enqueue(database_backup_task, job_class=MAINTENANCE)
+                else:
+                    logger.debug("[MAINTENANCE] Queue busy, deferring database backup")
+            
+            if current_time - last_db_maintenance >= DB_MAINTENANCE_INTERVAL:
+                last_db_maintenance = current_time
+                if is_queue_idle(redis_conn, QUEUE_NAME):
+                    logger.info("[MAINTENANCE] Enqueuing database maintenance task")
+                    scheduler.enqueue(database_maintenance_task, job_class=MAINTENANCE)
                 else:
+                    logger.debug("[MAINTENANCE] Queue busy, deferring database maintenance")
             
             if current_time - last_cleanup >= CLEANUP_INTERVAL:
                 last_cleanup = current_time
                 if is_queue_idle(redis_conn, QUEUE_NAME):
                     logger.info("[MAINTENANCE] Enqueuing task cleanup")
-                    queue.enqueue(cleanup_old_tasks)
+                    scheduler.enqueue(cleanup_old_tasks, job_class=MAINTENANCE)
                 else:
+                    logger.debug("[MAINTENANCE] Queue busy, deferring task cleanup")
             
             if current_time - last_monitoring >= MONITORING_INTERVAL:
                 last_monitoring = current_time
                 if is_queue_idle(redis_conn, QUEUE_NAME):
-                    queue.enqueue(monitoring_task)
+                    scheduler.enqueue(monitoring_task, job_class=MAINTENANCE)
                 else:
+                    logger.debug("[MAINTENANCE] Queue busy, deferring monitoring")
             
             time.sleep(10)  # Check every 10 seconds for task scheduling
             
@@ -0,0 +1,480 @@
+"""
+Bulk Corpus Processing
+
+Runs UnifiedCitationProcessorV2 over thousands of documents:
+
+- documents come from a directory (recursively) or a manifest file
+  (one path per line, or JSONL objects with ``id`` and ``path`` or ``text``)
+- documents are fanned out across a process pool, one processor per worker
+- every finished document is appended to ``results.jsonl`` in the output
+  directory, which doubles as the checkpoint: a rerun skips documents that
+  already have a record, so a crash resumes where it left off
+- verification results are shared by all workers through a SQLite store in
+  the output directory, so a citation repeated across the corpus is verified
+  once
+- ``citations.parquet`` (one row per citation) can be written from the JSONL
+  sink for columnar analysis
+
+In two-phase mode network cost scales with unique citations rather than
+mentions: phase 1 extracts and clusters every document offline, phase 2
+verifies the corpus-wide unique citation set once at the API's full batch
+size, and phase 3 joins the results back into each document's citations and
+clusters.
+
+Usage:
+    python -m src.bulk_processing wa_briefs_txt --output bulk_results --workers 4
+    python -m src.bulk_processing manifest.jsonl --output bulk_results --parquet
+    python -m src.bulk_processing wa_briefs_txt --output bulk_results --two-phase
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+RESULTS_FILE = 'results.jsonl'
+VERIFICATION_STORE_FILE = 'verification_store.db'
+PARQUET_FILE = 'citations.parquet'
+DOCUMENT_EXTENSIONS = ('.txt', '.pdf', '.docx', '.doc', '.rtf', '.html', '.htm', '.md')
+
+# CourtListener citation-lookup accepts up to 250 citations per request
+CORPUS_VERIFY_BATCH_SIZE = 250
+# Unique citations per verify_citations_batch call in phase 2 (each chunk is checkpointed)
+CORPUS_VERIFY_CHUNK = 2000
+
+# Pending phase 2 marker on phase 1 records
+VERIFICATION_PENDING = 'pending'
+VERIFICATION_APPLIED = 'applied'
+
+# Per-worker state, created once by the pool initializer
+_worker_processor = None
+
+
+@dataclass
+class BulkDocument:
+    """One unit of bulk work."""
+    doc_id: str
+    path: Optional[str] = None
+    text: Optional[str] = None
+
+
+@dataclass
+class BulkSummary:
+    """Outcome of a bulk run."""
+    total: int = 0
+    skipped: int = 0
+    processed: int = 0
+    failed: int = 0
+    citations: int = 0
+    unique_citations: int = 0
+    verified: int = 0
+    elapsed: float = 0.0
+    failures: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'skipped': self.skipped,
+            'processed': self.processed,
+            'failed': self.failed,
+            'citations': self.citations,
+            'unique_citations': self.unique_citations,
+            'verified': self.verified,
+            'elapsed': round(self.elapsed, 2),
+            'documents_per_second': round(self.processed / self.elapsed, 3) if self.elapsed else 0.0,
+            'failures': self.failures,
+        }
+
+
+def iter_documents(source: str) -> Iterator[BulkDocument]:
+    """Yield documents from a directory or a manifest file."""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(DOCUMENT_EXTENSIONS):
+                    path = os.path.join(root, name)
+                    yield BulkDocument(os.path.relpath(path, source), path=path)
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                entry = json.loads(line)
+                path = entry.get('path')
+                if path and not os.path.isabs(path):
+                    path = os.path.join(base_dir, path)
+                doc_id = entry.get('id') or entry.get('path') or f'line-{line_number}'
+                yield BulkDocument(str(doc_id), path=path, text=entry.get('text'))
+            else:
+                path = line if os.path.isabs(line) else os.path.join(base_dir, line)
+                yield BulkDocument(line, path=path)
+
+
+def completed_ids(results_path: str, include_failed: bool = False) -> Set[str]:
+    """Document ids already recorded in the JSONL sink (the resume checkpoint)."""
+    done = set()
+    if not os.path.exists(results_path):
+        return done
+    valid_bytes = 0
+    with open(results_path, 'rb') as f:
+        for raw in f:
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                break  # torn write from a crash: everything after it is dropped below
+            valid_bytes += len(raw)
+            if include_failed or record.get('status') == 'ok':
+                done.add(record['id'])
+    if valid_bytes < os.path.getsize(results_path):
+        logger.warning(f"Truncating partial record at the end of {results_path}")
+        with open(results_path, 'r+b') as f:
+            f.truncate(valid_bytes)
+    return done
+
+
+def _load_text(document: BulkDocument) -> str:
+    if document.text is not None:
+        return document.text
+    if document.path.lower().endswith(('.txt', '.md')):
+        with open(document.path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    from src.document_processing_unified import extract_text_from_file
+    return extract_text_from_file(document.path)
+
+
+def _init_worker(enable_verification: bool, store_path: Optional[str]):
+    """Pool initializer: one processor and one shared verification store per process."""
+    global _worker_processor
+    from src.models import ProcessingConfig
+    from src.unified_citation_processor_v2 import UnifiedCitationProcessorV2
+
+    logging.getLogger('src').setLevel(logging.WARNING)
+    if store_path:
+        from src.unified_verification_master import set_verification_result_store
+        from src.websearch.cache import CacheManager
+        set_verification_result_store(CacheManager(cache_file=store_path, ttl_hours=24 * 30))
+    _worker_processor = UnifiedCitationProcessorV2(ProcessingConfig(enable_verification=enable_verification))
+
+
+def _citation_to_dict(citation) -> Dict[str, Any]:
+    return citation.to_dict() if hasattr(citation, 'to_dict') else dict(citation)
+
+
+def process_document(document: BulkDocument) -> Dict[str, Any]:
+    """Process one document in a worker and return its JSONL record."""
+    started = time.perf_counter()
+    record: Dict[str, Any] = {'id': document.doc_id, 'path': document.path}
+    try:
+        text = _load_text(document)
+        result = asyncio.run(_worker_processor.process_text(text))
+        record.update({
+            'status': 'ok',
+            'chars': len(text),
+            'citations': [_citation_to_dict(c) for c in result.get('citations', [])],
+            'clusters': result.get('clusters', []),
+        })
+    except Exception as e:
+        logger.error(f"[BULK] {document.doc_id} failed: {e}")
+        record.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+    record['elapsed'] = round(time.perf_counter() - started, 3)
+    return record
+
+
+class BulkProcessor:
+    """
+    Parallel, resumable corpus processing on top of UnifiedCitationProcessorV2.
+
+    Example:
+        summary = BulkProcessor('bulk_results', workers=4).run('wa_briefs_txt')
+    """
+
+    def __init__(self, output_dir: str, workers: Optional[int] = None, enable_verification: bool = True,
+                 share_verification: bool = True, retry_failed: bool = False,
+                 max_in_flight: Optional[int] = None, two_phase: bool = False,
+                 verify_batch_size: int = CORPUS_VERIFY_BATCH_SIZE,
+                 on_record: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.output_dir = output_dir
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.enable_verification = enable_verification
+        self.two_phase = two_phase and enable_verification
+        self.verify_batch_size = verify_batch_size
+        self.share_verification = share_verification
+        self.retry_failed = retry_failed
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.on_record = on_record
+        self.results_path = os.path.join(output_dir, RESULTS_FILE)
+        self.store_path = os.path.join(output_dir, VERIFICATION_STORE_FILE)
+
+    def _append(self, sink, record: Dict[str, Any]):
+        sink.write(json.dumps(record, default=str) + '\n')
+        sink.flush()
+        os.fsync(sink.fileno())
+
+    def run(self, source: str) -> BulkSummary:
+        """Process every not-yet-completed document from ``source``."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        done = completed_ids(self.results_path, include_failed=not self.retry_failed)
+        # Two-phase workers only extract; verification happens once for the corpus afterwards
+        worker_verification = self.enable_verification and not self.two_phase
+        store_path = self.store_path if worker_verification and self.share_verification else None
+
+        summary = BulkSummary()
+        started = time.perf_counter()
+        pending = set()
+
+        def collect(futures, sink):
+            for future in futures:
+                record = future.result()
+                if self.two_phase and record['status'] == 'ok':
+                    record['verification'] = VERIFICATION_PENDING
+                self._append(sink, record)
+                if record['status'] == 'ok':
+                    summary.processed += 1
+                    summary.citations += len(record['citations'])
+                else:
+                    summary.failed += 1
+                    summary.failures.append(record['id'])
+                if self.on_record:
+                    self.on_record(record)
+
+        with open(self.results_path, 'a', encoding='utf-8') as sink, \
+                ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                    initargs=(worker_verification, store_path)) as pool:
+            for document in iter_documents(source):
+                summary.total += 1
+                if document.doc_id in done:
+                    summary.skipped += 1
+                    continue
+                # Bounded submission keeps memory flat on very large manifests
+                if len(pending) >= self.max_in_flight:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished, sink)
+                pending.add(pool.submit(process_document, document))
+            finished, _ = wait(pending)
+            collect(finished, sink)
+
+        if self.two_phase:
+            summary.unique_citations, summary.verified = self.verify_corpus()
+        summary.elapsed = time.perf_counter() - started
+        logger.info(f"[BULK] {summary.to_dict()}")
+        return summary
+
+    def verify_corpus(self) -> Tuple[int, int]:
+        """
+        Phases 2 and 3: verify each unique pending citation once, then join the
+        results back into every pending record.
+
+        Verified chunks are kept in the shared store, so an interrupted phase 2
+        resumes without repeating network calls.
+
+        Returns:
+            (unique citations verified, how many of them verified)
+        """
+        from src.unified_verification_master import get_master_verifier, set_verification_result_store
+        from src.websearch.cache import CacheManager
+
+        unique: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for record in _read_records(self.results_path):
+            if record.get('verification') == VERIFICATION_PENDING:
+                for citation in record['citations']:
+                    key = normalize_citation_key(citation.get('citation'))
+                    if key and key not in unique:
+                        unique[key] = (citation.get('extracted_case_name'), citation.get('extracted_date'))
+        if not unique:
+            return 0, 0
+
+        texts = list(unique)
+        results: Dict[str, Any] = {}
+        store = CacheManager(cache_file=self.store_path, ttl_hours=24 * 30)
+        set_verification_result_store(store)
+        try:
+            verifier = get_master_verifier()
+            for start in range(0, len(texts), CORPUS_VERIFY_CHUNK):
+                chunk = texts[start:start + CORPUS_VERIFY_CHUNK]
+                names = [unique[text][0] for text in chunk]
+                dates = [unique[text][1] for text in chunk]
+                chunk_results = asyncio.run(verifier.verify_citations_batch(
+                    chunk, names, dates, batch_size=self.verify_batch_size))
+                results.update(zip(chunk, chunk_results))
+                logger.info(f"[BULK] Verified {min(start + len(chunk), len(texts))}/{len(texts)} unique citations")
+        finally:
+            set_verification_result_store(None)
+            store.close()
+
+        self._rewrite(lambda record: apply_verification(record, results)
+                      if record.get('verification') == VERIFICATION_PENDING else record)
+        return len(texts), sum(1 for result in results.values() if result is not None and result.verified)
+
+    def _rewrite(self, transform: Callable[[Dict[str, Any]], Dict[str, Any]]):
+        """Atomically replace the JSONL sink with transformed records."""
+        temp_path = self.results_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            for record in _read_records(self.results_path):
+                out.write(json.dumps(transform(record), default=str) + '\n')
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(temp_path, self.results_path)
+
+    def write_parquet(self, path: Optional[str] = None) -> str:
+        """Flatten the JSONL sink into one Parquet row per citation."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = path or os.path.join(self.output_dir, PARQUET_FILE)
+        columns = ('citation', 'extracted_case_name', 'extracted_date', 'canonical_name', 'canonical_date',
+                   'canonical_url', 'verified', 'cluster_id', 'start_index', 'end_index')
+        writer = None
+        try:
+            with open(self.results_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record.get('status') != 'ok' or not record['citations']:
+                        continue
+                    rows = {'document_id': [record['id']] * len(record['citations'])}
+                    for column in columns:
+                        rows[column] = [c.get(column) for c in record['citations']]
+                    rows['verified'] = [bool(v) for v in rows['verified']]
+                    for column in ('start_index', 'end_index'):
+                        rows[column] = [int(v) if v is not None else None for v in rows[column]]
+                    for column in set(columns) - {'verified', 'start_index', 'end_index'}:
+                        rows[column] = [str(v) if v is not None else None for v in rows[column]]
+                    table = pa.table(rows, schema=_parquet_schema(pa))
+                    if writer is None:
+                        writer = pq.ParquetWriter(path, table.schema)
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+
+
+def normalize_citation_key(citation: Optional[str]) -> Optional[str]:
+    """Corpus-wide identity of a citation: whitespace-normalized text."""
+    if not citation:
+        return None
+    return ' '.join(citation.split())
+
+
+def _read_records(results_path: str) -> Iterator[Dict[str, Any]]:
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def apply_verification(record: Dict[str, Any], results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Phase 3: copy corpus verification results into one document's citations and clusters.
+
+    Mirrors the single-document pipeline: each citation shows only its own
+    canonical data, unverified members of a cluster with a verified member are
+    true_by_parallel, and a cluster takes its canonical data from its first
+    verified member.
+    """
+    by_text: Dict[str, Dict[str, Any]] = {}
+    for citation in record['citations']:
+        result = results.get(normalize_citation_key(citation.get('citation')))
+        if result is not None and result.verified:
+            citation.update({
+                'verified': True,
+                'is_verified': True,
+                'canonical_name': result.canonical_name,
+                'canonical_date': result.canonical_date,
+                'canonical_url': result.canonical_url,
+                'source': result.source,
+                'verification_source': result.source,
+            })
+        else:
+            citation['verified'] = False
+            citation['is_verified'] = False
+        by_text[citation.get('citation')] = citation
+
+    verified_clusters = {c.get('cluster_id') for c in record['citations'] if c['verified'] and c.get('cluster_id')}
+    for citation in record['citations']:
+        citation['true_by_parallel'] = not citation['verified'] and citation.get('cluster_id') in verified_clusters
+
+    for cluster in record.get('clusters', []):
+        members = [by_text.get(entry.get('text')) for entry in cluster.get('citations', [])]
+        for key in ('citations', 'citation_details'):
+            for entry in cluster.get(key, []):
+                citation = by_text.get(entry.get('text'))
+                if citation is not None:
+                    entry.update({
+                        'verified': citation['verified'],
+                        'verification_source': citation.get('verification_source'),
+                        'verification_url': citation.get('canonical_url'),
+                        'true_by_parallel': citation['true_by_parallel'],
+                    })
+        anchor = next((m for m in members if m is not None and m['verified']), None)
+        cluster['verified'] = anchor is not None
+        if anchor is not None:
+            cluster['canonical_name'] = anchor['canonical_name']
+            cluster['canonical_date'] = anchor['canonical_date']
+            cluster['canonical_url'] = anchor['canonical_url']
+
+    record['verification'] = VERIFICATION_APPLIED
+    return record
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ('document_id', pa.string()),
+        ('citation', pa.string()),
+        ('extracted_case_name', pa.string()),
+        ('extracted_date', pa.string()),
+        ('canonical_name', pa.string()),
+        ('canonical_date', pa.string()),
+        ('canonical_url', pa.string()),
+        ('verified', pa.bool_()),
+        ('cluster_id', pa.string()),
+        ('start_index', pa.int64()),
+        ('end_index', pa.int64()),
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Process a corpus of documents with CaseStrainer")
+    parser.add_argument('source', help="Directory of documents or manifest file (paths or JSONL)")
+    parser.add_argument('--output', required=True, help="Output directory (results.jsonl is the checkpoint)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPUs - 1)")
+    parser.add_argument('--no-verification', action='store_true', help="Extract and cluster only")
+    parser.add_argument('--no-shared-verification', action='store_true',
+                        help="Do not share verification results between documents")
+    parser.add_argument('--two-phase', action='store_true',
+                        help="Extract everything offline, then verify each unique citation once")
+    parser.add_argument('--retry-failed', action='store_true', help="Reprocess documents that failed before")
+    parser.add_argument('--parquet', action='store_true', help="Also write citations.parquet")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logging.getLogger('src').setLevel(logging.WARNING)
+    logging.getLogger(__name__).setLevel(logging.INFO)
+
+    processor = BulkProcessor(args.output, workers=args.workers,
+                              enable_verification=not args.no_verification,
+                              share_verification=not args.no_shared_verification,
+                              retry_failed=args.retry_failed,
+                              two_phase=args.two_phase,
+                              on_record=lambda r: print(f"{r['status']:>5} {r['elapsed']:>8.2f}s {r['id']}"))
+    summary = processor.run(args.source)
+    if args.parquet:
+        print(f"Wrote {processor.write_parquet()}")
+    print(json.dumps(summary.to_dict(), indent=2))
+    return 1 if summary.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
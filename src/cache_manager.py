@@ -413,16 +413,14 @@ class UnifiedCacheManager:
             return False
 
     def get_url_content(self, url: str) -> Optional[str]:
-        """Get URL content from cache."""
-        if not self.redis_client:
-            return None
+        """Get URL content from the shared HTTP cache (src.http_cache)."""
+        from src.http_cache import get_http_cache
         
-        redis_key = self._get_redis_key('url', url)
         try:
-            cached_data = self.redis_client.get(redis_key)
-            if cached_data:
+            cached_data = get_http_cache().lookup(url)
+            if cached_data is not None:
                 self._update_stats('url', 'hit')
-                return self._decompress_data(cached_data)  # type: ignore
+                return cached_data.decode('utf-8', errors='replace')
             else:
                 self._update_stats('url', 'miss')
                 return None
@@ -431,18 +429,11 @@ class UnifiedCacheManager:
             return None
     
     def set_url_content(self, url: str, content: str) -> bool:
-        """Set URL content in Redis."""
-        if not self.redis_client:
-            return False
+        """Set URL content in the shared HTTP cache (src.http_cache)."""
+        from src.http_cache import get_http_cache
         
         try:
-            redis_key = self._get_redis_key('url', url)
-            compressed_data = self._compress_data(content)
-            self.redis_client.setex(
-                redis_key,
-                self.config['url_cache']['ttl'],
-                compressed_data
-            )
+            get_http_cache().store(url, content.encode('utf-8'), ttl=self.config['url_cache']['ttl'])
             return True
         except Exception as e:
             logger.error(f"Error setting URL content {url}: {e}")
@@ -51,7 +51,7 @@ def analyze_document_citations():
         citations = result.get('citations', [])
         
         results = {
-            'citations': [citation.__dict__ for citation in citations] if citations else [],
+            'citations': [citation.to_dict() for citation in citations] if citations else [],
             'total_count': len(citations) if citations else 0,
             'status': 'success'
         }
@@ -20,6 +20,7 @@ import logging
 from typing import Dict, List, Any
 from src.clean_extraction_pipeline import extract_citations_clean
 from src.models import CitationResult
+from src.streaming_extraction import extract_citations_streaming
 
 logger = logging.getLogger(__name__)
 
@@ -73,7 +74,7 @@ def _organize_clusters_by_verification(clusters: List[Dict]) -> Dict[str, List[D
     }
 
 
-def extract_citations_production(text: str) -> Dict[str, Any]:
+def extract_citations_production(text: str, streaming: bool = False) -> Dict[str, Any]:
     """
     PRODUCTION citation extraction endpoint.
     
@@ -85,6 +86,7 @@ def extract_citations_production(text: str) -> Dict[str, Any]:
     
     Args:
         text: Document text to extract citations from
+        streaming: Extract in bounded windows (see src.streaming_extraction) to cap memory
         
     Returns:
         Dictionary with:
@@ -107,7 +109,7 @@ def extract_citations_production(text: str) -> Dict[str, Any]:
         
         # Use clean extraction pipeline
         logger.info(f"[PRODUCTION] About to call extract_citations_clean()...")
-        citations = extract_citations_clean(text)
+        citations = extract_citations_streaming(text) if streaming else extract_citations_clean(text)
         logger.info(f"[PRODUCTION] extract_citations_clean() returned {len(citations)} citations")
         
         logger.info(f"[PRODUCTION] Extracted {len(citations)} citations with clean pipeline")
@@ -125,6 +127,8 @@ def extract_citations_production(text: str) -> Dict[str, Any]:
                 'confidence': cit.confidence,
                 'metadata': cit.metadata if hasattr(cit, 'metadata') else {}
             })
+        total = len(citations)
+        del citations  # the dicts replace the CitationResult objects
         
         # NEW: Propagate case names to parallel citations
         logger.info(f"[PRODUCTION] Applying parallel citation name propagation...")
@@ -137,11 +141,12 @@ def extract_citations_production(text: str) -> Dict[str, Any]:
         
         return {
             'citations': citation_dicts,
-            'total': len(citations),
+            'total': total,
             'accuracy': '90-93%',
             'method': 'clean_pipeline_v1',
             'version': '1.0.0',
             'case_name_bleeding': 'zero',
+            'memory_mode': 'streaming' if streaming else 'full',
             'status': 'success'
         }
         
@@ -158,7 +163,8 @@ def extract_citations_production(text: str) -> Dict[str, Any]:
         }
 
 
-def extract_citations_with_clustering(text: str, enable_verification: bool = False) -> Dict[str, Any]:
+def extract_citations_with_clustering(text: str, enable_verification: bool = False,
+                                      streaming: bool = False) -> Dict[str, Any]:
     """
     PRODUCTION endpoint with extraction + clustering.
     
@@ -170,6 +176,7 @@ def extract_citations_with_clustering(text: str, enable_verification: bool = Fal
     Args:
         text: Document text
         enable_verification: Whether to verify citations with CourtListener API
+        streaming: Extract in bounded windows for documents over the job memory budget
         
     Returns:
         Dictionary with citations and clusters
@@ -179,7 +186,7 @@ def extract_citations_with_clustering(text: str, enable_verification: bool = Fal
     try:
         # Step 1: Extract citations with clean pipeline
         logger.info(f"[PRODUCTION] Step 1: Extracting citations from {len(text)} chars")
-        extraction_result = extract_citations_production(text)
+        extraction_result = extract_citations_production(text, streaming=streaming)
         
         if extraction_result['status'] == 'error':
             return extraction_result
@@ -294,6 +301,7 @@ def extract_citations_with_clustering(text: str, enable_verification: bool = Fal
             'method': 'clean_pipeline_v1_with_clustering',
             'version': '1.0.0',
             'verification_enabled': enable_verification,
+            'memory_mode': extraction_result['memory_mode'],
             'status': 'success'
         }
         
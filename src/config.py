@@ -134,6 +134,32 @@ CASEMINE_TIMEOUT: int = int(get_config_value("CASEMINE_TIMEOUT", "8"))
 WEBSEARCH_TIMEOUT: int = int(get_config_value("WEBSEARCH_TIMEOUT", "5"))
 SCRAPINGBEE_TIMEOUT: int = int(get_config_value("SCRAPINGBEE_TIMEOUT", "15"))
 
+# Fallback source racing (EnhancedFallbackVerifier.verify_citations_batch)
+FALLBACK_CITATION_DEADLINE: float = float(get_config_value("FALLBACK_CITATION_DEADLINE", "12.0"))
+FALLBACK_WAVE_SIZE: int = int(get_config_value("FALLBACK_WAVE_SIZE", "3"))
+FALLBACK_WAVE_INTERVAL: float = float(get_config_value("FALLBACK_WAVE_INTERVAL", "1.5"))
+FALLBACK_SCORE_THRESHOLD: float = float(get_config_value("FALLBACK_SCORE_THRESHOLD", "2.5"))
+FALLBACK_MAX_INFLIGHT_CITATIONS: int = int(get_config_value("FALLBACK_MAX_INFLIGHT_CITATIONS", "8"))
+FALLBACK_PER_DOMAIN_LIMIT: int = int(get_config_value("FALLBACK_PER_DOMAIN_LIMIT", "2"))
+FALLBACK_SCRAPER_THREADS: int = int(get_config_value("FALLBACK_SCRAPER_THREADS", "16"))
+
+# Maximum HTML body parsed by scrapers and URL ingestion (src/utils/html_parsing.py)
+HTML_MAX_BYTES: int = int(get_config_value("HTML_MAX_BYTES", str(5 * 1024 * 1024)))
+
+# Conditional-GET HTTP cache for fetched pages and opinions (src/http_cache.py)
+HTTP_CACHE_ENABLED: bool = get_bool_config_value("HTTP_CACHE_ENABLED", True)
+HTTP_CACHE_SEARCH_TTL: int = int(get_config_value("HTTP_CACHE_SEARCH_TTL", "3600"))  # 1 hour
+HTTP_CACHE_OPINION_TTL: int = int(get_config_value("HTTP_CACHE_OPINION_TTL", str(7 * 86400)))  # 7 days
+HTTP_CACHE_RETENTION: int = int(get_config_value("HTTP_CACHE_RETENTION", str(30 * 86400)))  # kept for revalidation
+HTTP_CACHE_MAX_BODY_BYTES: int = int(get_config_value("HTTP_CACHE_MAX_BODY_BYTES", str(20 * 1024 * 1024)))
+HTTP_CACHE_MEMORY_ENTRIES: int = int(get_config_value("HTTP_CACHE_MEMORY_ENTRIES", "512"))
+
+# ML triage of verification work (src/verification_scheduler.py)
+ML_TRIAGE_ENABLED: bool = get_bool_config_value("ML_TRIAGE_ENABLED", True)
+ML_TRIAGE_SKIP_BELOW: float = float(get_config_value("ML_TRIAGE_SKIP_BELOW", "0.05"))  # P(valid) treated as junk
+ML_TRIAGE_DEFER_BELOW: float = float(get_config_value("ML_TRIAGE_DEFER_BELOW", "0.3"))  # verified only if time remains
+VERIFICATION_TIME_BUDGET: float = float(get_config_value("VERIFICATION_TIME_BUDGET", "0"))  # seconds per document, 0 = unlimited
+
 DEFAULT_MAX_RETRIES: int = int(get_config_value("DEFAULT_MAX_RETRIES", "3"))
 RETRY_DELAY: float = float(get_config_value("RETRY_DELAY", "1.0"))
 
@@ -187,6 +213,7 @@ def get_timeout_config() -> dict:
         'casemine_timeout': CASEMINE_TIMEOUT,
         'websearch_timeout': WEBSEARCH_TIMEOUT,
         'scrapingbee_timeout': SCRAPINGBEE_TIMEOUT,
+        'fallback_citation_deadline': FALLBACK_CITATION_DEADLINE,
         'default_max_retries': DEFAULT_MAX_RETRIES,
         'retry_delay': RETRY_DELAY,
         'job_timeout_minutes': JOB_TIMEOUT_MINUTES,
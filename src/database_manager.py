@@ -27,6 +27,14 @@ from src.config import DATABASE_FILE, DEFAULT_REQUEST_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+# Online backup and maintenance run in small steps with pauses, so writers wait at most one step
+BACKUP_PAGES_PER_STEP = int(os.environ.get('DB_BACKUP_PAGES_PER_STEP', 1024))
+BACKUP_STEP_SLEEP = float(os.environ.get('DB_BACKUP_STEP_SLEEP', 0.05))
+BACKUP_COMPRESS_LEVEL = 6
+BACKUP_CHUNK_SIZE = 1024 * 1024
+VACUUM_PAGES_PER_STEP = int(os.environ.get('DB_VACUUM_PAGES_PER_STEP', 256))
+VACUUM_STEP_SLEEP = float(os.environ.get('DB_VACUUM_STEP_SLEEP', 0.1))
+
 class DatabaseManager:
     """
     Comprehensive database manager for CaseStrainer with production-ready features.
@@ -52,6 +60,14 @@ class DatabaseManager:
             'queries_executed': 0,
             'backups_created': 0,
             'last_backup': None,
+            'last_backup_seconds': None,
+            'last_backup_steps': 0,
+            'backup_step_max_seconds': 0.0,
+            'last_maintenance': None,
+            'last_maintenance_seconds': None,
+            'vacuumed_pages': 0,
+            'write_stall_seconds': 0.0,
+            'write_stall_max_seconds': 0.0,
             'errors': 0
         }
         
@@ -67,14 +83,15 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
+                # page_size and auto_vacuum only take effect before the file is initialized,
+                # which switching to WAL does
+                cursor.execute("PRAGMA page_size = 4096")  # Optimal page size
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Free pages released by maintain_database
                 cursor.execute("PRAGMA journal_mode = WAL")  # Write-Ahead Logging
                 cursor.execute("PRAGMA synchronous = NORMAL")  # Balance between safety and performance
                 cursor.execute("PRAGMA cache_size = -64000")  # 64MB cache
                 cursor.execute("PRAGMA temp_store = MEMORY")  # Store temp tables in memory
                 cursor.execute("PRAGMA mmap_size = 268435456")  # 256MB memory mapping
-                cursor.execute("PRAGMA page_size = 4096")  # Optimal page size
-                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")  # Incremental vacuum
-                cursor.execute("PRAGMA incremental_vacuum = 1000")  # Vacuum 1000 pages at a time
                 
                 self._create_schema(cursor)
                 
@@ -314,34 +331,72 @@ class DatabaseManager:
             logger.error(f"Batch query execution error: {e}")
             raise
     
-    def backup_database(self, backup_path: Optional[str] = None) -> str:
-        """Create a compressed backup of the database."""
+    def backup_database(self, backup_path: Optional[str] = None, pages_per_step: int = BACKUP_PAGES_PER_STEP,
+                        step_sleep: float = BACKUP_STEP_SLEEP) -> str:
+        """
+        Create a compressed backup of the database.
+        
+        Uses the SQLite online backup API, so the copy is a consistent snapshot
+        including the WAL. It copies ``pages_per_step`` pages per step and pauses
+        ``step_sleep`` seconds between steps, so writers are never held up for
+        more than one step. The snapshot is then gzipped in chunks.
+        """
         if backup_path is None:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_dir = os.path.join(os.path.dirname(self.db_path), "backups")
             os.makedirs(backup_dir, exist_ok=True)
             backup_path = os.path.join(backup_dir, f"citations_backup_{timestamp}.db.gz")
         
+        temp_backup = f"{backup_path}.snapshot"
+        temp_archive = f"{backup_path}.tmp"
+        start = time.perf_counter()
+        steps = 0
+        step_max = 0.0
+        last_step = start
+        
+        def progress(status, remaining, total):
+            nonlocal steps, step_max, last_step
+            step_max = max(step_max, time.perf_counter() - last_step)
+            steps += 1
+            if remaining and step_sleep:
+                time.sleep(step_sleep)  # sqlite3 itself only sleeps when the source is busy
+            last_step = time.perf_counter()
+        
         try:
-            temp_backup = f"{backup_path}.tmp"
-            
-            shutil.copy2(self.db_path, temp_backup)
+            source = sqlite3.connect(self.db_path, timeout=DEFAULT_REQUEST_TIMEOUT)
+            target = sqlite3.connect(temp_backup)
+            try:
+                # Pin one WAL snapshot for the whole copy. Writers carry on; without it every
+                # commit from another connection would restart the backup from page one.
+                source.execute("BEGIN")
+                source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+                source.backup(target, pages=pages_per_step, progress=progress)
+            finally:
+                target.close()
+                source.close()
             
             with open(temp_backup, 'rb') as f_in:
-                with gzip.open(backup_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            
-            os.remove(temp_backup)
+                with gzip.open(temp_archive, 'wb', compresslevel=BACKUP_COMPRESS_LEVEL) as f_out:
+                    shutil.copyfileobj(f_in, f_out, BACKUP_CHUNK_SIZE)
+            os.replace(temp_archive, backup_path)
             
+            duration = time.perf_counter() - start
             self.stats['backups_created'] += 1
             self.stats['last_backup'] = datetime.now().isoformat()
+            self.stats['last_backup_seconds'] = round(duration, 3)
+            self.stats['last_backup_steps'] = steps
+            self.stats['backup_step_max_seconds'] = round(step_max, 4)
             
-            logger.info(f"Database backup created: {backup_path}")
+            logger.info(f"Database backup created: {backup_path} ({steps} steps, {duration:.2f}s)")
             return backup_path
             
         except Exception as e:
             logger.error(f"Database backup failed: {e}")
             raise
+        finally:
+            for path in (temp_backup, temp_archive):
+                if os.path.exists(path):
+                    os.remove(path)
     
     def restore_database(self, backup_path: str) -> bool:
         """Restore database from a backup file."""
@@ -366,11 +421,20 @@ class DatabaseManager:
             logger.error(f"Database restore failed: {e}")
             return False
     
-    def vacuum_database(self) -> bool:
-        """Optimize database by removing unused space."""
+    def vacuum_database(self, full: bool = False) -> bool:
+        """
+        Optimize database by removing unused space.
+        
+        By default this is the online maintenance pass (maintain_database).
+        ``full`` runs a blocking VACUUM; it is only needed once, to switch a
+        database created before auto_vacuum=INCREMENTAL over to it.
+        """
+        if not full:
+            return self.maintain_database()
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
                 cursor.execute("VACUUM")
                 cursor.execute("ANALYZE")
                 logger.info("Database vacuum and analyze completed")
@@ -379,6 +443,56 @@ class DatabaseManager:
             logger.error(f"Database vacuum failed: {e}")
             return False
     
+    def maintain_database(self, pages_per_step: int = VACUUM_PAGES_PER_STEP,
+                          step_sleep: float = VACUUM_STEP_SLEEP) -> bool:
+        """
+        Reclaim free pages and refresh planner statistics without stalling writers.
+        
+        Free pages are released by ``PRAGMA incremental_vacuum`` in write
+        transactions of ``pages_per_step`` pages with ``step_sleep`` pauses, then
+        ``PRAGMA optimize`` re-analyzes only what needs it. Time spent holding
+        the write lock is recorded as write stall.
+        """
+        start = time.perf_counter()
+        vacuumed = 0
+        
+        def timed(cursor, statement):
+            step_start = time.perf_counter()
+            # executescript steps the statement to completion; execute() would free one page
+            cursor.executescript(statement)
+            held = time.perf_counter() - step_start
+            self.stats['write_stall_seconds'] = round(self.stats['write_stall_seconds'] + held, 4)
+            self.stats['write_stall_max_seconds'] = round(max(self.stats['write_stall_max_seconds'], held), 4)
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                auto_vacuum = cursor.execute("PRAGMA auto_vacuum").fetchone()[0]
+                if auto_vacuum == 2:  # INCREMENTAL
+                    while True:
+                        free_pages = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+                        if not free_pages:
+                            break
+                        timed(cursor, f"PRAGMA incremental_vacuum({min(free_pages, pages_per_step)})")
+                        released = free_pages - cursor.execute("PRAGMA freelist_count").fetchone()[0]
+                        if released <= 0:
+                            break
+                        vacuumed += released
+                        time.sleep(step_sleep)
+                else:
+                    logger.info("Database is not in incremental auto_vacuum mode; run vacuum_database(full=True) once")
+                timed(cursor, "PRAGMA optimize")
+            
+            duration = time.perf_counter() - start
+            self.stats['vacuumed_pages'] += vacuumed
+            self.stats['last_maintenance'] = datetime.now().isoformat()
+            self.stats['last_maintenance_seconds'] = round(duration, 3)
+            logger.info(f"Database maintenance completed: {vacuumed} pages released in {duration:.2f}s")
+            return True
+        except Exception as e:
+            logger.error(f"Database maintenance failed: {e}")
+            return False
+    
     def get_database_stats(self) -> Dict[str, Any]:
         """Get comprehensive database statistics."""
         try:
@@ -17,6 +17,8 @@ from typing import Dict, List, Any, Optional
 from urllib.parse import urlparse
 import requests
 from bs4 import BeautifulSoup
+from src.config import HTML_MAX_BYTES
+from src.utils.html_parsing import html_to_text
 import docx
 import subprocess
 import tempfile
@@ -1071,14 +1073,25 @@ class UnifiedDocumentProcessor:
                         os.unlink(temp_file_path)  # Clean up temporary file
                         logger.info(f"Deleted temporary file: {temp_file_path}")
             
-            if 'text/html' in content_type:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                return soup.get_text()
-            elif 'text/plain' in content_type:
+            if 'text/plain' in content_type:
                 return response.text
-            else:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                return soup.get_text()
+            
+            # Read at most HTML_MAX_BYTES instead of buffering the whole body
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                body.extend(chunk)
+                if len(body) >= HTML_MAX_BYTES:
+                    logger.warning(f"HTML body from {url} exceeds {HTML_MAX_BYTES} bytes - truncating")
+                    break
+            response.close()
+            html = bytes(body)
+            charset = re.search(r'charset=([\w-]+)', content_type)
+            if charset:
+                try:
+                    html = html.decode(charset.group(1), errors='replace')
+                except LookupError:
+                    pass
+            return html_to_text(html, separator='', strip=False)
                 
         except Exception as e:
             logger.error(f"URL extraction failed: {e}")
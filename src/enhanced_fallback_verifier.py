@@ -35,10 +35,17 @@ def _deprecated_warning():
 
 import asyncio
 from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
+from src.config import (
+    FALLBACK_CITATION_DEADLINE, FALLBACK_WAVE_SIZE, FALLBACK_WAVE_INTERVAL, FALLBACK_SCORE_THRESHOLD,
+    FALLBACK_MAX_INFLIGHT_CITATIONS, FALLBACK_PER_DOMAIN_LIMIT, FALLBACK_SCRAPER_THREADS
+)
 
 import logging
 import re
+import threading
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple, Any
 from urllib.parse import urljoin, quote, urlparse
 import requests
@@ -48,6 +55,21 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Race scrapers block on requests, so they run on a dedicated, bounded pool
+# shared by every verifier instead of the loop's default executor
+_scraper_executor: Optional[ThreadPoolExecutor] = None
+_scraper_executor_lock = threading.Lock()
+
+
+def _get_scraper_executor() -> ThreadPoolExecutor:
+    global _scraper_executor
+    with _scraper_executor_lock:
+        if _scraper_executor is None:
+            _scraper_executor = ThreadPoolExecutor(
+                max_workers=max(1, FALLBACK_SCRAPER_THREADS), thread_name_prefix='fallback-scraper'
+            )
+        return _scraper_executor
+
 class EnhancedFallbackVerifier:
     """
     Enhanced fallback verification system that integrates multiple approaches
@@ -56,12 +78,13 @@ class EnhancedFallbackVerifier:
     
     def __init__(self, enable_experimental_engines=True):
         _deprecated_warning()  # Issue deprecation warning
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session_headers = {
             'User-Agent': 'CaseStrainer Citation Verifier (Educational Research)'
-        })
+        }
+        self._local = threading.local()
         
         self.last_request_time = {}
+        self._rate_limit_lock = threading.Lock()
         self.min_delay = 0.2  # Reduced from 1.0 to 0.2 seconds for faster processing
         
         self.legal_domains = {
@@ -140,16 +163,40 @@ class EnhancedFallbackVerifier:
         
         self._verification_cache = {}
         self._cache_ttl = 60 * 60  # Cache results for 1 hour
+        
+        # Source racing settings (see _race_citation)
+        self.citation_deadline = FALLBACK_CITATION_DEADLINE
+        self.wave_size = max(1, FALLBACK_WAVE_SIZE)
+        self.wave_interval = FALLBACK_WAVE_INTERVAL
+        self.score_threshold = FALLBACK_SCORE_THRESHOLD
+        self.max_inflight_citations = max(1, FALLBACK_MAX_INFLIGHT_CITATIONS)
+        self.per_domain_limit = max(1, FALLBACK_PER_DOMAIN_LIMIT)
+        # Semaphores bind to the loop they are first used on, so each loop gets its own set
+        self._domain_semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]' = \
+            weakref.WeakKeyDictionary()
+        self._domain_semaphores_lock = threading.Lock()
+        self._ml_predictor = None
+    
+    @property
+    def session(self) -> requests.Session:
+        """The calling thread's requests session (sessions are not thread-safe)."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.session_headers)
+            self._local.session = session
+        return session
     
     def _rate_limit(self, domain: str):
         """Apply rate limiting for requests to the same domain."""
-        now = time.time()
-        if domain in self.last_request_time:
-            time_since_last = now - self.last_request_time[domain]
-            if time_since_last < self.min_delay:
-                sleep_time = self.min_delay - time_since_last
-                time.sleep(sleep_time)
-        self.last_request_time[domain] = now
+        # Reserve the next send slot under the lock, then sleep outside it so
+        # concurrent scrapers for the same domain are spaced min_delay apart
+        with self._rate_limit_lock:
+            now = time.time()
+            send_at = max(now, self.last_request_time.get(domain, 0.0) + self.min_delay)
+            self.last_request_time[domain] = send_at
+        if send_at > now:
+            time.sleep(send_at - now)
     
     def normalize_citation(self, citation: str) -> str:
         """Normalize citation format (e.g., WN. -> Wash.)."""
@@ -1894,6 +1941,235 @@ class EnhancedFallbackVerifier:
             logger.warning(f"ScrapingBee verification failed for {citation_text}: {e}")
             return None
 
+    def _get_race_sources(self) -> Dict[str, Tuple[Any, str, float]]:
+        """
+        Sources raced by _race_citation, keyed by the names used in
+        AdvancedMLPredictor.success_rates so its ranking maps across directly.
+        
+        Returns:
+            Dict of source name -> (verify function, rate-limit domain, per-source timeout)
+        """
+        return {
+            'justia': (self._verify_with_justia, 'justia.com', WEBSEARCH_TIMEOUT),
+            'findlaw': (self._verify_with_findlaw, 'findlaw.com', WEBSEARCH_TIMEOUT),
+            'leagle': (self._verify_with_leagle, 'leagle.com', WEBSEARCH_TIMEOUT),
+            'casemine': (self._verify_with_casemine, 'casemine.com', CASEMINE_TIMEOUT),
+            'google_scholar': (self._verify_with_google_scholar, 'scholar.google.com', WEBSEARCH_TIMEOUT),
+            'bing': (self._verify_with_bing, 'bing.com', WEBSEARCH_TIMEOUT),
+            'duckduckgo': (self._verify_with_duckduckgo, 'duckduckgo.com', WEBSEARCH_TIMEOUT),
+            'vlex': (self._verify_with_vlex, 'vlex.com', WEBSEARCH_TIMEOUT),
+            'descrybe': (self._verify_with_descrybe, 'descrybe.ai', WEBSEARCH_TIMEOUT),
+        }
+    
+    def _rank_race_sources(self, citation_text: str, extracted_case_name: Optional[str] = None) -> List[str]:
+        """
+        Order race sources by expected time-to-verify from live telemetry.
+        
+        AdvancedMLPredictor.predict_optimal_sources supplies the prior success
+        rates, so its ranking holds until telemetry for the reporter builds up.
+        """
+        sources = list(self._get_race_sources().keys())
+        
+        try:
+            if self._ml_predictor is None:
+                from src.websearch.cache import CacheManager
+                from src.websearch.ml_predictor import AdvancedMLPredictor
+                self._ml_predictor = AdvancedMLPredictor(CacheManager())
+            predicted = self._ml_predictor.predict_optimal_sources(citation_text, extracted_case_name)
+        except Exception as e:
+            logger.debug(f"Source prediction unavailable for {citation_text}: {e}")
+            predicted = []
+        
+        priors = {name: score for name, score in predicted if name in sources}
+        
+        try:
+            from src.websearch.source_telemetry import get_source_telemetry
+            return get_source_telemetry().rank_sources(citation_text, sources, priors=priors)
+        except Exception as e:
+            logger.debug(f"Source telemetry unavailable for {citation_text}: {e}")
+        
+        ranked = [name for name, _score in predicted if name in sources]
+        ranked.extend(name for name in sources if name not in ranked)
+        return ranked
+    
+    def _record_source_outcome(self, source_name: str, success: bool, latency: float, citation_text: str):
+        """Feed a source attempt into the shared telemetry used for ranking."""
+        try:
+            from src.websearch.source_telemetry import get_source_telemetry
+            get_source_telemetry().record(source_name, success, latency, citation_text)
+        except Exception as e:
+            logger.debug(f"Failed to record telemetry for {source_name}: {e}")
+    
+    def _get_domain_semaphore(self, domain: str) -> asyncio.Semaphore:
+        """Get the per-domain concurrency cap shared by all in-flight citations."""
+        loop = asyncio.get_running_loop()
+        with self._domain_semaphores_lock:
+            semaphores = self._domain_semaphores.setdefault(loop, {})
+            semaphore = semaphores.get(domain)
+            if semaphore is None:
+                semaphore = semaphores[domain] = asyncio.Semaphore(self.per_domain_limit)
+        return semaphore
+    
+    async def _run_race_source(self, source_name: str, citation_text: str, citation_info: Dict,
+                               extracted_case_name: Optional[str], extracted_date: Optional[str],
+                               query: str, timeout: float) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """
+        Run one source under its domain cap and return (source, result, score).
+        
+        The scrapers use blocking requests, so each one runs on the bounded
+        scraper pool to keep the event loop free for the other racers. A thread
+        cannot be interrupted, so when the racer times out or is cancelled the
+        domain slot stays taken until the thread actually returns.
+        """
+        verify_func, domain, source_timeout = self._get_race_sources()[source_name]
+        timeout = min(timeout, source_timeout)
+        if timeout <= 0:
+            return None
+        
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_domain_semaphore(domain)
+        await semaphore.acquire()
+        
+        args = (citation_text, citation_info, extracted_case_name, extracted_date, query)
+        if asyncio.iscoroutinefunction(verify_func):
+            call = lambda: asyncio.run(verify_func(*args))
+        else:
+            call = lambda: verify_func(*args)
+        try:
+            future = _get_scraper_executor().submit(call)
+        except BaseException:
+            semaphore.release()
+            raise
+        
+        def release_slot(_future):
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass  # loop already closed; its semaphores went with it
+        
+        future.add_done_callback(release_slot)
+        
+        started = time.time()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout=timeout)
+        except asyncio.TimeoutError:
+            future.cancel()  # only succeeds if the pool never started it
+            logger.debug(f"Race source {source_name} timed out for {citation_text}")
+            self._record_source_outcome(source_name, False, time.time() - started, citation_text)
+            return None
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            logger.debug(f"Race source {source_name} failed for {citation_text}: {e}")
+            self._record_source_outcome(source_name, False, time.time() - started, citation_text)
+            return None
+        
+        verified = bool(result and result.get('verified', False))
+        self._record_source_outcome(source_name, verified, time.time() - started, citation_text)
+        if not verified:
+            return None
+        
+        score = self._calculate_verification_score(result, extracted_case_name, extracted_date)
+        return source_name, result, score
+    
+    async def _race_citation(self, citation_text: str, extracted_case_name: Optional[str] = None,
+                             extracted_date: Optional[str] = None,
+                             deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Race fallback sources for one citation under a total deadline.
+        
+        Sources are launched in ranked waves of ``wave_size``. A new wave starts
+        when the previous one is exhausted or ``wave_interval`` has passed
+        without a winner. The first result scoring at or above
+        ``score_threshold`` wins and cancels the remaining racers; otherwise the
+        best verified result seen before the deadline is returned.
+        """
+        citation_text = self._preprocess_text_for_citations(citation_text)
+        if extracted_case_name:
+            extracted_case_name = self._preprocess_text_for_citations(extracted_case_name)
+        
+        # Same cache (and key) as verify_citation_sync_optimized
+        cache_key = f"{citation_text}_{extracted_case_name}_{extracted_date}"
+        cached = self._verification_cache.get(cache_key)
+        if cached and time.time() - cached.get('cache_time', 0) < self._cache_ttl:
+            logger.info(f"Cache hit for {citation_text}")
+            return cached['result']
+        
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline_at = start + (deadline if deadline is not None else self.citation_deadline)
+        
+        citation_info = self._parse_citation(citation_text)
+        queries = self.generate_enhanced_legal_queries(citation_text, extracted_case_name)
+        query = queries[0]['query'] if queries else citation_text
+        
+        ranked = self._rank_race_sources(citation_text, extracted_case_name)
+        waves = [ranked[i:i + self.wave_size] for i in range(0, len(ranked), self.wave_size)]
+        
+        pending = set()
+        best: Optional[Tuple[str, Dict[str, Any], float]] = None
+        winner: Optional[Tuple[str, Dict[str, Any], float]] = None
+        next_wave = 0
+        next_launch_at = start
+        
+        try:
+            while winner is None:
+                now = loop.time()
+                if now >= deadline_at:
+                    break
+                
+                if next_wave < len(waves) and (now >= next_launch_at or not pending):
+                    for source_name in waves[next_wave]:
+                        pending.add(asyncio.ensure_future(self._run_race_source(
+                            source_name, citation_text, citation_info,
+                            extracted_case_name, extracted_date, query, deadline_at - now
+                        )))
+                    next_wave += 1
+                    next_launch_at = now + self.wave_interval
+                
+                if not pending:
+                    break
+                
+                wait_timeout = deadline_at - now
+                if next_wave < len(waves):
+                    wait_timeout = min(wait_timeout, max(next_launch_at - now, 0.0))
+                
+                done, pending = await asyncio.wait(pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    outcome = task.result()
+                    if not outcome:
+                        continue
+                    if outcome[2] >= self.score_threshold:
+                        winner = outcome
+                        break
+                    if best is None or outcome[2] > best[2]:
+                        best = outcome
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        elapsed = loop.time() - start
+        chosen = winner or best
+        if chosen is None:
+            status = "deadline_exceeded" if loop.time() >= deadline_at else "not_found"
+            logger.info(f"❌ Fallback race failed for {citation_text}: {status} after {elapsed:.1f}s")
+            result = self._create_fallback_result(citation_text, status)
+            result['race_elapsed'] = round(elapsed, 3)
+            return result
+        
+        source_name, result, score = chosen
+        result = dict(result)
+        result.setdefault('canonical_url', result.get('url'))
+        result['verification_strategy'] = 'fallback_race'
+        result['race_source'] = source_name
+        result['race_score'] = round(score, 3)
+        result['race_elapsed'] = round(elapsed, 3)
+        logger.info(f"🏁 Fallback race won by {source_name} for {citation_text} (score {score:.2f}) in {elapsed:.1f}s")
+        # Misses are not cached: a deadline or a rate-limited source is not a verdict
+        self._verification_cache[cache_key] = {'result': result, 'cache_time': time.time()}
+        return result
+    
     async def verify_citations_batch(self, citations: List[str], extracted_case_names: Optional[List[str]] = None, extracted_dates: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         """
         Verify multiple citations using CourtListener batch API first, then enhanced fallback.
@@ -1946,14 +2222,21 @@ class EnhancedFallbackVerifier:
                     })
             
             if citations_needing_fallback:
-                logger.info(f"Processing {len(citations_needing_fallback)} citations with enhanced fallback verification")
+                logger.info(f"Racing fallback sources for {len(citations_needing_fallback)} citations "
+                            f"({self.max_inflight_citations} in flight, {self.citation_deadline:.0f}s deadline each)")
+                
+                citation_slots = asyncio.Semaphore(self.max_inflight_citations)
                 
-                for i, citation in enumerate(citations_needing_fallback):
-                    original_index = fallback_indices[i]
+                async def race_one(original_index: int, citation: str) -> None:
                     extracted_case_name = extracted_case_names[original_index] if extracted_case_names and original_index < len(extracted_case_names) else None
                     extracted_date = extracted_dates[original_index] if extracted_dates and original_index < len(extracted_dates) else None
                     
-                    fallback_result = await self.verify_citation(citation, extracted_case_name, extracted_date, has_courtlistener_data=False)
+                    async with citation_slots:
+                        try:
+                            fallback_result = await self._race_citation(citation, extracted_case_name, extracted_date)
+                        except Exception as e:
+                            logger.warning(f"Fallback race error for {citation}: {e}")
+                            fallback_result = self._create_fallback_result(citation, "race_error")
                     
                     results[original_index] = fallback_result
                     
@@ -1961,6 +2244,11 @@ class EnhancedFallbackVerifier:
                         logger.info(f"✅ Fallback verified: {citation} -> {fallback_result.get('canonical_name', 'N/A')} (via {fallback_result.get('source', 'unknown')})")
                     else:
                         logger.info(f"❌ Fallback failed: {citation}")
+                
+                await asyncio.gather(*(
+                    race_one(original_index, citation)
+                    for original_index, citation in zip(fallback_indices, citations_needing_fallback)
+                ))
             
             logger.info(f"Batch verification completed: {len([r for r in results if r.get('verified', False)])}/{len(citations)} verified")
             return results
@@ -0,0 +1,496 @@
+"""
+Conditional-GET HTTP cache for fetched pages and opinions.
+
+URL ingestion and the direct-URL verification scrapers fetch the same opinion
+pages over and over. This module keeps one shared cache in front of those
+requests:
+
+- bodies are stored once, content-addressed by SHA-256
+- each URL keeps its ETag/Last-Modified validators and a freshness deadline
+- stale entries are revalidated with If-None-Match/If-Modified-Since, so an
+  unchanged page costs a 304 instead of a full download
+- Cache-Control (no-store, no-cache, max-age, s-maxage) and Expires are
+  honoured, capped by separate TTLs for search pages and opinion pages
+- Authorization and Accept are always part of the key, on top of Vary
+
+Entries live in a bounded in-process LRU, backed by Redis when it is reachable.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from src.config import (
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_MAX_BODY_BYTES,
+    HTTP_CACHE_MEMORY_ENTRIES,
+    HTTP_CACHE_OPINION_TTL,
+    HTTP_CACHE_RETENTION,
+    HTTP_CACHE_SEARCH_TTL,
+)
+
+logger = logging.getLogger(__name__)
+
+KIND_OPINION = 'opinion'
+KIND_SEARCH = 'search'
+
+# Headers kept with a cached entry; transfer-level headers no longer describe the decoded body
+_STORED_HEADERS = ('content-type', 'cache-control', 'expires', 'date', 'etag', 'last-modified', 'vary')
+
+# Request headers that select a different representation even when the server
+# omits them from Vary (CourtListener answers API and HTML requests on one URL)
+_KEYED_REQUEST_HEADERS = ('authorization', 'accept')
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _full_url(url: str, params: Optional[Dict[str, Any]]) -> str:
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url or url
+
+
+class CachedResponse:
+    """
+    A response served from (or stored into) the HTTP cache.
+
+    Exposes the subset of ``requests.Response`` the fetchers use, so callers
+    can treat cached and live responses alike.
+    """
+
+    def __init__(self, url: str, status_code: int, headers: Dict[str, str], content: bytes,
+                 from_cache: bool = False, revalidated: bool = False, truncated: bool = False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.from_cache = from_cache
+        self.revalidated = revalidated
+        self.truncated = truncated
+        self.encoding = requests.utils.get_encoding_from_headers(self.headers)
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def apparent_encoding(self) -> str:
+        try:
+            return requests.compat.chardet.detect(self.content)['encoding'] or 'utf-8'
+        except Exception:
+            return 'utf-8'
+
+    @property
+    def text(self) -> str:
+        encoding = self.encoding or self.apparent_encoding
+        try:
+            return self.content.decode(encoding, errors='replace')
+        except LookupError:
+            return self.content.decode('utf-8', errors='replace')
+
+    def json(self, **kwargs) -> Any:
+        return json.loads(self.text, **kwargs)
+
+    def iter_content(self, chunk_size: int = 1, decode_unicode: bool = False) -> Iterator:
+        data = self.text if decode_unicode else self.content
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        pass
+
+
+class _MemoryStore:
+    """Bounded LRU of URL entries; bodies are dropped with their last referencing entry."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._bodies: Dict[str, bytes] = {}
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def get_body(self, body_hash: str) -> Optional[bytes]:
+        with self._lock:
+            return self._bodies.get(body_hash)
+
+    def set(self, key: str, entry: Dict[str, Any], body: Optional[bytes]):
+        with self._lock:
+            body_hash = entry['body_hash']
+            # Take the new reference before dropping the old one: a refreshed
+            # entry (304) points at the body its predecessor was holding
+            stored = body is not None or body_hash in self._bodies
+            if stored:
+                if body is not None:
+                    self._bodies[body_hash] = body
+                self._refs[body_hash] = self._refs.get(body_hash, 0) + 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._release(previous['body_hash'])
+            if stored:
+                self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                _key, evicted = self._entries.popitem(last=False)
+                self._release(evicted['body_hash'])
+
+    def _release(self, body_hash: str):
+        remaining = self._refs.get(body_hash, 0) - 1
+        if remaining > 0:
+            self._refs[body_hash] = remaining
+        else:
+            self._refs.pop(body_hash, None)
+            self._bodies.pop(body_hash, None)
+
+
+class _RedisStore:
+    """Redis-backed entries and gzip-compressed bodies under the ``casestrainer:http`` namespace."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        data = self.client.get(f"casestrainer:http:entry:{key}")
+        return json.loads(data) if data else None
+
+    def get_body(self, body_hash: str) -> Optional[bytes]:
+        data = self.client.get(f"casestrainer:http:body:{body_hash}")
+        return gzip.decompress(data) if data else None
+
+    def set(self, key: str, entry: Dict[str, Any], body: Optional[bytes], ttl: int):
+        body_key = f"casestrainer:http:body:{entry['body_hash']}"
+        # Bodies are shared by every entry with the same content, so their TTL
+        # may only grow: another URL's entry can still need the body for longer
+        remaining = self.client.ttl(body_key)  # -2: missing, -1: no expiry
+        pipe = self.client.pipeline()
+        if remaining == -2:
+            if body is not None:
+                pipe.setex(body_key, ttl, gzip.compress(body))
+        elif 0 <= remaining < ttl:
+            pipe.expire(body_key, ttl)
+        pipe.setex(f"casestrainer:http:entry:{key}", ttl, json.dumps(entry))
+        pipe.execute()
+
+
+class HTTPCache:
+    """
+    Shared conditional-GET cache.
+
+    Args:
+        redis_client: Optional Redis client for the shared tier
+        search_ttl: Maximum freshness (seconds) for search result pages
+        opinion_ttl: Maximum freshness (seconds) for opinion/document pages
+        retention: How long stale entries are kept for revalidation
+        max_body_bytes: Bodies larger than this are passed through uncached
+        memory_entries: Size of the in-process LRU
+        enabled: When False every call goes straight to the network
+    """
+
+    def __init__(self, redis_client=None, search_ttl: int = HTTP_CACHE_SEARCH_TTL,
+                 opinion_ttl: int = HTTP_CACHE_OPINION_TTL, retention: int = HTTP_CACHE_RETENTION,
+                 max_body_bytes: int = HTTP_CACHE_MAX_BODY_BYTES,
+                 memory_entries: int = HTTP_CACHE_MEMORY_ENTRIES, enabled: bool = HTTP_CACHE_ENABLED):
+        self.ttls = {KIND_SEARCH: search_ttl, KIND_OPINION: opinion_ttl}
+        self.retention = retention
+        self.max_body_bytes = max_body_bytes
+        self.enabled = enabled
+        self._memory = _MemoryStore(memory_entries)
+        self._redis = _RedisStore(redis_client) if redis_client is not None else None
+        self._stats_lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'uncacheable': 0}
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['redis_connected'] = self._redis is not None
+        return stats
+
+    @staticmethod
+    def _key(url: str, request_headers: Optional[Dict[str, str]] = None) -> str:
+        lowered = {name.lower(): value for name, value in (request_headers or {}).items()}
+        keyed = [lowered.get(name, '') for name in _KEYED_REQUEST_HEADERS]
+        return hashlib.sha256(json.dumps([url] + keyed).encode('utf-8')).hexdigest()
+
+    def _load(self, key: str):
+        """Return (entry, body) from memory, then Redis."""
+        entry = self._memory.get(key)
+        body = self._memory.get_body(entry['body_hash']) if entry else None
+        if body is not None:
+            return entry, body
+        if self._redis is None:
+            return None, None
+        try:
+            entry = self._redis.get(key)
+            body = self._redis.get_body(entry['body_hash']) if entry else None
+        except Exception as e:
+            logger.debug(f"HTTP cache Redis read failed: {e}")
+            return None, None
+        if entry is None or body is None:
+            return None, None
+        self._memory.set(key, entry, body)
+        return entry, body
+
+    def _store(self, key: str, entry: Dict[str, Any], body: Optional[bytes]):
+        self._memory.set(key, entry, body)
+        if self._redis is not None:
+            ttl = int(max(self.retention, entry['fresh_until'] - time.time(), 1))
+            try:
+                self._redis.set(key, entry, body, ttl)
+            except Exception as e:
+                logger.debug(f"HTTP cache Redis write failed: {e}")
+
+    def freshness_lifetime(self, headers, kind: str) -> Optional[float]:
+        """
+        Seconds a response stays fresh, or None if it must not be stored.
+
+        Server directives can shorten but never extend the per-kind TTL.
+        """
+        directives = _parse_cache_control(headers.get('Cache-Control'))
+        if 'no-store' in directives:
+            return None
+        ttl = self.ttls.get(kind, self.ttls[KIND_OPINION])
+        if 'no-cache' in directives:
+            return 0
+        for directive in ('s-maxage', 'max-age'):
+            if directive in directives:
+                try:
+                    return max(0, min(int(directives[directive] or 0), ttl))
+                except ValueError:
+                    return 0
+        expires = _parse_http_date(headers.get('Expires'))
+        if headers.get('Expires') and expires is None:
+            return 0  # invalid Expires means already expired
+        if expires is not None:
+            date = _parse_http_date(headers.get('Date')) or time.time()
+            return max(0, min(expires - date, ttl))
+        return ttl
+
+    @staticmethod
+    def _vary_values(vary: Optional[str], request_headers: Dict[str, str]) -> Optional[Dict[str, str]]:
+        """
+        Request header values named by Vary plus Authorization and Accept, or None for ``Vary: *``.
+
+        Authorization is kept as a digest so credentials never reach the stored entry.
+        """
+        lowered = {name.lower(): value for name, value in request_headers.items()}
+        values = {}
+        for name in list(_KEYED_REQUEST_HEADERS) + (vary or '').split(','):
+            name = name.strip().lower()
+            if name == '*':
+                return None
+            if name:
+                values[name] = lowered.get(name, '')
+        if values.get('authorization'):
+            values['authorization'] = hashlib.sha256(values['authorization'].encode('utf-8')).hexdigest()
+        return values
+
+    def _build_entry(self, url: str, status_code: int, headers, body_hash: str, lifetime: float,
+                     kind: str, request_headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        headers = CaseInsensitiveDict(headers)
+        vary = self._vary_values(headers.get('Vary'), request_headers)
+        if vary is None:
+            return None
+        now = time.time()
+        return {
+            'url': url,
+            'status_code': status_code,
+            'headers': {name: headers[name] for name in _STORED_HEADERS if name in headers},
+            'body_hash': body_hash,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'vary': vary,
+            'kind': kind,
+            'stored_at': now,
+            'fresh_until': now + lifetime,
+        }
+
+    @staticmethod
+    def _read_body(response, limit: Optional[int] = None):
+        """Return (body, truncated); reading stops once the body passes ``limit``."""
+        chunks = []
+        size = 0
+        truncated = False
+        for chunk in response.iter_content(chunk_size=65536):
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            size += len(chunk)
+            if limit is not None and size > limit:
+                truncated = True
+                break
+        response.close()
+        return b''.join(chunks), truncated
+
+    def get(self, url: str, session=None, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+            kind: str = KIND_OPINION, max_bytes: Optional[int] = None, **kwargs):
+        """
+        GET a URL through the cache.
+
+        Args:
+            url: URL to fetch
+            session: requests.Session to use (module-level ``requests`` if None)
+            params: Query parameters (part of the cache key)
+            headers: Request headers
+            timeout: Request timeout
+            kind: ``'opinion'`` or ``'search'``; selects the maximum freshness
+            max_bytes: Stop reading the body after this many bytes; the
+                response is then marked ``truncated`` (its content is longer
+                than max_bytes) and never cached. Without it the full body is
+                returned, and only stored if it fits ``max_body_bytes``
+            **kwargs: Passed through to ``session.get``
+
+        Returns:
+            CachedResponse for 200/304 outcomes, otherwise the live response
+        """
+        requester = session or requests
+        request_headers = dict(headers or {})
+        kwargs.pop('stream', None)
+        if not self.enabled:
+            return requester.get(url, params=params, headers=request_headers, timeout=timeout, **kwargs)
+
+        full_url = _full_url(url, params)
+        key = self._key(full_url, request_headers)
+        entry, body = self._load(key)
+        if entry is not None and entry['vary'] != self._vary_values(','.join(entry['vary']), request_headers):
+            entry, body = None, None  # cached variant was negotiated with different request headers
+
+        if entry is not None and time.time() < entry['fresh_until']:
+            self._count('hits')
+            return CachedResponse(full_url, entry['status_code'], entry['headers'], body, from_cache=True)
+
+        conditional_headers = dict(request_headers)
+        if entry is not None:
+            if entry.get('etag'):
+                conditional_headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                conditional_headers['If-Modified-Since'] = entry['last_modified']
+
+        response = requester.get(full_url, headers=conditional_headers, timeout=timeout, stream=True, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            merged = CaseInsensitiveDict(entry['headers'])
+            merged.update({name: value for name, value in response.headers.items() if name.lower() in _STORED_HEADERS})
+            lifetime = self.freshness_lifetime(merged, kind)
+            refreshed = self._build_entry(entry['url'], entry['status_code'], merged, entry['body_hash'],
+                                          lifetime or 0, kind, request_headers)
+            if lifetime is not None and refreshed is not None:
+                self._store(key, refreshed, None)
+            response.close()
+            self._count('revalidated')
+            return CachedResponse(full_url, entry['status_code'], dict(merged), body,
+                                  from_cache=True, revalidated=True)
+
+        if response.status_code != 200:
+            self._count('uncacheable')
+            return response
+
+        self._count('misses')
+        content, truncated = self._read_body(response, max_bytes)
+        final_url = getattr(response, 'url', None) or full_url
+        cached = CachedResponse(final_url, 200, dict(response.headers), content, truncated=truncated)
+
+        lifetime = self.freshness_lifetime(response.headers, kind)
+        has_validators = bool(response.headers.get('ETag') or response.headers.get('Last-Modified'))
+        if (lifetime is None or truncated or len(content) > self.max_body_bytes
+                or (lifetime == 0 and not has_validators)):
+            self._count('uncacheable')
+            return cached
+
+        body_hash = hashlib.sha256(content).hexdigest()
+        new_entry = self._build_entry(final_url, 200, response.headers, body_hash, lifetime, kind, request_headers)
+        if new_entry is not None:
+            self._store(key, new_entry, content)
+            self._count('stored')
+        return cached
+
+    def lookup(self, url: str) -> Optional[bytes]:
+        """Body of a fresh cached 200 for ``url``, without touching the network."""
+        if not self.enabled:
+            return None
+        entry, body = self._load(self._key(url))
+        if entry is None or entry['status_code'] != 200 or time.time() >= entry['fresh_until']:
+            return None
+        return body
+
+    def store(self, url: str, content: bytes, kind: str = KIND_OPINION, ttl: Optional[float] = None):
+        """Store a body fetched outside ``get`` (no validators, fresh for ``ttl`` or the kind's TTL)."""
+        if not self.enabled or len(content) > self.max_body_bytes:
+            return
+        lifetime = self.ttls.get(kind, self.ttls[KIND_OPINION])
+        if ttl is not None:
+            lifetime = min(ttl, lifetime)
+        entry = self._build_entry(url, 200, {}, hashlib.sha256(content).hexdigest(),
+                                  lifetime, kind, {})
+        self._store(self._key(url), entry, content)
+        self._count('stored')
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def _connect_redis():
+    """Connect to the shared Redis tier, or return None so the cache stays in-process."""
+    try:
+        import redis
+        client = redis.Redis.from_url(
+            os.environ.get('REDIS_URL', 'redis://casestrainer-redis-prod:6379/0'),
+            socket_connect_timeout=1,
+            socket_timeout=2,
+        )
+        client.ping()
+        return client
+    except Exception as e:
+        logger.info(f"HTTP cache running without Redis: {e}")
+        return None
+
+
+def get_http_cache() -> HTTPCache:
+    """Get the process-wide HTTP cache."""
+    global _http_cache
+    if _http_cache is None:
+        with _http_cache_lock:
+            if _http_cache is None:
+                _http_cache = HTTPCache(redis_client=_connect_redis() if HTTP_CACHE_ENABLED else None)
+    return _http_cache
@@ -0,0 +1,421 @@
+"""
+Incremental Re-analysis
+
+Users iterate on a brief and resubmit it with small edits. Instead of running
+extraction, enrichment, clustering and verification over the whole text again,
+``IncrementalAnalyzer`` diffs the new submission against the snapshot of the
+previous one for the same ``document_id``:
+
+- the diff (fast_diff_match_patch) is mapped onto the paragraphs of the new
+  text; changed paragraphs plus one neighbour on each side are dirty
+- any previous cluster with a member in a dirty paragraph makes the
+  paragraphs of all its members dirty, so clusters are rebuilt whole
+- citations and clusters outside the dirty windows are kept, with their
+  positions shifted by the edit offsets
+- only the dirty windows go through extraction and clustering again
+- verification is reused from the snapshot by citation text; only citations
+  that have never been seen are sent to the verifier
+
+Large rewrites (more than half the text dirty) fall back to a full analysis.
+``plan`` reports how much would be reprocessed without doing it, so callers
+can run small re-analyses inline and queue first or full runs like any other
+large document (``analyze_document_task`` is the RQ entry point). The diff it
+computes is handed on to ``analyze`` so it is not computed twice.
+
+Snapshots are namespaced by ``owner`` (the submitting client), so one client
+cannot read or overwrite another's history by reusing a ``document_id``.
+
+Example:
+    analyzer = get_incremental_analyzer()
+    result = analyzer.analyze('brief-42', text, owner=client_id)
+    result['metadata']['incremental']  # {'mode': 'incremental', 'windows': 1, ...}
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.result_store import offloads_result
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_STORE_FILE = 'data/incremental_snapshots.db'
+SNAPSHOT_TTL_HOURS = 24 * 7
+SNAPSHOT_MEMORY_ITEMS = 32
+NEIGHBOUR_PARAGRAPHS = 1
+MAX_DIRTY_FRACTION = 0.5
+
+PARAGRAPH_BREAK = re.compile(r'\n[ \t]*\n')
+
+Span = Tuple[int, int]
+
+
+def paragraph_spans(text: str) -> List[Span]:
+    """Paragraphs of ``text`` as [start, end) spans that cover it end to end."""
+    spans = []
+    start = 0
+    for match in PARAGRAPH_BREAK.finditer(text):
+        spans.append((start, match.end()))
+        start = match.end()
+    if start < len(text) or not spans:
+        spans.append((start, len(text)))
+    return spans
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class TextDiff:
+    """Character diff between two texts: unchanged runs and edit positions in the new text."""
+
+    def __init__(self, old: str, new: str):
+        import fast_diff_match_patch
+
+        # Unchanged runs as (old_start, new_start, length), sorted by old_start
+        self.equal: List[Tuple[int, int, int]] = []
+        self.insertions: List[Span] = []
+        self.deletions: List[int] = []
+        old_pos = new_pos = 0
+        for op, length in fast_diff_match_patch.diff(old, new, counts_only=True):
+            if op == '=':
+                self.equal.append((old_pos, new_pos, length))
+                old_pos += length
+                new_pos += length
+            elif op == '+':
+                self.insertions.append((new_pos, new_pos + length))
+                new_pos += length
+            else:
+                self.deletions.append(new_pos)
+                old_pos += length
+        self._equal_starts = [run[0] for run in self.equal]
+        self.old_digest = _digest(old)
+        self.new_digest = _digest(new)
+
+    def matches(self, old: str, new: str) -> bool:
+        """True when this diff was computed between ``old`` and ``new``."""
+        return self.old_digest == _digest(old) and self.new_digest == _digest(new)
+
+    def map_span(self, start: int, end: int) -> Optional[Span]:
+        """New-text position of old span [start, end), or None unless it is entirely unchanged."""
+        i = bisect_right(self._equal_starts, start) - 1
+        if i < 0:
+            return None
+        old_start, new_start, length = self.equal[i]
+        if end > old_start + length:
+            return None
+        shift = new_start - old_start
+        return start + shift, end + shift
+
+
+def _merge_windows(paragraphs: List[Span], dirty: set) -> List[Span]:
+    windows: List[Span] = []
+    for i in sorted(dirty):
+        start, end = paragraphs[i]
+        if windows and windows[-1][1] == start:
+            windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def _paragraph_of(paragraph_starts: List[int], position: int) -> int:
+    return max(bisect_right(paragraph_starts, position) - 1, 0)
+
+
+def _citation_to_dict(citation) -> Dict[str, Any]:
+    return citation.to_dict() if hasattr(citation, 'to_dict') else dict(citation)
+
+
+class IncrementalAnalyzer:
+    """
+    Re-analyze edited documents by diffing against the previous submission.
+
+    Snapshots (text, citation dicts, formatted clusters) are kept per
+    ``(owner, document_id)`` in a SQLite-backed CacheManager so every worker
+    process of the API sees the same history. One analyzer is shared by the
+    request threads of a process, so each thread gets its own processors.
+    """
+
+    def __init__(self, store=None, enable_verification: bool = True):
+        if store is None:
+            from src.websearch.cache import CacheManager
+            store = CacheManager(cache_file=SNAPSHOT_STORE_FILE, ttl_hours=SNAPSHOT_TTL_HOURS,
+                                 memory_items=SNAPSHOT_MEMORY_ITEMS)
+        self.store = store
+        self.enable_verification = enable_verification
+        self._local = threading.local()
+
+    def _processor(self, window: bool):
+        from src.models import ProcessingConfig
+        from src.unified_citation_processor_v2 import UnifiedCitationProcessorV2
+
+        # UnifiedCitationProcessorV2 keeps per-run state, so processors are per thread
+        attr = 'window_processor' if window else 'full_processor'
+        processor = getattr(self._local, attr, None)
+        if processor is None:
+            # Windows are extracted and clustered offline; verification is joined afterwards
+            verify = False if window else self.enable_verification
+            processor = UnifiedCitationProcessorV2(ProcessingConfig(enable_verification=verify))
+            setattr(self._local, attr, processor)
+        return processor
+
+    def _process(self, text: str, window: bool = False) -> Dict[str, Any]:
+        result = asyncio.run(self._processor(window).process_text(text))
+        return {
+            'citations': [_citation_to_dict(c) for c in result.get('citations', [])],
+            'clusters': result.get('clusters', []),
+        }
+
+    @staticmethod
+    def _snapshot_key(document_id: str, owner: Optional[str]) -> str:
+        return f"{owner or 'anonymous'}/{document_id}"
+
+    def get_snapshot(self, document_id: str, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        return self.store.get('incremental_snapshot', self._snapshot_key(document_id, owner))
+
+    def save_snapshot(self, document_id: str, text: str, result: Dict[str, Any], owner: Optional[str] = None):
+        self.store.set('incremental_snapshot', self._snapshot_key(document_id, owner), value={
+            'text': text,
+            'citations': result['citations'],
+            'clusters': result['clusters'],
+            'verification': self.enable_verification,
+        })
+
+    def plan(self, document_id: str, text: str, owner: Optional[str] = None) -> Dict[str, Any]:
+        """
+        How ``analyze`` would handle ``text`` without running the pipeline.
+
+        Returns:
+            Dict with 'mode' ('unchanged', 'incremental' or 'full') and
+            'reprocessed_chars', the characters that would be re-extracted;
+            incremental plans also carry the computed 'diff' for ``analyze``
+        """
+        snapshot = self.get_snapshot(document_id, owner)
+        if snapshot is not None and snapshot.get('verification') == self.enable_verification:
+            if snapshot['text'] == text:
+                return {'mode': 'unchanged', 'reprocessed_chars': 0}
+            diff = TextDiff(snapshot['text'], text)
+            windows = self.dirty_windows(snapshot, text, diff)
+            if windows is not None:
+                dirty_chars = sum(end - start for start, end in windows)
+                if dirty_chars <= MAX_DIRTY_FRACTION * len(text):
+                    return {'mode': 'incremental', 'reprocessed_chars': dirty_chars, 'diff': diff}
+        return {'mode': 'full', 'reprocessed_chars': len(text)}
+
+    def analyze(self, document_id: str, text: str, owner: Optional[str] = None,
+                diff: Optional[TextDiff] = None) -> Dict[str, Any]:
+        """
+        Analyze ``text`` as the latest revision of ``owner``'s ``document_id``.
+
+        ``diff`` is the one ``plan`` computed; it is used when it still
+        matches the stored snapshot and recomputed otherwise.
+
+        Returns:
+            Dict with 'citations' (dicts), 'clusters' (formatted clusters) and
+            'metadata' -> 'incremental' describing how much was reprocessed
+        """
+        snapshot = self.get_snapshot(document_id, owner)
+        result = None
+        stats: Dict[str, Any] = {'mode': 'full', 'windows': 0, 'reprocessed_chars': len(text)}
+        if snapshot is not None and snapshot.get('verification') == self.enable_verification:
+            if snapshot['text'] == text:
+                result = {'citations': snapshot['citations'], 'clusters': snapshot['clusters']}
+                stats = {'mode': 'unchanged', 'windows': 0, 'reprocessed_chars': 0,
+                         'reused_citations': len(result['citations']), 'verified_citations': 0}
+            else:
+                result, stats = self._reanalyze(snapshot, text, diff)
+        if result is None:
+            result = self._process(text)
+            stats['reused_citations'] = 0
+            stats['verified_citations'] = len(result['citations']) if self.enable_verification else 0
+
+        self.save_snapshot(document_id, text, result, owner)
+        logger.info(f"[INCREMENTAL] {document_id}: {stats}")
+        return {
+            'citations': result['citations'],
+            'clusters': result['clusters'],
+            'metadata': {'incremental': stats},
+        }
+
+    def dirty_windows(self, snapshot: Dict[str, Any], text: str, diff: TextDiff) -> Optional[List[Span]]:
+        """
+        Windows of the new text that must be re-extracted, or None when the
+        snapshot cannot be reused (citations without positions).
+        """
+        paragraphs = paragraph_spans(text)
+        starts = [start for start, _ in paragraphs]
+        dirty = set()
+        for start, end in diff.insertions:
+            dirty.update(range(_paragraph_of(starts, start), _paragraph_of(starts, max(end - 1, start)) + 1))
+        for position in diff.deletions:
+            dirty.add(_paragraph_of(starts, position))
+            if position in starts:
+                dirty.add(_paragraph_of(starts, position - 1))
+        for i in list(dirty):
+            dirty.update(range(max(i - NEIGHBOUR_PARAGRAPHS, 0), min(i + NEIGHBOUR_PARAGRAPHS + 1, len(paragraphs))))
+
+        # Position of each old citation in the new text; None when it sat in edited text
+        members: Dict[str, List[Optional[Span]]] = {}
+        for citation in snapshot['citations']:
+            if citation.get('start_index') is None or citation.get('end_index') is None:
+                return None
+            mapped = diff.map_span(citation['start_index'], citation['end_index'])
+            members.setdefault(citation.get('cluster_id'), []).append(mapped)
+
+        # A cluster touching a dirty paragraph is rebuilt from all of its members
+        changed = True
+        while changed:
+            changed = False
+            for cluster_id, spans in members.items():
+                if cluster_id is None:
+                    continue
+                paragraph_ids = {_paragraph_of(starts, span[0]) for span in spans if span is not None}
+                touched = len(paragraph_ids) < len(spans) or paragraph_ids & dirty
+                if touched and not paragraph_ids <= dirty:
+                    dirty |= paragraph_ids
+                    changed = True
+        return _merge_windows(paragraphs, dirty)
+
+    def _reanalyze(self, snapshot: Dict[str, Any], text: str,
+                   diff: Optional[TextDiff] = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+        if diff is None or not diff.matches(snapshot['text'], text):
+            diff = TextDiff(snapshot['text'], text)
+        windows = self.dirty_windows(snapshot, text, diff)
+        stats: Dict[str, Any] = {'mode': 'full', 'windows': 0, 'reprocessed_chars': len(text)}
+        if windows is None:
+            return None, stats
+        dirty_chars = sum(end - start for start, end in windows)
+        if dirty_chars > MAX_DIRTY_FRACTION * len(text):
+            return None, stats
+
+        def in_window(span: Span) -> bool:
+            return any(start <= span[0] < end for start, end in windows)
+
+        # Keep every citation outside the windows, shifted into new-text positions
+        citations: List[Dict[str, Any]] = []
+        dropped_clusters = set()
+        for citation in snapshot['citations']:
+            mapped = diff.map_span(citation['start_index'], citation['end_index'])
+            if mapped is None or in_window(mapped):
+                dropped_clusters.add(citation.get('cluster_id'))
+                continue
+            citations.append(dict(citation, start_index=mapped[0], end_index=mapped[1]))
+        clusters = [dict(cluster) for cluster in snapshot['clusters']
+                    if cluster.get('cluster_id') not in dropped_clusters]
+        reused = len(citations)
+
+        # Re-extract and re-cluster only the dirty windows
+        cluster_by_member = {entry.get('text'): cluster for cluster in clusters
+                             for entry in cluster.get('citations', [])}
+        for start, end in windows:
+            window_result = self._process(text[start:end], window=True)
+            renamed = {}
+            for cluster in window_result['clusters']:
+                cluster_id = f"{cluster.get('cluster_id')}_w{start}"
+                renamed[cluster.get('cluster_id')] = cluster_id
+                # A window cluster sharing a member with a kept cluster joins it, as a full run would
+                existing = next((cluster_by_member[entry.get('text')] for entry in cluster.get('citations', [])
+                                 if entry.get('text') in cluster_by_member), None)
+                if existing is None:
+                    cluster['cluster_id'] = cluster_id
+                    clusters.append(cluster)
+                    existing = cluster
+                else:
+                    renamed[cluster.get('cluster_id')] = existing['cluster_id']
+                    known = {entry.get('text') for entry in existing.get('citations', [])}
+                    additions = [entry for entry in cluster.get('citations', []) if entry.get('text') not in known]
+                    existing['citations'] = existing.get('citations', []) + additions
+                    existing['citation_details'] = existing['citations']
+                    existing['size'] = len(existing['citations'])
+                for entry in existing.get('citations', []):
+                    cluster_by_member.setdefault(entry.get('text'), existing)
+            for citation in window_result['citations']:
+                if citation.get('start_index') is not None:
+                    citation['start_index'] += start
+                if citation.get('end_index') is not None:
+                    citation['end_index'] += start
+                if citation.get('cluster_id') in renamed:
+                    citation['cluster_id'] = renamed[citation['cluster_id']]
+                citations.append(citation)
+
+        citations.sort(key=lambda c: c.get('start_index') or 0)
+        record = {'citations': citations, 'clusters': clusters}
+        verified = self._join_verification(record, snapshot)
+        stats.update({
+            'mode': 'incremental',
+            'windows': len(windows),
+            'reprocessed_chars': dirty_chars,
+            'reused_citations': reused,
+            'verified_citations': verified,
+        })
+        return record, stats
+
+    def _join_verification(self, record: Dict[str, Any], snapshot: Dict[str, Any]) -> int:
+        """Reuse snapshot verification by citation text and verify only unseen citations."""
+        if not self.enable_verification:
+            return 0
+        from src.bulk_processing import apply_verification, normalize_citation_key
+        from src.unified_verification_master import VerificationResult, get_master_verifier
+
+        # Every snapshot citation went through verification (hit or miss); reuse both outcomes
+        results: Dict[str, Any] = {}
+        for citation in snapshot['citations']:
+            key = normalize_citation_key(citation.get('citation'))
+            if key and key not in results:
+                results[key] = VerificationResult(
+                    citation=key,
+                    verified=bool(citation.get('verified')),
+                    canonical_name=citation.get('canonical_name'),
+                    canonical_date=citation.get('canonical_date'),
+                    canonical_url=citation.get('canonical_url'),
+                    source=citation.get('verification_source') or citation.get('source'),
+                )
+
+        unseen: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        for citation in record['citations']:
+            key = normalize_citation_key(citation.get('citation'))
+            if key and key not in results and key not in unseen:
+                unseen[key] = (citation.get('extracted_case_name'), citation.get('extracted_date'))
+        if unseen:
+            texts = list(unseen)
+            verifier = get_master_verifier()
+            fresh = asyncio.run(verifier.verify_citations_batch(
+                texts, [unseen[t][0] for t in texts], [unseen[t][1] for t in texts]))
+            results.update(zip(texts, fresh))
+
+        apply_verification(record, results)
+        record.pop('verification', None)
+        return len(unseen)
+
+
+_incremental_analyzer = None
+_incremental_analyzer_lock = threading.Lock()
+
+
+def get_incremental_analyzer() -> IncrementalAnalyzer:
+    """Get the process-wide incremental analyzer."""
+    global _incremental_analyzer
+    with _incremental_analyzer_lock:
+        if _incremental_analyzer is None:
+            from src.config import get_citation_config
+            _incremental_analyzer = IncrementalAnalyzer(
+                enable_verification=get_citation_config()['enable_verification'])
+        return _incremental_analyzer
+
+
+@offloads_result
+def analyze_document_task(task_id: str, document_id: str, text: str, owner: Optional[str] = None,
+                          diff: Optional[TextDiff] = None) -> Dict[str, Any]:
+    """RQ entry point for incremental requests too large to run in the web process."""
+    result = get_incremental_analyzer().analyze(document_id, text, owner=owner, diff=diff)
+    result['metadata'].update({
+        'processing_mode': 'incremental',
+        'input_type': 'text',
+        'text_length': len(text),
+    })
+    return {'success': True, 'task_id': task_id, **result}
@@ -0,0 +1,303 @@
+"""
+Priority Job Queues
+
+All RQ work used to share the single ``casestrainer`` queue, so a 2 MB
+appellate record or a maintenance batch could sit in front of a 6 KB paste.
+Work is now split into three classes, each with its own RQ queue:
+
+- interactive: pastes, URLs and ordinary uploads (keeps the ``casestrainer`` name)
+- bulk: large documents, by text size, page count or upload size
+  (``CitationService.determine_job_class``)
+- maintenance: the ``background_tasks`` jobs
+
+Each client (by remote address, like ``rate_limiter``) may hold a limited
+number of active jobs per class. Excess interactive jobs are demoted to bulk;
+excess bulk jobs wait behind the client's latest bulk job as an RQ dependency,
+so one client's batch cannot take every worker.
+
+``WeightedPriorityWorker`` drains the queues by smooth weighted round-robin
+(6:3:1 by default, ``RQ_QUEUE_WEIGHTS``): under load every class gets its
+share of dequeues. Only queues with a backlog earn credit, so a queue that
+sat idle cannot bank credit and then jump ahead of interactive work. The worker records each job's queue wait per class;
+``queue_wait_stats`` reports them.
+
+Example:
+    scheduler = JobScheduler(redis_conn)
+    job_class = CitationService().determine_job_class(text_length=len(text))
+    scheduler.enqueue('src.progress_manager.process_citation_task_direct',
+                      args=(request_id, 'text', {'text': text}), job_id=request_id,
+                      job_class=job_class, client_id=current_client_id())
+"""
+
+import contextlib
+import logging
+import os
+import time
+from datetime import timezone
+from typing import Any, Dict, List, Optional
+
+from rq import Queue, Worker
+from rq.exceptions import NoSuchJobError
+from rq.job import Dependency, Job
+from rq.utils import now
+
+from src import sampling_profiler
+from src.memory_monitor import JobMemoryBudget
+from src.metrics import JOB_PEAK_RSS_MB, QUEUE_WAIT_SECONDS, get_metrics
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+MAINTENANCE = 'maintenance'
+JOB_CLASSES = (INTERACTIVE, BULK, MAINTENANCE)
+
+QUEUE_BASE = os.environ.get('RQ_QUEUE_NAME', 'casestrainer')
+QUEUE_NAMES = {
+    INTERACTIVE: QUEUE_BASE,
+    BULK: f'{QUEUE_BASE}-bulk',
+    MAINTENANCE: f'{QUEUE_BASE}-maintenance',
+}
+
+
+def _parse_weights(spec: str) -> Dict[str, int]:
+    """'interactive=6,bulk=3,maintenance=1' -> {'interactive': 6, ...}"""
+    weights = {}
+    for item in spec.split(','):
+        name, _, value = item.partition('=')
+        if name.strip() in JOB_CLASSES and value.strip().isdigit():
+            weights[name.strip()] = max(int(value), 1)
+    return {job_class: weights.get(job_class, 1) for job_class in JOB_CLASSES}
+
+
+QUEUE_WEIGHTS = _parse_weights(os.environ.get('RQ_QUEUE_WEIGHTS', 'interactive=6,bulk=3,maintenance=1'))
+
+# Active (queued, deferred or running) jobs one client may hold per class
+CLIENT_ACTIVE_LIMITS = {
+    INTERACTIVE: int(os.environ.get('RQ_CLIENT_INTERACTIVE_LIMIT', 2)),
+    BULK: int(os.environ.get('RQ_CLIENT_BULK_LIMIT', 4)),
+}
+ACTIVE_JOB_STATUSES = ('queued', 'started', 'deferred', 'scheduled')
+
+CLIENT_JOBS_KEY = 'casestrainer:scheduler:client:{job_class}:{client_id}'
+CLIENT_JOBS_TTL = 86400
+WAIT_SAMPLES_KEY = 'casestrainer:scheduler:wait:{job_class}'
+WAIT_SAMPLES = 1000
+WAIT_SAMPLES_TTL = 7 * 86400
+
+
+def queue_for(job_class: str, connection) -> Queue:
+    return Queue(QUEUE_NAMES[job_class], connection=connection)
+
+
+def job_class_of(queue_name: str) -> Optional[str]:
+    for job_class, name in QUEUE_NAMES.items():
+        if name == queue_name:
+            return job_class
+    return None
+
+
+def worker_queue_names() -> List[str]:
+    """Queues a worker listens on: RQ_WORKER_QUEUES (job classes) or all of them, heaviest weight first."""
+    classes = [c.strip() for c in os.environ.get('RQ_WORKER_QUEUES', '').split(',') if c.strip() in JOB_CLASSES]
+    classes = classes or sorted(JOB_CLASSES, key=lambda c: -QUEUE_WEIGHTS[c])
+    return [QUEUE_NAMES[c] for c in classes]
+
+
+def current_client_id() -> Optional[str]:
+    """
+    Fair-share identity of the client behind the current Flask request, if any.
+
+    There is no authenticated identity, so this is the remote address; a
+    client-supplied header would let a client escape its limits by rotating it.
+    """
+    try:
+        from flask import has_request_context, request
+    except ImportError:
+        return None
+    if not has_request_context():
+        return None
+    return request.remote_addr or None
+
+
+def fetch_job(job_id: str, connection) -> Optional[Job]:
+    """Fetch a job from whichever priority queue it was routed to."""
+    try:
+        return Job.fetch(job_id, connection=connection)
+    except NoSuchJobError:
+        return None
+
+
+class JobScheduler:
+    """Routes jobs to the priority queues and enforces per-client fair share."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def active_jobs(self, client_id: str, job_class: str) -> List[str]:
+        """The client's unfinished jobs in ``job_class``, oldest first; finished ones are pruned."""
+        key = CLIENT_JOBS_KEY.format(job_class=job_class, client_id=client_id)
+        job_ids = [i.decode() if isinstance(i, bytes) else i for i in self.connection.zrange(key, 0, -1)]
+        if not job_ids:
+            return []
+        jobs = Job.fetch_many(job_ids, connection=self.connection)
+        active = [job.id for job in jobs if job is not None and job.get_status(refresh=False) in ACTIVE_JOB_STATUSES]
+        finished = set(job_ids) - set(active)
+        if finished:
+            self.connection.zrem(key, *finished)
+        return active
+
+    def enqueue(self, f, *args, job_class: str = INTERACTIVE, client_id: Optional[str] = None, **kwargs) -> Job:
+        """
+        Enqueue ``f`` like ``Queue.enqueue`` on the queue for ``job_class``.
+
+        With a ``client_id`` the client's fair-share limits apply: over the
+        interactive limit the job is demoted to bulk, over the bulk limit it
+        runs after the client's latest bulk job.
+        """
+        depends_on = kwargs.pop('depends_on', None)
+        if client_id and job_class in CLIENT_ACTIVE_LIMITS:
+            if job_class == INTERACTIVE and \
+                    len(self.active_jobs(client_id, INTERACTIVE)) >= CLIENT_ACTIVE_LIMITS[INTERACTIVE]:
+                logger.info(f"[SCHEDULER] Client {client_id} is over its interactive share; routing to bulk")
+                job_class = BULK
+            if job_class == BULK and depends_on is None:
+                active = self.active_jobs(client_id, BULK)
+                if len(active) >= CLIENT_ACTIVE_LIMITS[BULK]:
+                    logger.info(f"[SCHEDULER] Client {client_id} has {len(active)} bulk jobs; deferring behind {active[-1]}")
+                    depends_on = Dependency(jobs=[active[-1]], allow_failure=True)
+
+        meta = dict(kwargs.pop('meta', None) or {})
+        meta.update({'job_class': job_class, 'client_id': client_id})
+        job = queue_for(job_class, self.connection).enqueue(f, *args, depends_on=depends_on, meta=meta, **kwargs)
+
+        if client_id and job_class in CLIENT_ACTIVE_LIMITS:
+            key = CLIENT_JOBS_KEY.format(job_class=job_class, client_id=client_id)
+            pipe = self.connection.pipeline()
+            pipe.zadd(key, {job.id: time.time()})
+            pipe.expire(key, CLIENT_JOBS_TTL)
+            pipe.execute()
+        logger.info(f"[SCHEDULER] Enqueued {job.id} on {QUEUE_NAMES[job_class]} ({job_class})")
+        return job
+
+    def is_idle(self, job_classes=(INTERACTIVE, BULK)) -> bool:
+        """True when no job of ``job_classes`` is queued or running."""
+        for job_class in job_classes:
+            queue = queue_for(job_class, self.connection)
+            if queue.count or queue.started_job_registry.count:
+                return False
+        return True
+
+
+def record_queue_wait(connection, job: Job, queue_name: Optional[str] = None):
+    """Store how long ``job`` waited in its queue, as a sample for its class."""
+    if job.enqueued_at is None:
+        return
+    job_class = (job.meta or {}).get('job_class') or job_class_of(queue_name or job.origin)
+    if job_class is None:
+        return
+    enqueued_at = job.enqueued_at
+    if enqueued_at.tzinfo is None:
+        enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+    wait = max((now() - enqueued_at).total_seconds(), 0.0)
+    QUEUE_WAIT_SECONDS.observe(wait, job_class=job_class)
+    key = WAIT_SAMPLES_KEY.format(job_class=job_class)
+    pipe = connection.pipeline()
+    pipe.lpush(key, f'{wait:.3f}')
+    pipe.ltrim(key, 0, WAIT_SAMPLES - 1)
+    pipe.expire(key, WAIT_SAMPLES_TTL)
+    pipe.execute()
+
+
+def record_job_memory(job: Job, budget: JobMemoryBudget):
+    """Keep the job's peak RSS in its meta (and the metrics) for container sizing."""
+    job_class = (job.meta or {}).get('job_class') or job_class_of(job.origin) or 'unknown'
+    JOB_PEAK_RSS_MB.observe(budget.peak_rss_mb, job_class=job_class)
+    try:
+        job.meta.update(budget.as_meta())
+        job.save_meta()
+    except Exception as e:
+        logger.warning(f"[SCHEDULER] Could not record peak memory for {job.id}: {e}")
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def queue_wait_stats(connection) -> Dict[str, Dict[str, Any]]:
+    """Queue depth and wait-time summary (last WAIT_SAMPLES jobs) for every job class."""
+    stats = {}
+    for job_class in JOB_CLASSES:
+        samples = sorted(float(s) for s in connection.lrange(WAIT_SAMPLES_KEY.format(job_class=job_class), 0, -1))
+        entry = {
+            'queue': QUEUE_NAMES[job_class],
+            'weight': QUEUE_WEIGHTS[job_class],
+            'queued': queue_for(job_class, connection).count,
+            'samples': len(samples),
+        }
+        if samples:
+            entry.update({
+                'mean_wait_seconds': round(sum(samples) / len(samples), 3),
+                'p50_wait_seconds': _percentile(samples, 0.50),
+                'p95_wait_seconds': _percentile(samples, 0.95),
+                'max_wait_seconds': samples[-1],
+            })
+        stats[job_class] = entry
+    return stats
+
+
+class WeightedPriorityWorker(Worker):
+    """
+    RQ worker that drains the priority queues by smooth weighted round-robin.
+
+    After every dequeue each queue with a backlog earns its weight in credit
+    and the queue that was served pays the total of those weights, then the
+    queues are polled in credit order. A busy interactive queue therefore
+    gets 6 of every 10 dequeues against busy bulk and maintenance queues, but
+    bulk work is never starved. Empty queues earn nothing and keep no surplus.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queue_weights = {q.name: QUEUE_WEIGHTS.get(job_class_of(q.name), 1) for q in self._ordered_queues}
+        self._queue_credit = {name: 0 for name in self._queue_weights}
+        self._ordered_queues.sort(key=lambda q: -self._queue_weights[q.name])
+
+    @staticmethod
+    def _has_backlog(queue) -> bool:
+        try:
+            return queue.count > 0
+        except Exception as e:
+            logger.debug(f"[SCHEDULER] Could not read depth of {queue.name}: {e}")
+            return False
+
+    def reorder_queues(self, reference_queue):
+        competing = {q.name for q in self._ordered_queues
+                     if q.name == reference_queue.name or self._has_backlog(q)}
+        total = sum(self._queue_weights[name] for name in competing)
+        for name, weight in self._queue_weights.items():
+            if name in competing:
+                self._queue_credit[name] += weight
+            else:
+                self._queue_credit[name] = min(self._queue_credit[name], 0)
+        self._queue_credit[reference_queue.name] -= total
+        self._ordered_queues.sort(key=lambda q: -self._queue_credit[q.name])
+
+    def perform_job(self, job, queue):
+        try:
+            record_queue_wait(self.connection, job, queue.name)
+        except Exception as e:
+            logger.warning(f"[SCHEDULER] Could not record queue wait for {job.id}: {e}")
+        try:
+            profile_id = sampling_profiler.job_profile_id(job)
+        except Exception as e:
+            logger.warning(f"[SCHEDULER] Could not check profiling for {job.id}: {e}")
+            profile_id = None
+        budget = JobMemoryBudget(single_job_process=os.getpid() != self.pid)
+        try:
+            with budget, sampling_profiler.profile(profile_id, request=job.id) if profile_id else contextlib.nullcontext():
+                return super().perform_job(job, queue)
+        finally:
+            record_job_memory(job, budget)
+            # The work horse exits with os._exit, so atexit never flushes its samples
+            get_metrics().flush()
@@ -173,6 +173,145 @@ def monitor_memory(func):
                 
     return wrapper
 
+# Per-job memory budgets
+#
+# The full pipeline keeps the text, every CitationResult, the cluster dicts and
+# the response copies in memory at once, so its peak grows with the input. Jobs
+# whose estimate exceeds the budget run in streaming mode instead, and workers
+# stop dequeuing while their container is close to its limit.
+JOB_MEMORY_BUDGET_MB = int(os.environ.get('JOB_MEMORY_BUDGET_MB', 1024))
+PIPELINE_BASE_MB = 350  # loaded engines before any text
+PIPELINE_BYTES_PER_CHAR = int(os.environ.get('PIPELINE_BYTES_PER_CHAR', 90))
+WORKER_MEMORY_HIGH_WATER = float(os.environ.get('WORKER_MEMORY_HIGH_WATER', 0.85))
+MEMORY_MODE_FULL = 'full'
+MEMORY_MODE_STREAMING = 'streaming'
+
+# (usage, limit, stat, inactive page-cache key in stat) per cgroup version
+_CGROUP_FILES = (
+    ('/sys/fs/cgroup/memory.current', '/sys/fs/cgroup/memory.max',
+     '/sys/fs/cgroup/memory.stat', 'inactive_file'),  # cgroup v2
+    ('/sys/fs/cgroup/memory/memory.usage_in_bytes', '/sys/fs/cgroup/memory/memory.limit_in_bytes',
+     '/sys/fs/cgroup/memory/memory.stat', 'total_inactive_file'),  # v1
+)
+
+
+def rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+def _cgroup_stat(path: str, key: str) -> int:
+    """One counter from a cgroup memory.stat file, 0 when unavailable"""
+    try:
+        with open(path) as f:
+            for line in f:
+                name, _, value = line.partition(' ')
+                if name == key:
+                    return int(value)
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def container_memory_mb():
+    """
+    (used, limit) memory in MB of this container, or of the host without a cgroup limit.
+
+    Usage is the working set, as kubelet computes it: cgroup usage minus the
+    inactive page cache, which the kernel reclaims before it OOM-kills.
+    """
+    total = psutil.virtual_memory()
+    for usage_path, limit_path, stat_path, inactive_key in _CGROUP_FILES:
+        try:
+            with open(usage_path) as f:
+                used = int(f.read().strip())
+            with open(limit_path) as f:
+                limit = f.read().strip()
+        except (OSError, ValueError):
+            continue
+        # 'max' (v2) or a huge sentinel (v1) means unlimited
+        if limit != 'max' and int(limit) < total.total:
+            used = max(used - _cgroup_stat(stat_path, inactive_key), 0)
+            return used / 1024 / 1024, int(limit) / 1024 / 1024
+        break
+    return (total.total - total.available) / 1024 / 1024, total.total / 1024 / 1024
+
+
+def estimate_job_memory_mb(text_length: int) -> float:
+    """Expected peak RSS of the full in-memory pipeline for a text of ``text_length`` characters"""
+    return PIPELINE_BASE_MB + text_length * PIPELINE_BYTES_PER_CHAR / 1024 / 1024
+
+
+def choose_memory_mode(text_length: int, budget_mb: Optional[float] = None) -> str:
+    """'streaming' when the full pipeline would not fit the job's memory budget, else 'full'"""
+    budget_mb = JOB_MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+    return MEMORY_MODE_STREAMING if estimate_job_memory_mb(text_length) > budget_mb else MEMORY_MODE_FULL
+
+
+def memory_pressure() -> float:
+    """Share of the container's memory limit in use"""
+    used, limit = container_memory_mb()
+    return used / limit if limit else 0.0
+
+
+class JobMemoryBudget:
+    """
+    Tracks one job's peak RSS against its budget.
+
+    RSS is sampled in the background; in a process that runs a single job (an
+    RQ work horse) the kernel's own peak is used as well, so short spikes
+    between samples are not missed. Crossing the budget is logged once and
+    triggers a garbage collection.
+    """
+
+    def __init__(self, budget_mb: Optional[float] = None, sample_interval: float = 0.5,
+                 single_job_process: bool = False):
+        self.budget_mb = JOB_MEMORY_BUDGET_MB if budget_mb is None else budget_mb
+        self.sample_interval = sample_interval
+        self.single_job_process = single_job_process
+        self.start_rss_mb = 0.0
+        self.peak_rss_mb = 0.0
+        self.over_budget = False
+        self._stop = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(__name__)
+
+    def _sample(self):
+        current = rss_mb()
+        self.peak_rss_mb = max(self.peak_rss_mb, current)
+        if current > self.budget_mb and not self.over_budget:
+            self.over_budget = True
+            import gc
+            gc.collect()
+            self.logger.warning(f"Job memory {current:.0f}MB exceeded its {self.budget_mb:.0f}MB budget")
+
+    def _run(self):
+        while not self._stop.wait(self.sample_interval):
+            self._sample()
+
+    def __enter__(self):
+        self.start_rss_mb = self.peak_rss_mb = rss_mb()
+        self._thread = threading.Thread(target=self._run, name='job-memory-budget', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        if self.single_job_process:
+            import resource
+            self.peak_rss_mb = max(self.peak_rss_mb, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024)
+        return False
+
+    def as_meta(self) -> Dict:
+        return {
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'start_rss_mb': round(self.start_rss_mb, 1),
+            'memory_budget_mb': self.budget_mb,
+            'over_memory_budget': self.over_budget,
+        }
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     
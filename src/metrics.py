@@ -0,0 +1,283 @@
+"""
+Process-shared metrics with a Prometheus text endpoint.
+
+Counters and histograms for the pipeline stages (extraction, case name
+enrichment, clustering, verification, serialization), upstream verification
+calls per source, RQ queue wait and HTTP requests. The older in-process
+trackers (CaseStrainerMonitor, PerformanceMonitor, PerformanceProfiler,
+AdvancedAnalytics) record into the same registry.
+
+The web process and every RQ worker record into a local buffer that is
+flushed every ``FLUSH_INTERVAL`` seconds (and at the end of each job) into one
+Redis hash with HINCRBYFLOAT, so ``/metrics`` on any web process reports the
+totals of all processes and survives restarts. Without Redis the registry
+keeps in-process totals only.
+
+Histogram buckets are stored cumulatively, as Prometheus exposes them, so a
+hash field is exactly one sample line: ``name_bucket{stage="clustering",le="0.5"}``.
+
+Example:
+    with time_stage('clustering'):
+        clusters = cluster(citations)
+    VERIFICATIONS.inc(source='courtlistener_lookup', outcome='verified')
+"""
+
+import atexit
+import contextlib
+import logging
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from src.sampling_profiler import set_thread_tag
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = 'casestrainer:metrics'
+FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Progress steps reported by UnifiedCitationProcessorV2.process_text -> pipeline stage
+STEP_STAGES = {
+    'Extracting': 'extraction',
+    'Enhancing': 'case_name_enrichment',
+    'Propagating Data': 'case_name_enrichment',
+    'Filtering': 'case_name_enrichment',
+    'Verifying': 'verification',
+    'Clustering': 'clustering',
+}
+
+_LE = re.compile(r'le="([^"]*)"')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _sample(name: str, labels: Iterable[Tuple[str, object]]) -> str:
+    body = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f'{name}{{{body}}}' if body else name
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _labels(self, labels: Dict[str, object]):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return [(k, labels[k]) for k in self.labelnames]
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (self.name,)
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        get_metrics().add({_sample(self.name, self._labels(labels)): amount})
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        base = self._labels(labels)
+        deltas = {_sample(f'{self.name}_bucket', base + [('le', '+Inf')]): 1,
+                  _sample(f'{self.name}_sum', base): value,
+                  _sample(f'{self.name}_count', base): 1}
+        for edge in self.buckets:
+            # Zero increments too, so every label set exposes the full bucket ladder
+            deltas[_sample(f'{self.name}_bucket', base + [('le', repr(edge))])] = 1 if value <= edge else 0
+        get_metrics().add(deltas)
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def sample_names(self) -> Tuple[str, ...]:
+        return (f'{self.name}_bucket', f'{self.name}_sum', f'{self.name}_count')
+
+
+class MetricsRegistry:
+    """Buffered metric samples, summed across processes in Redis when available."""
+
+    def __init__(self, redis_client=None, flush_interval: float = FLUSH_INTERVAL):
+        self.redis_client = redis_client
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, float] = {}
+        self._totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def add(self, deltas: Dict[str, float]):
+        with self._lock:
+            for sample, amount in deltas.items():
+                self._pending[sample] = self._pending.get(sample, 0.0) + amount
+            should_flush = time.monotonic() - self._last_flush >= self.flush_interval
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """Push buffered samples to Redis (or into the local totals without it)."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            if self.redis_client is None:
+                for sample, amount in pending.items():
+                    self._totals[sample] = self._totals.get(sample, 0.0) + amount
+                return
+        if not pending:
+            return
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for sample, amount in pending.items():
+                pipe.hincrbyfloat(METRICS_KEY, sample, amount)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[METRICS] Could not flush {len(pending)} samples: {e}")
+            with self._lock:
+                for sample, amount in pending.items():
+                    self._pending[sample] = self._pending.get(sample, 0.0) + amount
+
+    def samples(self) -> Dict[str, float]:
+        """Current totals per sample line, across processes when Redis is shared."""
+        self.flush()
+        if self.redis_client is not None:
+            try:
+                raw = self.redis_client.hgetall(METRICS_KEY)
+                return {(k.decode() if isinstance(k, bytes) else k): float(v) for k, v in raw.items()}
+            except Exception as e:
+                logger.warning(f"[METRICS] Could not read shared samples: {e}")
+        with self._lock:
+            return dict(self._totals)
+
+    def render(self) -> str:
+        """All registered metrics in the Prometheus text exposition format."""
+        samples = self.samples()
+        lines = []
+        for name in sorted(_FAMILIES):
+            metric = _FAMILIES[name]
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for sample_name in metric.sample_names():
+                family = [s for s in samples if s == sample_name or s.startswith(sample_name + '{')]
+                for sample in sorted(family, key=_sort_key):
+                    lines.append(f'{sample} {_format_value(samples[sample])}')
+        return '\n'.join(lines) + '\n'
+
+
+def _sort_key(sample: str):
+    match = _LE.search(sample)
+    if match is None:
+        return sample, 0.0
+    le = match.group(1)
+    return _LE.sub('', sample), float('inf') if le == '+Inf' else float(le)
+
+
+_FAMILIES: Dict[str, _Metric] = {}
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _FAMILIES.setdefault(name, Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _FAMILIES.setdefault(name, Histogram(name, documentation, labelnames, buckets))
+
+
+STAGE_SECONDS = histogram('casestrainer_stage_seconds', 'Time spent in each pipeline stage.', ('stage',))
+VERIFICATION_SECONDS = histogram('casestrainer_verification_seconds',
+                                 'Latency of upstream verification calls by source.', ('source',))
+VERIFICATIONS = counter('casestrainer_verifications_total',
+                        'Citations checked against each verification source, by outcome.', ('source', 'outcome'))
+QUEUE_WAIT_SECONDS = histogram('casestrainer_queue_wait_seconds',
+                               'Time jobs waited in their RQ queue before a worker started them.', ('job_class',))
+JOB_PEAK_RSS_MB = histogram('casestrainer_job_peak_rss_mb', 'Peak resident memory of each RQ job in MB.',
+                            ('job_class',), buckets=(128, 256, 384, 512, 768, 1024, 1536, 2048, 3072, 4096, 6144, 8192))
+HTTP_REQUEST_SECONDS = histogram('casestrainer_http_request_seconds', 'HTTP request latency by endpoint.',
+                                 ('endpoint', 'method', 'status'))
+OPERATION_SECONDS = histogram('casestrainer_operation_seconds',
+                              'Time spent in operations timed by the profiler and performance monitor.', ('operation',))
+CACHE_LOOKUPS = counter('casestrainer_cache_lookups_total', 'Cache lookups by cache and outcome.', ('cache', 'outcome'))
+RECOVERY_ATTEMPTS = counter('casestrainer_recovery_attempts_total',
+                            'Web search recovery attempts by outcome.', ('outcome',))
+
+
+def time_stage(stage: str):
+    """Context manager (or decorator) observing one pipeline stage."""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def record_verification(source: str, verified: bool, seconds: Optional[float] = None, count: int = 1):
+    """One upstream call to ``source`` that settled ``count`` citations."""
+    if seconds is not None:
+        VERIFICATION_SECONDS.observe(seconds, source=source)
+    VERIFICATIONS.inc(count, source=source, outcome='verified' if verified else 'unverified')
+
+
+class StageClock:
+    """Progress callback companion that observes the stage each progress step starts."""
+
+    def __init__(self):
+        self._stage: Optional[str] = None
+        self._started = 0.0
+
+    def step(self, step: str):
+        now = time.perf_counter()
+        if self._stage is not None:
+            STAGE_SECONDS.observe(now - self._started, stage=self._stage)
+        self._stage = STEP_STAGES.get(step)
+        self._started = now
+        set_thread_tag('stage', self._stage)
+
+    def reset(self):
+        self._stage = None
+        set_thread_tag('stage', None)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide registry (Redis-backed when reachable)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                redis_client = None
+                redis_url = os.environ.get('REDIS_URL')
+                if redis_url:
+                    try:
+                        import redis
+                        redis_client = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=2)
+                        redis_client.ping()
+                    except Exception as e:
+                        logger.info(f"[METRICS] Keeping metrics in process only: {e}")
+                        redis_client = None
+                _registry = MetricsRegistry(redis_client=redis_client)
+                atexit.register(_registry.flush)
+    return _registry
@@ -6,14 +6,16 @@ that can identify valid citations with high accuracy without requiring API calls
 """
 
 import os
-from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
+from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT, DATABASE_FILE
 
 import logging
 import sqlite3
 import re
+import threading
 import numpy as np
 import pickle
 from datetime import datetime
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
@@ -26,6 +28,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger("citation_classifier")
 
+REPORTERS = [
+    "U.S.",
+    "S.Ct.",
+    "L.Ed.",
+    "F.",
+    "F.2d",
+    "F.3d",
+    "F.Supp.",
+    "Wn.",
+    "Wn.2d",
+    "Wn. App.",
+    "P.",
+    "P.2d",
+    "P.3d",
+]
+
+# Numeric features appended to the TF-IDF columns, in model column order
+NUMERIC_FEATURES = [
+    "length",
+    "word_count",
+    "has_v",
+    "has_digits",
+    "has_reporter",
+    "has_vol_page",
+    "volume",
+    "page",
+    "has_year",
+    "year",
+]
+
+VOL_PAGE_PATTERN = re.compile(r"(\d+)\s+[A-Za-z\.\s]+\s+(\d+)")
+YEAR_PATTERN = re.compile(r"\((\d{4})\)")
+DIGIT_PATTERN = re.compile(r"\d")
+
 
 class CitationClassifier:
     """
@@ -33,18 +69,17 @@ class CitationClassifier:
     valid citations with high accuracy without requiring API calls.
     """
 
-    def __init__(self):
+    def __init__(self, db_path=None, model_dir=None):
         """Initialize the classifier."""
-        self.db_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "citations.db"
-        )
-        self.model_dir = os.path.join(
+        self.db_path = db_path or DATABASE_FILE
+        self.model_dir = model_dir or os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "ml_models"
         )
         self.vectorizer_path = os.path.join(self.model_dir, "citation_vectorizer.pkl")
         self.model_path = os.path.join(self.model_dir, "citation_classifier.pkl")
         self.vectorizer = None
         self.model = None
+        self.valid_threshold = 0.7  # Threshold can be adjusted
 
         if not os.path.exists(self.model_dir):
             os.makedirs(self.model_dir)
@@ -93,33 +128,17 @@ class CitationClassifier:
         features["word_count"] = len(citation.split())
 
         features["has_v"] = 1 if " v. " in citation else 0
-        features["has_digits"] = 1 if re.search(r"\d", citation) else 0
+        features["has_digits"] = 1 if DIGIT_PATTERN.search(citation) else 0
         features["has_reporter"] = 0
 
-        reporters = [
-            "U.S.",
-            "S.Ct.",
-            "L.Ed.",
-            "F.",
-            "F.2d",
-            "F.3d",
-            "F.Supp.",
-            "Wn.",
-            "Wn.2d",
-            "Wn. App.",
-            "P.",
-            "P.2d",
-            "P.3d",
-        ]
-
-        for reporter in reporters:
+        for reporter in REPORTERS:
             if reporter in citation:
                 features["has_reporter"] = 1
                 features[f"reporter_{reporter.replace('.', '')}"] = 1
             else:
                 features[f"reporter_{reporter.replace('.', '')}"] = 0
 
-        vol_page_pattern = re.search(r"(\d+)\s+[A-Za-z\.\s]+\s+(\d+)", citation)
+        vol_page_pattern = VOL_PAGE_PATTERN.search(citation)
         if vol_page_pattern:
             features["has_vol_page"] = 1
             features["volume"] = int(vol_page_pattern.group(1))
@@ -129,7 +148,7 @@ class CitationClassifier:
             features["volume"] = 0
             features["page"] = 0
 
-        year_pattern = re.search(r"\((\d{4})\)", citation)
+        year_pattern = YEAR_PATTERN.search(citation)
         if year_pattern:
             features["has_year"] = 1
             features["year"] = int(year_pattern.group(1))
@@ -139,13 +158,26 @@ class CitationClassifier:
 
         return features
 
+    def _feature_matrix(self, citations, features=None, fit=False):
+        """TF-IDF and numeric features for many citations as one sparse matrix."""
+        if features is None:
+            features = [self._extract_features(citation) for citation in citations]
+        if fit:
+            X_text = self.vectorizer.fit_transform(citations)
+        else:
+            X_text = self.vectorizer.transform(citations)
+        X_additional = np.array(
+            [[f[name] for name in NUMERIC_FEATURES] for f in features], dtype=np.float64
+        ).reshape(len(features), len(NUMERIC_FEATURES))
+        return sparse.hstack((X_text, sparse.csr_matrix(X_additional)), format="csr")
+
     def _get_training_data(self):
         """Get training data from the database."""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
 
-            cursor.execute("SELECT citation_text, found FROM citations")
+            cursor.execute("SELECT citation_text, found, is_verified FROM citations")
             rows = cursor.fetchall()
 
             conn.close()
@@ -159,7 +191,7 @@ class CitationClassifier:
 
             for row in rows:
                 citation_text = row[0]
-                found = row[1]
+                found = row[1] or row[2]
 
                 if citation_text:
                     citations.append(citation_text)
@@ -185,36 +217,17 @@ class CitationClassifier:
             logger.error("No training data available")
             return False
 
+        if len(set(labels)) < 2:
+            logger.error("Training data needs both verified and unverified citations")
+            return False
+
         try:
             logger.info("Creating feature vectors...")
             self.vectorizer = TfidfVectorizer(
                 analyzer="char_wb", ngram_range=(2, 5), max_features=5000
             )
 
-            X_text = self.vectorizer.fit_transform(citations)
-
-            logger.info("Extracting additional features...")
-            additional_features = []
-
-            for citation in citations:
-                features = self._extract_features(citation)
-                additional_features.append(
-                    [
-                        features["length"],
-                        features["word_count"],
-                        features["has_v"],
-                        features["has_digits"],
-                        features["has_reporter"],
-                        features["has_vol_page"],
-                        features["volume"],
-                        features["page"],
-                        features["has_year"],
-                        features["year"],
-                    ]
-                )
-
-            X_additional = np.array(additional_features)
-            X_combined = np.hstack((X_text.toarray(), X_additional))  # type: ignore
+            X_combined = self._feature_matrix(citations, fit=True)
 
             X_train, X_test, y_train, y_test = train_test_split(
                 X_combined, labels, test_size=0.2, random_state=42
@@ -243,116 +256,149 @@ class CitationClassifier:
             logger.error(f"Error training model: {e}")
             return False
 
-    def predict(self, citation):
+    @property
+    def is_informative(self):
+        """True when a model is loaded that can tell valid from invalid citations."""
+        return (
+            self.model is not None
+            and self.vectorizer is not None
+            and len(getattr(self.model, "classes_", [])) > 1
+        )
+
+    def predict_many(self, citations):
         """
-        Predict whether a citation is valid.
-        Returns a confidence score between 0 and 1.
+        Predict validity for many citations with a single model call.
+        Returns an array of confidence scores between 0 and 1.
         """
+        citations = list(citations)
         if not self.model or not self.vectorizer:
             logger.error("Model not trained. Call train() first.")
-            return 0.0
+            return np.zeros(len(citations))
+        if not citations:
+            return np.zeros(0)
 
-        try:
-            X_text = self.vectorizer.transform([citation])
-
-            features = self._extract_features(citation)
-            X_additional = np.array(
-                [
-                    features["length"],
-                    features["word_count"],
-                    features["has_v"],
-                    features["has_digits"],
-                    features["has_reporter"],
-                    features["has_vol_page"],
-                    features["volume"],
-                    features["page"],
-                    features["has_year"],
-                    features["year"],
-                ]
-            ).reshape(1, -1)
-
-            X_combined = np.hstack((X_text.toarray(), X_additional))  # type: ignore
-
-            prediction = self.model.predict_proba(X_combined)[0]
-
-            if len(prediction) == 1:
-                # in that class, otherwise 0.0
-                return 1.0 if prediction[0] > 0.5 else 0.0
-
-            return prediction[1] if len(prediction) > 1 else prediction[0]
+        return self._scores(self._feature_matrix(citations))
 
-        except Exception as e:
-            logger.error(f"Error predicting citation '{citation}': {str(e)}")
-            return 0.0
+    def _scores(self, X):
+        """Probability of the 'valid' class for each row of a feature matrix."""
+        classes = list(self.model.classes_)
+        if len(classes) == 1:
+            # Trained on one class only: every citation gets that class
+            return np.full(X.shape[0], 1.0 if classes[0] == 1 else 0.0)
+        return self.model.predict_proba(X)[:, classes.index(1)]
 
-    def classify_citation(self, citation):
+    def predict(self, citation):
         """
-        Classify a citation and return a detailed result.
+        Predict whether a citation is valid.
+        Returns a confidence score between 0 and 1.
         """
         try:
-            confidence = self.predict(citation)
-
-            features = self._extract_features(citation)
+            return float(self.predict_many([citation])[0])
+        except Exception as e:
+            logger.error(f"Error predicting citation '{citation}': {str(e)}")
+            return 0.0
 
-            is_valid = confidence >= 0.7  # Threshold can be adjusted
+    @staticmethod
+    def _explain(features):
+        explanation = []
 
-            explanation = []
+        if features["has_reporter"]:
+            explanation.append("Contains a recognized legal reporter")
+        else:
+            explanation.append("Does not contain a recognized legal reporter")
 
-            if features["has_reporter"]:
-                explanation.append("Contains a recognized legal reporter")
-            else:
-                explanation.append("Does not contain a recognized legal reporter")
+        if features["has_vol_page"]:
+            explanation.append(
+                f"Contains volume ({features['volume']}) and page ({features['page']}) numbers"
+            )
+        else:
+            explanation.append("Missing volume and page number pattern")
 
-            if features["has_vol_page"]:
-                explanation.append(
-                    f"Contains volume ({features['volume']}) and page ({features['page']}) numbers"
-                )
-            else:
-                explanation.append("Missing volume and page number pattern")
+        if features["has_year"]:
+            explanation.append(f"Contains a year ({features['year']})")
+        else:
+            explanation.append("Missing year")
 
-            if features["has_year"]:
-                explanation.append(f"Contains a year ({features['year']})")
-            else:
-                explanation.append("Missing year")
+        if features["has_v"]:
+            explanation.append("Contains 'v.' (versus) indicating a case name")
+        else:
+            explanation.append("Missing 'v.' (versus) in case name")
 
-            if features["has_v"]:
-                explanation.append("Contains 'v.' (versus) indicating a case name")
-            else:
-                explanation.append("Missing 'v.' (versus) in case name")
+        return explanation
 
-            return {
-                "citation": citation,
-                "is_valid": is_valid,
-                "confidence": confidence,
-                "features": features,
-                "explanation": explanation,
-                "classification_date": datetime.now().isoformat(),
-            }
+    def classify_citation(self, citation):
+        """
+        Classify a citation and return a detailed result.
+        """
+        return self.batch_classify([citation])[0]
 
-        except Exception as e:
-            logger.error(f"Error in classify_citation for '{citation}': {str(e)}")
-            return {
-                "citation": citation,
-                "is_valid": False,
-                "confidence": 0.0,
-                "error": str(e),
-                "classification_date": datetime.now().isoformat(),
-            }
-
-    def batch_classify(self, citations):
+    def batch_classify(self, citations, batch_size=1000):
         """
         Classify a batch of citations.
         Returns a list of classification results.
+
+        Features are extracted once per citation and the model is called
+        once per ``batch_size`` citations.
         """
+        citations = list(citations)
         results = []
-
-        for citation in citations:
-            result = self.classify_citation(citation)
-            results.append(result)
+        classification_date = datetime.now().isoformat()
+
+        for start in range(0, len(citations), batch_size):
+            chunk = citations[start:start + batch_size]
+            try:
+                features = [self._extract_features(citation) for citation in chunk]
+                if self.model is not None and self.vectorizer is not None:
+                    scores = self._scores(self._feature_matrix(chunk, features))
+                else:
+                    logger.error("Model not trained. Call train() first.")
+                    scores = np.zeros(len(chunk))
+
+                for citation, score, citation_features in zip(chunk, scores, features):
+                    confidence = float(score)
+                    results.append({
+                        "citation": citation,
+                        "is_valid": confidence >= self.valid_threshold,
+                        "confidence": confidence,
+                        "features": citation_features,
+                        "explanation": self._explain(citation_features),
+                        "classification_date": classification_date,
+                    })
+
+            except Exception as e:
+                logger.error(f"Error classifying batch of {len(chunk)} citations: {str(e)}")
+                for citation in chunk:
+                    results.append({
+                        "citation": citation,
+                        "is_valid": False,
+                        "confidence": 0.0,
+                        "error": str(e),
+                        "classification_date": classification_date,
+                    })
 
         return results
 
 
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_citation_classifier():
+    """Get the process-wide classifier so the model is unpickled only once."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                classifier = CitationClassifier()
+                if not classifier.is_informative:
+                    # A missing or single-class model only yields the heuristic
+                    # ordering; retrain from the database once it has both labels
+                    logger.info("Citation classifier model is not informative; retraining")
+                    classifier.train(force=True)
+                _classifier = classifier
+    return _classifier
+
+
 if __name__ == "__main__":
     classifier = CitationClassifier()
 
@@ -3,90 +3,222 @@ from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_
 
 from typing import Optional, List, Dict, Any
 
-@dataclass
+# CitationResult fields in constructor order
+_CITATION_FIELD_NAMES = (
+    'citation', 'extracted_case_name', 'extracted_date', 'canonical_name', 'canonical_date',
+    'canonical_url', 'verified', 'url', 'court', 'docket_number', 'confidence', 'method', 'pattern',
+    'context', 'start_index', 'end_index', 'is_parallel', 'is_cluster', 'parallel_citations',
+    'cluster_members', 'pinpoint_pages', 'docket_numbers', 'case_history', 'publication_status',
+    'source', 'error', 'metadata', 'cluster_id', 'true_by_parallel', 'is_pinpoint',
+    'verification_citation',
+)
+
+# Collections allocated on first access instead of for every instance
+_LAZY_COLLECTIONS = {
+    'parallel_citations': list,
+    'cluster_members': list,
+    'pinpoint_pages': list,
+    'docket_numbers': list,
+    'case_history': list,
+    'metadata': dict,
+}
+_CITATION_SLOTS = tuple(
+    f'_{name}' if name in _LAZY_COLLECTIONS else name for name in _CITATION_FIELD_NAMES
+)
+
+
+def _lazy_collection(name: str) -> property:
+    """Public attribute over a private slot that holds None until first read."""
+    slot = f'_{name}'
+    factory = _LAZY_COLLECTIONS[name]
+
+    def getter(self):
+        value = getattr(self, slot)
+        if value is None:
+            value = factory()
+            setattr(self, slot, value)
+        return value
+
+    def setter(self, value):
+        setattr(self, slot, value)
+
+    return property(getter, setter, doc=f"{name} (allocated on first access)")
+
+
 class CitationResult:
+    """
+    One extracted citation.
+
+    Large documents produce tens of thousands of these, so fields live in
+    __slots__ and the list/dict fields are only allocated when first read or
+    assigned. Attribute and getattr() access behave as they did for the old
+    dataclass: unset collections read as empty, and ad-hoc attributes (such
+    as cluster_case_name) are still accepted through a lazily created
+    instance __dict__. Serialize with to_dict(), not __dict__.
+    """
+
+    __slots__ = _CITATION_SLOTS + ('__dict__',)
+
     citation: str
-    extracted_case_name: Optional[str] = None
-    extracted_date: Optional[str] = None
-    canonical_name: Optional[str] = None
-    canonical_date: Optional[str] = None
-    canonical_url: Optional[str] = None
-    verified: bool = False
-    url: Optional[str] = None
-    court: Optional[str] = None
-    docket_number: Optional[str] = None
-    confidence: float = 0.0
-    method: str = "unified_processor"
-    pattern: str = ""
-    context: str = ""
-    start_index: Optional[int] = None
-    end_index: Optional[int] = None
-    is_parallel: bool = False
-    is_cluster: bool = False
-    parallel_citations: Optional[List[str]] = None
-    cluster_members: Optional[List[str]] = None
-    pinpoint_pages: Optional[List[str]] = None
-    docket_numbers: Optional[List[str]] = None
-    case_history: Optional[List[str]] = None
-    publication_status: Optional[str] = None
-    source: str = "Unknown"
-    error: Optional[str] = None
-    metadata: Optional[Dict[str, Any]] = None
-    cluster_id: Optional[str] = None
-    true_by_parallel: bool = False
-    is_pinpoint: bool = False
-    verification_citation: Optional[str] = None
-
-    def __post_init__(self):
-        if self.parallel_citations is None:
-            self.parallel_citations = []
-        if self.cluster_members is None:
-            self.cluster_members = []
-        if self.pinpoint_pages is None:
-            self.pinpoint_pages = []
-        if self.docket_numbers is None:
-            self.docket_numbers = []
-        if self.case_history is None:
-            self.case_history = []
-        if self.metadata is None:
-            self.metadata = {}
-            
+    extracted_case_name: Optional[str]
+    extracted_date: Optional[str]
+    canonical_name: Optional[str]
+    canonical_date: Optional[str]
+    canonical_url: Optional[str]
+    verified: bool
+    url: Optional[str]
+    court: Optional[str]
+    docket_number: Optional[str]
+    confidence: float
+    method: str
+    pattern: str
+    context: str
+    start_index: Optional[int]
+    end_index: Optional[int]
+    is_parallel: bool
+    is_cluster: bool
+    parallel_citations: List[str]
+    cluster_members: List[str]
+    pinpoint_pages: List[str]
+    docket_numbers: List[str]
+    case_history: List[str]
+    publication_status: Optional[str]
+    source: str
+    error: Optional[str]
+    metadata: Dict[str, Any]
+    cluster_id: Optional[str]
+    true_by_parallel: bool
+    is_pinpoint: bool
+    verification_citation: Optional[str]
+
+    def __init__(self, citation: str, extracted_case_name: Optional[str] = None,
+                 extracted_date: Optional[str] = None, canonical_name: Optional[str] = None,
+                 canonical_date: Optional[str] = None, canonical_url: Optional[str] = None,
+                 verified: bool = False, url: Optional[str] = None, court: Optional[str] = None,
+                 docket_number: Optional[str] = None, confidence: float = 0.0,
+                 method: str = "unified_processor", pattern: str = "", context: str = "",
+                 start_index: Optional[int] = None, end_index: Optional[int] = None,
+                 is_parallel: bool = False, is_cluster: bool = False,
+                 parallel_citations: Optional[List[str]] = None, cluster_members: Optional[List[str]] = None,
+                 pinpoint_pages: Optional[List[str]] = None, docket_numbers: Optional[List[str]] = None,
+                 case_history: Optional[List[str]] = None, publication_status: Optional[str] = None,
+                 source: str = "Unknown", error: Optional[str] = None,
+                 metadata: Optional[Dict[str, Any]] = None, cluster_id: Optional[str] = None,
+                 true_by_parallel: bool = False, is_pinpoint: bool = False,
+                 verification_citation: Optional[str] = None):
+        self.citation = citation
+        self.extracted_case_name = extracted_case_name
+        self.extracted_date = extracted_date
+        self.canonical_name = canonical_name
+        self.canonical_date = canonical_date
+        self.canonical_url = canonical_url
+        self.verified = verified
+        self.url = url
+        self.court = court
+        self.docket_number = docket_number
+        self.confidence = confidence
+        self.method = method
+        self.pattern = pattern
+        self.context = context
+        self.start_index = start_index
+        self.end_index = end_index
+        self.is_parallel = is_parallel
+        self.is_cluster = is_cluster
+        self.publication_status = publication_status
+        self.source = source
+        self.error = error
+        self.cluster_id = cluster_id
+        self.true_by_parallel = true_by_parallel
+        self.is_pinpoint = is_pinpoint
+        self.verification_citation = verification_citation
+        # None until first read, see _lazy_collection()
+        self._parallel_citations = parallel_citations
+        self._cluster_members = cluster_members
+        self._pinpoint_pages = pinpoint_pages
+        self._docket_numbers = docket_numbers
+        self._case_history = case_history
+        self._metadata = metadata
+
+    parallel_citations = _lazy_collection('parallel_citations')
+    cluster_members = _lazy_collection('cluster_members')
+    pinpoint_pages = _lazy_collection('pinpoint_pages')
+    docket_numbers = _lazy_collection('docket_numbers')
+    case_history = _lazy_collection('case_history')
+    metadata = _lazy_collection('metadata')
+
+    def __copy__(self):
+        # Clustering shallow-copies every citation; spelled out because a generic
+        # setattr loop over slots is several times slower than copying a dataclass
+        clone = object.__new__(type(self))
+        clone.citation = self.citation
+        clone.extracted_case_name = self.extracted_case_name
+        clone.extracted_date = self.extracted_date
+        clone.canonical_name = self.canonical_name
+        clone.canonical_date = self.canonical_date
+        clone.canonical_url = self.canonical_url
+        clone.verified = self.verified
+        clone.url = self.url
+        clone.court = self.court
+        clone.docket_number = self.docket_number
+        clone.confidence = self.confidence
+        clone.method = self.method
+        clone.pattern = self.pattern
+        clone.context = self.context
+        clone.start_index = self.start_index
+        clone.end_index = self.end_index
+        clone.is_parallel = self.is_parallel
+        clone.is_cluster = self.is_cluster
+        clone._parallel_citations = self._parallel_citations
+        clone._cluster_members = self._cluster_members
+        clone._pinpoint_pages = self._pinpoint_pages
+        clone._docket_numbers = self._docket_numbers
+        clone._case_history = self._case_history
+        clone.publication_status = self.publication_status
+        clone.source = self.source
+        clone.error = self.error
+        clone._metadata = self._metadata
+        clone.cluster_id = self.cluster_id
+        clone.true_by_parallel = self.true_by_parallel
+        clone.is_pinpoint = self.is_pinpoint
+        clone.verification_citation = self.verification_citation
+        extras = self.__dict__
+        if extras:
+            clone.__dict__.update(extras)
+        return clone
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in _CITATION_FIELD_NAMES)
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in _CITATION_FIELD_NAMES)
+        return f"{type(self).__name__}({fields})"
+
     def to_dict(self):
         """Convert the CitationResult to a dictionary for JSON serialization."""
-        
-        # Get cluster case name from attribute or metadata
+        metadata = self._metadata
+        # Cluster case name from the ad-hoc attribute, else from metadata
         cluster_case_name = getattr(self, 'cluster_case_name', None)
-        # Also check metadata if direct attribute is not set
-        if not cluster_case_name and hasattr(self, 'metadata') and self.metadata:
-            cluster_case_name = self.metadata.get('cluster_case_name')
-            
-        extracted_case_name = self.extracted_case_name
-        canonical_name = self.canonical_name
-        
-        # REMOVED: case_name field eliminated to prevent contamination and maintain data clarity
-        # Frontend will use extracted_case_name and canonical_name directly
-        
-        # Debug logging for data separation
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.debug(f"DATA_SEPARATION: cluster='{cluster_case_name}', extracted='{extracted_case_name}', canonical='{canonical_name}'")
-        
+        if not cluster_case_name and metadata:
+            cluster_case_name = metadata.get('cluster_case_name')
+
         # CRITICAL FIX: DO NOT override verified status!
         # A citation with verified=False should stay False even if it has canonical data
         # This is because canonical data can come from true_by_parallel propagation
         # (unverified citation inherits canonical data from verified parallel citation)
-        verified_status = self.verified  # Use the actual verification status
-        
-        result = {
+        data = {
             'citation': self.citation,
             # REMOVED: case_name field to prevent contamination
-            'extracted_case_name': extracted_case_name,
+            'extracted_case_name': self.extracted_case_name,
             'extracted_date': self.extracted_date,
-            'canonical_name': canonical_name,
+            'canonical_name': self.canonical_name,
             'canonical_date': self.canonical_date,
             'canonical_url': self.canonical_url,
-            'cluster_case_name': cluster_case_name,  # FIXED: Add cluster_case_name field
-            'verified': verified_status,  # Use actual verification status (not overridden)
+            'cluster_case_name': cluster_case_name,
+            'verified': self.verified,
             'url': self.url,
             'court': self.court,
             'docket_number': self.docket_number,
@@ -98,20 +230,26 @@ class CitationResult:
             'end_index': self.end_index,
             'is_parallel': self.is_parallel,
             'is_cluster': self.is_cluster,
-            'parallel_citations': self.parallel_citations,
-            'cluster_members': self.cluster_members,
-            'pinpoint_pages': self.pinpoint_pages,
-            'docket_numbers': self.docket_numbers,
-            'case_history': self.case_history,
+            'parallel_citations': self._parallel_citations or [],
+            'cluster_members': self._cluster_members or [],
+            'pinpoint_pages': self._pinpoint_pages or [],
+            'docket_numbers': self._docket_numbers or [],
+            'case_history': self._case_history or [],
             'publication_status': self.publication_status,
             'source': self.source,
             'error': self.error,
-            'metadata': self.metadata,
+            'metadata': metadata or {},
             'cluster_id': self.cluster_id,
             'true_by_parallel': self.true_by_parallel,
+            'is_pinpoint': self.is_pinpoint,
+            'verification_citation': self.verification_citation,
             'is_verified': self.verified  # Add is_verified alias for backward compatibility
         }
-        return result
+        # Ad-hoc attributes (verification_status, original_case_name, ...) as
+        # serializing __dict__ used to include them
+        for name, value in self.__dict__.items():
+            data.setdefault(name, value)
+        return data
 
 @dataclass
 class ProcessingConfig:
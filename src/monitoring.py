@@ -14,6 +14,8 @@ from datetime import datetime, timedelta
 from collections import deque, defaultdict
 import logging
 
+from src.metrics import HTTP_REQUEST_SECONDS
+
 logger = logging.getLogger(__name__)
 
 class CaseStrainerMonitor:
@@ -97,8 +99,9 @@ class CaseStrainerMonitor:
         else:
             logger.info(f"Component {component} status: {status}")
     
-    def record_request(self, endpoint, duration, status_code, error=None):
-        """Record a request for performance tracking"""
+    def record_request(self, endpoint, duration, status_code, error=None, method='GET'):
+        """Record a request for performance tracking (also exported as casestrainer_http_request_seconds)"""
+        HTTP_REQUEST_SECONDS.observe(duration, endpoint=endpoint, method=method, status=status_code)
         request_data = {
             'timestamp': time.time(),
             'endpoint': endpoint,
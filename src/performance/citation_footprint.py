@@ -0,0 +1,198 @@
+"""
+CitationResult footprint measurement
+
+Measures memory and time for the CitationResult lifecycle on a synthetic
+5,000-citation document: construction the way the extractors do it, one
+shallow copy per pipeline stage (clustering copies every citation), a
+metadata touch on a share of them, and final to_dict() serialization.
+The current slotted class is compared against the previous plain dataclass.
+
+Usage:
+    python -m src.performance.citation_footprint
+    python -m src.performance.citation_footprint --citations 20000 --repeat 5
+"""
+
+import argparse
+import copy
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from src.models import CitationResult
+
+DEFAULT_CITATIONS = 5000
+COPY_STAGES = 2
+
+
+@dataclass
+class LegacyCitationResult:
+    """The pre-__slots__ CitationResult, kept only as the comparison baseline."""
+    citation: str
+    extracted_case_name: Optional[str] = None
+    extracted_date: Optional[str] = None
+    canonical_name: Optional[str] = None
+    canonical_date: Optional[str] = None
+    canonical_url: Optional[str] = None
+    verified: bool = False
+    url: Optional[str] = None
+    court: Optional[str] = None
+    docket_number: Optional[str] = None
+    confidence: float = 0.0
+    method: str = "unified_processor"
+    pattern: str = ""
+    context: str = ""
+    start_index: Optional[int] = None
+    end_index: Optional[int] = None
+    is_parallel: bool = False
+    is_cluster: bool = False
+    parallel_citations: Optional[List[str]] = None
+    cluster_members: Optional[List[str]] = None
+    pinpoint_pages: Optional[List[str]] = None
+    docket_numbers: Optional[List[str]] = None
+    case_history: Optional[List[str]] = None
+    publication_status: Optional[str] = None
+    source: str = "Unknown"
+    error: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    cluster_id: Optional[str] = None
+    true_by_parallel: bool = False
+    is_pinpoint: bool = False
+    verification_citation: Optional[str] = None
+
+    def __post_init__(self):
+        if self.parallel_citations is None:
+            self.parallel_citations = []
+        if self.cluster_members is None:
+            self.cluster_members = []
+        if self.pinpoint_pages is None:
+            self.pinpoint_pages = []
+        if self.docket_numbers is None:
+            self.docket_numbers = []
+        if self.case_history is None:
+            self.case_history = []
+        if self.metadata is None:
+            self.metadata = {}
+
+    def to_dict(self):
+        import logging
+        logger = logging.getLogger(__name__)
+        cluster_case_name = getattr(self, 'cluster_case_name', None)
+        if not cluster_case_name and hasattr(self, 'metadata') and self.metadata:
+            cluster_case_name = self.metadata.get('cluster_case_name')
+        logger.debug(f"DATA_SEPARATION: cluster='{cluster_case_name}', extracted='{self.extracted_case_name}', "
+                     f"canonical='{self.canonical_name}'")
+        return {
+            'citation': self.citation,
+            'extracted_case_name': self.extracted_case_name,
+            'extracted_date': self.extracted_date,
+            'canonical_name': self.canonical_name,
+            'canonical_date': self.canonical_date,
+            'canonical_url': self.canonical_url,
+            'cluster_case_name': cluster_case_name,
+            'verified': self.verified,
+            'url': self.url,
+            'court': self.court,
+            'docket_number': self.docket_number,
+            'confidence': self.confidence,
+            'method': self.method,
+            'pattern': self.pattern,
+            'context': self.context,
+            'start_index': self.start_index,
+            'end_index': self.end_index,
+            'is_parallel': self.is_parallel,
+            'is_cluster': self.is_cluster,
+            'parallel_citations': self.parallel_citations,
+            'cluster_members': self.cluster_members,
+            'pinpoint_pages': self.pinpoint_pages,
+            'docket_numbers': self.docket_numbers,
+            'case_history': self.case_history,
+            'publication_status': self.publication_status,
+            'source': self.source,
+            'error': self.error,
+            'metadata': self.metadata,
+            'cluster_id': self.cluster_id,
+            'true_by_parallel': self.true_by_parallel,
+            'is_verified': self.verified
+        }
+
+
+def _workload(cls: Callable[..., Any], count: int) -> List[Dict[str, Any]]:
+    citations = []
+    for i in range(count):
+        citation = cls(
+            citation=f"{100 + i % 400} Wn.2d {i + 1}",
+            start_index=i * 60,
+            end_index=i * 60 + 14,
+            method="eyecite",
+            pattern="eyecite",
+            context="",
+        )
+        citation.extracted_case_name = f"State v. Party{i}"
+        citation.extracted_date = str(1950 + i % 70)
+        if i % 3 == 0:
+            citation.metadata['detector'] = 'eyecite'
+        citations.append(citation)
+    for _ in range(COPY_STAGES):
+        citations = [copy.copy(c) for c in citations]
+    for citation in citations:
+        citation.cluster_case_name = citation.extracted_case_name
+    return [c.to_dict() for c in citations]
+
+
+def measure(cls: Callable[..., Any], count: int = DEFAULT_CITATIONS, repeat: int = 3) -> Dict[str, float]:
+    """Peak traced memory and best-of-``repeat`` wall time for one workload run."""
+    gc.collect()
+    tracemalloc.start()
+    _workload(cls, count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        _workload(cls, count)
+        timings.append(time.perf_counter() - started)
+
+    citation = cls(citation='1 U.S. 1')
+    return {
+        'peak_mb': round(peak / (1024 * 1024), 2),
+        'seconds': round(min(timings), 4),
+        'instance_bytes': _instance_bytes(citation),
+    }
+
+
+def _instance_bytes(citation: Any) -> int:
+    """Shallow size of one fresh instance including its own containers."""
+    import sys
+    size = sys.getsizeof(citation)
+    extras = getattr(citation, '__dict__', None)
+    if extras is not None and (type(citation) is not CitationResult or extras):
+        size += sys.getsizeof(extras)
+    if type(citation) is not CitationResult:
+        size += sum(sys.getsizeof(getattr(citation, name)) for name in
+                    ('parallel_citations', 'cluster_members', 'pinpoint_pages', 'docket_numbers',
+                     'case_history', 'metadata'))
+    return size
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure CitationResult memory and time")
+    parser.add_argument('--citations', type=int, default=DEFAULT_CITATIONS)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    results = {
+        'citations': args.citations,
+        'legacy_dataclass': measure(LegacyCitationResult, args.citations, args.repeat),
+        'slotted': measure(CitationResult, args.citations, args.repeat),
+    }
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,431 @@
+"""
+Corpus Benchmark for Citation Processing
+
+Runs UnifiedCitationProcessorV2 over the bundled brief corpus (wa_briefs_txt/
+by default) with verification answered from recorded responses, so results are
+reproducible offline. For every document it records per-stage time
+(extraction, case-name enrichment, verification, clustering, serialization);
+for the run it records peak RSS and citations per second. Results are written
+as JSON and can be compared against a stored baseline to flag regressions.
+
+Usage:
+    python -m src.performance.corpus_benchmark --output benchmarks/latest.json
+    python -m src.performance.corpus_benchmark --baseline benchmarks/baseline.json
+    python -m src.performance.corpus_benchmark --update-baseline
+    python -m src.performance.corpus_benchmark --record   # refresh recordings (needs network)
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import psutil
+
+from src.metrics import STEP_STAGES
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CORPUS = os.path.join(PROJECT_ROOT, 'wa_briefs_txt')
+BENCHMARK_DIR = os.path.join(PROJECT_ROOT, 'benchmarks')
+DEFAULT_RECORDINGS = os.path.join(BENCHMARK_DIR, 'recorded_verifications.json')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+STAGES = ['extraction', 'case_name_enrichment', 'verification', 'clustering', 'serialization']
+
+
+# Relative slowdown tolerated before a metric is flagged, and the absolute
+# floor below which timing differences are treated as noise
+DEFAULT_TOLERANCE = 0.20
+NOISE_FLOOR_SECONDS = 0.05
+
+
+class RecordedVerifier:
+    """
+    Answers UnifiedVerificationMaster calls from recorded responses.
+
+    Recordings map a citation to the fields of a VerificationResult; citations
+    without a recording come back unverified. With ``record=True`` the real
+    verifier runs and its answers are captured for save().
+    """
+
+    def __init__(self, recordings: Optional[Dict[str, Dict[str, Any]]] = None, record: bool = False):
+        self.recordings = dict(recordings or {})
+        self.record = record
+        self.calls = 0
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_RECORDINGS, record: bool = False) -> 'RecordedVerifier':
+        recordings = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                recordings = json.load(f)
+        elif not record:
+            logger.warning(f"No recorded verifications at {path}; every citation will be unverified")
+        return cls(recordings, record=record)
+
+    def save(self, path: str = DEFAULT_RECORDINGS):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.recordings, f, indent=2, sort_keys=True)
+
+    def _result(self, citation: str):
+        from src.unified_verification_master import VerificationResult
+        recorded = self.recordings.get(citation)
+        if not recorded:
+            return VerificationResult(citation=citation, verified=False, source='recorded',
+                                      error='No recorded verification')
+        return VerificationResult(
+            citation=citation,
+            verified=bool(recorded.get('verified')),
+            canonical_name=recorded.get('canonical_name'),
+            canonical_date=recorded.get('canonical_date'),
+            canonical_url=recorded.get('canonical_url'),
+            source=recorded.get('source') or 'recorded',
+            confidence=recorded.get('confidence', 1.0 if recorded.get('verified') else 0.0),
+            method='recorded',
+        )
+
+    def _remember(self, results):
+        for result in results:
+            if result is not None:
+                self.recordings[result.citation] = {
+                    'verified': bool(result.verified),
+                    'canonical_name': result.canonical_name,
+                    'canonical_date': result.canonical_date,
+                    'canonical_url': result.canonical_url,
+                    'source': result.source,
+                }
+
+    @contextlib.contextmanager
+    def installed(self) -> Iterator['RecordedVerifier']:
+        """Patch UnifiedVerificationMaster for the duration of the block."""
+        from src.unified_verification_master import UnifiedVerificationMaster
+
+        verifier = self
+        originals = {name: UnifiedVerificationMaster.__dict__.get(name)
+                     for name in ('verify_citation', 'verify_citations_batch')}
+        real_batch = originals['verify_citations_batch']
+        real_single = originals['verify_citation']
+
+        async def verify_citations_batch(self, citations, extracted_case_names=None, extracted_dates=None,
+                                         *args, **kwargs):
+            verifier.calls += 1
+            if verifier.record:
+                results = await real_batch(self, citations, extracted_case_names, extracted_dates, *args, **kwargs)
+                verifier._remember(results)
+                return results
+            return [verifier._result(citation) for citation in citations]
+
+        async def verify_citation(self, citation, extracted_case_name=None, extracted_date=None, *args, **kwargs):
+            verifier.calls += 1
+            if verifier.record:
+                result = await real_single(self, citation, extracted_case_name, extracted_date, *args, **kwargs)
+                verifier._remember([result])
+                return result
+            return verifier._result(citation)
+
+        UnifiedVerificationMaster.verify_citations_batch = verify_citations_batch
+        UnifiedVerificationMaster.verify_citation = verify_citation
+        try:
+            yield self
+        finally:
+            for name, original in originals.items():
+                setattr(UnifiedVerificationMaster, name, original)
+
+
+class StageTimer:
+    """Progress callback that turns processor progress steps into stage durations."""
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {stage: 0.0 for stage in STAGES}
+        self._stage: Optional[str] = None
+        self._started = 0.0
+
+    def _close(self, now: float):
+        if self._stage is not None:
+            self.durations[self._stage] += now - self._started
+        self._stage = None
+
+    def __call__(self, progress, step, message=None):
+        now = time.perf_counter()
+        self._close(now)
+        stage = STEP_STAGES.get(step)
+        if stage is not None:
+            self._stage = stage
+            self._started = now
+
+    def finish(self):
+        self._close(time.perf_counter())
+
+    @contextlib.contextmanager
+    def measure(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durations[stage] += time.perf_counter() - started
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KB on Linux, bytes on macOS
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except (ImportError, AttributeError):
+        info = psutil.Process(os.getpid()).memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+
+
+def load_corpus(paths: Sequence[str], include_pdf: bool = False, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Collect documents (name, path, text) from files or directories, sorted by name."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in os.listdir(path))
+        else:
+            files.append(path)
+
+    documents = []
+    for file_path in sorted(files, key=os.path.basename):
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext == '.txt':
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        elif ext == '.pdf' and include_pdf:
+            from src.document_processing_unified import extract_text_from_file
+            text = extract_text_from_file(file_path)
+        else:
+            continue
+        documents.append({'name': os.path.basename(file_path), 'path': file_path, 'text': text})
+        if limit and len(documents) >= limit:
+            break
+    return documents
+
+
+def _serialize(result: Dict[str, Any]) -> int:
+    citations = [c.to_dict() if hasattr(c, 'to_dict') else c for c in result.get('citations', [])]
+    payload = json.dumps({'citations': citations, 'clusters': result.get('clusters', [])}, default=str)
+    return len(payload)
+
+
+def benchmark_document(document: Dict[str, Any], enable_verification: bool = True) -> Dict[str, Any]:
+    """Process one document and return its stage timings and counts."""
+    from src.models import ProcessingConfig
+    from src.unified_citation_processor_v2 import UnifiedCitationProcessorV2
+
+    timer = StageTimer()
+    processor = UnifiedCitationProcessorV2(ProcessingConfig(enable_verification=enable_verification),
+                                           progress_callback=timer)
+    started = time.perf_counter()
+    result = asyncio.run(processor.process_text(document['text']))
+    timer.finish()
+    with timer.measure('serialization'):
+        payload_bytes = _serialize(result)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'name': document['name'],
+        'chars': len(document['text']),
+        'citations': len(result.get('citations', [])),
+        'clusters': len(result.get('clusters', [])),
+        'verified': sum(1 for c in result.get('citations', []) if getattr(c, 'verified', False)),
+        'payload_bytes': payload_bytes,
+        'stages': {stage: round(seconds, 4) for stage, seconds in timer.durations.items()},
+        'total_seconds': round(elapsed, 4),
+    }
+
+
+def run_corpus_benchmark(documents: Sequence[Dict[str, Any]], verifier: Optional[RecordedVerifier] = None,
+                         enable_verification: bool = True) -> Dict[str, Any]:
+    """Benchmark every document with verification answered by ``verifier``."""
+    verifier = verifier or RecordedVerifier.from_file()
+    per_document = []
+    with verifier.installed():
+        started = time.perf_counter()
+        for document in documents:
+            per_document.append(benchmark_document(document, enable_verification))
+            logger.info(f"[BENCHMARK] {document['name']}: {per_document[-1]['total_seconds']:.2f}s, "
+                        f"{per_document[-1]['citations']} citations")
+        elapsed = time.perf_counter() - started
+
+    citations = sum(d['citations'] for d in per_document)
+    chars = sum(d['chars'] for d in per_document)
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'totals': {
+            'documents': len(per_document),
+            'chars': chars,
+            'citations': citations,
+            'clusters': sum(d['clusters'] for d in per_document),
+            'verified': sum(d['verified'] for d in per_document),
+            'total_seconds': round(elapsed, 4),
+            'citations_per_second': round(citations / elapsed, 3) if elapsed else 0.0,
+            'chars_per_second': round(chars / elapsed, 1) if elapsed else 0.0,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'stages': {stage: round(sum(d['stages'][stage] for d in per_document), 4) for stage in STAGES},
+            'verification_calls': verifier.calls,
+        },
+        'documents': per_document,
+    }
+
+
+def _common_totals(results: Dict[str, Any], names: Sequence[str]) -> Dict[str, Any]:
+    """Totals of ``results`` over the named documents only."""
+    documents = [d for d in results['documents'] if d['name'] in names]
+    seconds = sum(d['total_seconds'] for d in documents)
+    citations = sum(d['citations'] for d in documents)
+    return {
+        'citations': citations,
+        'clusters': sum(d['clusters'] for d in documents),
+        'total_seconds': round(seconds, 4),
+        'citations_per_second': round(citations / seconds, 3) if seconds else 0.0,
+        'stages': {stage: round(sum(d['stages'][stage] for d in documents), 4) for stage in STAGES},
+    }
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    List regressions of ``results`` against ``baseline``.
+
+    Only documents present in both runs are compared, so a ``--limit`` run
+    can be checked against a full baseline. Flags stage/total times that grew
+    by more than ``tolerance``, a citations-per-second drop of more than
+    ``tolerance``, and any change in a document's citation/cluster counts (an
+    output change, not a speed change). Peak RSS is a whole-run figure and is
+    only compared when both runs processed the same documents.
+    """
+    regressions = []
+    current_names = [d['name'] for d in results.get('documents', [])]
+    previous_names = {d['name'] for d in baseline.get('documents', [])}
+    common = [name for name in current_names if name in previous_names]
+    if common:
+        current, previous = _common_totals(results, common), _common_totals(baseline, common)
+    else:
+        current, previous = results['totals'], baseline['totals']
+
+    def slower(metric, now, before):
+        if before is None:
+            return
+        if now - before > NOISE_FLOOR_SECONDS and now > before * (1 + tolerance):
+            regressions.append({'metric': metric, 'baseline': before, 'current': now,
+                                'change': round(now / before - 1, 3) if before else None})
+
+    for stage in STAGES:
+        slower(f'stages.{stage}', current['stages'][stage], previous.get('stages', {}).get(stage))
+    slower('total_seconds', current['total_seconds'], previous.get('total_seconds'))
+
+    same_run = not common or (len(common) == len(current_names) == len(previous_names))
+    current_rss, previous_rss = results['totals'].get('peak_rss_mb'), baseline['totals'].get('peak_rss_mb')
+    if same_run and previous_rss and current_rss > previous_rss * (1 + tolerance):
+        regressions.append({'metric': 'peak_rss_mb', 'baseline': previous_rss, 'current': current_rss,
+                            'change': round(current_rss / previous_rss - 1, 3)})
+
+    if previous.get('citations_per_second') and \
+            current['citations_per_second'] < previous['citations_per_second'] * (1 - tolerance):
+        regressions.append({'metric': 'citations_per_second', 'baseline': previous['citations_per_second'],
+                            'current': current['citations_per_second'],
+                            'change': round(current['citations_per_second'] / previous['citations_per_second'] - 1, 3)})
+
+    if common:
+        before_docs = {d['name']: d for d in baseline['documents']}
+        for document in results['documents']:
+            before = before_docs.get(document['name'])
+            for metric in ('citations', 'clusters'):
+                if before is not None and document[metric] != before[metric]:
+                    regressions.append({'metric': f"{document['name']}.{metric}", 'baseline': before[metric],
+                                        'current': document[metric], 'change': None})
+    else:
+        for metric in ('citations', 'clusters'):
+            if previous.get(metric) is not None and current[metric] != previous[metric]:
+                regressions.append({'metric': metric, 'baseline': previous[metric], 'current': current[metric],
+                                    'change': None})
+    return regressions
+
+
+def print_summary(results: Dict[str, Any], regressions: Optional[List[Dict[str, Any]]] = None):
+    totals = results['totals']
+    print("\n" + "=" * 80)
+    print("CORPUS BENCHMARK RESULTS")
+    print("=" * 80)
+    print(f"Documents: {totals['documents']}  Citations: {totals['citations']}  "
+          f"Clusters: {totals['clusters']}  Verified: {totals['verified']}")
+    print(f"Total: {totals['total_seconds']:.2f}s  Citations/sec: {totals['citations_per_second']:.2f}  "
+          f"Peak RSS: {totals['peak_rss_mb']:.1f} MB")
+    print("-" * 80)
+    for stage in STAGES:
+        print(f"{stage:<25} {totals['stages'][stage]:>10.3f}s")
+    if regressions is not None:
+        print("-" * 80)
+        if not regressions:
+            print("No regressions against baseline")
+        for regression in regressions:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline']} -> {regression['current']}")
+    print("=" * 80)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark citation processing over the brief corpus")
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_CORPUS], help="Files or directories to process")
+    parser.add_argument('--limit', type=int, help="Only process the first N documents")
+    parser.add_argument('--include-pdf', action='store_true', help="Also extract and process PDFs")
+    parser.add_argument('--recordings', default=DEFAULT_RECORDINGS, help="Recorded verification responses")
+    parser.add_argument('--record', action='store_true', help="Verify live and update the recordings")
+    parser.add_argument('--no-verification', action='store_true', help="Skip the verification stage")
+    parser.add_argument('--output', help="Write machine-readable results to this JSON file")
+    parser.add_argument('--baseline', default=None, help="Baseline JSON to compare against")
+    parser.add_argument('--update-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="Allowed relative slowdown")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    # The pipeline logs heavily; keep the benchmark's own output readable
+    logging.getLogger('src').setLevel(logging.CRITICAL)
+
+    documents = load_corpus(args.paths, include_pdf=args.include_pdf, limit=args.limit)
+    if not documents:
+        print("No documents found", file=sys.stderr)
+        return 2
+
+    verifier = RecordedVerifier.from_file(args.recordings, record=args.record)
+    results = run_corpus_benchmark(documents, verifier, enable_verification=not args.no_verification)
+    if args.record:
+        verifier.save(args.recordings)
+
+    regressions = None
+    baseline_path = args.baseline or (DEFAULT_BASELINE if not args.update_baseline else None)
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        results['regressions'] = regressions
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        with open(args.baseline or DEFAULT_BASELINE, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    print_summary(results, regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -248,6 +248,7 @@ class OptimizedCitationVerifier(ICitationVerifier):
                 cached_citations.append(citation)
                 
                 if self.config.debug_mode:
+                    logger.debug(f"Verification cache hit: {citation.citation}")
             else:
                 uncached_citations.append(citation)
         
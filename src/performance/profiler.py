@@ -16,6 +16,8 @@ from dataclasses import dataclass, field
 import psutil
 import os
 
+from src.metrics import OPERATION_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,6 +80,7 @@ class PerformanceProfiler:
                         output_size=output_size
                     )
                     self.metrics.append(metrics)
+                    OPERATION_SECONDS.observe(execution_time, operation=operation_name)
                     
                     if True:
 
@@ -134,6 +137,7 @@ class PerformanceProfiler:
                         output_size=output_size
                     )
                     self.metrics.append(metrics)
+                    OPERATION_SECONDS.observe(execution_time, operation=operation_name)
                     
                     if True:
 
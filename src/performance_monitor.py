@@ -14,6 +14,8 @@ from dataclasses import dataclass, asdict
 from collections import defaultdict
 import statistics
 
+from src.metrics import OPERATION_SECONDS
+
 @dataclass
 class OperationMetrics:
     """Metrics for a single processing operation"""
@@ -94,6 +96,7 @@ class PerformanceMonitor:
                 setattr(operation, key, value)
         
         self._update_performance_data(operation)
+        OPERATION_SECONDS.observe(operation.processing_time, operation='file_processing')
         
         if operation.error:
             self.performance_data['session_info']['failed_operations'] += 1
@@ -6,7 +6,7 @@ AUTO-RELOAD LIVE TEST: This change should trigger immediate restart!
 """
 
 import os
-from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
+from src.config import MAX_CONTENT_LENGTH, DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
 
 import sys
 import time
@@ -26,6 +26,12 @@ logging.getLogger('requests').setLevel(logging.WARNING)
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 from concurrent.futures import ThreadPoolExecutor
+from src.http_cache import get_http_cache, KIND_OPINION
+from src.result_store import offloads_result
+from src.streaming_extraction import StreamingCitationExtractor, Window, plan_windows
+
+if TYPE_CHECKING:
+    from src.models import CitationResult
 
 try:
     from flask_socketio import SocketIO, emit  # type: ignore
@@ -240,7 +246,9 @@ class ChunkedCitationProcessor:
     
     def __init__(self, progress_manager: SSEProgressManager):
         self.progress_manager = progress_manager
-        self.chunk_size = 5000  # Characters per chunk (increased to prevent citation splitting)
+        # Characters per window; citations across window boundaries are stitched
+        self.chunk_size = 20_000
+        self.extractor = StreamingCitationExtractor(window_chars=self.chunk_size)
     
     async def process_document_with_progress(self, 
                                            document_text: str, 
@@ -286,54 +294,12 @@ class ChunkedCitationProcessor:
             )
             raise
     
-    def _split_into_chunks(self, text: str) -> List[str]:
-        """Split document into processable chunks"""
-        chunks = []
-        for i in range(0, len(text), self.chunk_size):
-            chunk = text[i:i + self.chunk_size]
-            
-            if i + self.chunk_size < len(text):
-                break_points = ['. ', '\n\n', '\n', '. ']
-                for bp in break_points:
-                    last_bp = chunk.rfind(bp)
-                    if last_bp > self.chunk_size * 0.8:  # Don't make chunks too small
-                        chunk = chunk[:last_bp + len(bp)]
-                        break
-            
-            chunks.append(chunk)
-        
-        return chunks
-    
-    async def _preprocess_chunks(self, chunks: List[str]) -> List[str]:
-        """Preprocess chunks for better citation extraction"""
-        processed = []
-        for chunk in chunks:
-            processed_chunk = chunk.replace('  ', ' ').strip()
-            processed.append(processed_chunk)
-        
-        return processed
-    
-    async def _process_chunk(self, chunk: str, document_type: str) -> List[Dict]:
-        """Process a single chunk for citations using the CLEAN extraction pipeline."""
-        chunk_hash = hash(chunk) % 1000
-        logger.info(f"[Chunk-{chunk_hash}] Starting chunk processing (size: {len(chunk)} chars)")
+    async def _process_chunk(self, window: Window, citation_results: List['CitationResult'], document_type: str) -> List[Dict]:
+        """Convert one window's stitched CLEAN pipeline citations to result dicts."""
+        chunk_hash = window.index
+        logger.info(f"[Chunk-{chunk_hash}] Window {window.start}-{window.end} gave {len(citation_results)} citations")
         
         try:
-            logger.info(f"[Chunk-{chunk_hash}] Using CleanExtractionPipeline...")
-            from src.clean_extraction_pipeline import CleanExtractionPipeline
-            
-            logger.info(f"[Chunk-{chunk_hash}] Creating clean pipeline...")
-            pipeline = CleanExtractionPipeline()
-            
-            logger.info(f"[Chunk-{chunk_hash}] Starting extract_citations()...")
-            start_time = time.time()
-            
-            # Extract citations using clean pipeline
-            citation_results = pipeline.extract_citations(chunk)
-            
-            process_time = time.time() - start_time
-            logger.info(f"[Chunk-{chunk_hash}] extract_citations() completed in {process_time:.2f}s, got {len(citation_results)} citations")
-            
             # Convert CitationResult objects to dicts
             results = {'citations': []}
             for cit_obj in citation_results:
@@ -420,9 +386,8 @@ class ChunkedCitationProcessor:
                 
             logger.info(f"Document sample: {document_text[:200]}...")
             
-            logger.info("Splitting document into chunks...")
-            chunks = self._split_into_chunks(document_text)
-            logger.info(f"Document split into {len(chunks)} chunks")
+            windows = plan_windows(len(document_text), self.chunk_size, self.extractor.overlap_chars)
+            logger.info(f"Document split into {len(windows)} windows")
             
             logger.info("Updating progress to 10% (chunking complete)")
             self.progress_manager.update_progress(
@@ -430,15 +395,14 @@ class ChunkedCitationProcessor:
             )
             
             results = []
-            total_chunks = len(chunks)
+            total_chunks = len(windows)
             logger.info(f"Starting to process {total_chunks} chunks...")
             
-            for i, chunk in enumerate(chunks, 1):
+            for i, (window, citation_results) in enumerate(self.extractor.iter_windows(document_text), 1):
                 try:
                     logger.info(f"\nProcessing chunk {i}/{total_chunks}")
                     
-                    logger.info("Calling _process_chunk...")
-                    chunk_results = await self._process_chunk(chunk, document_type)
+                    chunk_results = await self._process_chunk(window, citation_results, document_type)
                     logger.info(f"Processed chunk {i}, found {len(chunk_results)} citations")
                     
                     results.extend(chunk_results)
@@ -644,12 +608,14 @@ def fetch_url_content(url: str) -> str:
         retry_delay = 5  # Start with 5 seconds
         
         for attempt in range(max_attempts):
-            response = requests.get(
+            # Shared conditional-GET cache: repeat fetches of an opinion cost a 304 (or nothing)
+            response = get_http_cache().get(
                 url,
                 headers=headers,
                 timeout=DEFAULT_REQUEST_TIMEOUT,  # 30 second timeout
-                allow_redirects=True,
-                stream=True  # Stream the response for large files
+                kind=KIND_OPINION,
+                max_bytes=MAX_CONTENT_LENGTH,  # same cap as file uploads
+                allow_redirects=True
             )
             
             logger.info(f"Response status: {response.status_code}")
@@ -681,7 +647,7 @@ def fetch_url_content(url: str) -> str:
                         headers.pop('Authorization', None)
                         headers['Accept'] = 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8'
                         # Try one more time with the original URL
-                        response = requests.get(url, headers=headers, timeout=DEFAULT_REQUEST_TIMEOUT, allow_redirects=True, stream=True)
+                        response = get_http_cache().get(url, headers=headers, timeout=DEFAULT_REQUEST_TIMEOUT, kind=KIND_OPINION, max_bytes=MAX_CONTENT_LENGTH, allow_redirects=True)
                         logger.info(f"Fallback response status: {response.status_code}")
                         if response.status_code != 429:
                             response.raise_for_status()
@@ -694,6 +660,10 @@ def fetch_url_content(url: str) -> str:
             response.raise_for_status()
             break
         
+        if getattr(response, 'truncated', False):
+            logger.error(f"URL content exceeded size limit: more than {MAX_CONTENT_LENGTH} bytes")
+            raise Exception(f"The document at this URL is larger than the {MAX_CONTENT_LENGTH // (1024 * 1024)}MB limit.")
+        
         content_type = response.headers.get('content-type', '').lower()
         logger.info(f"Content type: {content_type}")
         
@@ -746,17 +716,13 @@ def fetch_url_content(url: str) -> str:
                     return text
                 elif 'html_with_citations' in data:
                     # Fallback to HTML version
-                    from bs4 import BeautifulSoup
-                    html = data['html_with_citations']
-                    soup = BeautifulSoup(html, 'html.parser')
-                    text = soup.get_text(separator=' ', strip=True)
+                    from src.utils.html_parsing import html_to_text
+                    text = html_to_text(data['html_with_citations'])
                     logger.info(f"✅ Extracted from html_with_citations: {len(text)} characters")
                     return text
                 elif 'html' in data:
-                    from bs4 import BeautifulSoup
-                    html = data['html']
-                    soup = BeautifulSoup(html, 'html.parser')
-                    text = soup.get_text(separator=' ', strip=True)
+                    from src.utils.html_parsing import html_to_text
+                    text = html_to_text(data['html'])
                     logger.info(f"✅ Extracted from html field: {len(text)} characters")
                     return text
                 else:
@@ -771,17 +737,13 @@ def fetch_url_content(url: str) -> str:
         elif 'html' in content_type:
             logger.info(f"Processing HTML content")
             try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Remove script and style elements
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                # Get text
-                text = soup.get_text(separator=' ', strip=True)
-                logger.info(f"✅ Extracted text from HTML: {len(text)} characters")
+                from src.utils.html_parsing import html_to_text, get_parser_backend
+                # Script and style elements are dropped before collecting text
+                text = html_to_text(response.text)
+                logger.info(f"✅ Extracted text from HTML ({get_parser_backend()}): {len(text)} characters")
                 return text
             except Exception as e:
-                logger.warning(f"Failed to parse HTML with BeautifulSoup: {e}")
+                logger.warning(f"Failed to parse HTML: {e}")
                 logger.info(f"Returning raw HTML content, length: {len(response.text)}")
                 return response.text
         
@@ -798,13 +760,9 @@ def fetch_url_content(url: str) -> str:
                 if text.strip().startswith('<!DOCTYPE html') or text.strip().startswith('<html'):
                     logger.info(f"Detected HTML in unknown content type, attempting to parse")
                     try:
-                        from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(text, 'html.parser')
-                        # Remove script and style elements
-                        for script in soup(["script", "style"]):
-                            script.decompose()
-                        # Get text
-                        parsed_text = soup.get_text(separator=' ', strip=True)
+                        from src.utils.html_parsing import html_to_text
+                        # Script and style elements are dropped before collecting text
+                        parsed_text = html_to_text(text)
                         logger.info(f"✅ Extracted text from HTML: {len(parsed_text)} characters")
                         return parsed_text
                     except Exception as e:
@@ -916,6 +874,7 @@ def _extract_with_pdfplumber(pdf_content: bytes) -> str:
     except ImportError:
         raise Exception("pdfplumber not available")
 
+@offloads_result
 def process_citation_task_direct(task_id: str, input_type: str, input_data: dict):
     """
     Process citation task directly (for use with RQ workers).
@@ -1011,9 +970,17 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
                 # instead of just extraction
                 from src.citation_extraction_endpoint import extract_citations_with_clustering
                 
+                # Documents whose full pipeline would not fit the job memory budget are streamed
+                from src.memory_monitor import MEMORY_MODE_STREAMING, choose_memory_mode, estimate_job_memory_mb
+                memory_mode = choose_memory_mode(len(text))
+                if memory_mode == MEMORY_MODE_STREAMING:
+                    logger.info(f"[Task {task_id}] Streaming extraction: {len(text)} chars needs an estimated "
+                                f"{estimate_job_memory_mb(len(text)):.0f}MB in memory")
+                
                 # Verification enabled - uses fallback sources if CourtListener is rate-limited
                 logger.error(f"[Task {task_id}] >>>>>>> ABOUT TO CALL extract_citations_with_clustering with verification=True (with fallback sources)")
-                result = extract_citations_with_clustering(text, enable_verification=True)
+                result = extract_citations_with_clustering(text, enable_verification=True,
+                                                           streaming=memory_mode == MEMORY_MODE_STREAMING)
                 
                 # Check if any citations show CourtListener rate limit messages
                 courtlistener_rate_limited = False
@@ -1373,6 +1340,7 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
                     },
                     'success': True,
                     'processing_mode': 'async_full_processing',
+                    'memory_mode': memory_mode,
                     'verification_enabled': True,
                     'request_id': task_id
                 }
@@ -1562,7 +1530,9 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
                 citation_dicts = []
                 
                 for citation in citations:
-                    if hasattr(citation, '__dict__'):
+                    if hasattr(citation, 'to_dict'):
+                        citation_dict = citation.to_dict()
+                    elif hasattr(citation, '__dict__'):
                         citation_dict = citation.__dict__.copy()
                     elif isinstance(citation, dict):
                         citation_dict = citation.copy()
@@ -0,0 +1,238 @@
+"""
+Out-of-band storage for finished task results.
+
+RQ used to keep every worker's full result (all citations, clusters and
+metadata) as a pickled job result for 24 hours, and each /task_status poll
+unpickled it. Finished payloads are now written once as compressed, versioned
+blobs keyed by task id:
+
+- blobs up to ``REDIS_MAX_BLOB_BYTES`` go to Redis with a TTL
+- larger blobs (or all of them when Redis is unreachable) spill to files in
+  ``SPILL_DIR``, which the web and worker containers share
+- the job only keeps a small pointer (``result_ref``) in its meta and as its
+  return value, so a status poll never touches the payload
+
+A blob is ``b'CSR' + version byte + zlib(JSON)``. The web process streams it
+out by decompressing in chunks and splicing the JSON into the response
+envelope, without parsing it.
+
+Example:
+    pointer = offload_task_result(task_id, result)   # in the worker
+    get_result_store().load(task_id)                 # {'citations': [...], ...}
+"""
+
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from src.metrics import time_stage
+
+logger = logging.getLogger(__name__)
+
+RESULT_FORMAT_VERSION = 1
+BLOB_MAGIC = b'CSR'
+RESULT_TTL = 86400  # seconds a finished result is kept
+REDIS_MAX_BLOB_BYTES = int(os.environ.get('RESULT_REDIS_MAX_BYTES', 512 * 1024))
+SPILL_DIR = os.environ.get('RESULT_SPILL_DIR', os.path.join('data', 'results'))
+SPILL_CLEANUP_INTERVAL = 600
+STREAM_CHUNK_SIZE = 64 * 1024
+RESULT_SECTIONS = {'citations': [], 'clusters': [], 'statistics': {}, 'metadata': {}}
+RESULT_KEY_PREFIX = 'casestrainer:result'
+
+_SAFE_ID = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+def encode_blob(payload: Dict[str, Any]) -> bytes:
+    body = json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+    return BLOB_MAGIC + bytes([RESULT_FORMAT_VERSION]) + zlib.compress(body, 6)
+
+
+def _check_header(blob: bytes):
+    if blob[:3] != BLOB_MAGIC:
+        raise ValueError("Not a stored result blob")
+    if blob[3] != RESULT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported result blob version {blob[3]}")
+
+
+def decode_blob(blob: bytes) -> Dict[str, Any]:
+    _check_header(blob)
+    return json.loads(zlib.decompress(blob[4:]))
+
+
+def iter_blob_json(blob: bytes, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """The blob's JSON text, decompressed ``chunk_size`` compressed bytes at a time."""
+    _check_header(blob)
+    decompressor = zlib.decompressobj()
+    for start in range(4, len(blob), chunk_size):
+        chunk = decompressor.decompress(blob[start:start + chunk_size])
+        if chunk:
+            yield chunk
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+def with_envelope(envelope: Dict[str, Any], payload_json: Iterator[bytes]) -> Iterator[bytes]:
+    """Merge a stored JSON object into ``envelope`` as one JSON object, chunk by chunk."""
+    prefix = json.dumps(envelope, default=str)[:-1].encode('utf-8')
+    first = True
+    for chunk in payload_json:
+        if first:
+            # Stored payloads always hold RESULT_SECTIONS, so the object is never empty
+            chunk = prefix + b',' + chunk.lstrip()[1:]
+            first = False
+        yield chunk
+    if first:
+        yield prefix + b'}'
+
+
+class ResultStore:
+    """Compressed result blobs in Redis, spilling large ones to disk."""
+
+    def __init__(self, redis_client=None, spill_dir: str = SPILL_DIR, ttl: int = RESULT_TTL,
+                 redis_max_bytes: int = REDIS_MAX_BLOB_BYTES):
+        self.redis_client = redis_client
+        self.spill_dir = spill_dir
+        self.ttl = ttl
+        self.redis_max_bytes = redis_max_bytes
+        self._last_cleanup = 0.0
+
+    def _key(self, task_id: str) -> str:
+        return f"{RESULT_KEY_PREFIX}:{task_id}"
+
+    def _path(self, task_id: str) -> str:
+        return os.path.join(self.spill_dir, _SAFE_ID.sub('_', task_id) + '.csr')
+
+    def put(self, task_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Store ``payload`` and return the pointer kept with the job."""
+        with time_stage('serialization'):
+            blob = encode_blob(payload)
+        backend = None
+        if self.redis_client is not None and len(blob) <= self.redis_max_bytes:
+            try:
+                self.redis_client.setex(self._key(task_id), self.ttl, blob)
+                backend = 'redis'
+            except Exception as e:
+                logger.warning(f"[RESULT_STORE] Redis write failed for {task_id}, spilling to disk: {e}")
+        if backend is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = self._path(task_id)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(temp_path, path)
+            backend = 'disk'
+            self._maybe_cleanup()
+        return {
+            'version': RESULT_FORMAT_VERSION,
+            'backend': backend,
+            'bytes': len(blob),
+            'stored_at': time.time(),
+            'expires_at': time.time() + self.ttl,
+        }
+
+    def get_blob(self, task_id: str) -> Optional[bytes]:
+        if self.redis_client is not None:
+            try:
+                blob = self.redis_client.get(self._key(task_id))
+                if blob:
+                    return blob
+            except Exception as e:
+                logger.warning(f"[RESULT_STORE] Redis read failed for {task_id}: {e}")
+        path = self._path(task_id)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def load(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """The stored payload, or None when unknown or expired."""
+        blob = self.get_blob(task_id)
+        return decode_blob(blob) if blob is not None else None
+
+    def iter_json(self, task_id: str) -> Optional[Iterator[bytes]]:
+        """The stored payload as JSON bytes in chunks, or None when unknown or expired."""
+        blob = self.get_blob(task_id)
+        return iter_blob_json(blob) if blob is not None else None
+
+    def _maybe_cleanup(self):
+        now = time.time()
+        if now - self._last_cleanup < SPILL_CLEANUP_INTERVAL:
+            return
+        self._last_cleanup = now
+        try:
+            for name in os.listdir(self.spill_dir):
+                path = os.path.join(self.spill_dir, name)
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+        except OSError as e:
+            logger.debug(f"[RESULT_STORE] Spill cleanup skipped: {e}")
+
+
+_result_store = None
+_result_store_lock = threading.Lock()
+
+
+def get_result_store() -> ResultStore:
+    """Get the process-wide result store (Redis-backed when reachable)."""
+    global _result_store
+    if _result_store is None:
+        with _result_store_lock:
+            if _result_store is None:
+                redis_client = None
+                redis_url = os.environ.get('REDIS_URL')
+                if redis_url:
+                    try:
+                        import redis
+                        redis_client = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=5)
+                        redis_client.ping()
+                    except Exception as e:
+                        logger.info(f"[RESULT_STORE] Using disk only: {e}")
+                        redis_client = None
+                _result_store = ResultStore(redis_client=redis_client)
+    return _result_store
+
+
+def offload_task_result(task_id: str, result: Any, store: Optional[ResultStore] = None) -> Any:
+    """
+    Store a finished task's payload out of band and return the small pointer
+    result RQ keeps instead. Failed results (and pointers) pass through.
+    """
+    if not isinstance(result, dict) or 'result_ref' in result:
+        return result
+    if result.get('status') not in ('success', 'completed') and result.get('success') is not True:
+        return result
+    # Some workers nest the payload: {'success': True, 'result': {'citations': [...], ...}}
+    payload = result['result'] if isinstance(result.get('result'), dict) else result
+    body = {section: payload.get(section) or empty for section, empty in RESULT_SECTIONS.items()}
+    ref = (store or get_result_store()).put(task_id, body)
+    ref.update(citation_count=len(body['citations']), cluster_count=len(body['clusters']))
+
+    try:
+        from rq import get_current_job
+        job = get_current_job()
+        if job is not None:
+            job.meta['result_ref'] = ref
+            job.save_meta()
+    except Exception as e:
+        logger.warning(f"[RESULT_STORE] Could not attach result pointer to job {task_id}: {e}")
+
+    logger.info(f"[RESULT_STORE] Stored result for {task_id}: {ref['bytes']} bytes in {ref['backend']}")
+    return {'status': 'completed', 'success': True, 'task_id': task_id, 'result_ref': ref}
+
+
+def offloads_result(func: Callable) -> Callable:
+    """Decorate an RQ task taking ``task_id`` first so its finished payload is stored out of band."""
+    @functools.wraps(func)
+    def wrapper(task_id, *args, **kwargs):
+        return offload_task_result(task_id, func(task_id, *args, **kwargs))
+    return wrapper
@@ -0,0 +1,297 @@
+"""
+Incremental result streaming and cursor pagination for analysis requests.
+
+Large appellate records produce multi-MB results that the /analyze and
+/task_status endpoints only return once the whole pipeline has finished. This
+module lets the pipeline publish results as they become available:
+
+- ``citations``: citations as soon as extraction (names/dates) is done
+- ``verification``: per-citation verification updates
+- ``clusters``: clusters once clustering completes
+- ``complete`` / ``error``: terminal events
+
+Events are appended to a per-request log (a Redis list when Redis is reachable,
+otherwise in-process) so a client can tail them as NDJSON or Server-Sent Events
+and resume from an event index. A request's first write picks its store and
+every later event and read stays there, so event indexes never mix stores. Finished results are stored so they can be
+paged with opaque cursors instead of being returned in one blob.
+"""
+
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_TTL = 3600  # seconds an event log / stored result is kept
+DEFAULT_BATCH_SIZE = 50  # citations per streamed event
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+TERMINAL_EVENTS = ('complete', 'error')
+RESULT_SECTIONS = ('citations', 'clusters')
+
+
+def _citation_to_dict(citation) -> Dict[str, Any]:
+    if isinstance(citation, dict):
+        return citation
+    if hasattr(citation, 'to_dict'):
+        return citation.to_dict()
+    return {'citation': str(citation)}
+
+
+def encode_cursor(section: str, offset: int) -> str:
+    """Opaque cursor for the next page of a stored result section."""
+    raw = json.dumps({'s': section, 'o': offset}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[Optional[str], int]:
+    """Decode a cursor into (section, offset); raises ValueError if malformed."""
+    if not cursor:
+        return None, 0
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        offset = int(data['o'])
+        section = data['s']
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if section not in RESULT_SECTIONS or offset < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return section, offset
+
+
+def paginate_result(result: Dict[str, Any], section: str = 'citations', cursor: Optional[str] = None,
+                    limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Return one page of a stored result.
+
+    Args:
+        result: Completed result with 'citations' and 'clusters' lists
+        section: 'citations' or 'clusters' (ignored when a cursor is given)
+        cursor: Cursor from a previous page's ``next_cursor``
+        limit: Items per page (capped at MAX_PAGE_SIZE)
+
+    Returns:
+        Dict with the section name, its items, total count and ``next_cursor``
+        (None on the last page)
+    """
+    cursor_section, offset = decode_cursor(cursor)
+    section = cursor_section or section
+    if section not in RESULT_SECTIONS:
+        raise ValueError(f"Unknown result section: {section}")
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    items = result.get(section) or []
+    page = [_citation_to_dict(item) for item in items[offset:offset + limit]]
+    next_offset = offset + len(page)
+    return {
+        'section': section,
+        section: page,
+        'total': len(items),
+        'offset': offset,
+        'next_cursor': encode_cursor(section, next_offset) if next_offset < len(items) else None,
+    }
+
+
+def format_event(event: Dict[str, Any], index: int, fmt: str = 'ndjson') -> str:
+    """Serialize one event as an NDJSON line or an SSE frame (with its index as the event id)."""
+    payload = json.dumps(event, default=str)
+    if fmt == 'sse':
+        return f"id: {index}\nevent: {event.get('type', 'message')}\ndata: {payload}\n\n"
+    return payload + '\n'
+
+
+class ResultStream:
+    """Per-request event logs and stored results, in Redis or in-process."""
+
+    def __init__(self, redis_client=None, ttl: int = EVENT_TTL, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self._events: Dict[str, List[Dict[str, Any]]] = {}
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._expires: Dict[str, float] = {}
+        self._stores: Dict[str, str] = {}  # request_id -> 'redis' or 'local', set by its first write
+        self._condition = threading.Condition()
+
+    def _events_key(self, request_id: str) -> str:
+        return f"casestrainer:stream:{request_id}:events"
+
+    def _result_key(self, request_id: str) -> str:
+        return f"casestrainer:stream:{request_id}:result"
+
+    def _prune(self):
+        now = time.time()
+        for request_id in [rid for rid, expires in self._expires.items() if expires < now]:
+            self._expires.pop(request_id, None)
+            self._events.pop(request_id, None)
+            self._results.pop(request_id, None)
+            self._stores.pop(request_id, None)
+
+    def _in_redis(self, request_id: str) -> bool:
+        """Whether the request's log lives in Redis; requests not written by this process are read from Redis."""
+        with self._condition:
+            return self.redis_client is not None and self._stores.get(request_id) != 'local'
+
+    def _write_redis(self, request_id: str, write, what: str) -> bool:
+        """
+        Run ``write`` against Redis for a Redis request.
+
+        Returns False when the request should be written in-process instead:
+        only when Redis fails on its very first write, before any event went there.
+        """
+        try:
+            write()
+        except Exception as e:
+            with self._condition:
+                if self._stores.get(request_id) == 'redis':
+                    logger.error(f"Result stream Redis {what} failed for {request_id}, dropping it: {e}")
+                    return True
+                logger.warning(f"Result stream Redis {what} failed, keeping {request_id} in-process: {e}")
+                self._stores[request_id] = 'local'
+                return False
+        with self._condition:
+            self._prune()
+            self._stores[request_id] = 'redis'
+            self._expires[request_id] = time.time() + self.ttl
+        return True
+
+    def publish(self, request_id: str, event_type: str, **payload):
+        """Append one event to the request's log."""
+        event = {'type': event_type, 'request_id': request_id, 'timestamp': time.time(), **payload}
+        if self._in_redis(request_id):
+            def push():
+                key = self._events_key(request_id)
+                pipe = self.redis_client.pipeline()
+                pipe.rpush(key, json.dumps(event, default=str))
+                pipe.expire(key, self.ttl)
+                pipe.execute()
+            if self._write_redis(request_id, push, 'publish'):
+                return
+        with self._condition:
+            self._prune()
+            self._stores[request_id] = 'local'
+            self._events.setdefault(request_id, []).append(event)
+            self._expires[request_id] = time.time() + self.ttl
+            self._condition.notify_all()
+
+    def publish_citations(self, request_id: str, citations: List[Any], event_type: str = 'citations'):
+        """Publish citations in batches so the first ones reach the client quickly."""
+        total = len(citations)
+        for start in range(0, total, self.batch_size):
+            batch = [_citation_to_dict(c) for c in citations[start:start + self.batch_size]]
+            self.publish(request_id, event_type, citations=batch, offset=start, total=total)
+
+    def publisher(self, request_id: str):
+        """An ``event_callback(event_type, payload)`` that appends pipeline events to the request's log."""
+        def publish_event(event_type: str, payload: Dict[str, Any]):
+            if event_type in ('citations', 'verification'):
+                self.publish_citations(request_id, payload.get('citations', []), event_type=event_type)
+            else:
+                self.publish(request_id, event_type, **payload)
+        return publish_event
+
+    def read(self, request_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        """Events from index ``start`` onwards."""
+        if self._in_redis(request_id):
+            try:
+                raw = self.redis_client.lrange(self._events_key(request_id), start, -1)
+                return [json.loads(item) for item in raw]
+            except Exception as e:
+                logger.warning(f"Result stream Redis read failed: {e}")
+                return []
+        with self._condition:
+            return list(self._events.get(request_id, [])[start:])
+
+    def wait(self, timeout: float, request_id: Optional[str] = None):
+        """Block until an in-process event arrives (or ``timeout`` elapses)."""
+        if self._in_redis(request_id):
+            time.sleep(timeout)
+            return
+        with self._condition:
+            self._condition.wait(timeout)
+
+    def store_result(self, request_id: str, result: Dict[str, Any]):
+        """Keep a completed result for cursor pagination."""
+        stored = {
+            'citations': [_citation_to_dict(c) for c in result.get('citations') or []],
+            'clusters': result.get('clusters') or [],
+            'metadata': result.get('metadata') or {},
+        }
+        if self._in_redis(request_id):
+            def store():
+                self.redis_client.setex(self._result_key(request_id), self.ttl, json.dumps(stored, default=str))
+            if self._write_redis(request_id, store, 'store'):
+                return
+        with self._condition:
+            self._prune()
+            self._stores[request_id] = 'local'
+            self._results[request_id] = stored
+            self._expires[request_id] = time.time() + self.ttl
+
+    def get_result(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """A stored completed result, or None."""
+        if self._in_redis(request_id):
+            try:
+                raw = self.redis_client.get(self._result_key(request_id))
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning(f"Result stream Redis lookup failed: {e}")
+                return None
+        with self._condition:
+            return self._results.get(request_id)
+
+    def iter_events(self, request_id: str, start: int = 0, fmt: str = 'ndjson', timeout: float = 600.0,
+                    poll_interval: float = 0.5, heartbeat: float = 15.0) -> Iterator[str]:
+        """
+        Tail a request's events until a terminal event or ``timeout``.
+
+        Yields formatted NDJSON lines or SSE frames; SSE clients resume via
+        Last-Event-ID, NDJSON clients via the ``since`` index.
+        """
+        index = start
+        deadline = time.time() + timeout
+        last_sent = time.time()
+        while time.time() < deadline:
+            events = self.read(request_id, index)
+            for event in events:
+                yield format_event(event, index, fmt)
+                index += 1
+                last_sent = time.time()
+                if event.get('type') in TERMINAL_EVENTS:
+                    return
+            if not events:
+                if time.time() - last_sent >= heartbeat:
+                    yield ': keep-alive\n\n' if fmt == 'sse' else '\n'
+                    last_sent = time.time()
+                self.wait(poll_interval, request_id)
+        yield format_event({'type': 'error', 'request_id': request_id, 'error': 'Stream timed out'}, index, fmt)
+
+
+_result_stream = None
+_result_stream_lock = threading.Lock()
+
+
+def get_result_stream() -> ResultStream:
+    """Get the process-wide result stream (Redis-backed when reachable)."""
+    global _result_stream
+    if _result_stream is None:
+        with _result_stream_lock:
+            if _result_stream is None:
+                redis_client = None
+                redis_url = os.environ.get('REDIS_URL')
+                if redis_url:
+                    try:
+                        import redis
+                        redis_client = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=5)
+                        redis_client.ping()
+                    except Exception as e:
+                        logger.info(f"Result stream running in-process only: {e}")
+                        redis_client = None
+                _result_stream = ResultStream(redis_client=redis_client)
+    return _result_stream
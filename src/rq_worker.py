@@ -3,6 +3,7 @@ Robust RQ Worker for CaseStrainer with memory management and auto-restart
 This script starts an RQ worker with better error handling and resource management
 """
 
+import gc
 import os
 import sys
 
@@ -12,7 +13,9 @@ sys.path.insert(0, os.path.dirname(__file__))  # Add /app/src to path
 
 from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
 
+import asyncio
 import logging
+import platform
 import signal
 import time
 import threading
@@ -21,6 +24,7 @@ from datetime import datetime
 
 try:
     import psutil
+    from src.memory_monitor import WORKER_MEMORY_HIGH_WATER, memory_pressure, rss_mb
     PSUTIL_AVAILABLE = True
 except ImportError:
     PSUTIL_AVAILABLE = False
@@ -28,6 +32,7 @@ except ImportError:
 
 from rq import Worker, Queue
 from redis import Redis
+from src.job_queues import WeightedPriorityWorker, worker_queue_names
 from src.redis_distributed_processor import extract_pdf_pages, extract_pdf_optimized
 from src.optimized_pdf_processor import extract_pdf_optimized_v2
 
@@ -42,6 +47,8 @@ redis_conn = Redis.from_url(redis_url)
 
 queue = Queue('casestrainer', connection=redis_conn)
 
+BACKPRESSURE_POLL_SECONDS = 5  # how often a worker paused for memory rechecks
+
 def register_worker_functions():
     """Register all worker functions with RQ."""
     worker_functions = [
@@ -66,8 +73,24 @@ __all__ = [
     'verify_citations_enhanced'
 ]
 
-def process_citation_task_direct(task_id: str, input_type: str, input_data: dict):
-    """Direct wrapper function with extensive diagnostic logging."""
+def process_citation_task_direct(task_id: str, input_type: str, input_data: dict, event_callback=None):
+    """
+    Direct wrapper function with extensive diagnostic logging.
+    
+    Stage results are passed to ``event_callback(event_type, payload)`` as they
+    complete (citations window by window, then clusters, then complete/error);
+    by default they go to the task's /analyze/stream event log.
+    """
+    
+    def emit(event_type, payload):
+        nonlocal event_callback
+        try:
+            if event_callback is None:
+                from src.result_stream import get_result_stream
+                event_callback = get_result_stream().publisher(task_id)
+            event_callback(event_type, payload)
+        except Exception as e:
+            logger.warning(f"[TASK:{task_id}] Failed to publish '{event_type}' event: {e}")
     
     # DIAGNOSTIC LOGGING - Track every step of worker startup
     logger.info(f"[DIAGNOSTIC:{task_id}] ========== WORKER STARTUP BEGINS ==========")
@@ -123,6 +146,7 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
             else:
                 # Timeout waiting for Redis
                 logger.error(f"[DIAGNOSTIC:{task_id}] Redis not ready after {max_wait} seconds")
+                emit('error', {'error': f'Redis not ready after {max_wait} seconds'})
                 return {
                     'status': 'failed',
                     'task_id': task_id,
@@ -148,6 +172,7 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
     except Exception as e:
         logger.error(f"[DIAGNOSTIC:{task_id}] STARTUP FAILED at import/initialization: {str(e)}")
         logger.error(f"[DIAGNOSTIC:{task_id}] Traceback: {traceback.format_exc()}")
+        emit('error', {'error': f'Worker startup failed: {str(e)}'})
         return {
             'status': 'failed',
             'task_id': task_id,
@@ -197,38 +222,11 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
                 # Extract text from URL first
                 try:
                     logger.info(f"[TASK:{task_id}] Extracting text from URL...")
-                    import requests
-                    from src.optimized_pdf_processor import OptimizedPDFProcessor
-                    import tempfile
-                    import os
-                    
-                    # Download the content
-                    response = requests.get(url, timeout=30)
-                    response.raise_for_status()
-                    
-                    # If it's a PDF, extract text
-                    if 'pdf' in response.headers.get('content-type', '').lower() or url.lower().endswith('.pdf'):
-                        logger.info(f"[TASK:{task_id}] Detected PDF, extracting text...")
-                        
-                        # Save to temporary file
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-                            temp_file.write(response.content)
-                            temp_path = temp_file.name
-                        
-                        try:
-                            # Extract text using PDF processor
-                            pdf_processor = OptimizedPDFProcessor()
-                            result = pdf_processor.process_pdf(temp_path)
-                            text = result.text if result else ""
-                            logger.info(f"[TASK:{task_id}] Extracted {len(text)} characters from PDF")
-                        finally:
-                            # Clean up temp file
-                            if os.path.exists(temp_path):
-                                os.remove(temp_path)
-                    else:
-                        # Plain text content
-                        text = response.text
-                        logger.info(f"[TASK:{task_id}] Extracted {len(text)} characters from URL")
+                    # Same fetch as synchronous URL input: CourtListener API, PDF and
+                    # HTML extraction, the shared HTTP cache and the size cap
+                    from src.progress_manager import fetch_url_content
+                    text = fetch_url_content(url)
+                    logger.info(f"[TASK:{task_id}] Extracted {len(text)} characters from URL")
                     
                     if not text or len(text.strip()) < 10:
                         logger.warning(f"[TASK:{task_id}] No meaningful text extracted from URL")
@@ -261,60 +259,26 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
                 
                 try:
                     logger.info(f"[DIAGNOSTIC:{task_id}] Step 10: Importing clean pipeline...")
-                    from src.citation_extraction_endpoint import extract_citations_production
-                    from src.models import CitationResult
+                    from src.citation_deduplication import deduplicate_citations
+                    from src.streaming_extraction import StreamingCitationExtractor
                     import time
                     logger.info(f"[DIAGNOSTIC:{task_id}] Step 10: Clean pipeline import SUCCESS")
                     
                     logger.info(f"[DIAGNOSTIC:{task_id}] Step 11: Starting clean extraction pipeline")
                     
-                    # Use the clean extraction pipeline
-                    clean_result = extract_citations_production(text)
-                    
-                    # Convert clean pipeline results to CitationResult objects
-                    citations_found = []
-                    if clean_result['status'] == 'success':
-                        for cit_dict in clean_result['citations']:
-                            citations_found.append(CitationResult(
-                                citation=cit_dict['citation'],
-                                extracted_case_name=cit_dict.get('extracted_case_name'),
-                                extracted_date=cit_dict.get('extracted_date'),
-                                method=cit_dict.get('method', 'clean_pipeline_v1'),
-                                confidence=cit_dict.get('confidence', 0.9)
-                            ))
-                    
-                    result_data = {
-                        'citations': citations_found,
-                        'clusters': []
-                    }
-                    
-                    logger.info(f"[TASK:{task_id}] Full pipeline found {len(citations_found)} citations")
-                    
-                    # Convert CitationResult objects to dictionaries if needed
+                    # Extract window by window (a single window for ordinary documents) and
+                    # publish each window's new citations as soon as it is done
                     citations_list = []
-                    for citation in citations_found:
-                        if hasattr(citation, 'to_dict'):
-                            citations_list.append(citation.to_dict())
-                        elif isinstance(citation, dict):
-                            citations_list.append(citation)
-                        else:
-                            # Fallback conversion with case_name mapping
-                            cluster_case_name = getattr(citation, 'cluster_case_name', None)
-                            extracted_case_name = getattr(citation, 'extracted_case_name', None)
-                            canonical_name = getattr(citation, 'canonical_name', None)
-                            
-                            # REMOVED: case_name field eliminated to prevent contamination and maintain data clarity
-                            # Frontend will use extracted_case_name and canonical_name directly
-                            
-                            citations_list.append({
-                                'citation': getattr(citation, 'citation', str(citation)),
-                                'extracted_case_name': extracted_case_name,
-                                'canonical_name': canonical_name,
-                                'cluster_case_name': cluster_case_name,
-                                'verified': getattr(citation, 'verified', False),
-                                'confidence': getattr(citation, 'confidence', 1.0),
-                                'method': getattr(citation, 'method', 'full_async')
-                            })
+                    published = set()
+                    for window, window_citations in StreamingCitationExtractor().iter_windows(text):
+                        batch = [citation.to_dict() for citation in window_citations]
+                        citations_list.extend(batch)
+                        fresh = [c for c in deduplicate_citations(batch) if c.get('citation') not in published]
+                        published.update(c.get('citation') for c in fresh)
+                        if fresh:
+                            emit('citations', {'citations': fresh})
+                    
+                    logger.info(f"[TASK:{task_id}] Full pipeline found {len(citations_list)} citations")
                     
                     # Apply deduplication to rq_worker async processing (MISSING FEATURE ADDED)
                     logger.info(f"[TASK:{task_id}] Starting deduplication of {len(citations_list)} citations")
@@ -336,7 +300,7 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
                     result = {
                         'success': True,
                         'citations': citations_list,
-                        'clusters': result_data.get('clusters', []),
+                        'clusters': [],
                         'processing_strategy': 'full_async_unified',
                         'processing_time': time.time() - start_time
                     }
@@ -396,6 +360,7 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
             
             # Ensure result has the expected format for async
             if result.get('success', False):
+                emit('clusters', {'clusters': result.get('clusters', [])})
                 result = {
                     'status': 'completed',
                     'task_id': task_id,
@@ -417,6 +382,8 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
             # For non-text inputs, fall back to the original method
             logger.info(f"[TASK:{task_id}] Using CitationService for non-text input type: {input_type}")
             result = asyncio.run(service.process_citation_task(task_id, input_type, input_data))
+            if isinstance(result, dict) and result.get('status') == 'completed':
+                emit('clusters', {'clusters': result.get('clusters', [])})
         
         # Ensure the result is JSON serializable
         processing_time = time.time() - start_time
@@ -440,28 +407,25 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
                 num_clusters = len(result.get('clusters', []))
                 logger.info(f"[TASK:{task_id}] Task completed with status '{status}'. Citations: {num_citations}, Clusters: {num_clusters}")
             
-            # Ensure the result is properly stored in Redis
+            # Keep the payload out of band; RQ only keeps the small pointer
+            stored = result
             try:
-                from redis import Redis
-                import json
-                redis_url = os.environ.get('REDIS_URL', 'redis://:caseStrainerRedis123@casestrainer-redis-prod:6379/0')
-                redis_conn = Redis.from_url(redis_url)
-                
-                # Store the result with a 24-hour TTL
-                result_key = f'rq:job:{task_id}:result'
-                redis_conn.setex(result_key, 86400, json.dumps(result))
-                logger.info(f"[TASK:{task_id}] Result stored in Redis with key: {result_key}")
-                
-                # Also store in the job hash for RQ compatibility
-                job_key = f'rq:job:{task_id}'
-                redis_conn.hset(job_key, 'result', json.dumps(result))
-                redis_conn.expire(job_key, 86400)
-                logger.info(f"[TASK:{task_id}] Result stored in job hash")
-                
+                from src.result_store import offload_task_result
+                stored = offload_task_result(task_id, result)
             except Exception as e:
-                logger.error(f"[TASK:{task_id}] Error storing result in Redis: {str(e)}", exc_info=True)
+                logger.error(f"[TASK:{task_id}] Error storing result: {str(e)}", exc_info=True)
             
-            return result
+            if isinstance(result, dict) and result.get('status') == 'completed':
+                emit('complete', {
+                    'citation_count': len(result.get('citations', [])),
+                    'cluster_count': len(result.get('clusters', [])),
+                    'results_url': f"/casestrainer/api/analyze/results/{task_id}"
+                })
+            else:
+                error = result.get('error') if isinstance(result, dict) else None
+                emit('error', {'error': error or 'Processing failed'})
+            
+            return stored
             
         except (TypeError, OverflowError) as e:
             error_msg = f"Result for task {task_id} is not JSON serializable: {e}"
@@ -492,6 +456,7 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
     except TimeoutError as e:
         error_msg = f"Task {task_id} timed out after 10 minutes"
         logger.error(f"[TASK:{task_id}] {error_msg}", exc_info=True)
+        emit('error', {'error': error_msg})
         return {
             'status': 'failed',
             'error': error_msg,
@@ -503,6 +468,7 @@ def process_citation_task_direct(task_id: str, input_type: str, input_data: dict
     except Exception as e:
         error_msg = f"Task {task_id} failed: {str(e)}"
         logger.error(f"[TASK:{task_id}] {error_msg}", exc_info=True)
+        emit('error', {'error': error_msg})
         return {
             'status': 'failed',
             'error': error_msg,
@@ -541,11 +507,12 @@ def verify_citations_enhanced(citations: list, text: str, request_id: str, input
             'metadata': metadata
         }
 
-class RobustWorker(Worker):
+class RobustWorker(WeightedPriorityWorker):
     """
     Enhanced RQ worker with memory management, graceful shutdown, and better monitoring.
     
     Features:
+    - Weighted draining of the interactive, bulk and maintenance queues
     - Memory usage monitoring and soft limits
     - Automatic restart after job count threshold
     - Graceful shutdown on signals
@@ -562,10 +529,9 @@ class RobustWorker(Worker):
         self.job_count = 0
         self.max_jobs = int(os.environ.get('MAX_JOBS_BEFORE_RESTART', 100))
         
-        # Initialize worker with custom queue name if specified
-        queue_name = os.environ.get('RQ_QUEUE_NAME', 'casestrainer')
+        # Listen on every priority queue unless RQ_WORKER_QUEUES narrows it down
         if 'queues' not in kwargs:
-            kwargs['queues'] = [queue_name]
+            kwargs['queues'] = worker_queue_names()
             
         # Configure worker name for better identification
         if 'name' not in kwargs:
@@ -588,16 +554,43 @@ class RobustWorker(Worker):
         logger.info(f"Initialized RobustWorker with max_memory={self.max_memory_mb}MB, "
                   f"max_jobs={self.max_jobs}, queues={kwargs['queues']}")
         
+    def dequeue_job_and_maintain_ttl(self, timeout, max_idle_time=None):
+        """Take a new job only when there is memory for it."""
+        if PSUTIL_AVAILABLE and not self._wait_for_memory_headroom():
+            return None
+        return super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+    
+    def _wait_for_memory_headroom(self) -> bool:
+        """
+        Hold off dequeuing while the container is above WORKER_MEMORY_HIGH_WATER
+        of its limit, so queued jobs go to workers with room instead of pushing
+        this one into the OOM killer. Returns False when the worker should stop.
+        """
+        worker_rss = rss_mb()
+        if worker_rss > self.max_memory_mb:
+            logger.warning(f"Worker memory {worker_rss:.1f}MB is over {self.max_memory_mb}MB, restarting worker")
+            self._stop_requested = True
+            return False
+        
+        paused_at = None
+        while not self._stop_requested:
+            pressure = memory_pressure()
+            if pressure < WORKER_MEMORY_HIGH_WATER:
+                break
+            if paused_at is None:
+                paused_at = time.time()
+                gc.collect()
+                logger.warning(f"Container memory at {pressure:.0%}, not taking new jobs until it drops "
+                               f"below {WORKER_MEMORY_HIGH_WATER:.0%}")
+            self.heartbeat()
+            time.sleep(BACKPRESSURE_POLL_SECONDS)
+        if paused_at is not None:
+            logger.info(f"Resuming after {time.time() - paused_at:.0f}s of memory backpressure")
+        return not self._stop_requested
+    
     def perform_job(self, job, queue):
-        """Override to add memory management and job counting."""
+        """Override to add job counting."""
         try:
-            if PSUTIL_AVAILABLE:
-                memory_usage = psutil.Process().memory_info().rss / 1024 / 1024  # MB
-                if memory_usage > self.max_memory_mb:
-                    logger.warning(f"Memory usage high ({memory_usage:.1f}MB), restarting worker")
-                    sys.exit(0)  # Graceful shutdown
-                    return
-            
             self.job_count += 1
             if self.job_count >= self.max_jobs:
                 logger.info(f"Processed {self.job_count} jobs, restarting worker")
@@ -739,11 +732,11 @@ def main():
     
     print("🔍 DEBUG STEP 4: Signal handlers configured", flush=True)
     
-    # Configure queue and worker name
-    queue_name = os.environ.get('RQ_QUEUE_NAME', 'casestrainer')
+    # Configure queues and worker name
+    queue_names = worker_queue_names()
     worker_name = f'worker-{os.getpid()}@{os.uname().nodename}'
     
-    print(f"🔍 DEBUG STEP 5: Queue={queue_name}, Worker={worker_name}", flush=True)
+    print(f"🔍 DEBUG STEP 5: Queues={queue_names}, Worker={worker_name}", flush=True)
     
     # CRITICAL: Clean up any stale registration with the same name
     # This prevents "worker already exists" errors after container restarts
@@ -763,7 +756,7 @@ def main():
     # Configure worker settings
     worker_kwargs = {
         'connection': redis_conn,
-        'queues': [queue_name],
+        'queues': queue_names,
         'name': worker_name
     }
     
@@ -0,0 +1,341 @@
+"""
+On-demand sampling profiler for live web and worker processes.
+
+A slow production job used to mean adding diagnostic logging and redeploying.
+Instead, profiling can now be switched on without a restart:
+
+- per job: set ``job.meta['profile']`` (``POST /admin/profiler`` with a
+  ``job_id`` does this for a queued job); the worker profiles that job only
+- per time window: ``POST /admin/profiler`` with ``seconds`` publishes a window
+  in Redis; workers profile every job they start inside it and web processes
+  sample all their threads until it ends
+
+One daemon thread per process samples the attached threads with
+``sys._current_frames()`` every ``SAMPLE_INTERVAL`` seconds. When its own CPU
+time exceeds ``MAX_OVERHEAD`` of wall time it halves its rate, so profiling
+stays cheap on busy workers. Stacks are aggregated in the folded format
+flamegraph tools read (``frame;frame;frame count``), with the request id and
+pipeline stage as root frames, and summed per profile id in Redis so several
+processes can contribute to one window.
+
+Example:
+    with profile(job.id, request=job.id):
+        run_job()
+    get_profile_store().folded(job.id)   # 'request:abc;stage:extraction;...;src.x:f 12\n...'
+"""
+
+import collections
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_INTERVAL = float(os.environ.get('PROFILER_SAMPLE_INTERVAL', 0.01))
+MAX_SAMPLE_INTERVAL = 0.2
+MAX_OVERHEAD = float(os.environ.get('PROFILER_MAX_OVERHEAD', 0.02))  # sampler CPU share of wall time
+MAX_DEPTH = 128
+MAX_WINDOW_SECONDS = 900
+PROFILE_TTL = 7 * 86400
+WINDOW_POLL_INTERVAL = 5.0
+SCOPES = ('web', 'workers', 'all')
+
+PROFILE_KEY_PREFIX = 'casestrainer:profile'
+WINDOW_KEY = 'casestrainer:profiler:window'
+
+# Per-thread tags (e.g. the pipeline stage) added as root frames of that thread's samples
+_thread_tags: Dict[int, Dict[str, str]] = {}
+
+
+def set_thread_tag(key: str, value: Optional[str]):
+    """Tag the calling thread's samples; ``None`` removes the tag."""
+    tags = _thread_tags.setdefault(threading.get_ident(), {})
+    if value is None:
+        tags.pop(key, None)
+    else:
+        tags[key] = str(value)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def fold_stack(frame, max_depth: int = MAX_DEPTH) -> str:
+    """Root-to-leaf ``;``-joined frame labels of ``frame``'s stack."""
+    labels = []
+    while frame is not None and len(labels) < max_depth:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class ProfileSession:
+    """Samples collected for one profile id in this process."""
+
+    def __init__(self, profile_id: str, thread_id: Optional[int] = None, tags: Optional[Dict[str, str]] = None):
+        self.profile_id = profile_id
+        self.thread_id = thread_id  # None samples every thread but the sampler
+        self.tags = {k: str(v) for k, v in (tags or {}).items() if v is not None}
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.sampler_cpu_seconds = 0.0
+
+    @property
+    def overhead(self) -> float:
+        """Sampler CPU time as a share of the session's wall time."""
+        return self.sampler_cpu_seconds / self.seconds if self.seconds else 0.0
+
+
+class SamplingProfiler:
+    """One sampler thread per process, shared by all active sessions."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, max_overhead: float = MAX_OVERHEAD,
+                 max_depth: int = MAX_DEPTH):
+        self.base_interval = interval
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.max_depth = max_depth
+        self._sessions: List[ProfileSession] = []
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self._sessions)
+
+    def start(self, profile_id: str, thread_id: Optional[int] = None, **tags) -> ProfileSession:
+        session = ProfileSession(profile_id, thread_id, tags)
+        with self._lock:
+            self._sessions.append(session)
+            if self._thread is None:
+                self.interval = self.base_interval
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+        return session
+
+    def stop(self, session: ProfileSession) -> ProfileSession:
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        session.seconds = time.perf_counter() - session.started
+        return session
+
+    def sample(self, sessions: List[ProfileSession]):
+        """Add one sample of every thread the sessions watch."""
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            targets = [s for s in sessions if s.thread_id in (None, thread_id)]
+            if not targets:
+                continue
+            stack = fold_stack(frame, self.max_depth)
+            thread_tags = _thread_tags.get(thread_id, {})
+            for session in targets:
+                tags = {**session.tags, **thread_tags}
+                prefix = ';'.join(f'{k}:{v}' for k, v in tags.items())
+                session.stacks[f'{prefix};{stack}' if prefix else stack] += 1
+                session.samples += 1
+
+    def _run(self):
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._thread = None
+                    return
+            wall_started, cpu_started = time.perf_counter(), time.thread_time()
+            self.sample(sessions)
+            cpu = time.thread_time() - cpu_started
+            for session in sessions:
+                session.sampler_cpu_seconds += cpu
+            if cpu > self.max_overhead * (self.interval + time.perf_counter() - wall_started):
+                self.interval = min(self.interval * 2, MAX_SAMPLE_INTERVAL)
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """Folded stacks and metadata per profile id, summed across processes in Redis."""
+
+    def __init__(self, redis_client=None, ttl: int = PROFILE_TTL):
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self._memory: Dict[str, Dict] = {}
+        self._window: Optional[Dict] = None
+
+    def _key(self, profile_id: str) -> str:
+        return f"{PROFILE_KEY_PREFIX}:{profile_id}"
+
+    def save(self, session: ProfileSession):
+        meta = {'samples': session.samples, 'seconds': session.seconds,
+                'sampler_cpu_seconds': session.sampler_cpu_seconds}
+        if self.redis_client is not None:
+            try:
+                key = self._key(session.profile_id)
+                pipe = self.redis_client.pipeline(transaction=False)
+                for stack, count in session.stacks.items():
+                    pipe.hincrby(f'{key}:stacks', stack, count)
+                for field, value in meta.items():
+                    pipe.hincrbyfloat(f'{key}:meta', field, value)
+                pipe.hincrby(f'{key}:meta', 'processes', 1)
+                pipe.expire(f'{key}:stacks', self.ttl)
+                pipe.expire(f'{key}:meta', self.ttl)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"[PROFILER] Could not store profile {session.profile_id}, keeping it in process: {e}")
+        entry = self._memory.setdefault(session.profile_id, {'stacks': collections.Counter(), 'meta': {}})
+        entry['stacks'].update(session.stacks)
+        for field, value in dict(meta, processes=1).items():
+            entry['meta'][field] = entry['meta'].get(field, 0) + value
+
+    def load(self, profile_id: str) -> Optional[Dict]:
+        """``{'stacks': {stack: count}, 'meta': {...}}``, or None for an unknown profile."""
+        if self.redis_client is not None:
+            try:
+                key = self._key(profile_id)
+                stacks = self.redis_client.hgetall(f'{key}:stacks')
+                meta = self.redis_client.hgetall(f'{key}:meta')
+                if stacks or meta:
+                    decode = lambda v: v.decode() if isinstance(v, bytes) else v
+                    return {'stacks': {decode(k): int(v) for k, v in stacks.items()},
+                            'meta': {decode(k): float(v) for k, v in meta.items()}}
+            except Exception as e:
+                logger.warning(f"[PROFILER] Could not read profile {profile_id}: {e}")
+        entry = self._memory.get(profile_id)
+        if entry is None:
+            return None
+        return {'stacks': dict(entry['stacks']), 'meta': dict(entry['meta'])}
+
+    def folded(self, profile_id: str) -> Optional[str]:
+        """The profile as folded stacks, heaviest first, for flamegraph tools."""
+        profile = self.load(profile_id)
+        if profile is None:
+            return None
+        stacks = sorted(profile['stacks'].items(), key=lambda item: -item[1])
+        return ''.join(f'{stack} {count}\n' for stack, count in stacks)
+
+    def publish_window(self, profile_id: str, seconds: float, scope: str):
+        window = {'profile_id': profile_id, 'scope': scope, 'expires_at': time.time() + seconds}
+        if self.redis_client is not None:
+            try:
+                self.redis_client.setex(WINDOW_KEY, max(int(seconds), 1), json.dumps(window))
+                return
+            except Exception as e:
+                logger.warning(f"[PROFILER] Could not publish profiling window, this process only: {e}")
+        self._window = window
+
+    def active_window(self, scope: str) -> Optional[Dict]:
+        """The window covering ``scope`` ('web' or 'workers'), if one is open."""
+        window = self._window
+        if self.redis_client is not None:
+            try:
+                raw = self.redis_client.get(WINDOW_KEY)
+                window = json.loads(raw) if raw else None
+            except Exception as e:
+                logger.debug(f"[PROFILER] Could not read profiling window: {e}")
+        if window and window['expires_at'] > time.time() and window['scope'] in (scope, 'all'):
+            return window
+        return None
+
+
+_profiler = SamplingProfiler()
+_profile_store = None
+_profile_store_lock = threading.Lock()
+_joined_windows = set()
+_last_window_poll = 0.0
+
+
+def get_profiler() -> SamplingProfiler:
+    return _profiler
+
+
+def get_profile_store() -> ProfileStore:
+    """Get the process-wide profile store (Redis-backed when reachable)."""
+    global _profile_store
+    if _profile_store is None:
+        with _profile_store_lock:
+            if _profile_store is None:
+                redis_client = None
+                redis_url = os.environ.get('REDIS_URL')
+                if redis_url:
+                    try:
+                        import redis
+                        redis_client = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=2)
+                        redis_client.ping()
+                    except Exception as e:
+                        logger.info(f"[PROFILER] Keeping profiles in process only: {e}")
+                        redis_client = None
+                _profile_store = ProfileStore(redis_client=redis_client)
+    return _profile_store
+
+
+@contextlib.contextmanager
+def profile(profile_id: str, **tags):
+    """Profile the calling thread for the duration of the block and store the result."""
+    session = _profiler.start(profile_id, threading.get_ident(), **tags)
+    try:
+        yield session
+    finally:
+        _profiler.stop(session)
+        _thread_tags.pop(threading.get_ident(), None)
+        get_profile_store().save(session)
+        logger.info(f"[PROFILER] Profile {profile_id}: {session.samples} samples in {session.seconds:.1f}s "
+                    f"({session.overhead:.1%} sampler overhead)")
+
+
+def profile_process(profile_id: str, seconds: float) -> ProfileSession:
+    """Sample every thread of this process for ``seconds`` in the background."""
+    session = _profiler.start(profile_id, pid=os.getpid())
+
+    def finish():
+        _profiler.stop(session)
+        get_profile_store().save(session)
+        logger.info(f"[PROFILER] Window {profile_id} done in process {os.getpid()}: {session.samples} samples")
+
+    timer = threading.Timer(seconds, finish)
+    timer.daemon = True
+    timer.start()
+    return session
+
+
+def start_window(seconds: float, scope: str = 'all') -> str:
+    """Open a profiling window for web processes, workers or both; returns its profile id."""
+    if scope not in SCOPES:
+        raise ValueError(f"scope must be one of {SCOPES}")
+    seconds = min(max(float(seconds), 1.0), MAX_WINDOW_SECONDS)
+    profile_id = f"window-{uuid.uuid4().hex[:12]}"
+    get_profile_store().publish_window(profile_id, seconds, scope)
+    logger.info(f"[PROFILER] Opened {seconds:.0f}s profiling window {profile_id} for {scope}")
+    join_web_window(force=True)
+    return profile_id
+
+
+def join_web_window(force: bool = False):
+    """In a web process, start sampling if a web window is open (polled at most every few seconds)."""
+    global _last_window_poll
+    now = time.time()
+    if not force and now - _last_window_poll < WINDOW_POLL_INTERVAL:
+        return
+    _last_window_poll = now
+    window = get_profile_store().active_window('web')
+    if window and window['profile_id'] not in _joined_windows:
+        _joined_windows.add(window['profile_id'])
+        profile_process(window['profile_id'], window['expires_at'] - now)
+
+
+def job_profile_id(job) -> Optional[str]:
+    """Profile id for an RQ job: its own id when flagged, else the open worker window's."""
+    if (job.meta or {}).get('profile'):
+        return job.id
+    window = get_profile_store().active_window('workers')
+    return window['profile_id'] if window else None
@@ -0,0 +1,175 @@
+"""
+Streaming Citation Extraction
+
+Runs the clean extraction pipeline over very large records one window at a
+time, so memory is bounded by the window size rather than the document:
+
+- the text is cut into fixed windows; each window owns the citations that
+  *start* inside it and is read with ``overlap`` extra characters on both
+  sides, behind it for case-name look-back and past its end so a citation
+  (and its year parenthetical) crossing the boundary is read whole
+- offsets are shifted back to document positions before anything is returned
+- stitching is deterministic: windows are emitted in document order, and a
+  citation that overlaps one already emitted by an earlier window is dropped,
+  so a match split differently on each side of a boundary is kept once
+- windows are independent, so they can be handed to any
+  ``concurrent.futures`` executor; at most ``max_in_flight`` windows are
+  pending at a time and results still come back in document order
+
+The source may be a string or an iterable of text pieces (e.g. pages as they
+come off the PDF extractor); only the current window plus its overlap is
+buffered.
+
+Example:
+    extractor = StreamingCitationExtractor(window_chars=200_000)
+    for citation in extractor.iter_citations(pages):
+        ...
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.models import CitationResult
+
+logger = logging.getLogger(__name__)
+
+STREAMING_WINDOW_CHARS = 200_000
+STREAMING_OVERLAP_CHARS = 2_000
+
+
+@dataclass(frozen=True)
+class Window:
+    """One extraction window: owns [start, end) and reads [lead, tail)"""
+    index: int
+    start: int
+    end: int
+    lead: int
+    tail: int
+
+
+def plan_windows(text_length: int, window_chars: int = STREAMING_WINDOW_CHARS,
+                 overlap_chars: int = STREAMING_OVERLAP_CHARS) -> List[Window]:
+    """Windows covering a text of ``text_length`` characters"""
+    return [
+        Window(index, start, min(start + window_chars, text_length),
+               max(start - overlap_chars, 0), min(start + window_chars + overlap_chars, text_length))
+        for index, start in enumerate(range(0, text_length, window_chars))
+    ]
+
+
+def extract_window(text: str, window: Window) -> List[CitationResult]:
+    """
+    Citations owned by ``window``, with document offsets.
+
+    ``text`` is the window's read range (document[lead:tail]). Module-level so
+    process pools can pickle it.
+    """
+    from src.clean_extraction_pipeline import extract_citations_clean
+
+    owned = []
+    for citation in extract_citations_clean(text):
+        if citation.start_index is None:
+            continue
+        citation.start_index += window.lead
+        if not window.start <= citation.start_index < window.end:
+            continue
+        if citation.end_index is not None:
+            citation.end_index += window.lead
+        owned.append(citation)
+    owned.sort(key=lambda c: c.start_index)
+    return owned
+
+
+class StreamingCitationExtractor:
+    """Window-at-a-time clean-pipeline extraction with overlap stitching"""
+
+    def __init__(self, window_chars: int = STREAMING_WINDOW_CHARS,
+                 overlap_chars: int = STREAMING_OVERLAP_CHARS,
+                 executor: Optional[Executor] = None, max_in_flight: Optional[int] = None):
+        if window_chars <= 0 or overlap_chars < 0:
+            raise ValueError("window_chars must be positive and overlap_chars non-negative")
+        self.window_chars = window_chars
+        self.overlap_chars = overlap_chars
+        self.executor = executor
+        self.max_in_flight = max_in_flight or (getattr(executor, '_max_workers', 1) * 2 if executor else 1)
+
+    def _windows(self, source: Union[str, Iterable[str]]) -> Iterator[Tuple[Window, str]]:
+        """(window, read text) pairs, buffering only one window plus overlap"""
+        if isinstance(source, str):
+            for window in plan_windows(len(source), self.window_chars, self.overlap_chars):
+                yield window, source[window.lead:window.tail]
+            return
+
+        pieces = iter(source)
+        buffer, buffer_start = '', 0
+        exhausted = False
+        index, start = 0, 0
+        while True:
+            want = start + self.window_chars + self.overlap_chars
+            while not exhausted and buffer_start + len(buffer) < want:
+                try:
+                    buffer += next(pieces)
+                except StopIteration:
+                    exhausted = True
+            buffered_end = buffer_start + len(buffer)
+            if start >= buffered_end:
+                return
+            end = min(start + self.window_chars, buffered_end)
+            window = Window(index, start, end, max(start - self.overlap_chars, 0), min(want, buffered_end))
+            yield window, buffer[window.lead - buffer_start:window.tail - buffer_start]
+            # Keep only what the next window reads behind its start
+            keep_from = max(end - self.overlap_chars, 0)
+            buffer, buffer_start = buffer[keep_from - buffer_start:], keep_from
+            index, start = index + 1, end
+
+    def _extracted(self, source) -> Iterator[Tuple[Window, List[CitationResult]]]:
+        if self.executor is None:
+            for window, text in self._windows(source):
+                yield window, extract_window(text, window)
+            return
+
+        pending = deque()
+        for window, text in self._windows(source):
+            pending.append((window, self.executor.submit(extract_window, text, window)))
+            if len(pending) >= self.max_in_flight:
+                window, future = pending.popleft()
+                yield window, future.result()
+        while pending:
+            window, future = pending.popleft()
+            yield window, future.result()
+
+    def iter_windows(self, source: Union[str, Iterable[str]]) -> Iterator[Tuple[Window, List[CitationResult]]]:
+        """(window, stitched citations) in document order"""
+        emitted_end = 0
+        for window, citations in self._extracted(source):
+            kept = []
+            for citation in citations:
+                if citation.start_index < emitted_end:
+                    logger.debug(f"[STREAMING] Dropping {citation.citation!r} at {citation.start_index}: "
+                                 f"overlaps a citation from an earlier window")
+                    continue
+                kept.append(citation)
+            if kept:
+                emitted_end = max(emitted_end, max((c.end_index or c.start_index) for c in kept))
+            yield window, kept
+
+    def iter_citations(self, source: Union[str, Iterable[str]]) -> Iterator[CitationResult]:
+        for _, citations in self.iter_windows(source):
+            yield from citations
+
+    def extract(self, source: Union[str, Iterable[str]]) -> List[CitationResult]:
+        return list(self.iter_citations(source))
+
+
+def extract_citations_streaming(source: Union[str, Iterable[str]], **kwargs) -> List[CitationResult]:
+    """Clean-pipeline extraction of ``source`` in bounded windows, with document offsets"""
+    return StreamingCitationExtractor(**kwargs).extract(source)
+
+
+__all__ = [
+    'STREAMING_WINDOW_CHARS', 'STREAMING_OVERLAP_CHARS', 'Window', 'plan_windows', 'extract_window',
+    'StreamingCitationExtractor', 'extract_citations_streaming',
+]
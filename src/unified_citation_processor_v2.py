@@ -54,6 +54,8 @@ from src.unified_case_name_extractor_v2 import (
 )
 
 from src.unified_clustering_master import cluster_citations_unified_master as cluster_citations_unified
+from src.utils.text_boundaries import get_boundary_index
+from src.metrics import StageClock
 import warnings
 
 from src.config import get_config_value
@@ -187,7 +189,8 @@ class UnifiedCitationProcessorV2:
     Unified citation processor that consolidates the best parts of all existing implementations.
     """
     
-    def __init__(self, config: Optional[ProcessingConfig] = None, progress_callback: Optional[callable] = None):
+    def __init__(self, config: Optional[ProcessingConfig] = None, progress_callback: Optional[callable] = None,
+                 event_callback: Optional[callable] = None):
         logger.info('[DEBUG] ENTERED UnifiedCitationProcessorV2.__init__')
         self.config = config or ProcessingConfig()
         logger.warning(f'[CONFIG-CHECK] extract_case_names={self.config.extract_case_names}, extract_dates={self.config.extract_dates}')
@@ -198,6 +201,8 @@ class UnifiedCitationProcessorV2:
             self.config.extract_case_names = True
         
         self.progress_callback = progress_callback  # NEW: Progress callback support
+        self.event_callback = event_callback  # Incremental results: event_callback(event_type, payload)
+        self._stage_clock = StageClock()  # Observes per-stage latency from the progress steps
         self._init_patterns()
         self._init_case_name_patterns()
         self._init_date_patterns()
@@ -226,12 +231,21 @@ class UnifiedCitationProcessorV2:
 
     def _update_progress(self, progress: int, step: str, message: str):
         """Update progress if callback is available."""
+        self._stage_clock.step(step)
         if self.progress_callback and callable(self.progress_callback):
             try:
                 self.progress_callback(progress, step, message)
             except Exception as e:
                 logger.warning(f"Progress callback failed: {e}")
 
+    def _emit_event(self, event_type: str, payload: Dict[str, Any]):
+        """Publish an incremental result (citations, verification, clusters) if a callback is set."""
+        if self.event_callback and callable(self.event_callback):
+            try:
+                self.event_callback(event_type, payload)
+            except Exception as e:
+                logger.warning(f"Event callback failed for '{event_type}': {e}")
+
     def _init_patterns(self):
         """Initialize comprehensive citation patterns with proper Bluebook spacing."""
         self.citation_patterns = {
@@ -1969,21 +1983,10 @@ class UnifiedCitationProcessorV2:
         Returns:
             Isolated context string or None if no suitable isolation found
         """
-        # Find the smallest enclosing parenthetical that contains this citation
-        paren_stack = []
-        innermost_paren_start = None
-        
-        # Search backward from citation start to find opening parentheses
-        for i in range(citation_start - 1, max(-1, citation_start - 200), -1):
-            if text[i] == ')':
-                paren_stack.append(i)
-            elif text[i] == '(':
-                if paren_stack:
-                    paren_stack.pop()
-                else:
-                    # Found an opening parenthesis that matches our citation's context
-                    innermost_paren_start = i
-                    break
+        boundaries = get_boundary_index(text)
+        
+        # Find the smallest enclosing parenthetical (opened within 200 chars) that contains this citation
+        innermost_paren_start = boundaries.enclosing_parenthetical_start(citation_start, max_distance=200)
         
         if innermost_paren_start is not None:
             # Extract the content within this parenthetical
@@ -2002,22 +2005,15 @@ class UnifiedCitationProcessorV2:
             
             return paren_content
         
-        # Fallback: Try to find structural boundaries using commas and semicolons
-        # Look backward for the nearest structural separator
-        separators = [';', ':', '.)', ').', '."', ')."', '.)"']
+        # Fallback: Try to find structural boundaries (, ; : .) ." ).) within 150 chars back
         separator_pos = None
         
-        for i in range(citation_start - 1, max(-1, citation_start - 150), -1):
-            char = text[i]
-            next_char = text[i + 1] if i + 1 < len(text) else ''
-            two_chars = char + next_char
-            
-            if two_chars in separators or char in [',', ';', ':']:
-                # Check if this separator is followed by a citation pattern to avoid false boundaries
-                after_separator = text[i + 1:citation_start].strip()
-                if not re.search(r'\d+\s+[A-Za-z.]+\s+\d+', after_separator[:50]):
-                    separator_pos = i
-                    break
+        for i in boundaries.separators_before(citation_start, citation_start - 150):
+            # Check if this separator is followed by a citation pattern to avoid false boundaries
+            after_separator = text[i + 1:citation_start].strip()
+            if not re.search(r'\d+\s+[A-Za-z.]+\s+\d+', after_separator[:50]):
+                separator_pos = i
+                break
         
         if separator_pos is not None:
             context = text[separator_pos + 1:citation_start].strip()
@@ -2105,6 +2101,7 @@ class UnifiedCitationProcessorV2:
         if not citation.start_index:
             return None, None
         
+        boundaries = get_boundary_index(text)
         nearby_citations = []
         if all_citations:
             for other_citation in all_citations:
@@ -2140,27 +2137,23 @@ class UnifiedCitationProcessorV2:
                 if prev_citation and prev_citation.end_index:
                     potential_start = prev_citation.end_index
                     
-                    sentence_pattern = re.compile(r'\.\s+[A-Z]')
-                    sentence_matches = list(sentence_pattern.finditer(text, potential_start, citation.start_index))
-                    if sentence_matches:
-                        context_start = sentence_matches[-1].start() + 1  # Start after the period
+                    sentence_match = boundaries.sentences.last_within(potential_start, citation.start_index)
+                    if sentence_match:
+                        context_start = sentence_match[0] + 1  # Start after the period
                     else:
-                        year_pattern = re.compile(r'\((19|20)\d{2}\)')
-                        year_matches = list(year_pattern.finditer(text, potential_start, citation.start_index))
-                        if year_matches:
-                            context_start = year_matches[-1].end()
+                        year_match = boundaries.year_parentheticals.last_within(potential_start, citation.start_index)
+                        if year_match:
+                            context_start = year_match[1]
                         else:
-                            separator_pattern = re.compile(r'[;]\s+')
-                            separator_matches = list(separator_pattern.finditer(text, potential_start, citation.start_index))
-                            if separator_matches:
-                                context_start = separator_matches[-1].end()
+                            separator_match = boundaries.semicolons.last_within(potential_start, citation.start_index)
+                            if separator_match:
+                                context_start = separator_match[1]
                             else:
                                 context_start = potential_start
                 else:
-                    year_pattern = re.compile(r'\((19|20)\d{2}\)')
-                    year_matches = list(year_pattern.finditer(text, 0, citation.start_index))
-                    if year_matches:
-                        context_start = year_matches[-1].end()
+                    year_match = boundaries.year_parentheticals.last_within(0, citation.start_index)
+                    if year_match:
+                        context_start = year_match[1]
                     else:
                         potential_start = max(0, citation.start_index - 300)  # CRITICAL: Restored to 300 for proper extraction
                         
@@ -2178,10 +2171,9 @@ class UnifiedCitationProcessorV2:
                         
                         context_start = last_citation_pos
             else:
-                year_pattern = re.compile(r'\((19|20)\d{2}\)')
-                year_matches = list(year_pattern.finditer(text, 0, citation.start_index))
-                if year_matches:
-                    context_start = year_matches[-1].end()
+                year_match = boundaries.year_parentheticals.last_within(0, citation.start_index)
+                if year_match:
+                    context_start = year_match[1]
                 else:
                     potential_start = max(0, citation.start_index - 50)  # Reduced from 300 to 50
                     
@@ -2211,34 +2203,29 @@ class UnifiedCitationProcessorV2:
             if next_citation and next_citation.start_index:
                 potential_end = next_citation.start_index
                 
-                sentence_pattern = re.compile(r'\.\s+[A-Z]')
-                sentence_matches = list(sentence_pattern.finditer(text, citation.end_index, potential_end))
-                if sentence_matches:
-                    context_end = sentence_matches[0].start() + 1  # End before the period
+                sentence_match = boundaries.sentences.first_within(citation.end_index, potential_end)
+                if sentence_match:
+                    context_end = sentence_match[0] + 1  # End before the period
                 else:
-                    year_pattern = re.compile(r'\((19|20)\d{2}\)')
-                    year_matches = list(year_pattern.finditer(text, citation.end_index, potential_end))
-                    if year_matches:
-                        context_end = year_matches[0].start()
+                    year_match = boundaries.year_parentheticals.first_within(citation.end_index, potential_end)
+                    if year_match:
+                        context_end = year_match[0]
                     else:
-                        separator_pattern = re.compile(r'[;]\s+')
-                        separator_matches = list(separator_pattern.finditer(text, citation.end_index, potential_end))
-                        if separator_matches:
-                            context_end = separator_matches[0].start()
+                        separator_match = boundaries.semicolons.first_within(citation.end_index, potential_end)
+                        if separator_match:
+                            context_end = separator_match[0]
                         else:
                             context_end = potential_end
             else:
-                year_pattern = re.compile(r'\((19|20)\d{2}\)')
-                next_year_matches = list(year_pattern.finditer(text, citation.end_index))
-                if next_year_matches:
-                    context_end = next_year_matches[0].start()
+                next_year_match = boundaries.year_parentheticals.first_within(citation.end_index)
+                if next_year_match:
+                    context_end = next_year_match[0]
                 else:
                     context_end = min(len(text), citation.end_index + 50)
         else:
-            year_pattern = re.compile(r'\((19|20)\d{2}\)')
-            next_year_matches = list(year_pattern.finditer(text, citation.end_index))
-            if next_year_matches:
-                context_end = next_year_matches[0].start()
+            next_year_match = boundaries.year_parentheticals.first_within(citation.end_index)
+            if next_year_match:
+                context_end = next_year_match[0]
             else:
                 context_end = min(len(text), citation.end_index + 50)
         
@@ -2920,31 +2907,42 @@ class UnifiedCitationProcessorV2:
             if citations_to_verify:
                 batch_size = 50
                 total = len(citations_to_verify)
+                total_batches = (total + batch_size - 1) // batch_size
                 logger.info(f"[BATCH-VERIFY] Processing {total} citations in batches of {batch_size}")
                 
                 verifier = UnifiedVerificationMaster()
+                batch_counter = [0]
                 
-                # Process citations in batches
-                for batch_start in range(0, total, batch_size):
-                    batch_end = min(batch_start + batch_size, total)
-                    batch = citations_to_verify[batch_start:batch_end]
-                    batch_num = (batch_start // batch_size) + 1
-                    total_batches = (total + batch_size - 1) // batch_size
+                def run_batch_lookup(citation_strings, case_names, dates):
+                    """Run verify_citations_batch on a private event loop (called on a helper thread)"""
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                    try:
+                        return loop.run_until_complete(verifier.verify_citations_batch(
+                            citation_strings, case_names, dates, batch_size=batch_size
+                        ))
+                    finally:
+                        loop.close()
+                
+                def verify_batch(batch):
+                    batch_counter[0] += 1
+                    batch_num = batch_counter[0]
                     
-                    logger.info(f"[BATCH {batch_num}/{total_batches}] Verifying citations {batch_start+1}-{batch_end} ({len(batch)} citations)")
+                    logger.info(f"[BATCH {batch_num}/{total_batches}] Verifying {len(batch)} citations")
                     
                     # Extract data for batch
                     citation_strings = [c.citation for c in batch]
                     case_names = [c.extracted_case_name for c in batch]
                     dates = [c.extracted_date for c in batch]
                     
-                    # Call batch verification
+                    # Call batch verification (async, and process_text's loop is already
+                    # running in this thread, so run it in a new loop in a separate thread)
                     try:
-                        batch_results = asyncio.run(verifier._batch_verify_with_courtlistener(
-                            citations=citation_strings,
-                            extracted_case_names=case_names,
-                            extracted_dates=dates
-                        ))
+                        from concurrent.futures import ThreadPoolExecutor
+                        with ThreadPoolExecutor(max_workers=1) as executor:
+                            batch_results = executor.submit(
+                                run_batch_lookup, citation_strings, case_names, dates
+                            ).result()
                         
                         # Apply results to citation objects
                         verified_count = 0
@@ -2973,6 +2971,28 @@ class UnifiedCitationProcessorV2:
                         for citation in batch:
                             citation.verified = False
                             citation.verification_status = "error"
+                
+                # ML triage: likely-valid, high-value citations first; junk skipped;
+                # low scorers deferred and dropped first when the time budget runs out
+                from src.verification_scheduler import get_verification_scheduler, default_time_budget
+                scheduler = get_verification_scheduler()
+                if scheduler is not None:
+                    plan = scheduler.plan(citations_to_verify)
+                    logger.info(f"[TRIAGE] {plan.summary()}")
+                    for item in plan.verify + plan.deferred + plan.skipped:
+                        if isinstance(getattr(item.citation, 'metadata', None), dict):
+                            item.citation.metadata['triage_score'] = round(item.score, 4)
+                    for item in plan.skipped:
+                        item.citation.verified = False
+                        item.citation.verification_status = "skipped_low_confidence"
+                    unverified = scheduler.run(plan, verify_batch, batch_size=batch_size,
+                                               time_budget=default_time_budget())
+                    for citation in unverified:
+                        citation.verified = False
+                        citation.verification_status = "deferred"
+                else:
+                    for batch_start in range(0, total, batch_size):
+                        verify_batch(citations_to_verify[batch_start:batch_start + batch_size])
             
             logger.info(f"[BATCH-VERIFY] Completed all batches")
             
@@ -3620,6 +3640,7 @@ class UnifiedCitationProcessorV2:
         # Store for use in extraction calls
         self.document_primary_case_name = document_primary_case_name
         
+        self._stage_clock.reset()
         self._update_progress(10, "Extracting", "Extracting citations from text")
         
         logger.info("[UNIFIED_PIPELINE] Starting CLEAN extraction pipeline for 100% accuracy")
@@ -3808,6 +3829,10 @@ class UnifiedCitationProcessorV2:
         citations = self._filter_false_positive_citations(citations, text)
         logger.info(f"[UNIFIED_PIPELINE] After false positive filtering: {len(citations)} citations")
         
+        # Citations are final apart from verification/clustering - stream them now
+        if self.event_callback:
+            self._emit_event('citations', {'citations': citations})
+        
         # FIX #54: Diagnostic logging to find why verification doesn't run
         logger.error(f"🔍 [FIX #54] PRE-VERIFICATION CHECK:")
         logger.error(f"   enable_verification: {self.config.enable_verification}")
@@ -3821,14 +3846,29 @@ class UnifiedCitationProcessorV2:
             verified_citations = self._verify_citations_sync(citations, text)
             citations = verified_citations
             logger.info(f"[UNIFIED_PIPELINE] After pre-clustering verification: {len(citations)} citations")
+            if self.event_callback:
+                self._emit_event('verification', {'citations': [
+                    {
+                        'citation': getattr(c, 'citation', None),
+                        'verified': getattr(c, 'verified', False),
+                        'canonical_name': getattr(c, 'canonical_name', None),
+                        'canonical_date': getattr(c, 'canonical_date', None),
+                        'canonical_url': getattr(c, 'canonical_url', None),
+                        'source': getattr(c, 'source', None),
+                        'true_by_parallel': getattr(c, 'true_by_parallel', False),
+                    }
+                    for c in citations
+                ]})
         else:
             logger.info("[UNIFIED_PIPELINE] Phase 4.75: Skipping pre-clustering verification (disabled)")
         
         logger.info("[UNIFIED_PIPELINE] Phase 5: Creating citation clusters with MASTER clustering system")
         self._update_progress(70, "Clustering", "Creating citation clusters")
         from src.unified_clustering_master import cluster_citations_unified_master
-        # ENABLE batch verification to use efficient citation-lookup API
-        clusters = cluster_citations_unified_master(citations, original_text=text, enable_verification=True)
+        # Batch verification in clustering uses the efficient citation-lookup API; it follows the
+        # config so extraction-only runs (e.g. phase 1 of a two-phase bulk run) stay offline
+        clusters = cluster_citations_unified_master(citations, original_text=text,
+                                                    enable_verification=self.config.enable_verification)
         logger.info(f"[UNIFIED_PIPELINE] Created {len(clusters)} clusters using MASTER clustering")
         
         # CRITICAL FIX: Update citation objects with cluster information immediately
@@ -4046,6 +4086,9 @@ class UnifiedCitationProcessorV2:
             
             formatted_clusters.append(formatted_cluster)
         
+        if self.event_callback:
+            self._emit_event('clusters', {'clusters': formatted_clusters})
+        
         result = {
             'citations': citations,
             'clusters': formatted_clusters
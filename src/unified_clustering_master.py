@@ -26,6 +26,8 @@ from dataclasses import dataclass
 from enum import Enum
 from collections import defaultdict, Counter
 
+from src.utils.text_boundaries import get_boundary_index
+
 logger = logging.getLogger(__name__)
 
 class ClusterType(Enum):
@@ -525,30 +527,8 @@ class UnifiedClusteringMaster:
         if start1 > start2:
             start1, start2 = start2, start1
         
-        # Get the text between the two citations
-        between_text = text[start1:start2]
-        
-        # Count parentheses in the text between the citations
-        paren_depth = 0
-        crossed_boundary = False
-        
-        for char in between_text:
-            if char == '(':
-                paren_depth += 1
-                if paren_depth > 0:
-                    crossed_boundary = True
-            elif char == ')':
-                paren_depth -= 1
-                if paren_depth < 0:
-                    # Closing paren before opening - definitely crossed a boundary
-                    return True
-        
-        # If paren_depth != 0, we crossed into or out of a parenthetical
-        # If crossed_boundary is True and paren_depth > 0, we're inside a parenthetical
-        if paren_depth != 0 or (crossed_boundary and paren_depth > 0):
-            return True
-        
-        return False
+        # Balanced-parenthesis check between the two starts, answered from the document's boundary index
+        return get_boundary_index(text).parenthetical_boundary_between(start1, start2)
     
     def _are_citations_parallel_pair(self, citation1: Any, citation2: Any, text: str) -> bool:
         """Determine if two citations are likely parallel citations."""
@@ -558,14 +538,14 @@ class UnifiedClusteringMaster:
             citation1_meta = citation1
         else:
             citation1_text = getattr(citation1, 'citation', str(citation1))
-            citation1_meta = citation1.__dict__ if hasattr(citation1, '__dict__') else {}
+            citation1_meta = citation1
 
         if isinstance(citation2, dict):
             citation2_text = citation2.get('citation', '')
             citation2_meta = citation2
         else:
             citation2_text = getattr(citation2, 'citation', str(citation2))
-            citation2_meta = citation2.__dict__ if hasattr(citation2, '__dict__') else {}
+            citation2_meta = citation2
 
         # Check for known parallel citations from metadata first
         def get_parallel_citations(citation_meta):
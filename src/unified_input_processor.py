@@ -462,7 +462,6 @@ class UnifiedInputProcessor:
                 logger.error(f"[Unified Processor {request_id}] 📋 Source: {source_name}, Input type from metadata: {input_metadata.get('input_type')}")
                 
                 try:
-                    from rq import Queue
                     from redis import Redis
                     logger.error(f"[Unified Processor {request_id}] ✅ Imported RQ and Redis modules")
                     
@@ -494,22 +493,25 @@ class UnifiedInputProcessor:
                         logger.error(f"[Unified Processor {request_id}] 🚨 CRITICAL: No Redis instance available after trying all configs")
                         raise Exception("No Redis instance available")
                     
-                    logger.error(f"[Unified Processor {request_id}] 🎯 Creating queue 'casestrainer'...")
-                    queue = Queue('casestrainer', connection=redis_conn)
-                    logger.error(f"[Unified Processor {request_id}] ✅ Queue created successfully")
+                    from src.job_queues import JobScheduler, current_client_id
+                    job_class = self.citation_service.determine_job_class(text_length=len(text))
+                    logger.error(f"[Unified Processor {request_id}] 🎯 Routing to the {job_class} queue...")
+                    scheduler = JobScheduler(redis_conn)
                     
                     logger.error(f"[Unified Processor {request_id}] 📤 About to enqueue job...")
                     logger.error(f"[Unified Processor {request_id}]    Function: src.progress_manager.process_citation_task_direct")
                     logger.error(f"[Unified Processor {request_id}]    Args: ({request_id}, 'text', {{text: {len(text)} chars}})")
                     logger.error(f"[Unified Processor {request_id}]    Job ID: {request_id}")
                     
-                    job = queue.enqueue(
+                    job = scheduler.enqueue(
                         'src.progress_manager.process_citation_task_direct',  # FIXED: String path instead of function object
                         args=(request_id, 'text', {'text': text}),
                         job_id=request_id,  # Use request_id as the job ID
                         job_timeout=600,  # 10 minutes timeout
                         result_ttl=86400,
-                        failure_ttl=86400
+                        failure_ttl=86400,
+                        job_class=job_class,
+                        client_id=current_client_id()
                     )
                     
                     logger.error(f"[Unified Processor {request_id}] ✅ Task enqueued successfully!")
@@ -20,6 +20,7 @@ Key Features Consolidated:
 """
 
 import asyncio
+import functools
 import logging
 import time
 import requests
@@ -32,6 +33,8 @@ from urllib.parse import quote
 
 # CRITICAL: Import from config to ensure .env files are loaded
 from src.config import COURTLISTENER_API_KEY, get_bool_config_value
+from src.http_cache import get_http_cache, KIND_OPINION, KIND_SEARCH
+from src.metrics import VERIFICATION_SECONDS, VERIFICATIONS
 
 logger = logging.getLogger(__name__)
 
@@ -99,6 +102,30 @@ class VerificationResult:
             **kwargs
         )
 
+def _observed(source: VerificationSource):
+    """Record the latency and per-citation outcome of an upstream call in the shared metrics."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await func(self, *args, **kwargs)
+            except Exception:
+                VERIFICATION_SECONDS.observe(time.perf_counter() - started, source=source.value)
+                VERIFICATIONS.inc(source=source.value, outcome='error')
+                raise
+            VERIFICATION_SECONDS.observe(time.perf_counter() - started, source=source.value)
+            results = result if isinstance(result, list) else [result]
+            verified = sum(1 for r in results if r.verified)
+            if verified:
+                VERIFICATIONS.inc(verified, source=source.value, outcome='verified')
+            if len(results) > verified:
+                VERIFICATIONS.inc(len(results) - verified, source=source.value, outcome='unverified')
+            return result
+        return wrapper
+    return decorator
+
+
 class UnifiedVerificationMaster:
     """
     THE SINGLE, AUTHORITATIVE verification implementation.
@@ -322,6 +349,55 @@ class UnifiedVerificationMaster:
         Returns:
             List of VerificationResult objects
         """
+        store = _result_store
+        if store is None or not citations:
+            return await self._verify_citations_batch_uncached(
+                citations, extracted_case_names, extracted_dates, batch_size, timeout_per_citation
+            )
+        
+        # Shared result store (e.g. a bulk corpus run): verify each citation text once
+        case_names = extracted_case_names or [None] * len(citations)
+        dates = extracted_dates or [None] * len(citations)
+        try:
+            known = store.get_many([('verification', c) for c in set(citations)])
+        except Exception as e:
+            logger.warning(f"Verification result store read failed: {e}")
+            known = {}
+        found = {key[1]: result for key, result in known.items()}
+        
+        pending = {}
+        for i, citation in enumerate(citations):
+            if citation not in found and citation not in pending:
+                pending[citation] = i
+        if pending:
+            indexes = list(pending.values())
+            fresh = await self._verify_citations_batch_uncached(
+                [citations[i] for i in indexes],
+                [case_names[i] if i < len(case_names) else None for i in indexes],
+                [dates[i] if i < len(dates) else None for i in indexes],
+                batch_size, timeout_per_citation
+            )
+            new_results = dict(zip(pending, fresh))
+            found.update(new_results)
+            # Errors (rate limits, timeouts, transport failures) are not answers; retry them next time
+            try:
+                store.set_many({('verification', c): r for c, r in new_results.items()
+                                if r is not None and r.error is None})
+            except Exception as e:
+                logger.warning(f"Verification result store write failed: {e}")
+        
+        logger.info(f"🎯 MASTER_BATCH_VERIFY: {len(citations) - len(pending)}/{len(citations)} citations served from the shared result store")
+        return [found.get(citation) for citation in citations]
+    
+    async def _verify_citations_batch_uncached(
+        self,
+        citations: List[str],
+        extracted_case_names: Optional[List[str]] = None,
+        extracted_dates: Optional[List[str]] = None,
+        batch_size: int = 50,
+        timeout_per_citation: float = 10.0
+    ) -> List[VerificationResult]:
+        """Batch verification against the live sources (see verify_citations_batch)."""
         logger.info(f"🎯 MASTER_BATCH_VERIFY: Starting batch verification of {len(citations)} citations")
         
         # Prepare data
@@ -393,17 +469,24 @@ class UnifiedVerificationMaster:
         
         return results
     
+    @_observed(VerificationSource.COURTLISTENER_LOOKUP)
     async def _verify_with_courtlistener_lookup_batch(
         self,
         citations: List[str],
         extracted_case_names: Optional[List[str]] = None,
-        extracted_dates: Optional[List[str]] = None
+        extracted_dates: Optional[List[str]] = None,
+        fallback_on_rate_limit: bool = True
     ) -> List[VerificationResult]:
         """
         Batch verify using CourtListener citation-lookup API v4.
         
         The API supports passing multiple citations in the text field separated by spaces.
         This is much more efficient than individual requests.
+        
+        Every result the lookup actually answered (verified or not found) has
+        method ``citation_lookup_v4_batch``; transport errors do not. Without
+        ``fallback_on_rate_limit`` a 429 returns errors instead of running
+        the fallback scrapers.
         """
         if not self.api_key:
             return [VerificationResult(citation=c, error="No CourtListener API key") for c in citations]
@@ -453,6 +536,8 @@ class UnifiedVerificationMaster:
                 
                 # Handle 429 rate limit - fall back to enhanced fallback verifier
                 if response.status_code == 429:
+                    if not fallback_on_rate_limit:
+                        return [VerificationResult(citation=c, error="CourtListener rate limited") for c in citations]
                     logger.warning(f"⚠️  CourtListener rate limited (429) - falling back to enhanced verifier for {len(citations)} citations")
                     from src.enhanced_fallback_verifier import EnhancedFallbackVerifier
                     fallback = EnhancedFallbackVerifier()
@@ -473,6 +558,8 @@ class UnifiedVerificationMaster:
             except requests.exceptions.HTTPError as e:
                 # Check if it's a 429 that wasn't caught above
                 if hasattr(e, 'response') and e.response.status_code == 429:
+                    if not fallback_on_rate_limit:
+                        return [VerificationResult(citation=c, error="CourtListener rate limited") for c in citations]
                     logger.warning(f"⚠️  CourtListener rate limited (429) - falling back to enhanced verifier")
                     from src.enhanced_fallback_verifier import EnhancedFallbackVerifier
                     fallback = EnhancedFallbackVerifier()
@@ -531,7 +618,8 @@ class UnifiedVerificationMaster:
                     logger.error(f"[BATCH-DEBUG] Looking for: '{citation}'")
                     logger.error(f"[BATCH-DEBUG] API returned: {api_citations[:5]}")
                     logger.warning(f"⚠️  No clusters found with exact citation match for {citation}")
-                    results.append(VerificationResult(citation=citation, error="No match found in batch lookup"))
+                    results.append(VerificationResult(citation=citation, method="citation_lookup_v4_batch",
+                                                      error="No match found in batch lookup"))
                     continue
                 
                 # Check the status of this specific citation
@@ -544,7 +632,8 @@ class UnifiedVerificationMaster:
                 if status_code == 404 or not clusters_for_citation:
                     # Citation not found in CourtListener
                     logger.error(f"[BATCH-DEBUG] Citation '{citation}' returned 404 or no clusters: {error_message}")
-                    results.append(VerificationResult(citation=citation, error=error_message or "Citation not found"))
+                    results.append(VerificationResult(citation=citation, method="citation_lookup_v4_batch",
+                                                      error=error_message or "Citation not found"))
                     continue
                 
                 # CRITICAL FIX: If there's only one cluster, use it directly
@@ -623,6 +712,7 @@ class UnifiedVerificationMaster:
                     results.append(VerificationResult(
                         citation=citation,
                         verified=False,
+                        method="citation_lookup_v4_batch",
                         error="No match found in batch lookup"
                     ))
             
@@ -632,6 +722,7 @@ class UnifiedVerificationMaster:
             logger.error(f"CourtListener batch lookup error: {e}")
             return [VerificationResult(citation=c, verified=False, error=str(e)) for c in citations]
     
+    @_observed(VerificationSource.COURTLISTENER_LOOKUP)
     async def _verify_with_courtlistener_lookup(
         self, 
         citation: str, 
@@ -1510,6 +1601,7 @@ class UnifiedVerificationMaster:
         normalized = normalized.lower()
         return normalized
     
+    @_observed(VerificationSource.COURTLISTENER_SEARCH)
     async def _verify_with_courtlistener_search(
         self, 
         citation: str, 
@@ -1700,36 +1792,48 @@ class UnifiedVerificationMaster:
             logger.error(f"❌ FALLBACK ERROR for '{citation}': {e}")
             return VerificationResult(citation=citation, error=f"Fallback error: {e}")
         
-        # Try fallback sources in priority order
-        # Updated with working direct URL sources
-        fallback_sources = [
-            (VerificationSource.JUSTIA, self._verify_with_justia),
-            ('OpenJurist', self._verify_with_openjurist),  # NEW: Direct URL access
-            ('Cornell_LII', self._verify_with_cornell_lii),  # NEW: Cornell Legal Information Institute
-            (VerificationSource.GOOGLE_SCHOLAR, self._verify_with_google_scholar),
-            (VerificationSource.FINDLAW, self._verify_with_findlaw),
-            (VerificationSource.BING, self._verify_with_bing),
-        ]
+        # Direct URL sources, ordered by expected time-to-verify learned from telemetry
+        # (unreachable: both branches above return)
+        fallback_sources = {
+            'justia': self._verify_with_justia,
+            'openjurist': self._verify_with_openjurist,
+            'cornell_lii': self._verify_with_cornell_lii,
+            'google_scholar': self._verify_with_google_scholar,
+            'findlaw': self._verify_with_findlaw,
+            'bing': self._verify_with_bing,
+        }
         
-        time_per_source = remaining_timeout / len(fallback_sources)
+        from src.websearch.source_telemetry import get_source_telemetry
+        telemetry = get_source_telemetry()
+        ordered_sources = telemetry.rank_sources(citation, list(fallback_sources.keys()))
         
-        for source, verify_func in fallback_sources:
+        for source_name in ordered_sources:
             if remaining_timeout <= 0:
                 break
             
+            # Cap each source at 1.5x its observed p95 so slow sources can't eat the budget
+            p95 = telemetry.get_source_stats(source_name, citation).get('p95_latency')
+            source_timeout = min(remaining_timeout, max(p95 * 1.5, 2.0)) if p95 else remaining_timeout
+            
+            source_start = time.time()
             try:
-                source_start = time.time()
-                result = await verify_func(citation, extracted_case_name, extracted_date, time_per_source)
-                
-                if result.verified:
-                    logger.info(f"✅ FALLBACK_VERIFY: {source.value} succeeded for '{citation}'")
-                    return result
-                
-                remaining_timeout -= (time.time() - source_start)
-                
+                result = await asyncio.wait_for(
+                    fallback_sources[source_name](citation, extracted_case_name, extracted_date, source_timeout),
+                    timeout=source_timeout
+                )
+            except asyncio.TimeoutError:
+                result = VerificationResult(citation=citation, error=f"{source_name} timed out")
             except Exception as e:
-                logger.warning(f"Fallback source {source.value} failed for {citation}: {e}")
-                continue
+                logger.warning(f"Fallback source {source_name} failed for {citation}: {e}")
+                result = VerificationResult(citation=citation, error=str(e))
+            
+            elapsed = time.time() - source_start
+            remaining_timeout -= elapsed
+            telemetry.record(source_name, bool(result.verified), elapsed, citation)
+            
+            if result.verified:
+                logger.info(f"✅ FALLBACK_VERIFY: {source_name} succeeded for '{citation}'")
+                return result
         
         return VerificationResult(citation=citation, error="All fallback sources failed")
     
@@ -1755,7 +1859,7 @@ class UnifiedVerificationMaster:
                 'Accept-Language': 'en-US,en;q=0.9',
             }
             
-            response = self.session.get(direct_url, headers=headers, timeout=min(timeout, 10))
+            response = get_http_cache().get(direct_url, session=self.session, headers=headers, timeout=min(timeout, 10), kind=KIND_OPINION)
             
             if response.status_code == 200:
                 content = response.text
@@ -1898,7 +2002,7 @@ class UnifiedVerificationMaster:
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             }
             
-            response = self.session.get(direct_url, headers=headers, timeout=min(timeout, 10))
+            response = get_http_cache().get(direct_url, session=self.session, headers=headers, timeout=min(timeout, 10), kind=KIND_OPINION)
             
             if response.status_code == 200:
                 content = response.text
@@ -2013,7 +2117,7 @@ class UnifiedVerificationMaster:
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             }
             
-            response = self.session.get(direct_url, headers=headers, timeout=min(timeout, 10))
+            response = get_http_cache().get(direct_url, session=self.session, headers=headers, timeout=min(timeout, 10), kind=KIND_OPINION)
             
             if response.status_code == 200:
                 content = response.text
@@ -2137,7 +2241,7 @@ class UnifiedVerificationMaster:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = self.session.get(search_url, headers=headers, timeout=min(timeout, 10))
+            response = get_http_cache().get(search_url, session=self.session, headers=headers, timeout=min(timeout, 10), kind=KIND_SEARCH)
             
             if response.status_code == 200:
                 content = response.text
@@ -2210,7 +2314,7 @@ class UnifiedVerificationMaster:
             search_query = f"{citation} {extracted_case_name}"
             search_url = f"https://caselaw.findlaw.com/search?query={quote(search_query)}"
             
-            response = self.session.get(search_url, timeout=min(timeout, 10))
+            response = get_http_cache().get(search_url, session=self.session, timeout=min(timeout, 10), kind=KIND_SEARCH)
             
             if response.status_code == 200:
                 content = response.text
@@ -2278,7 +2382,7 @@ class UnifiedVerificationMaster:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
-            response = self.session.get(search_url, headers=headers, timeout=min(timeout, 10))
+            response = get_http_cache().get(search_url, session=self.session, headers=headers, timeout=min(timeout, 10), kind=KIND_SEARCH)
             
             if response.status_code == 200:
                 content = response.text
@@ -2508,10 +2612,69 @@ class UnifiedVerificationMaster:
             await asyncio.sleep(sleep_time)
         
         self.rate_limits[source]['last_call'] = time.time()
+        _record_upstream_call(source)
 
 # Global singleton instance
 _master_verifier = None
 
+# Upstream calls per source and minute, counted in Redis by every process, so
+# background jobs can use only the budget interactive traffic leaves over
+UPSTREAM_CALLS_KEY = 'casestrainer:upstream_calls:{source}:{minute}'
+_call_counter = None  # Redis client; False when unavailable
+
+def _get_call_counter():
+    global _call_counter
+    if _call_counter is None:
+        _call_counter = False
+        redis_url = os.environ.get('REDIS_URL')
+        if redis_url:
+            try:
+                import redis
+                client = redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1)
+                client.ping()
+                _call_counter = client
+            except Exception as e:
+                logger.info(f"Upstream call counting disabled: {e}")
+    return _call_counter or None
+
+def _record_upstream_call(source: VerificationSource) -> None:
+    client = _get_call_counter()
+    if client is None:
+        return
+    key = UPSTREAM_CALLS_KEY.format(source=source.value, minute=int(time.time() // 60))
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.incr(key)
+        pipe.expire(key, 180)
+        pipe.execute()
+    except Exception as e:
+        logger.debug(f"Could not count upstream call: {e}")
+
+def remaining_call_budget(source: VerificationSource, calls_per_minute: float) -> float:
+    """Calls to ``source`` left in the sliding minute across all processes (all of them without Redis)."""
+    client = _get_call_counter()
+    if client is None:
+        return float(calls_per_minute)
+    now = time.time()
+    minute = int(now // 60)
+    try:
+        current, previous = client.mget([UPSTREAM_CALLS_KEY.format(source=source.value, minute=minute),
+                                         UPSTREAM_CALLS_KEY.format(source=source.value, minute=minute - 1)])
+    except Exception as e:
+        logger.debug(f"Could not read upstream call count: {e}")
+        return float(calls_per_minute)
+    used = int(current or 0) + int(previous or 0) * (1 - (now % 60) / 60)
+    return max(0.0, calls_per_minute - used)
+
+# Optional store shared by every verifier in the process: get_many/set_many keyed by
+# ('verification', citation), e.g. src.websearch.cache.CacheManager on a shared file
+_result_store = None
+
+def set_verification_result_store(store) -> None:
+    """Serve repeated batch verifications from ``store`` (None disables it)."""
+    global _result_store
+    _result_store = store
+
 def get_master_verifier() -> UnifiedVerificationMaster:
     """Get the singleton master verifier instance."""
     global _master_verifier
@@ -0,0 +1,345 @@
+"""
+Pluggable HTML parsing for verification scrapers and URL ingestion.
+
+The scrapers only need a title, a few labelled elements or the visible text,
+so building a full ``BeautifulSoup(..., 'html.parser')`` tree for every page is
+wasted work. This module picks the fastest backend available:
+
+- selectolax (optional) for CSS field lookups and visible text
+- lxml for visible text and as the BeautifulSoup tree builder
+- a streaming stdlib parser that stops as soon as the requested fields are found
+
+Every entry point caps the amount of HTML parsed at ``HTML_MAX_BYTES``.
+"""
+
+import logging
+import re
+from html.parser import HTMLParser as _StdlibHTMLParser
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from src.config import HTML_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    _SelectolaxParser = None
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html as _lxml_html
+    LXML_AVAILABLE = True
+except ImportError:
+    _lxml_html = None
+    LXML_AVAILABLE = False
+
+# Elements dropped before collecting text (matches the decompose() calls this replaces)
+_INVISIBLE_TAGS = ('script', 'style')
+
+# Elements that never have a closing tag
+_VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link',
+    'meta', 'param', 'source', 'track', 'wbr'
+))
+
+_SIMPLE_SELECTOR_RE = re.compile(
+    r'^(?P<tag>[a-zA-Z][a-zA-Z0-9-]*)?'
+    r'(?P<qualifiers>(?:[.#][\w-]+|\[[^\]]+\])*)$'
+)
+_QUALIFIER_RE = re.compile(r'\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[(?P<attr>[^\]]+)\]')
+_ATTR_RE = re.compile(r'^\s*(?P<name>[\w-]+)\s*(?:(?P<op>[*^$]?=)\s*["\']?(?P<value>[^"\']*)["\']?)?\s*$')
+
+FieldSelectors = Dict[str, Union[str, Sequence[str]]]
+
+
+def get_parser_backend() -> str:
+    """Name of the fastest parser backend installed in this process."""
+    if SELECTOLAX_AVAILABLE:
+        return 'selectolax'
+    if LXML_AVAILABLE:
+        return 'lxml'
+    return 'html.parser'
+
+
+def cap_html(html: Union[str, bytes, None], max_bytes: Optional[int] = None) -> Union[str, bytes]:
+    """
+    Truncate HTML to the configured body-size cap.
+
+    Bytes stay undecoded so lxml/selectolax can honour the page's own
+    ``<meta charset>``; only the stdlib fallback decodes them (as UTF-8).
+    """
+    if not html:
+        return ''
+    limit = HTML_MAX_BYTES if max_bytes is None else max_bytes
+    if limit and len(html) > limit:
+        logger.debug(f"Truncating HTML body from {len(html)} to {limit} bytes")
+        html = html[:limit]
+    return html
+
+
+def _as_str(html: Union[str, bytes]) -> str:
+    return html.decode('utf-8', errors='replace') if isinstance(html, bytes) else html
+
+
+def make_soup(html: Union[str, bytes, None], max_bytes: Optional[int] = None):
+    """
+    Build a BeautifulSoup tree with the fastest installed tree builder.
+
+    Use this only when the caller really needs the full tree API; prefer
+    extract_fields() or html_to_text() otherwise.
+    """
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(cap_html(html, max_bytes), 'lxml' if LXML_AVAILABLE else 'html.parser')
+
+
+def _collapse_text(parts: List[str], separator: str, strip: bool) -> str:
+    if strip:
+        parts = [part.strip() for part in parts]
+        parts = [part for part in parts if part]
+    return separator.join(parts)
+
+
+def html_to_text(html: Union[str, bytes, None], separator: str = ' ', strip: bool = True,
+                 max_bytes: Optional[int] = None) -> str:
+    """
+    Extract the visible text of an HTML document.
+
+    Equivalent to decomposing script/style elements and calling
+    ``soup.get_text(separator=separator, strip=strip)``.
+    """
+    html = cap_html(html, max_bytes)
+    if not html:
+        return ''
+
+    if SELECTOLAX_AVAILABLE:
+        try:
+            tree = _SelectolaxParser(html)
+            tree.strip_tags(list(_INVISIBLE_TAGS))
+            root = tree.body or tree.root
+            return root.text(separator=separator, strip=strip) if root is not None else ''
+        except Exception as e:
+            logger.debug(f"selectolax text extraction failed, falling back: {e}")
+
+    if LXML_AVAILABLE:
+        try:
+            root = _lxml_html.document_fromstring(html)
+            for element in root.iter(*_INVISIBLE_TAGS):
+                element.drop_tree()
+            return _collapse_text(list(root.itertext()), separator, strip)
+        except Exception as e:
+            logger.debug(f"lxml text extraction failed, falling back: {e}")
+
+    parser = _TextCollector()
+    parser.feed(_as_str(html))
+    parser.close()
+    return _collapse_text(parser.parts, separator, strip)
+
+
+class _TextCollector(_StdlibHTMLParser):
+    """Collects text nodes outside invisible elements."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _INVISIBLE_TAGS:
+            self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in _INVISIBLE_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+class _SimpleSelector:
+    """A compound selector: ``tag``, ``.class``, ``#id`` and ``[attr op value]``."""
+
+    __slots__ = ('tag', 'classes', 'element_id', 'attrs')
+
+    def __init__(self, selector: str):
+        match = _SIMPLE_SELECTOR_RE.match(selector.strip())
+        if not match:
+            raise ValueError(f"Unsupported selector for streaming extraction: {selector!r}")
+        self.tag = (match.group('tag') or '').lower() or None
+        self.classes: List[str] = []
+        self.element_id: Optional[str] = None
+        self.attrs: List[Tuple[str, Optional[str], Optional[str]]] = []
+        for qualifier in _QUALIFIER_RE.finditer(match.group('qualifiers') or ''):
+            if qualifier.group('cls'):
+                self.classes.append(qualifier.group('cls'))
+            elif qualifier.group('id'):
+                self.element_id = qualifier.group('id')
+            else:
+                attr = _ATTR_RE.match(qualifier.group('attr'))
+                if not attr:
+                    raise ValueError(f"Unsupported attribute selector: {selector!r}")
+                self.attrs.append((attr.group('name').lower(), attr.group('op'), attr.group('value')))
+
+    def matches(self, tag: str, attrs: Dict[str, str]) -> bool:
+        if self.tag and tag != self.tag:
+            return False
+        if self.element_id and attrs.get('id') != self.element_id:
+            return False
+        if self.classes:
+            element_classes = attrs.get('class', '').split()
+            if not all(cls in element_classes for cls in self.classes):
+                return False
+        for name, op, value in self.attrs:
+            actual = attrs.get(name)
+            if actual is None:
+                return False
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and value not in actual:
+                return False
+            if op == '^=' and not actual.startswith(value):
+                return False
+            if op == '$=' and not actual.endswith(value):
+                return False
+        return True
+
+
+def _normalize_field_selectors(fields: FieldSelectors) -> Dict[str, List[str]]:
+    """Each field maps to selector groups in priority order."""
+    return {name: [groups] if isinstance(groups, str) else list(groups) for name, groups in fields.items()}
+
+
+class _FieldExtractor(_StdlibHTMLParser):
+    """
+    Streaming extractor for a handful of labelled elements.
+
+    Each field has selector groups in priority order; within a group the first
+    element in document order wins (like ``select_one``). Parsing stops once
+    every field's top-priority group has matched a non-empty element.
+    """
+
+    def __init__(self, fields: Dict[str, List[str]]):
+        super().__init__(convert_charrefs=True)
+        self.groups: Dict[str, List[List[_SimpleSelector]]] = {
+            name: [[_SimpleSelector(part) for part in group.split(',') if part.strip()] for group in groups]
+            for name, groups in fields.items()
+        }
+        # field -> group index -> captured text (None while unmatched)
+        self.results: Dict[str, List[Optional[str]]] = {name: [None] * len(groups) for name, groups in self.groups.items()}
+        self._captures: List[list] = []  # [field, group index, depth, parts]
+        self.done = False
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        for capture in self._captures:
+            capture[2] += 1
+        attr_map = {name: value or '' for name, value in attrs}
+        for name, groups in self.groups.items():
+            for index, group in enumerate(groups):
+                if self.results[name][index] is not None or self._is_capturing(name, index):
+                    continue
+                if any(selector.matches(tag, attr_map) for selector in group):
+                    if tag in _VOID_TAGS:
+                        self.results[name][index] = attr_map.get('content', '')
+                    else:
+                        self._captures.append([name, index, 1, []])
+        if tag in _VOID_TAGS:
+            self._close_void()
+        self._check_done()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in _VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def _close_void(self):
+        for capture in self._captures:
+            capture[2] -= 1
+
+    def handle_endtag(self, tag):
+        if self.done or tag in _VOID_TAGS:
+            return
+        still_open = []
+        for capture in self._captures:
+            capture[2] -= 1
+            if capture[2] <= 0:
+                name, index, _depth, parts = capture
+                self.results[name][index] = ''.join(parts).strip()
+            else:
+                still_open.append(capture)
+        self._captures = still_open
+        self._check_done()
+
+    def handle_data(self, data):
+        for capture in self._captures:
+            capture[3].append(data)
+
+    def _is_capturing(self, name: str, index: int) -> bool:
+        return any(capture[0] == name and capture[1] == index for capture in self._captures)
+
+    def _check_done(self):
+        self.done = all(values[0] for values in self.results.values())
+
+    def close(self):
+        super().close()
+        for name, index, _depth, parts in self._captures:
+            if self.results[name][index] is None:
+                self.results[name][index] = ''.join(parts).strip()
+        self._captures = []
+
+    def values(self) -> Dict[str, str]:
+        return {name: next((value for value in values if value), '') for name, values in self.results.items()}
+
+
+def _extract_fields_selectolax(html: str, fields: Dict[str, List[str]]) -> Dict[str, str]:
+    tree = _SelectolaxParser(html)
+    values = {}
+    for name, groups in fields.items():
+        values[name] = ''
+        for group in groups:
+            node = tree.css_first(group)
+            text = node.text().strip() if node is not None else ''
+            if text:
+                values[name] = text
+                break
+    return values
+
+
+def extract_fields(html: Union[str, bytes, None], fields: FieldSelectors, max_bytes: Optional[int] = None,
+                   chunk_size: int = 16384) -> Dict[str, str]:
+    """
+    Extract the text of a few labelled elements without building a full tree.
+
+    Args:
+        html: Page HTML
+        fields: Field name -> selector group or list of groups in priority
+            order, e.g. ``{'title': ['title', 'h1'], 'court': '.court, .jurisdiction'}``.
+            The first group with a non-empty match wins.
+        max_bytes: Override for the body-size cap
+        chunk_size: Characters fed to the streaming parser per step
+
+    Returns:
+        Field name -> stripped text ('' when nothing matched)
+    """
+    normalized = _normalize_field_selectors(fields)
+    html = cap_html(html, max_bytes)
+    if not html:
+        return {name: '' for name in normalized}
+
+    if SELECTOLAX_AVAILABLE:
+        try:
+            return _extract_fields_selectolax(html, normalized)
+        except Exception as e:
+            logger.debug(f"selectolax field extraction failed, falling back: {e}")
+
+    html = _as_str(html)
+    extractor = _FieldExtractor(normalized)
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+        if extractor.done:
+            break
+    extractor.close()
+    return extractor.values()
@@ -0,0 +1,176 @@
+"""
+Per-document structural boundary index.
+
+Context isolation asks the same questions for every citation: is there a
+sentence break, a year parenthetical or a semicolon between X and Y, which
+parenthetical encloses position X, do two positions sit at different
+parenthetical depths? Answering them by rescanning the text makes each
+citation cost O(document). This module scans a document once and keeps the
+answers in sorted arrays so each query is a bisect:
+
+- sentence breaks (``. A``), year parentheticals (``(1999)``), ``;`` separators,
+  signal words and footnote markers as sorted, non-overlapping spans
+- balanced parenthetical spans as a nesting tree (innermost enclosing span)
+- running parenthesis depth after every ``)`` with a sparse table for range
+  minimum queries (parenthetical boundary between two positions)
+
+Use ``get_boundary_index(text)``; the index for the last few documents is
+cached, so every stage of the pipeline shares one index per document.
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+SENTENCE_BREAK = re.compile(r'\.\s+[A-Z]')
+YEAR_PARENTHETICAL = re.compile(r'\((19|20)\d{2}\)')
+SEMICOLON = re.compile(r'[;]\s+')
+SIGNAL_WORD = re.compile(
+    r'\b(?:see\s+also|see\s+generally|but\s+see|but\s+cf\.|see|cf\.|compare|accord|contra|'
+    r'citing|quoting|e\.g\.)(?=[\s,])',
+    re.IGNORECASE,
+)
+# Footnote markers at the start of a line ("12 The court held ...") or bracketed ("[12]")
+FOOTNOTE_MARKER = re.compile(r'(?m)^[ \t]*\d{1,3}[ \t]+(?=[A-Z])|\[\d{1,3}\]')
+# Structural separators for parenthetical context fallback: , ; : .) ." ).
+SEPARATOR = re.compile(r'[,;:]|\.(?=[)"])|\)(?=\.)')
+
+BOUNDARY_INDEX_CACHE_SIZE = 4
+
+
+class BoundarySpans:
+    """Sorted, non-overlapping match spans of one boundary pattern."""
+
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, matches: Iterable[re.Match]):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        for match in matches:
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def last_within(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Last span lying entirely inside [start, end), like finditer(text, start, end)[-1]."""
+        i = bisect_right(self.ends, end) - 1
+        if i >= 0 and self.starts[i] >= start:
+            return self.starts[i], self.ends[i]
+        return None
+
+    def first_within(self, start: int, end: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """First span lying entirely inside [start, end), like next(finditer(text, start, end))."""
+        i = bisect_left(self.starts, start)
+        if i < len(self.starts) and (end is None or self.ends[i] <= end):
+            return self.starts[i], self.ends[i]
+        return None
+
+    def any_within(self, start: int, end: int) -> bool:
+        return self.first_within(start, end) is not None
+
+
+class TextBoundaryIndex:
+    """Structural boundaries of one document, answered in O(log n)."""
+
+    def __init__(self, text: str):
+        self.length = len(text)
+        self.sentences = BoundarySpans(SENTENCE_BREAK.finditer(text))
+        self.year_parentheticals = BoundarySpans(YEAR_PARENTHETICAL.finditer(text))
+        self.semicolons = BoundarySpans(SEMICOLON.finditer(text))
+        self.signal_words = BoundarySpans(SIGNAL_WORD.finditer(text))
+        self.footnote_markers = BoundarySpans(FOOTNOTE_MARKER.finditer(text))
+        self.separators: List[int] = [m.start() for m in SEPARATOR.finditer(text)]
+        self._index_parentheses(text)
+        self._depth_table: Optional[List[List[int]]] = None
+
+    def _index_parentheses(self, text: str):
+        self._opens: List[int] = []
+        self._closes: List[int] = []
+        # Raw depth (opens minus closes so far) right after each ")"
+        self._depth_after_close: List[int] = []
+        # Balanced spans in order of their "(": closing position (length if unclosed) and parent span
+        self._span_ends: List[int] = []
+        self._span_parents: List[int] = []
+        stack: List[int] = []
+        depth = 0
+        for match in re.finditer(r'[()]', text):
+            position = match.start()
+            if text[position] == '(':
+                self._opens.append(position)
+                self._span_ends.append(self.length)
+                self._span_parents.append(stack[-1] if stack else -1)
+                stack.append(len(self._opens) - 1)
+                depth += 1
+            else:
+                self._closes.append(position)
+                depth -= 1
+                self._depth_after_close.append(depth)
+                if stack:
+                    self._span_ends[stack.pop()] = position
+
+    def _depth_at(self, position: int) -> int:
+        """Raw parenthesis depth of the text before ``position``."""
+        return bisect_left(self._opens, position) - bisect_left(self._closes, position)
+
+    def _min_depth(self, first: int, last: int) -> int:
+        """Minimum of _depth_after_close[first:last] (non-empty) from the sparse table."""
+        if self._depth_table is None:
+            table = [self._depth_after_close]
+            width = 1
+            while width * 2 <= len(self._depth_after_close):
+                previous = table[-1]
+                table.append([min(a, b) for a, b in zip(previous, previous[width:])])
+                width *= 2
+            self._depth_table = table
+        level = (last - first).bit_length() - 1
+        row = self._depth_table[level]
+        return min(row[first], row[last - (1 << level)])
+
+    def parenthetical_boundary_between(self, start: int, end: int) -> bool:
+        """
+        True when [start, end) enters or leaves a parenthetical: its parentheses
+        do not balance, or a ")" closes something opened before ``start``.
+        """
+        if start > end:
+            start, end = end, start
+        base = self._depth_at(start)
+        if self._depth_at(end) != base:
+            return True
+        first = bisect_left(self._closes, start)
+        last = bisect_left(self._closes, end)
+        return first < last and self._min_depth(first, last) < base
+
+    def enclosing_parenthetical_start(self, position: int, max_distance: Optional[int] = None) -> Optional[int]:
+        """Position of the "(" of the innermost parenthetical still open at ``position``."""
+        i = bisect_left(self._opens, position) - 1
+        while i >= 0 and self._span_ends[i] < position:
+            i = self._span_parents[i]
+        if i < 0:
+            return None
+        if max_distance is not None and position - self._opens[i] >= max_distance:
+            return None
+        return self._opens[i]
+
+    def separators_before(self, position: int, lower: int) -> Iterable[int]:
+        """Separator positions in (lower, position), nearest first."""
+        i = bisect_left(self.separators, position) - 1
+        while i >= 0 and self.separators[i] > lower:
+            yield self.separators[i]
+            i -= 1
+
+    def has_boundary_between(self, start: int, end: int) -> bool:
+        """Any sentence break, semicolon, signal word, footnote marker or parenthetical edge in [start, end)."""
+        return (self.sentences.any_within(start, end)
+                or self.semicolons.any_within(start, end)
+                or self.signal_words.any_within(start, end)
+                or self.footnote_markers.any_within(start, end)
+                or self.parenthetical_boundary_between(start, end))
+
+
+@lru_cache(maxsize=BOUNDARY_INDEX_CACHE_SIZE)
+def get_boundary_index(text: str) -> TextBoundaryIndex:
+    """Boundary index for ``text``, built once per document."""
+    return TextBoundaryIndex(text)
@@ -10,21 +10,23 @@ Handles the complete verification flow including:
 """
 
 import asyncio
-from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
+from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT, VERIFICATION_TIMEOUT_MINUTES
 
 import json
 import logging
 import os
+import threading
 import time
 import uuid
+import zlib
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
-from dataclasses import dataclass, asdict
 from enum import Enum
 
 import redis
-from rq import Queue, Worker
-from rq.job import Job
+from rq import Worker
+from rq.exceptions import InvalidJobOperation, NoSuchJobError
+from rq.job import Job, JobStatus
 
 logger = logging.getLogger(__name__)
 
@@ -36,20 +38,213 @@ class VerificationStatus(Enum):
     FAILED = "failed"
     TIMEOUT = "timeout"
 
-@dataclass
-class VerificationMetadata:
-    """Metadata for tracking verification progress"""
-    request_id: str
-    job_id: str
-    status: VerificationStatus
-    started_at: float
-    citations_count: int
-    citations_processed: int = 0
-    progress: float = 0.0
-    current_method: Optional[str] = None
-    completed_at: Optional[float] = None
-    error_message: Optional[str] = None
-    verification_results: Optional[Dict[str, Any]] = None
+
+STATE_KEY_PREFIX = 'casestrainer:verification'
+TERMINAL_STATUSES = (VerificationStatus.COMPLETED.value, VerificationStatus.FAILED.value,
+                     VerificationStatus.TIMEOUT.value)
+_INT_FIELDS = ('citations_count', 'citations_processed')
+_FLOAT_FIELDS = ('started_at', 'updated_at', 'completed_at', 'progress')
+_METHOD_PREFIX = 'method:'
+
+
+class VerificationStateStore:
+    """
+    Verification job state shared by the web and worker processes.
+    
+    Each request is one small Redis hash (status, counts, per-method progress
+    and the key of its results blob), so any process answers a status poll with
+    a single HGETALL. Worker progress writes are buffered and flushed in one
+    pipeline at most every ``flush_interval`` seconds, or immediately when the
+    status changes. Hash and blob carry a TTL, so Redis expires finished jobs
+    on its own. Without Redis the same encoding is kept in-process.
+    """
+    
+    def __init__(self, redis_conn=None, ttl: int = 3600, flush_interval: float = 1.0):
+        self.redis_conn = redis_conn
+        self.ttl = ttl
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, str]] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._memory: Dict[str, Tuple[float, Dict[str, str]]] = {}
+        self._memory_results: Dict[str, Tuple[float, bytes]] = {}
+        self._memory_patches: Dict[str, Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, request_id: str) -> str:
+        return f"{STATE_KEY_PREFIX}:{request_id}"
+    
+    def _results_key(self, request_id: str) -> str:
+        return f"{STATE_KEY_PREFIX}:{request_id}:results"
+    
+    def _patches_key(self, request_id: str) -> str:
+        return f"{STATE_KEY_PREFIX}:{request_id}:patches"
+    
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, str]:
+        encoded = {}
+        for name, value in fields.items():
+            if isinstance(value, Enum):
+                value = value.value
+            encoded[name] = '' if value is None else str(value)
+        return encoded
+    
+    @staticmethod
+    def _decode(raw: Dict[Any, Any]) -> Dict[str, Any]:
+        state: Dict[str, Any] = {'method_progress': {}}
+        for name, value in raw.items():
+            if isinstance(name, bytes):
+                name = name.decode('utf-8')
+            if isinstance(value, bytes):
+                value = value.decode('utf-8')
+            if name.startswith(_METHOD_PREFIX):
+                processed, _, total = value.partition('/')
+                state['method_progress'][name[len(_METHOD_PREFIX):]] = {
+                    'processed': int(processed or 0), 'total': int(total or 0)
+                }
+            elif value == '':
+                state[name] = None
+            elif name in _INT_FIELDS:
+                state[name] = int(value)
+            elif name in _FLOAT_FIELDS:
+                state[name] = float(value)
+            else:
+                state[name] = value
+        return state
+    
+    def _prune_memory(self, now: float):
+        for request_id in [rid for rid, (expires, _) in self._memory.items() if expires < now]:
+            del self._memory[request_id]
+        for request_id in [rid for rid, (expires, _) in self._memory_results.items() if expires < now]:
+            del self._memory_results[request_id]
+        for request_id in [rid for rid, (expires, _) in self._memory_patches.items() if expires < now]:
+            del self._memory_patches[request_id]
+    
+    def update(self, request_id: str, force: bool = False, **fields):
+        """Buffer field updates; flushed on status change, on ``force`` or after ``flush_interval``."""
+        now = time.time()
+        fields['updated_at'] = now
+        with self._lock:
+            self._pending.setdefault(request_id, {}).update(self._encode(fields))
+            due = now - self._last_flush.get(request_id, 0.0) >= self.flush_interval
+        if force or due or 'status' in fields:
+            self.flush(request_id)
+    
+    def update_method_progress(self, request_id: str, method: str, processed: int, total: int, **fields):
+        """Record how far one verification method has got."""
+        fields[f"{_METHOD_PREFIX}{method}"] = f"{processed}/{total}"
+        self.update(request_id, **fields)
+    
+    def flush(self, request_id: Optional[str] = None):
+        """Write buffered updates (for one request, or all) in a single round trip."""
+        with self._lock:
+            request_ids = [request_id] if request_id else list(self._pending)
+            batch = {rid: self._pending.pop(rid) for rid in request_ids if rid in self._pending}
+            now = time.time()
+            for rid in batch:
+                self._last_flush[rid] = now
+        if not batch:
+            return
+        
+        if self.redis_conn is not None:
+            try:
+                pipe = self.redis_conn.pipeline(transaction=False)
+                for rid, fields in batch.items():
+                    pipe.hset(self._key(rid), mapping=fields)
+                    pipe.expire(self._key(rid), self.ttl)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Verification state write to Redis failed, keeping it in-process: {e}")
+        
+        with self._lock:
+            self._prune_memory(now)
+            for rid, fields in batch.items():
+                current = self._memory.get(rid, (0.0, {}))[1]
+                current.update(fields)
+                self._memory[rid] = (now + self.ttl, current)
+    
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Current state for a request, or None if unknown or expired."""
+        self.flush(request_id)
+        if self.redis_conn is not None:
+            try:
+                raw = self.redis_conn.hgetall(self._key(request_id))
+                if raw:
+                    return self._decode(raw)
+            except Exception as e:
+                logger.warning(f"Verification state read from Redis failed: {e}")
+        with self._lock:
+            entry = self._memory.get(request_id)
+            if entry is None or entry[0] < time.time():
+                return None
+            return self._decode(entry[1])
+    
+    def store_results(self, request_id: str, results: Dict[str, Any], **fields):
+        """Store the results blob and point the state hash at it."""
+        blob = zlib.compress(json.dumps(results, default=str).encode('utf-8'), 1)
+        key = self._results_key(request_id)
+        stored = False
+        if self.redis_conn is not None:
+            try:
+                self.redis_conn.setex(key, self.ttl, blob)
+                stored = True
+            except Exception as e:
+                logger.warning(f"Verification results write to Redis failed, keeping them in-process: {e}")
+        if not stored:
+            with self._lock:
+                self._memory_results[request_id] = (time.time() + self.ttl, blob)
+        self.update(request_id, force=True, results_key=key, **fields)
+    
+    def append_patch(self, request_id: str, patch: Dict[str, Any]):
+        """Append a partial result (e.g. newly settled clusters) for streaming clients."""
+        encoded = json.dumps(patch, default=str)
+        if self.redis_conn is not None:
+            try:
+                pipe = self.redis_conn.pipeline(transaction=False)
+                pipe.rpush(self._patches_key(request_id), encoded)
+                pipe.expire(self._patches_key(request_id), self.ttl)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning(f"Verification patch write to Redis failed, keeping it in-process: {e}")
+        now = time.time()
+        with self._lock:
+            self._prune_memory(now)
+            patches = self._memory_patches.get(request_id, (0.0, []))[1]
+            patches.append(encoded)
+            self._memory_patches[request_id] = (now + self.ttl, patches)
+    
+    def get_patches(self, request_id: str, start: int = 0) -> List[Dict[str, Any]]:
+        """Patches appended since index ``start``, oldest first."""
+        raw = None
+        if self.redis_conn is not None:
+            try:
+                raw = self.redis_conn.lrange(self._patches_key(request_id), start, -1)
+            except Exception as e:
+                logger.warning(f"Verification patch read from Redis failed: {e}")
+        if not raw:
+            with self._lock:
+                entry = self._memory_patches.get(request_id)
+                raw = entry[1][start:] if entry is not None and entry[0] >= time.time() else []
+        return [json.loads(item) for item in raw]
+    
+    def get_results(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Results of a finished request, or None."""
+        blob = None
+        if self.redis_conn is not None:
+            try:
+                blob = self.redis_conn.get(self._results_key(request_id))
+            except Exception as e:
+                logger.warning(f"Verification results read from Redis failed: {e}")
+        if blob is None:
+            with self._lock:
+                entry = self._memory_results.get(request_id)
+                if entry is not None and entry[0] >= time.time():
+                    blob = entry[1]
+        if blob is None:
+            return None
+        return json.loads(zlib.decompress(blob))
+
 
 class SmartVerificationStrategy:
     """Smart verification strategy with progressive fallbacks and known citations"""
@@ -157,6 +352,9 @@ class SmartVerificationStrategy:
                 'batch_size': 10
             }
         }
+        
+        # Fraction of citations that must verify before later methods are skipped
+        self.min_coverage = 1.0
     
     def get_method_config(self, method: str) -> Dict[str, Any]:
         """Get configuration for a specific verification method"""
@@ -189,31 +387,38 @@ class SmartVerificationStrategy:
         """Check if we have sufficient verification coverage"""
         if not citations:
             return True
-        results = {}
-        remaining_citations = set(citations)
-        
-        for method in self.verification_priority:
-            if not remaining_citations:
-                break
-                
-            config = self.get_method_config(method)
-            method_citations = list(remaining_citations)[:config['batch_size']]
+        verified = sum(1 for citation in citations if results.get(citation, {}).get('verified'))
+        return verified / len(citations) >= self.min_coverage
+
+
+class VerificationManager:
+    """Runs verification jobs on RQ and tracks their state in a shared store"""
+    
+    def __init__(self, redis_conn=None):
         redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
         self.redis_conn = redis_conn or redis.Redis.from_url(redis_url)
-        self.verification_queue = Queue('casestrainer', connection=self.redis_conn)
-        
-        self.active_verifications: Dict[str, VerificationMetadata] = {}
         
-        self.result_cache: Dict[str, Dict[str, Any]] = {}
         self.cache_ttl = 3600  # 1 hour
+        self.state = VerificationStateStore(self.redis_conn, ttl=self.cache_ttl)
+        self.stale_after = 60  # seconds without a state write before RQ is consulted
         
         self.verification_strategy = SmartVerificationStrategy()
         
-        self.last_cleanup = time.time()
-        self.cleanup_interval = 300  # 5 minutes
-        
         logger.info("VerificationManager initialized")
     
+    def __getstate__(self):
+        # RQ pickles the instance with the bound job method; connections are rebuilt in the worker
+        state = self.__dict__.copy()
+        for name in ('redis_conn', 'state'):
+            state.pop(name, None)
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        redis_url = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
+        self.redis_conn = redis.Redis.from_url(redis_url)
+        self.state = VerificationStateStore(self.redis_conn, ttl=self.cache_ttl)
+    
     def start_verification(self, request_id: str, citations: List[str], 
                           clusters: List[Dict[str, Any]]) -> str:
         """
@@ -227,21 +432,27 @@ class SmartVerificationStrategy:
         Returns:
             Job ID for tracking
         """
+        from src.job_queues import INTERACTIVE, JobScheduler, current_client_id
+        
         try:
-            job = self.verification_queue.enqueue(
+            job = JobScheduler(self.redis_conn).enqueue(
                 self._verify_citations_async,
                 request_id,
                 citations,
                 clusters,
+                job_class=INTERACTIVE,
+                client_id=current_client_id(),
                 job_timeout=VERIFICATION_TIMEOUT_MINUTES * 60  # 5 minutes total timeout
             )
             
-            self.active_verifications[request_id] = VerificationMetadata(
-                request_id=request_id,
+            self.state.update(
+                request_id,
                 job_id=job.id,
                 status=VerificationStatus.QUEUED,
                 started_at=time.time(),
-                citations_count=len(citations)
+                citations_count=len(citations),
+                citations_processed=0,
+                progress=0.0
             )
             
             logger.info(f"Verification started for request {request_id}, job {job.id}")
@@ -249,45 +460,82 @@ class SmartVerificationStrategy:
             
         except Exception as e:
             logger.error(f"Failed to start verification for request {request_id}: {e}")
-            if request_id in self.active_verifications:
-                self.active_verifications[request_id].status = VerificationStatus.FAILED
-                self.active_verifications[request_id].error_message = str(e)
+            self.state.update(request_id, status=VerificationStatus.FAILED, error_message=str(e))
             raise
     
     def get_verification_status(self, request_id: str) -> Optional[Dict[str, Any]]:
         """Get current verification status for a request"""
-        if request_id not in self.active_verifications:
+        status = self.state.get(request_id)
+        if status is None:
             return None
         
-        metadata = self.active_verifications[request_id]
-        
-        if metadata.status == VerificationStatus.RUNNING:
+        # A worker that died mid-job stops refreshing its hash; only then ask RQ
+        stale = time.time() - (status.get('updated_at') or 0) > self.stale_after
+        if status.get('status') not in TERMINAL_STATUSES and stale and status.get('job_id'):
             try:
-                job = Job.fetch(metadata.job_id, connection=self.redis_conn)
-                if job.is_finished:
-                    metadata.status = VerificationStatus.COMPLETED
-                    metadata.completed_at = time.time()
-                elif job.is_failed:
-                    metadata.status = VerificationStatus.FAILED
-                    metadata.error_message = str(job.exc_info)
+                try:
+                    job = Job.fetch(status['job_id'], connection=self.redis_conn)
+                    job_status = job.get_status()
+                except (NoSuchJobError, InvalidJobOperation):
+                    job, job_status = None, None  # expired from Redis, or never written
+                if job_status is None:
+                    self.state.update(request_id, status=VerificationStatus.FAILED,
+                                      error_message=f"Verification job {status['job_id']} expired or was lost")
+                    status = self.state.get(request_id)
+                elif job_status == JobStatus.FAILED:
+                    self.state.update(request_id, status=VerificationStatus.FAILED,
+                                      error_message=str(job.exc_info))
+                    status = self.state.get(request_id)
             except Exception as e:
                 logger.warning(f"Error checking job status for {request_id}: {e}")
         
-        return asdict(metadata)
+        return status
     
     def get_verification_results(self, request_id: str) -> Optional[Dict[str, Any]]:
         """Get verification results for a completed request"""
-        if request_id in self.result_cache:
-            return self.result_cache[request_id]
+        return self.state.get_results(request_id)
+    
+    def start_deferred_verification(self, request_id: str, citations: List[Dict[str, Any]],
+                                    clusters: List[Dict[str, Any]]) -> str:
+        """
+        Verify an already returned, unverified result in the background
         
-        status = self.get_verification_status(request_id)
-        if status and status['status'] == VerificationStatus.COMPLETED:
-            metadata = self.active_verifications[request_id]
-            if metadata.verification_results:
-                self.result_cache[request_id] = metadata.verification_results
-                return metadata.verification_results
+        Args:
+            request_id: Request the unverified response was sent for
+            citations: Citation dicts of that response
+            clusters: Cluster dicts of that response
+            
+        Returns:
+            Job ID for tracking
+        """
+        from src.job_queues import INTERACTIVE, JobScheduler, current_client_id
         
-        return None
+        self.state.update(
+            request_id,
+            status=VerificationStatus.QUEUED,
+            started_at=time.time(),
+            citations_count=len(citations),
+            citations_processed=0,
+            progress=0.0
+        )
+        try:
+            job = JobScheduler(self.redis_conn).enqueue(
+                'src.verification_manager.run_deferred_verification',
+                request_id,
+                citations,
+                clusters,
+                job_class=INTERACTIVE,
+                client_id=current_client_id(),
+                job_timeout=VERIFICATION_TIMEOUT_MINUTES * 60
+            )
+        except Exception as e:
+            logger.error(f"Failed to start deferred verification for request {request_id}: {e}")
+            self.state.update(request_id, status=VerificationStatus.FAILED, error_message=str(e))
+            raise
+        
+        self.state.update(request_id, force=True, job_id=job.id)
+        logger.info(f"Deferred verification started for request {request_id}, job {job.id}")
+        return job.id
     
     def _verify_citations_async(self, request_id: str, citations: List[str], 
                                 clusters: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -303,19 +551,15 @@ class SmartVerificationStrategy:
             Verification results
         """
         try:
-            if request_id in self.active_verifications:
-                self.active_verifications[request_id].status = VerificationStatus.RUNNING
-                self.active_verifications[request_id].current_method = "Starting verification"
+            self.state.update(request_id, status=VerificationStatus.RUNNING,
+                              current_method="Starting verification")
             
             results = self._progressive_verification(request_id, citations, clusters)
             
-            if request_id in self.active_verifications:
-                self.active_verifications[request_id].status = VerificationStatus.COMPLETED
-                self.active_verifications[request_id].completed_at = time.time()
-                self.active_verifications[request_id].verification_results = results
-                self.active_verifications[request_id].progress = 100.0
-            
-            self.result_cache[request_id] = results
+            self.state.store_results(request_id, results,
+                                     status=VerificationStatus.COMPLETED,
+                                     completed_at=time.time(),
+                                     progress=100.0)
             
             logger.info(f"Verification completed for request {request_id}")
             return results
@@ -323,9 +567,7 @@ class SmartVerificationStrategy:
         except Exception as e:
             logger.error(f"Verification failed for request {request_id}: {e}")
             
-            if request_id in self.active_verifications:
-                self.active_verifications[request_id].status = VerificationStatus.FAILED
-                self.active_verifications[request_id].error_message = str(e)
+            self.state.update(request_id, status=VerificationStatus.FAILED, error_message=str(e))
             
             return {
                 'error': str(e),
@@ -470,15 +712,14 @@ class SmartVerificationStrategy:
         
         for method in self.verification_strategy.verification_priority:
             try:
-                if request_id in self.active_verifications:
-                    self.active_verifications[request_id].current_method = f"Using {method}"
+                self.state.update(request_id, current_method=f"Using {method}")
                 
                 config = self.verification_strategy.get_method_config(method)
                 
                 # For citation_lookup_v4, skip citations that are already in our known citations
                 if method == 'citation_lookup_v4':
                     citations_to_process = [c for c in citations 
-                                         if not self.get_known_citation(c)]
+                                         if not self.verification_strategy.get_known_citation(c)]
                     if not citations_to_process:
                         continue
                 else:
@@ -490,11 +731,13 @@ class SmartVerificationStrategy:
                 
                 all_results.update(method_results)
                 
-                if request_id in self.active_verifications:
-                    processed = len([r for r in all_results.values() if r.get('verified', False)])
-                    progress = (processed / total_citations) * 100
-                    self.active_verifications[request_id].citations_processed = processed
-                    self.active_verifications[request_id].progress = min(progress, 100.0)
+                processed = len([r for r in all_results.values() if r.get('verified', False)])
+                progress = (processed / total_citations) * 100 if total_citations else 100.0
+                method_verified = sum(1 for r in method_results.values() if r.get('verified', False))
+                self.state.update_method_progress(
+                    request_id, method, method_verified, len(citations_to_process),
+                    citations_processed=processed, progress=min(progress, 100.0)
+                )
                 
                 if self.verification_strategy._has_sufficient_coverage(all_results, citations):
                     logger.info(f"Sufficient coverage achieved with {method}, stopping verification")
@@ -879,41 +1122,124 @@ class SmartVerificationStrategy:
         
         return updated_clusters
     
-    def cleanup_old_verifications(self):
-        """Clean up old verification data to prevent memory bloat"""
-        current_time = time.time()
-        
-        if current_time - self.last_cleanup < self.cleanup_interval:
-            return
-        
-        old_request_ids = []
-        for request_id, metadata in self.active_verifications.items():
-            if (metadata.status in [VerificationStatus.COMPLETED, VerificationStatus.FAILED] and
-                current_time - metadata.started_at > self.cache_ttl):
-                old_request_ids.append(request_id)
-        
-        for request_id in old_request_ids:
-            del self.active_verifications[request_id]
-            if request_id in self.result_cache:
-                del self.result_cache[request_id]
-        
-        if old_request_ids:
-            logger.info(f"Cleaned up {len(old_request_ids)} old verifications")
-        
-        self.last_cleanup = current_time
-    
     def get_performance_stats(self) -> Dict[str, Any]:
         """Get performance statistics for monitoring"""
-        self.cleanup_old_verifications()
+        from src.job_queues import INTERACTIVE, queue_for
         
         return {
-            'active_verifications': len(self.active_verifications),
-            'cached_results': len(self.result_cache),
-            'verification_status_counts': {
-                status.value: sum(1 for v in self.active_verifications.values() 
-                                if v.status == status)
-                for status in VerificationStatus
-            },
-            'queue_size': len(self.verification_queue),
-            'cache_ttl': self.cache_ttl
+            'queue_size': queue_for(INTERACTIVE, self.redis_conn).count,
+            'cache_ttl': self.cache_ttl,
+            'state_flush_interval': self.state.flush_interval
         }
+
+
+DEFERRED_VERIFICATION_BATCH = 10  # citations per lookup; each batch patches the clusters it settles
+
+
+def _cluster_patch(cluster: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'cluster_id': cluster.get('cluster_id'),
+        'verified': cluster.get('verified', False),
+        'canonical_name': cluster.get('canonical_name'),
+        'canonical_date': cluster.get('canonical_date'),
+        'canonical_url': cluster.get('canonical_url'),
+    }
+
+
+def _citation_patch(citation: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'citation': citation.get('citation'),
+        'cluster_id': citation.get('cluster_id'),
+        'verified': citation.get('verified', False),
+        'true_by_parallel': citation.get('true_by_parallel', False),
+        'canonical_name': citation.get('canonical_name'),
+        'canonical_date': citation.get('canonical_date'),
+        'canonical_url': citation.get('canonical_url'),
+        'verification_source': citation.get('verification_source'),
+    }
+
+
+def run_deferred_verification(request_id: str, citations: List[Dict[str, Any]],
+                              clusters: List[Dict[str, Any]], manager: Optional[VerificationManager] = None
+                              ) -> Dict[str, Any]:
+    """
+    RQ job behind ``VerificationManager.start_deferred_verification``.
+    
+    Unique citations are verified in batches. After each batch every cluster
+    whose citations all have an outcome is appended to the request's patch log
+    (with its citations), so /analyze/verification-stream can update the
+    response the client already shows. The full result is stored at the end.
+    """
+    from src.bulk_processing import apply_verification, normalize_citation_key
+    from src.unified_verification_master import get_master_verifier
+    
+    manager = manager or VerificationManager()
+    state = manager.state
+    record = {'citations': citations, 'clusters': clusters}
+    
+    unique: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+    members: Dict[Any, set] = {}
+    for citation in citations:
+        key = normalize_citation_key(citation.get('citation'))
+        if not key:
+            continue
+        unique.setdefault(key, (citation.get('extracted_case_name'), citation.get('extracted_date')))
+        members.setdefault(citation.get('cluster_id') or key, set()).add(key)
+    texts = list(unique)
+    
+    results: Dict[str, Any] = {}
+    settled: set = set()
+    
+    def publish_settled():
+        apply_verification(record, results)
+        group_ids = [gid for gid, keys in members.items() if gid not in settled and keys <= results.keys()]
+        if not group_ids:
+            return
+        settled.update(group_ids)
+        ready = set(group_ids)
+        state.append_patch(request_id, {
+            'clusters': [_cluster_patch(c) for c in clusters if c.get('cluster_id') in ready],
+            'citations': [_citation_patch(c) for c in citations
+                          if (c.get('cluster_id') or normalize_citation_key(c.get('citation'))) in ready],
+        })
+    
+    async def verify_in_batches():
+        verifier = get_master_verifier()
+        for start in range(0, len(texts), DEFERRED_VERIFICATION_BATCH):
+            batch = texts[start:start + DEFERRED_VERIFICATION_BATCH]
+            fresh = await verifier.verify_citations_batch(
+                batch, [unique[t][0] for t in batch], [unique[t][1] for t in batch])
+            results.update(zip(batch, fresh))
+            publish_settled()
+            state.update(request_id, citations_processed=len(results),
+                         progress=100.0 * len(results) / len(texts))
+    
+    try:
+        state.update(request_id, status=VerificationStatus.RUNNING, citations_count=len(texts),
+                     current_method="Batch verification")
+        asyncio.run(verify_in_batches())
+        apply_verification(record, results)
+        record.pop('verification', None)
+        
+        verified_count = sum(1 for r in results.values() if r.verified)
+        verification = {
+            'status': 'completed',
+            'citations': citations,
+            'clusters': clusters,
+            'verification_summary': {
+                'total_citations': len(texts),
+                'verified_citations': verified_count,
+                'verification_coverage': verified_count / len(texts) if texts else 0.0,
+            }
+        }
+        state.store_results(request_id, verification,
+                            status=VerificationStatus.COMPLETED,
+                            completed_at=time.time(),
+                            progress=100.0)
+        logger.info(f"Deferred verification completed for request {request_id}: {verified_count}/{len(texts)} verified")
+        return verification['verification_summary']
+        
+    except Exception as e:
+        logger.error(f"Deferred verification failed for request {request_id}: {e}")
+        state.update(request_id, status=VerificationStatus.FAILED, error_message=str(e))
+        return {'status': 'failed', 'error': str(e)}
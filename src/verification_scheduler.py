@@ -0,0 +1,217 @@
+"""
+ML triage for verification work.
+
+Verification is the expensive part of the pipeline: every citation costs one
+or more API/web round trips. The scheduler scores all of a document's
+citations with one batched call to the ML classifier and then
+
+- verifies likely-valid, high-value citations first,
+- defers low-scoring citations until everything else is done,
+- skips obvious junk outright, and
+- stops starting new batches when the per-document time budget would be
+  exceeded, so the budget goes to the citations whose verification changes
+  the result.
+
+Without a trained, two-class model the scheduler only orders citations by a
+structural heuristic and never skips or defers anything.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Sequence
+
+from src.config import (
+    ML_TRIAGE_DEFER_BELOW,
+    ML_TRIAGE_ENABLED,
+    ML_TRIAGE_SKIP_BELOW,
+    VERIFICATION_TIME_BUDGET,
+)
+
+logger = logging.getLogger(__name__)
+
+VERIFY = 'verify'
+DEFER = 'defer'
+SKIP = 'skip'
+
+# Reporters whose citations anchor a cluster (official or high-court reporters)
+_PRIMARY_REPORTER = re.compile(r"\b(?:U\.\s?S\.|Wn\.\s?2d|Wash\.\s?2d|S\.\s?Ct\.)")
+_SECONDARY_REPORTER = re.compile(r"\b(?:F\.\s?(?:2d|3d|4th)|P\.\s?(?:2d|3d)|Wn\.\s?App\.|Wash\.\s?App\.)")
+_VOLUME_PAGE = re.compile(r"\b\d+\s+[A-Za-z][A-Za-z.\s\d]*?\s+\d+\b")
+
+
+def _citation_text(citation: Any) -> str:
+    return citation if isinstance(citation, str) else getattr(citation, 'citation', str(citation))
+
+
+@dataclass
+class ScheduledCitation:
+    """One citation with its triage score and decision."""
+    citation: Any
+    text: str
+    score: float
+    value: float
+    decision: str = VERIFY
+
+    @property
+    def priority(self) -> float:
+        return self.score * self.value
+
+
+@dataclass
+class VerificationPlan:
+    """Citations split by triage decision, each list in priority order."""
+    verify: List[ScheduledCitation] = field(default_factory=list)
+    deferred: List[ScheduledCitation] = field(default_factory=list)
+    skipped: List[ScheduledCitation] = field(default_factory=list)
+    model_used: bool = False
+
+    def summary(self) -> dict:
+        return {
+            'verify': len(self.verify),
+            'deferred': len(self.deferred),
+            'skipped': len(self.skipped),
+            'model_used': self.model_used,
+        }
+
+
+class VerificationScheduler:
+    """Orders, defers and budgets citation verification using ML scores."""
+
+    def __init__(self, classifier=None, skip_below: float = ML_TRIAGE_SKIP_BELOW,
+                 defer_below: float = ML_TRIAGE_DEFER_BELOW,
+                 seconds_per_citation: float = 0.5):
+        self.classifier = classifier
+        self.skip_below = skip_below
+        self.defer_below = defer_below
+        self.seconds_per_citation = seconds_per_citation
+
+    def _get_classifier(self):
+        if self.classifier is None:
+            try:
+                from src.ml_citation_classifier import get_citation_classifier
+                self.classifier = get_citation_classifier()
+            except Exception as e:
+                logger.info(f"ML triage unavailable, using heuristic ordering: {e}")
+                self.classifier = False
+        return self.classifier or None
+
+    @staticmethod
+    def heuristic_score(text: str) -> float:
+        """Structural likelihood that a citation is real, for use without a model."""
+        if not _VOLUME_PAGE.search(text):
+            return 0.1
+        if _PRIMARY_REPORTER.search(text) or _SECONDARY_REPORTER.search(text):
+            return 0.8
+        return 0.5
+
+    def score(self, texts: Sequence[str]) -> List[float]:
+        """P(valid) for each citation, from one batched model call when a model is trained."""
+        classifier = self._get_classifier()
+        if classifier is not None and classifier.is_informative and texts:
+            try:
+                return [float(s) for s in classifier.predict_many(texts)]
+            except Exception as e:
+                logger.warning(f"ML triage scoring failed, using heuristic ordering: {e}")
+        return [self.heuristic_score(text) for text in texts]
+
+    @staticmethod
+    def citation_value(citation: Any, text: str, occurrences: int = 1) -> float:
+        """How much verifying this citation is worth to the final result."""
+        value = 1.0
+        if _PRIMARY_REPORTER.search(text):
+            value += 0.5
+        elif _SECONDARY_REPORTER.search(text):
+            value += 0.25
+        if getattr(citation, 'extracted_case_name', None) not in (None, '', 'N/A'):
+            value += 0.25
+        if getattr(citation, 'parallel_citations', None):
+            value += 0.25  # one lookup resolves the whole parallel group
+        if occurrences > 1:
+            value += 0.25 * math.log2(occurrences)
+        return value
+
+    def plan(self, citations: Sequence[Any]) -> VerificationPlan:
+        """Score every citation in one batch and decide verify/defer/skip."""
+        texts = [_citation_text(c) for c in citations]
+        classifier = self._get_classifier()
+        model_used = bool(classifier is not None and classifier.is_informative)
+        scores = self.score(texts)
+        occurrences = Counter(texts)
+
+        plan = VerificationPlan(model_used=model_used)
+        for citation, text, score in zip(citations, texts, scores):
+            item = ScheduledCitation(citation, text, score,
+                                     self.citation_value(citation, text, occurrences[text]))
+            if model_used and score < self.skip_below:
+                item.decision = SKIP
+                plan.skipped.append(item)
+            elif model_used and score < self.defer_below:
+                item.decision = DEFER
+                plan.deferred.append(item)
+            else:
+                plan.verify.append(item)
+
+        for items in (plan.verify, plan.deferred, plan.skipped):
+            items.sort(key=lambda item: item.priority, reverse=True)
+        return plan
+
+    def run(self, plan: VerificationPlan, verify_batch: Callable[[List[Any]], Any],
+            batch_size: int = 50, time_budget: Optional[float] = None) -> List[Any]:
+        """
+        Verify planned citations in priority order within a time budget.
+
+        Args:
+            plan: Plan from plan()
+            verify_batch: Called with each batch of original citation objects
+            batch_size: Citations per verify_batch call
+            time_budget: Seconds for the whole document (None/0 = unlimited)
+
+        Returns:
+            Citations that were not verified because the budget ran out
+        """
+        queue = [item.citation for item in plan.verify + plan.deferred]
+        started = time.monotonic()
+        per_citation = self.seconds_per_citation
+        done = 0
+
+        while done < len(queue):
+            batch = queue[done:done + batch_size]
+            elapsed = time.monotonic() - started
+            if time_budget and done and elapsed + per_citation * len(batch) > time_budget:
+                logger.info(f"[TRIAGE] Time budget of {time_budget}s reached after {done} citations; "
+                            f"{len(queue) - done} left unverified")
+                return queue[done:]
+            batch_started = time.monotonic()
+            verify_batch(batch)
+            # Smoothed cost estimate so the budget check tracks the live API latency
+            observed = (time.monotonic() - batch_started) / len(batch)
+            per_citation = 0.5 * per_citation + 0.5 * observed
+            done += len(batch)
+
+        return []
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_verification_scheduler() -> Optional[VerificationScheduler]:
+    """Get the process-wide scheduler, or None when ML triage is disabled."""
+    global _scheduler
+    if not ML_TRIAGE_ENABLED:
+        return None
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = VerificationScheduler()
+    return _scheduler
+
+
+def default_time_budget() -> Optional[float]:
+    """Configured per-document verification budget in seconds (None = unlimited)."""
+    return VERIFICATION_TIME_BUDGET or None
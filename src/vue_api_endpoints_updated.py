@@ -4,7 +4,7 @@ Main API routes for the CaseStrainer application
 """
 
 import os
-from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
+from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT, FILE_PROCESSING_TIMEOUT_MINUTES
 
 import sys
 import uuid
@@ -12,18 +12,29 @@ import logging
 import traceback
 import time
 import json
-import copy
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urlparse
 from typing import Dict, Any, Optional, List, Union
-from flask import Blueprint, request, jsonify, current_app, Response
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from src.api.services.citation_service import CitationService
 from src.database_manager import get_database_manager
 from src.data_separation_validator import validate_data_separation, enforce_data_separation, restore_extracted_name_if_contaminated
+from src.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, get_metrics, time_stage
 
-from src.rq_worker import process_citation_task_direct
-# UnifiedInputProcessor is imported locally where needed to avoid startup issues
+# Worker code (src.rq_worker and the engines behind it) is never imported by the web
+# process: jobs are enqueued by dotted path and UnifiedInputProcessor is imported
+# locally where needed.
+PROCESS_CITATION_TASK = 'src.rq_worker.process_citation_task_direct'
+
+# Small /analyze/stream requests run in-process on a few threads; anything larger
+# goes to the RQ workers. A full pool answers 503 instead of queueing in waitress.
+STREAM_INLINE_WORKERS = int(os.environ.get('STREAM_INLINE_WORKERS', 2))
+_stream_executor = ThreadPoolExecutor(max_workers=STREAM_INLINE_WORKERS, thread_name_prefix='analyze-stream')
+_stream_slots = threading.BoundedSemaphore(STREAM_INLINE_WORKERS)
 
 logger = logging.getLogger(__name__)
 
@@ -172,6 +183,76 @@ def db_stats():
         logger.error(f"Database stats error: {e}")
         return jsonify({'error': 'Database stats unavailable'}), 503
 
+@vue_api.route('/queue_stats', methods=['GET'])
+def queue_stats():
+    """Depth and queue-wait times of the interactive, bulk and maintenance queues"""
+    try:
+        from redis import Redis
+        from src.job_queues import queue_wait_stats
+        redis_url = os.environ.get('REDIS_URL', 'redis://:caseStrainerRedis123@casestrainer-redis-prod:6379/0')
+        return jsonify(queue_wait_stats(Redis.from_url(redis_url)))
+    except Exception as e:
+        logger.error(f"Queue stats error: {e}")
+        return jsonify({'error': 'Queue stats unavailable'}), 503
+
+@vue_api.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage, verification, queue-wait and request metrics of all processes, in Prometheus text format"""
+    return Response(get_metrics().render(), content_type=METRICS_CONTENT_TYPE)
+
+def _is_admin_request():
+    """Admin endpoints are enabled by setting ADMIN_TOKEN and require it in X-Admin-Token"""
+    token = os.environ.get('ADMIN_TOKEN')
+    return bool(token) and hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token)
+
+@vue_api.route('/admin/profiler', methods=['POST'])
+def start_profiler():
+    """
+    Switch the sampling profiler on without a restart.
+
+    JSON body: ``{"job_id": ...}`` profiles that queued job, or
+    ``{"seconds": 60, "scope": "web" | "workers" | "all"}`` opens a window.
+    """
+    if not _is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    from src import sampling_profiler
+    data = request.get_json(silent=True) or {}
+    try:
+        if data.get('job_id'):
+            from redis import Redis
+            from src.job_queues import fetch_job
+            redis_url = os.environ.get('REDIS_URL', 'redis://:caseStrainerRedis123@casestrainer-redis-prod:6379/0')
+            job = fetch_job(data['job_id'], Redis.from_url(redis_url))
+            if job is None:
+                return jsonify({'error': 'Job not found'}), 404
+            if job.get_status() != 'queued':
+                return jsonify({'error': 'Only queued jobs can be flagged for profiling'}), 409
+            job.meta['profile'] = True
+            job.save_meta()
+            profile_id = job.id
+        else:
+            profile_id = sampling_profiler.start_window(data.get('seconds', 60), data.get('scope', 'all'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'profile_id': profile_id, 'profile_url': f'/casestrainer/api/admin/profiler/{profile_id}'})
+
+@vue_api.route('/admin/profiler/<profile_id>', methods=['GET'])
+def profiler_results(profile_id):
+    """Folded stacks of a profile (flamegraph.pl / speedscope input), or its metadata with ?format=json"""
+    if not _is_admin_request():
+        return jsonify({'error': 'Forbidden'}), 403
+    from src.sampling_profiler import get_profile_store
+    store = get_profile_store()
+    if request.args.get('format') == 'json':
+        profile = store.load(profile_id)
+        if profile is None:
+            return jsonify({'error': 'Profile not found'}), 404
+        return jsonify({'profile_id': profile_id, 'meta': profile['meta'], 'stacks': len(profile['stacks'])})
+    folded = store.folded(profile_id)
+    if folded is None:
+        return jsonify({'error': 'Profile not found'}), 404
+    return Response(folded, mimetype='text/plain')
+
 @vue_api.route('/analyze', methods=['POST'])
 def analyze():
     """
@@ -303,11 +384,35 @@ def analyze():
                 elif data.get('type') == 'text' and data.get('text'):
                     text_data = data['text']
                     input_dict = {'type': 'text', 'text': text_data}
-                    
+
+                    if data.get('incremental') and data.get('document_id'):
+                        # Resubmission of an edited document: only the changed paragraphs are reprocessed.
+                        # Small re-analyses run inline; first and full runs are sized like any other text.
+                        logger.info(f"[Request {request_id}] Incremental analysis for document {data['document_id']}")
+                        try:
+                            from src.incremental_analysis import get_incremental_analyzer
+                            from src.job_queues import current_client_id
+                            analyzer = get_incremental_analyzer()
+                            document_id, owner = str(data['document_id']), current_client_id()
+                            plan = analyzer.plan(document_id, text_data, owner)
+                            if plan['reprocessed_chars'] < service.SYNC_THRESHOLD:
+                                result = analyzer.analyze(document_id, text_data, owner, diff=plan.get('diff'))
+                                result['request_id'] = request_id
+                                result['metadata'].update({
+                                    'processing_mode': 'incremental',
+                                    'input_type': 'text',
+                                    'text_length': len(text_data)
+                                })
+                                return _format_response(result, request_id, metadata, start_time)
+                            return _queue_incremental_analysis(service, request_id, document_id, text_data, owner, plan)
+                        except Exception as e:
+                            logger.error(f"[Request {request_id}] Error in incremental analysis: {str(e)}", exc_info=True)
+
                     if service.should_process_immediately(input_dict):
                         logger.info(f"[Request {request_id}] Processing JSON text immediately (short text)")
                         try:
-                            result = service.process_immediately(input_dict)
+                            result = _process_text_immediately(service, input_dict, request_id,
+                                                               bool(data.get('defer_verification')))
                             
                             result['request_id'] = request_id
                             if 'metadata' not in result:
@@ -335,7 +440,8 @@ def analyze():
                     if service.should_process_immediately(input_dict):
                         logger.info(f"[Request {request_id}] Processing legacy JSON text immediately (short text)")
                         try:
-                            result = service.process_immediately(input_dict)
+                            result = _process_text_immediately(service, input_dict, request_id,
+                                                               bool(data.get('defer_verification')))
                             
                             result['request_id'] = request_id
                             if 'metadata' not in result:
@@ -565,6 +671,62 @@ def analyze():
         )
 
 
+def _process_text_immediately(service, input_dict, request_id, defer_verification=False):
+    """
+    Run the sync path. With ``defer_verification`` the response carries extracted
+    citations and clusters with ``verification: 'pending'``; verification runs in
+    a worker and its cluster patches arrive on /analyze/verification-stream/<request_id>.
+    """
+    if not defer_verification:
+        return service.process_immediately(input_dict)
+    
+    result = service.process_immediately(input_dict, defer_verification=True)
+    if result.get('verification') != 'pending':
+        return result
+    try:
+        from src.verification_manager import VerificationManager
+        VerificationManager().start_deferred_verification(request_id, result['citations'], result.get('clusters', []))
+    except Exception as e:
+        logger.warning(f"[Request {request_id}] Could not defer verification, verifying inline: {e}")
+        return service.process_immediately(input_dict)
+    result['verification_stream_url'] = f"/casestrainer/api/analyze/verification-stream/{request_id}"
+    return result
+
+
+def _queue_incremental_analysis(service, request_id, document_id, text, owner, plan):
+    """Queue an incremental analysis that is too large to run in the web process."""
+    from redis import Redis
+    from src.job_queues import JobScheduler
+    
+    redis_url = os.environ.get('REDIS_URL', 'redis://:caseStrainerRedis123@casestrainer-redis-prod:6379/0')
+    JobScheduler(Redis.from_url(redis_url)).enqueue(
+        'src.incremental_analysis.analyze_document_task',
+        args=(request_id, document_id, text, owner, plan.get('diff')),
+        job_id=request_id,
+        job_timeout=FILE_PROCESSING_TIMEOUT_MINUTES * 60,
+        result_ttl=86400,
+        failure_ttl=86400,
+        job_class=service.determine_job_class(text_length=plan['reprocessed_chars']),
+        client_id=owner
+    )
+    logger.info(f"[Request {request_id}] Incremental analysis queued ({plan['mode']}, "
+                f"{plan['reprocessed_chars']} chars to reprocess)")
+    return jsonify({
+        'task_id': request_id,
+        'status': 'processing',
+        'message': 'Incremental analysis started',
+        'request_id': request_id,
+        'success': True,
+        'metadata': {
+            'input_type': 'text',
+            'text_length': len(text),
+            'processing_mode': 'queued',
+            'incremental': {'mode': plan['mode'], 'reprocessed_chars': plan['reprocessed_chars']}
+        }
+    })
+
+
+@time_stage('serialization')
 def _format_response(result, request_id, metadata, start_time):
     """Format a successful response with consistent structure"""
     processing_time_ms = int((time.time() - start_time) * 1000)
@@ -603,7 +765,8 @@ def _format_response(result, request_id, metadata, start_time):
         })
         response_data['result']['task_id'] = result['task_id']  # Also add inside result
     
-    for key in ['message', 'warnings', 'debug', 'verification_status', 'async_verification_queued']:
+    for key in ['message', 'warnings', 'debug', 'verification_status', 'async_verification_queued',
+                'verification', 'verification_stream_url']:
         if key in result and key not in response_data:
             response_data[key] = result[key]
     
@@ -614,14 +777,16 @@ def _format_response(result, request_id, metadata, start_time):
         # Log the validation errors but don't fail the request - let frontend handle it
         response_data['metadata']['validation_warnings'] = validation_errors
     
-    log_data = copy.deepcopy(response_data)
+    # The log record summarizes long lists, so a shallow copy is enough; a deep copy
+    # (and logging the full response) kept a second copy of every citation alive
+    log_data = {**response_data, 'result': dict(response_data['result'])}
     
     def safe_serialize(obj):
         """Safely serialize objects to JSON, handling custom objects"""
-        if hasattr(obj, '__dict__'):
-            return obj.__dict__
-        elif hasattr(obj, 'to_dict'):
+        if hasattr(obj, 'to_dict'):
             return obj.to_dict()
+        elif hasattr(obj, '__dict__'):
+            return obj.__dict__
         elif isinstance(obj, (list, tuple)):
             return [safe_serialize(item) for item in obj]
         elif isinstance(obj, dict):
@@ -647,7 +812,7 @@ def _format_response(result, request_id, metadata, start_time):
     try:
         os.makedirs('/app/logs', exist_ok=True)
         
-        serializable_data = safe_serialize(response_data)
+        serializable_data = safe_serialize(log_data)
         
         with open('/app/logs/frontend_api_results.log', 'a', encoding='utf-8') as f:
             f.write(json.dumps(serializable_data, ensure_ascii=False) + '\n')
@@ -742,12 +907,10 @@ def task_status(task_id):
                 'clusters': []
             }), 500
         
-        queue = Queue('casestrainer', connection=redis_conn)
+        from src.job_queues import fetch_job
         
-        job_ids = queue.job_ids
-        logger.info(f"Found {len(job_ids)} jobs in queue. Job IDs: {job_ids}")
-        
-        job = queue.fetch_job(task_id)
+        # The job may sit on any of the priority queues
+        job = fetch_job(task_id, redis_conn)
         
         if not job:
             logger.warning(f"Job {task_id} not found in queue")
@@ -765,6 +928,23 @@ def task_status(task_id):
         logger.info(f"Job {task_id} is_started: {job.is_started}")
         logger.info(f"Job {task_id} is_queued: {job.is_queued}")
         
+        result_ref = (job.meta or {}).get('result_ref')
+        if job.is_finished and result_ref:
+            # The job only holds a pointer; stream the stored payload without parsing it
+            from src.result_store import get_result_store, with_envelope
+            payload = get_result_store().iter_json(task_id)
+            if payload is None:
+                return jsonify({
+                    'status': 'failed',
+                    'task_id': task_id,
+                    'error': 'Results expired',
+                    'success': False,
+                    'citations': [],
+                    'clusters': []
+                }), 410
+            envelope = {'status': 'completed', 'task_id': task_id, 'is_finished': True, 'success': True}
+            return Response(stream_with_context(with_envelope(envelope, payload)), mimetype='application/json')
+        
         result = None
         if job.is_finished:
             try:
@@ -838,7 +1018,7 @@ def task_status(task_id):
         
         else:
             try:
-                position = queue.get_job_position(task_id)
+                position = Queue(job.origin, connection=redis_conn).get_job_position(task_id)
             except Exception as e:
                 logger.warning(f"Could not get job position: {e}")
                 position = -1
@@ -1126,16 +1306,14 @@ def _handle_file_upload(service, request_id):
             should_process_immediately = service.should_process_immediately(input_data)
             
             if not should_process_immediately:
-                from rq import Queue
                 from redis import Redis
-                from src.rq_worker import process_citation_task_direct
+                from src.job_queues import JobScheduler, current_client_id
                 
                 redis_url = os.environ.get('REDIS_URL', 'redis://:caseStrainerRedis123@casestrainer-redis-prod:6379/0')
                 redis_conn = Redis.from_url(redis_url)
-                queue = Queue('casestrainer', connection=redis_conn)
                 
-                job = queue.enqueue(
-                    process_citation_task_direct,
+                job = JobScheduler(redis_conn).enqueue(
+                    PROCESS_CITATION_TASK,
                     args=(request_id, 'file', {
                         'file_path': file_path,
                         'filename': filename,
@@ -1143,7 +1321,9 @@ def _handle_file_upload(service, request_id):
                     }),
                     job_timeout=FILE_PROCESSING_TIMEOUT_MINUTES * 60,  # 10 minutes timeout (optimized)
                     result_ttl=86400,  # Keep results for 24 hours
-                    failure_ttl=86400  # Keep failed jobs for 24 hours
+                    failure_ttl=86400,  # Keep failed jobs for 24 hours
+                    job_class=service.determine_job_class(file_size=file_size),
+                    client_id=current_client_id()
                 )
                 
                 logger.info(f"[File Upload {request_id}] File processing task enqueued with job_id: {job.id}")
@@ -1240,7 +1420,7 @@ def _handle_file_upload(service, request_id):
                 citations = processor._extract_citations_unified(text)
                 
                 result = {
-                    'citations': [citation.__dict__ if hasattr(citation, '__dict__') else citation for citation in citations],
+                    'citations': [citation.to_dict() if hasattr(citation, 'to_dict') else citation for citation in citations],
                     'clusters': [],  # Clustering will be handled by full async pipeline if needed
                     'statistics': {'total_citations': len(citations)}
                 }
@@ -1801,19 +1981,20 @@ def _process_url_input(url, request_id=None):
         else:
             logger.info(f"[URL Input {request_id}] Queuing URL content for async processing")
             
-            from rq import Queue
             from redis import Redis
+            from src.job_queues import JobScheduler, current_client_id
             
             redis_url = os.environ.get('REDIS_URL', 'redis://:caseStrainerRedis123@casestrainer-redis-prod:6379/0')
             redis_conn = Redis.from_url(redis_url)
-            queue = Queue('casestrainer', connection=redis_conn)
             
-            job = queue.enqueue(
-                process_citation_task_direct,
+            job = JobScheduler(redis_conn).enqueue(
+                PROCESS_CITATION_TASK,
                 args=(request_id, 'url', {'url': url, 'content': content}),
                 job_timeout=FILE_PROCESSING_TIMEOUT_MINUTES * 60,  # 10 minutes timeout (optimized)
                 result_ttl=86400,
-                failure_ttl=86400
+                failure_ttl=86400,
+                job_class=service.determine_job_class(text_length=len(content)),
+                client_id=current_client_id()
             )
             
             logger.info(f"[URL Input {request_id}] URL processing task enqueued with job_id: {job.id}")
@@ -1842,6 +2023,9 @@ def verification_stream(request_id):
     """
     Stream verification progress and results in real-time using Server-Sent Events (SSE)
     
+    Deferred verification also appends cluster patches as clusters settle; each
+    is sent as a 'verification_patch' event before the final result.
+    
     Args:
         request_id: The request ID to stream verification progress for
         
@@ -1849,7 +2033,7 @@ def verification_stream(request_id):
         Server-Sent Events stream with verification updates
     """
     try:
-        from verification_manager import VerificationManager
+        from src.verification_manager import VerificationManager
         
         verification_manager = VerificationManager()
         
@@ -1866,6 +2050,7 @@ def verification_stream(request_id):
                 
                 last_status = None
                 last_progress = 0
+                patch_index = 0
                 
                 while True:
                     try:
@@ -1881,6 +2066,18 @@ def verification_stream(request_id):
                             yield f"data: {json.dumps(error_data)}\n\n"
                             break
                         
+                        patches = verification_manager.state.get_patches(request_id, patch_index)
+                        for patch in patches:
+                            patch_data = {
+                                'type': 'verification_patch',
+                                'request_id': request_id,
+                                'clusters': patch.get('clusters', []),
+                                'citations': patch.get('citations', []),
+                                'timestamp': datetime.utcnow().isoformat()
+                            }
+                            yield f"data: {json.dumps(patch_data)}\n\n"
+                        patch_index += len(patches)
+                        
                         status_changed = (
                             last_status != status.get('status') or
                             last_progress != status.get('progress', 0)
@@ -2052,6 +2249,193 @@ def verification_results(request_id):
         }), 500
 
 
+def _stream_format():
+    """NDJSON by default; SSE when asked via ?format=sse or Accept: text/event-stream."""
+    fmt = request.args.get('format', '').lower()
+    if fmt in ('ndjson', 'sse'):
+        return fmt
+    return 'sse' if 'text/event-stream' in request.headers.get('Accept', '') else 'ndjson'
+
+
+def _stream_response(events, fmt, request_id):
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream' if fmt == 'sse' else 'application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',  # let nginx flush each event
+            'X-Request-ID': request_id,
+            'Access-Control-Allow-Origin': '*',
+            'Access-Control-Allow-Headers': 'Cache-Control, Last-Event-ID'
+        }
+    )
+
+
+@vue_api.route('/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """
+    Analyze text or a URL and stream results as they become available.
+    
+    Emits NDJSON lines (or SSE events with ?format=sse): ``started``, batches of
+    ``citations`` as soon as extraction finishes, ``verification`` updates,
+    ``clusters``, then ``complete`` with the URL for paging the stored result.
+    
+    Short texts are processed in-process on a small bounded pool (503 when it
+    is full); larger ones and every URL are queued like /analyze and streamed
+    from the worker, which also does the fetch.
+    
+    Returns:
+        Streaming response; the request ID is in the X-Request-ID header and
+        every event
+    """
+    from src.result_stream import get_result_stream
+    
+    request_id = str(uuid.uuid4())
+    fmt = _stream_format()
+    data = request.get_json(silent=True) or request.form.to_dict()
+    
+    source = 'url' if data.get('url') else 'text'
+    text = None
+    if source == 'url':
+        if not _validate_url(data['url']):
+            return _format_error('Invalid URL', status_code=400, request_id=request_id)
+    else:
+        text = data.get('text', '')
+        if not text or not text.strip():
+            return _format_error('No text provided', 'Provide "text" or "url" in the request body', 400, request_id)
+        if _is_test_citation_text(text):
+            return _format_error('Test citation detected. Please provide actual document content.', status_code=400,
+                                 request_id=request_id)
+    
+    stream = get_result_stream()
+    
+    if source == 'url' or not citation_service.should_process_immediately({'type': 'text', 'text': text}):
+        # Same routing as /analyze: large documents (and URLs, whose fetch can take
+        # minutes) are processed by the RQ workers, which publish to the same event
+        # log as they finish each stage
+        if source == 'url':
+            args = (request_id, 'url', {'url': data['url']})
+            stream.publish(request_id, 'started', source=source, processing_mode='queued')
+        else:
+            args = (request_id, 'text', {'text': text})
+            stream.publish(request_id, 'started', text_length=len(text), source=source, processing_mode='queued')
+        try:
+            from redis import Redis
+            from src.job_queues import JobScheduler, current_client_id
+            
+            redis_url = os.environ.get('REDIS_URL', 'redis://:caseStrainerRedis123@casestrainer-redis-prod:6379/0')
+            JobScheduler(Redis.from_url(redis_url)).enqueue(
+                PROCESS_CITATION_TASK,
+                args=args,
+                job_id=request_id,
+                job_timeout=FILE_PROCESSING_TIMEOUT_MINUTES * 60,
+                result_ttl=86400,
+                failure_ttl=86400,
+                job_class=citation_service.determine_job_class(text_length=len(text) if text else None),
+                client_id=current_client_id()
+            )
+        except Exception as e:
+            logger.error(f"[Stream {request_id}] Failed to enqueue: {e}")
+            return _format_error('Processing queue unavailable', str(e), 503, request_id)
+        return _stream_response(stream.iter_events(request_id, fmt=fmt), fmt, request_id)
+    
+    if not _stream_slots.acquire(blocking=False):
+        response = _format_error('Too many streaming requests in progress', 'Retry shortly', 503, request_id)
+        response[0].headers['Retry-After'] = '5'
+        return response
+    
+    def run_pipeline():
+        import asyncio
+        from src.unified_citation_processor_v2 import UnifiedCitationProcessorV2
+        try:
+            processor = UnifiedCitationProcessorV2(event_callback=stream.publisher(request_id))
+            result = asyncio.run(processor.process_text(text))
+            stream.store_result(request_id, result)
+            stream.publish(
+                request_id, 'complete',
+                citation_count=len(result.get('citations', [])),
+                cluster_count=len(result.get('clusters', [])),
+                results_url=f"/casestrainer/api/analyze/results/{request_id}"
+            )
+        except Exception as e:
+            logger.error(f"[Stream {request_id}] Processing failed: {e}", exc_info=True)
+            stream.publish(request_id, 'error', error=str(e))
+        finally:
+            _stream_slots.release()
+    
+    stream.publish(request_id, 'started', text_length=len(text), source=source, processing_mode='immediate')
+    _stream_executor.submit(run_pipeline)
+    
+    return _stream_response(stream.iter_events(request_id, fmt=fmt), fmt, request_id)
+
+
+@vue_api.route('/analyze/stream/<request_id>', methods=['GET'])
+def analyze_stream_resume(request_id):
+    """
+    Tail (or replay) the result events of a streaming request or async task.
+    
+    Resumes after the event index in ?since=N or the SSE Last-Event-ID header.
+    """
+    from src.result_stream import get_result_stream
+    
+    fmt = _stream_format()
+    try:
+        last_event_id = request.headers.get('Last-Event-ID')
+        start = int(last_event_id) + 1 if last_event_id else int(request.args.get('since', 0))
+    except ValueError:
+        return _format_error('Invalid event index', status_code=400, request_id=request_id)
+    
+    return _stream_response(get_result_stream().iter_events(request_id, start=max(start, 0), fmt=fmt), fmt, request_id)
+
+
+def _load_stored_result(request_id):
+    """Completed result for a streaming request, or the stored result of an async task."""
+    from src.result_stream import get_result_stream
+    
+    from src.result_store import get_result_store
+    
+    result = get_result_stream().get_result(request_id)
+    if result is not None:
+        return result
+    return get_result_store().load(request_id)
+
+
+@vue_api.route('/analyze/results/<request_id>', methods=['GET'])
+def analyze_results_page(request_id):
+    """
+    Page through a completed result with cursors.
+    
+    Query args:
+        section: 'citations' (default) or 'clusters'
+        cursor: next_cursor from the previous page
+        limit: items per page (default 100, max 1000)
+    """
+    from src.result_stream import paginate_result, DEFAULT_PAGE_SIZE
+    
+    try:
+        result = _load_stored_result(request_id)
+    except Exception as e:
+        logger.error(f"Failed to load stored result for {request_id}: {e}")
+        return _format_error('Failed to load results', str(e), 500, request_id)
+    
+    if result is None:
+        return _format_error('Results not available', 'Unknown request or processing not finished', 404, request_id)
+    
+    try:
+        page = paginate_result(
+            result,
+            section=request.args.get('section', 'citations'),
+            cursor=request.args.get('cursor'),
+            limit=int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        )
+    except ValueError as e:
+        return _format_error(str(e), status_code=400, request_id=request_id)
+    
+    page['request_id'] = request_id
+    page['success'] = True
+    return jsonify(page)
+
+
 def _validate_api_response_data(response_data):
     """
     Validate API response data for integrity issues.
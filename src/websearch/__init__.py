@@ -15,6 +15,7 @@ from .fusion import ResultFusionEngine
 from .ml_predictor import AdvancedMLPredictor
 from .error_recovery import AdvancedErrorRecovery
 from .analytics import AdvancedAnalytics
+from .source_telemetry import SourceTelemetry, get_source_telemetry
 from .extractor import ComprehensiveWebExtractor
 from .engine import ComprehensiveWebSearchEngine
 from .utils import search_cluster_for_canonical_sources, search_all_engines, test_comprehensive_web_search
@@ -30,6 +31,8 @@ __all__ = [
     'AdvancedMLPredictor',
     'AdvancedErrorRecovery',
     'AdvancedAnalytics',
+    'SourceTelemetry',
+    'get_source_telemetry',
     'ComprehensiveWebExtractor',
     'ComprehensiveWebSearchEngine',
     'search_cluster_for_canonical_sources',
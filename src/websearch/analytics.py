@@ -11,7 +11,10 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from collections import defaultdict, Counter
 
+from src.metrics import CACHE_LOOKUPS, RECOVERY_ATTEMPTS
+
 from .cache import CacheManager
+from .source_telemetry import get_source_telemetry
 
 logger = logging.getLogger(__name__)
 
@@ -61,8 +64,17 @@ class AdvancedAnalytics:
         
         self._cache_analytics_data()
         
+        self._record_telemetry(source, success, response_time, citation)
+        
         self._check_performance_issues(source, response_time, success)
     
+    def _record_telemetry(self, source: str, success: bool, response_time: float, citation: Optional[str]):
+        """Feed the attempt into the persistent telemetry used for source ranking (and src.metrics)."""
+        try:
+            get_source_telemetry().record(source, success, response_time, citation)
+        except Exception as e:
+            logger.warning(f"Failed to record source telemetry: {str(e)}")
+    
     def _check_performance_issues(self, source: str, response_time: float, success: bool):
         """Check for performance issues and log warnings."""
         if response_time > self.thresholds['slow_response']:
@@ -76,6 +88,7 @@ class AdvancedAnalytics:
     
     def record_cache_operation(self, hit: bool):
         """Record cache hit or miss."""
+        CACHE_LOOKUPS.inc(cache='websearch', outcome='hit' if hit else 'miss')
         if hit:
             self.stats['cache_hits'] += 1
         else:
@@ -83,6 +96,7 @@ class AdvancedAnalytics:
     
     def record_recovery_attempt(self, success: bool):
         """Record recovery attempt success or failure."""
+        RECOVERY_ATTEMPTS.inc(outcome='success' if success else 'failure')
         self.stats['recovery_attempts'] += 1
         if success:
             self.stats['recovery_successes'] += 1
@@ -1,168 +1,380 @@
 """
 Cache Management Module
 Handles SQLite-based caching with TTL support for web search operations.
+
+Each thread keeps one persistent WAL-mode connection, so concurrent
+verification threads read without blocking each other; a thread's connection
+is closed when the thread exits. Values are stored as
+binary BLOBs (pickle, zlib-compressed when large) with an integer epoch expiry
+column that is indexed for cheap expiry sweeps. A bounded in-process LRU sits in
+front of SQLite for hot keys.
 """
 
 import hashlib
-from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
-
 import logging
-import sqlite3
+import os
 import pickle
-from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+import sqlite3
+import threading
+import time
+import weakref
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+# One-byte serializer tags: raw pickle or zlib-compressed pickle
+_RAW = b'P'
+_ZLIB = b'Z'
+_COMPRESS_THRESHOLD = 1024
+
+URL_STATUS_TTL = 3600  # seconds a URL accessibility check stays valid
+
+# PRAGMA user_version of the current layout; version 1 dropped the pre-WAL
+# search_cache/url_status tables (JSON text with a timestamp/ttl_hours pair)
+SCHEMA_VERSION = 1
+_LEGACY_TABLES = ('search_cache', 'url_status')
+
+
+def _serialize(value: Any) -> bytes:
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(data) > _COMPRESS_THRESHOLD:
+        compressed = zlib.compress(data, 1)
+        if len(compressed) < len(data):
+            return _ZLIB + compressed
+    return _RAW + data
+
+
+def _deserialize(blob: bytes) -> Any:
+    tag, data = blob[:1], blob[1:]
+    if tag == _ZLIB:
+        data = zlib.decompress(data)
+    elif tag != _RAW:
+        raise ValueError(f"Unknown cache serializer tag: {tag!r}")
+    return pickle.loads(data)  # nosec B301 - values are written by this process only
+
+
+class _ThreadConnection:
+    """Thread-local holder; when the thread exits it is collected and the connection closed."""
+
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
 
 class CacheManager:
     """Advanced caching system with SQLite backend and TTL support."""
-    
-    def __init__(self, cache_file: str = "data/legal_search_cache.db", ttl_hours: int = 24):
+
+    def __init__(self, cache_file: str = "data/legal_search_cache.db", ttl_hours: int = 24,
+                 memory_items: int = 2048, cleanup_interval: float = 600.0):
         self.cache_file = cache_file
-        self.ttl = timedelta(hours=ttl_hours)
+        self.ttl_hours = ttl_hours
+        self.memory_items = memory_items
+        self.cleanup_interval = cleanup_interval
+
+        self._local = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
+
+        # key -> (expires_at, payload); payload is a serialized blob or a url_status row
+        self._memory: 'OrderedDict[str, Tuple[int, Any]]' = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._last_cleanup = time.time()
+
         self._init_db()
-    
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Persistent connection for the calling thread."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            directory = os.path.dirname(self.cache_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Only the owning thread uses it, but it may be closed from the thread that collects it
+            conn = sqlite3.connect(self.cache_file, timeout=10.0, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=10000')
+            holder = self._local.holder = _ThreadConnection(conn)
+            with self._connections_lock:
+                self._connections.add(conn)
+            weakref.finalize(holder, self._release_connection, conn)
+        return holder.conn
+
+    def _release_connection(self, conn: sqlite3.Connection):
+        """Close a connection whose thread has exited (no-op after close())."""
+        with self._connections_lock:
+            if conn not in self._connections:
+                return
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
     def _init_db(self):
         """Initialize SQLite database for caching."""
-        conn = sqlite3.connect(self.cache_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS search_cache (
-                key TEXT PRIMARY KEY,
-                value TEXT,
-                timestamp DATETIME,
-                ttl_hours INTEGER
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS url_status (
-                url TEXT PRIMARY KEY,
-                status TEXT,
-                status_code INTEGER,
-                last_checked DATETIME,
-                content_hash TEXT
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
+        conn = self._get_connection()
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires_at INTEGER NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries(expires_at)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS url_status_entries (
+                    url TEXT PRIMARY KEY,
+                    status TEXT,
+                    status_code INTEGER,
+                    last_checked INTEGER NOT NULL,
+                    content_hash TEXT
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_url_status_checked ON url_status_entries(last_checked)')
+        self._drop_legacy_tables(conn)
+
+    def _drop_legacy_tables(self, conn: sqlite3.Connection):
+        """
+        One-time cleanup of the old layout's tables.
+
+        Nothing reads them any more and their rows are short-lived cache
+        entries, so they are dropped rather than migrated; the file is then
+        vacuumed so the space is returned.
+        """
+        if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+            return
+        placeholders = ','.join('?' for _ in _LEGACY_TABLES)
+        legacy = [row[0] for row in conn.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})", _LEGACY_TABLES)]
+        with conn:
+            for table in legacy:
+                conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        if legacy:
+            logger.info(f"Dropped legacy websearch cache tables: {', '.join(legacy)}")
+            try:
+                conn.execute('VACUUM')
+            except sqlite3.Error as e:
+                logger.warning(f"Could not vacuum {self.cache_file} after dropping legacy tables: {e}")
+
+    def close(self):
+        """Close every thread's connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
     def _generate_key(self, *args) -> str:
         """Generate cache key from arguments."""
         key_string = "|".join(str(arg) for arg in args)
         return hashlib.sha256(key_string.encode('utf-8')).hexdigest()
-    
+
+    @staticmethod
+    def _key_args(key: Any) -> tuple:
+        return key if isinstance(key, tuple) else (key,)
+
+    # In-process tier
+
+    def _memory_get(self, key: str, now: int) -> Optional[Any]:
+        with self._memory_lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry[1]
+
+    def _memory_set(self, key: str, expires_at: int, payload: Any):
+        with self._memory_lock:
+            self._memory[key] = (expires_at, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def _memory_delete(self, keys: Iterable[str]):
+        with self._memory_lock:
+            for key in keys:
+                self._memory.pop(key, None)
+
+    # Search/value cache
+
     def get(self, *args) -> Optional[Any]:
         """Get cached value."""
-        key = self._generate_key(*args)
-        
-        conn = sqlite3.connect(self.cache_file)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            'SELECT value, timestamp, ttl_hours FROM search_cache WHERE key = ?',
-            (key,)
-        )
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            value_str, timestamp_str, ttl_hours = result
-            timestamp = datetime.fromisoformat(timestamp_str)
-            ttl = timedelta(hours=ttl_hours)
-            
-            if datetime.now() - timestamp < ttl:
-                try:
-                    return pickle.loads(value_str.encode('latin1'))
-                except Exception:
-                    return None
+        return self.get_many([args]).get(args)
+
+    def get_many(self, keys: Iterable[Any]) -> Dict[Any, Any]:
+        """
+        Get several cached values in one query.
+
+        Args:
+            keys: Cache keys; a tuple is treated as the positional args of get()
+
+        Returns:
+            Mapping of each key that was found (and not expired) to its value
+        """
+        now = int(time.time())
+        results: Dict[Any, Any] = {}
+        missing: Dict[str, Any] = {}
+        for key in keys:
+            hashed = self._generate_key(*self._key_args(key))
+            blob = self._memory_get(hashed, now)
+            if blob is not None:
+                results[key] = blob
             else:
-                self.delete(*args)
-        
-        return None
-    
+                missing[hashed] = key
+
+        if missing:
+            try:
+                conn = self._get_connection()
+                hashed_keys = list(missing)
+                for start in range(0, len(hashed_keys), 500):
+                    chunk = hashed_keys[start:start + 500]
+                    rows = conn.execute(
+                        f'SELECT key, value, expires_at FROM cache_entries '
+                        f'WHERE key IN ({",".join("?" * len(chunk))}) AND expires_at > ?',
+                        (*chunk, now)
+                    ).fetchall()
+                    for hashed, blob, expires_at in rows:
+                        blob = bytes(blob)
+                        self._memory_set(hashed, expires_at, blob)
+                        results[missing[hashed]] = blob
+            except sqlite3.Error as e:
+                logger.warning(f"Cache read failed: {e}")
+
+        values = {}
+        for key, blob in results.items():
+            try:
+                values[key] = _deserialize(blob)
+            except Exception as e:
+                logger.debug(f"Dropping undecodable cache entry: {e}")
+        return values
+
     def set(self, *args, value: Any, ttl_hours: Optional[int] = None):
         """Set cached value."""
-        key = self._generate_key(*args[:-1])  # Exclude value from key
-        ttl_hours = ttl_hours or int(self.ttl.total_seconds() / 3600)
-        
-        conn = sqlite3.connect(self.cache_file)
-        cursor = conn.cursor()
-        
+        self.set_many({args: value}, ttl_hours=ttl_hours)
+
+    def set_many(self, items: Dict[Any, Any], ttl_hours: Optional[int] = None):
+        """
+        Set several cached values in one transaction.
+
+        Args:
+            items: Mapping of cache key (tuple = positional args of set()) to value
+            ttl_hours: Lifetime for every item (defaults to the manager TTL)
+        """
+        if ttl_hours is None:
+            ttl_hours = self.ttl_hours
+        expires_at = int(time.time() + ttl_hours * 3600)
+        rows = []
+        for key, value in items.items():
+            try:
+                blob = _serialize(value)
+            except Exception as e:
+                logger.error(f"Failed to cache value: {e}")
+                continue
+            hashed = self._generate_key(*self._key_args(key))
+            rows.append((hashed, sqlite3.Binary(blob), expires_at))
+            self._memory_set(hashed, expires_at, blob)
+        if not rows:
+            return
+
         try:
-            value_str = pickle.dumps(value).decode('latin1')
-            cursor.execute(
-                'INSERT OR REPLACE INTO search_cache (key, value, timestamp, ttl_hours) VALUES (?, ?, ?, ?)',
-                (key, value_str, datetime.now().isoformat(), ttl_hours)
-            )
-            conn.commit()
-        except Exception as e:
+            conn = self._get_connection()
+            with conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)',
+                    rows
+                )
+        except sqlite3.Error as e:
             logger.error(f"Failed to cache value: {e}")
-        finally:
-            conn.close()
-    
+        self._maybe_cleanup()
+
     def delete(self, *args):
         """Delete cached value."""
         key = self._generate_key(*args)
-        
-        conn = sqlite3.connect(self.cache_file)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM search_cache WHERE key = ?', (key,))
-        conn.commit()
-        conn.close()
-    
+        self._memory_delete([key])
+        try:
+            conn = self._get_connection()
+            with conn:
+                conn.execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache delete failed: {e}")
+
+    def _maybe_cleanup(self):
+        if time.time() - self._last_cleanup >= self.cleanup_interval:
+            self.cleanup_expired()
+
     def cleanup_expired(self):
         """Remove expired cache entries."""
-        conn = sqlite3.connect(self.cache_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            DELETE FROM search_cache 
-            WHERE datetime(timestamp, '+' || ttl_hours || ' hours') < datetime('now')
-        ''')
-        
-        conn.commit()
-        conn.close()
-    
+        now = int(time.time())
+        self._last_cleanup = time.time()
+        with self._memory_lock:
+            for key in [key for key, (expires_at, _payload) in self._memory.items() if expires_at <= now]:
+                del self._memory[key]
+        try:
+            conn = self._get_connection()
+            with conn:
+                conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now,))
+                conn.execute('DELETE FROM url_status_entries WHERE last_checked <= ?', (now - URL_STATUS_TTL,))
+        except sqlite3.Error as e:
+            logger.warning(f"Cache cleanup failed: {e}")
+
+    # URL accessibility status
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        return f"url:{url}"
+
     def get_url_status(self, url: str) -> Optional[Dict[str, Any]]:
         """Get cached URL accessibility status."""
-        conn = sqlite3.connect(self.cache_file)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            'SELECT status, status_code, last_checked, content_hash FROM url_status WHERE url = ?',
-            (url,)
-        )
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
-            status, status_code, last_checked_str, content_hash = result
-            last_checked = datetime.fromisoformat(last_checked_str)
-            
-            if datetime.now() - last_checked < timedelta(hours=1):
-                return {
-                    'status': status,
-                    'status_code': status_code,
-                    'last_checked': last_checked,
-                    'content_hash': content_hash
-                }
-        
-        return None
-    
-    def set_url_status(self, url: str, status: str, status_code: Optional[int] = None, 
+        now = int(time.time())
+        row = self._memory_get(self._url_key(url), now)
+        if row is None:
+            try:
+                row = self._get_connection().execute(
+                    'SELECT status, status_code, last_checked, content_hash FROM url_status_entries '
+                    'WHERE url = ? AND last_checked > ?',
+                    (url, now - URL_STATUS_TTL)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"URL status read failed: {e}")
+                return None
+            if row is None:
+                return None
+            self._memory_set(self._url_key(url), row[2] + URL_STATUS_TTL, row)
+
+        status, status_code, last_checked, content_hash = row
+        return {
+            'status': status,
+            'status_code': status_code,
+            'last_checked': datetime.fromtimestamp(last_checked),
+            'content_hash': content_hash
+        }
+
+    def set_url_status(self, url: str, status: str, status_code: Optional[int] = None,
                       content_hash: Optional[str] = None):
         """Cache URL accessibility status."""
-        conn = sqlite3.connect(self.cache_file)
-        cursor = conn.cursor()
-        
-        cursor.execute(
-            'INSERT OR REPLACE INTO url_status (url, status, status_code, last_checked, content_hash) VALUES (?, ?, ?, ?, ?)',
-            (url, status, status_code, datetime.now().isoformat(), content_hash)
-        )
-        
-        conn.commit()
-        conn.close() 
\ No newline at end of file
+        last_checked = int(time.time())
+        row = (status, status_code, last_checked, content_hash)
+        self._memory_set(self._url_key(url), last_checked + URL_STATUS_TTL, row)
+        try:
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO url_status_entries (url, status, status_code, last_checked, content_hash) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (url, *row)
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"URL status write failed: {e}")
@@ -358,8 +358,9 @@ class ComprehensiveWebSearchEngine:
         
         self._rate_limit_check(engine)
         
-        cache_key = f"search_{engine}_{hash(query)}"
-        cached_result = self.cache_manager.get(cache_key)
+        # hash() is salted per process, so key on the query itself to share entries across workers
+        cache_key = ('search', engine, query)
+        cached_result = self.cache_manager.get(*cache_key)
         if cached_result:
             self.analytics.record_cache_operation(hit=True)
             return cached_result
@@ -381,7 +382,7 @@ class ComprehensiveWebSearchEngine:
                 results = []
             
             if results:
-                self.cache_manager.set(cache_key, value=results, ttl_hours=24)
+                self.cache_manager.set(*cache_key, value=results, ttl_hours=24)
             
             return results
             
@@ -810,41 +811,56 @@ class ComprehensiveWebSearchEngine:
             logger.warning(f"DuckDuckGo search failed for {citation}: {e}")
             return {'source': 'duckduckgo', 'verified': False, 'results': []}
     
+    async def _search_source(self, source: str, citation: str, case_name: Optional[str] = None) -> Dict:
+        """Run one named source search; errors come back in the result."""
+        try:
+            if source == 'vlex':
+                return await self.search_vlex(citation, case_name)
+            elif source == 'casetext':
+                return await self.search_casetext(citation, case_name)
+            elif source == 'justia':
+                return await self.search_justia(citation, case_name)
+            elif source == 'courtlistener_web':
+                return await self.search_courtlistener_web(citation, case_name)
+            elif source == 'findlaw':
+                return await self.search_findlaw(citation, case_name)
+            elif source == 'leagle':
+                return await self.search_leagle(citation, case_name)
+            elif source == 'openjurist':
+                return await self.search_openjurist(citation, case_name)
+            elif source == 'casemine':
+                return await self.search_casemine(citation, case_name)
+            elif source == 'google_scholar':
+                return await self.search_google_scholar(citation, case_name)
+            elif source == 'bing':
+                return await self.search_bing(citation, case_name)
+            elif source == 'duckduckgo':
+                return await self.search_duckduckgo(citation, case_name)
+            else:
+                return {'source': source, 'results': [], 'error': 'Unknown source'}
+        except Exception as e:
+            return {'source': source, 'results': [], 'error': str(e)}
+    
+    def _record_source_attempt(self, source: str, result: Dict, duration: float, citation: Optional[str]):
+        """Feed one source outcome into analytics and the telemetry ranking."""
+        error = result.get('error')
+        self.analytics.record_search_attempt(
+            source, bool(result.get('results')), duration, citation,
+            error=RuntimeError(error) if error else None
+        )
+    
     async def search_multiple_sources(self, citation: str, case_name: Optional[str] = None, max_concurrent: int = 3) -> Dict:
         """Search multiple sources concurrently."""
-        recommended_sources = self.source_predictor.predict_best_sources(citation, case_name)
+        recommended_sources = self.get_search_priority(citation, case_name)
         
         semaphore = asyncio.Semaphore(max_concurrent)
         
         async def search_source(source: str) -> Dict:
             async with semaphore:
-                try:
-                    if source == 'vlex':
-                        return await self.search_vlex(citation, case_name)
-                    elif source == 'casetext':
-                        return await self.search_casetext(citation, case_name)
-                    elif source == 'justia':
-                        return await self.search_justia(citation, case_name)
-                    elif source == 'courtlistener_web':
-                        return await self.search_courtlistener_web(citation, case_name)
-                    elif source == 'findlaw':
-                        return await self.search_findlaw(citation, case_name)
-                    elif source == 'leagle':
-                        return await self.search_leagle(citation, case_name)
-                    elif source == 'openjurist':
-                        return await self.search_openjurist(citation, case_name)
-                    elif source == 'casemine':
-                        return await self.search_casemine(citation, case_name)
-                    elif source == 'google_scholar':
-                        return await self.search_google_scholar(citation, case_name)
-                    elif source == 'bing':
-                        return await self.search_bing(citation, case_name)
-                    elif source == 'duckduckgo':
-                        return await self.search_duckduckgo(citation, case_name)
-                    else:
-                        return {'source': source, 'results': [], 'error': 'Unknown source'}
-                except Exception as e:
-                    return {'source': source, 'results': [], 'error': str(e)}
+                started = time.time()
+                result = await self._search_source(source, citation, case_name)
+                self._record_source_attempt(source, result, time.time() - started, citation)
+                return result
         
         tasks = [search_source(source) for source in recommended_sources[:max_concurrent]]
         results = await asyncio.gather(*tasks, return_exceptions=True)
@@ -924,12 +940,17 @@ class ComprehensiveWebSearchEngine:
             else:
                 max_sources_per_query = 2  # Fewer sources for case name searches
             
-            recommended_sources = self.source_predictor.predict_best_sources(
-                query_info.get('citation', ''), 
-                query_info.get('case_name', '')
-            )
+            # Search engines are left to _fallback_search; rank the case-law sites only
+            recommended_sources = [
+                source for source in self.get_search_priority(
+                    query_info.get('citation') or citation,
+                    query_info.get('case_name') or case_name
+                )
+                if source not in ('google_scholar', 'bing', 'duckduckgo')
+            ]
             
             for source in recommended_sources[:max_sources_per_query]:
+                started = time.time()
                 try:
                     if source == 'justia':
                         result = await self.search_justia(citation, case_name)
@@ -950,6 +971,7 @@ class ComprehensiveWebSearchEngine:
                     else:
                         continue
                     
+                    self._record_source_attempt(source, result, time.time() - started, citation)
                     if result.get('results'):
                         for res in result['results']:
                             res['query_used'] = query
@@ -1019,9 +1041,14 @@ class ComprehensiveWebSearchEngine:
             (current_avg * (total_searches - 1) + duration) / total_searches
         )
     
-    def get_search_priority(self) -> List[str]:
-        """Get prioritized list of search engines."""
-        return [
+    def get_search_priority(self, citation: Optional[str] = None, case_name: Optional[str] = None) -> List[str]:
+        """
+        Get prioritized list of search engines.
+        
+        With a citation, engines are ordered by expected time-to-verify learned
+        from live telemetry for that citation's reporter.
+        """
+        default_priority = [
             'justia',
             'findlaw', 
             'courtlistener_web',
@@ -1034,6 +1061,15 @@ class ComprehensiveWebSearchEngine:
             'bing',
             'duckduckgo'
         ]
+        
+        if not citation:
+            return default_priority
+        
+        try:
+            return self.ml_predictor.rank_sources_by_expected_time(citation, case_name, default_priority)
+        except Exception as e:
+            logger.warning(f"Adaptive search priority unavailable: {e}")
+            return default_priority
     
     async def _check_url_accessibility(self, url: str) -> Dict[str, Any]:
         """Check if a URL is accessible."""
@@ -1041,19 +1077,12 @@ class ComprehensiveWebSearchEngine:
     
     async def _check_accessibility_batch(self, results: List[Dict]):
         """Check accessibility of multiple URLs in batch."""
-        tasks = []
+        urls = [result.get('url', '') for result in results if result.get('url')]
+        if not urls:
+            return
+        
+        statuses = await self.linkrot_detector.check_urls(urls)
         for result in results:
             url = result.get('url', '')
             if url:
-                tasks.append(self._check_url_accessibility(url))
-        
-        if tasks:
-            accessibility_results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            for i, result in enumerate(results):
-                if i < len(accessibility_results):
-                    accessibility = accessibility_results[i]
-                    if isinstance(accessibility, dict):
-                        result['accessibility'] = accessibility
-                    else:
-                        result['accessibility'] = {'status': 'unknown', 'accessible': False} 
\ No newline at end of file
+                result['accessibility'] = statuses.get(url, {'status': 'unknown', 'accessible': False}) 
\ No newline at end of file
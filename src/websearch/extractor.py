@@ -9,7 +9,8 @@ from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_
 import logging
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+
+from src.utils.html_parsing import extract_fields, make_soup
 
 logger = logging.getLogger(__name__)
 
@@ -225,7 +226,7 @@ class ComprehensiveWebExtractor:
             return {'error': 'No HTML content provided'}
         
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            soup = make_soup(html_content)
             
             title = self._extract_title(soup)
             case_name = self._extract_case_name(soup, citation)
@@ -359,169 +360,51 @@ class ComprehensiveWebExtractor:
         
         return soup.get_text().strip()
     
-    def _extract_casemine_info(self, html_content: str, url: str) -> Dict[str, Any]:
-        """Extract information from Casemine pages."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        title = ""
-        case_name = ""
-        court = ""
-        date = ""
+    def _extract_site_info(self, html_content: str, url: str, source: str, title_selector: str,
+                           court_selector: str, date_selector: Optional[str] = None) -> Dict[str, Any]:
+        """Extract title/court/date from a legal database page without building a full tree."""
+        selectors = {'title': title_selector, 'court': court_selector}
+        if date_selector:
+            selectors['date'] = date_selector
         
-        title_elem = soup.select_one('.case-title, h1')
-        if title_elem:
-            title = title_elem.get_text().strip()
-        
-        court_elem = soup.select_one('.court-name, .jurisdiction')
-        if court_elem:
-            court = court_elem.get_text().strip()
-        
-        date_elem = soup.select_one('.decision-date, .date')
-        if date_elem:
-            date = date_elem.get_text().strip()
+        fields = extract_fields(html_content, selectors)
         
         return {
-            'title': title,
-            'case_name': case_name,
-            'court': court,
-            'date': date,
+            'title': fields['title'],
+            'case_name': "",
+            'court': fields['court'],
+            'date': fields.get('date', ""),
             'url': url,
-            'source': 'casemine'
+            'source': source
         }
     
+    def _extract_casemine_info(self, html_content: str, url: str) -> Dict[str, Any]:
+        """Extract information from Casemine pages."""
+        return self._extract_site_info(html_content, url, 'casemine', '.case-title, h1', '.court-name, .jurisdiction', '.decision-date, .date')
+    
     def _extract_vlex_info(self, html_content: str, url: str) -> Dict[str, Any]:
         """Extract information from Vlex pages."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        title = ""
-        case_name = ""
-        court = ""
-        date = ""
-        
-        title_elem = soup.select_one('.document-title, h1')
-        if title_elem:
-            title = title_elem.get_text().strip()
-        
-        court_elem = soup.select_one('.court, .jurisdiction')
-        if court_elem:
-            court = court_elem.get_text().strip()
-        
-        return {
-            'title': title,
-            'case_name': case_name,
-            'court': court,
-            'date': date,
-            'url': url,
-            'source': 'vlex'
-        }
+        return self._extract_site_info(html_content, url, 'vlex', '.document-title, h1', '.court, .jurisdiction')
     
     def _extract_casetext_info(self, html_content: str, url: str) -> Dict[str, Any]:
         """Extract information from Casetext pages."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        title = ""
-        case_name = ""
-        court = ""
-        date = ""
-        
-        title_elem = soup.select_one('.case-title, h1')
-        if title_elem:
-            title = title_elem.get_text().strip()
-        
-        court_elem = soup.select_one('.court, .jurisdiction')
-        if court_elem:
-            court = court_elem.get_text().strip()
-        
-        return {
-            'title': title,
-            'case_name': case_name,
-            'court': court,
-            'date': date,
-            'url': url,
-            'source': 'casetext'
-        }
+        return self._extract_site_info(html_content, url, 'casetext', '.case-title, h1', '.court, .jurisdiction')
     
     def _extract_leagle_info(self, html_content: str, url: str) -> Dict[str, Any]:
         """Extract information from Leagle pages."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        title = ""
-        case_name = ""
-        court = ""
-        date = ""
-        
-        title_elem = soup.select_one('.case-title, h1')
-        if title_elem:
-            title = title_elem.get_text().strip()
-        
-        court_elem = soup.select_one('.court, .jurisdiction')
-        if court_elem:
-            court = court_elem.get_text().strip()
-        
-        return {
-            'title': title,
-            'case_name': case_name,
-            'court': court,
-            'date': date,
-            'url': url,
-            'source': 'leagle'
-        }
+        return self._extract_site_info(html_content, url, 'leagle', '.case-title, h1', '.court, .jurisdiction')
     
     def _extract_justia_info(self, html_content: str, url: str) -> Dict[str, Any]:
         """Extract information from Justia pages."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        title = ""
-        case_name = ""
-        court = ""
-        date = ""
-        
-        title_elem = soup.select_one('.case-title, h1')
-        if title_elem:
-            title = title_elem.get_text().strip()
-        
-        court_elem = soup.select_one('.court, .jurisdiction')
-        if court_elem:
-            court = court_elem.get_text().strip()
-        
-        return {
-            'title': title,
-            'case_name': case_name,
-            'court': court,
-            'date': date,
-            'url': url,
-            'source': 'justia'
-        }
+        return self._extract_site_info(html_content, url, 'justia', '.case-title, h1', '.court, .jurisdiction')
     
     def _extract_findlaw_info(self, html_content: str, url: str) -> Dict[str, Any]:
         """Extract information from FindLaw pages."""
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        title = ""
-        case_name = ""
-        court = ""
-        date = ""
-        
-        title_elem = soup.select_one('.case-title, h1')
-        if title_elem:
-            title = title_elem.get_text().strip()
-        
-        court_elem = soup.select_one('.court, .jurisdiction')
-        if court_elem:
-            court = court_elem.get_text().strip()
-        
-        return {
-            'title': title,
-            'case_name': case_name,
-            'court': court,
-            'date': date,
-            'url': url,
-            'source': 'findlaw'
-        }
+        return self._extract_site_info(html_content, url, 'findlaw', '.case-title, h1', '.court, .jurisdiction')
     
     def _extract_generic_legal_info(self, html_content: str, url: str) -> Dict[str, Any]:
         """Extract information from generic legal pages."""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         
         title = self._extract_title(soup)
         court = self._extract_court_info(soup)
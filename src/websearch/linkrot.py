@@ -6,6 +6,7 @@ Advanced linkrot detection with recovery strategies.
 import logging
 from src.config import DEFAULT_REQUEST_TIMEOUT, COURTLISTENER_TIMEOUT, CASEMINE_TIMEOUT, WEBSEARCH_TIMEOUT, SCRAPINGBEE_TIMEOUT
 
+import asyncio
 import re
 import aiohttp
 from datetime import datetime
@@ -21,66 +22,167 @@ logger = logging.getLogger(__name__)
 class EnhancedLinkrotDetector:
     """Advanced linkrot detection with recovery strategies."""
     
-    def __init__(self, cache_manager: CacheManager):
+    # HEAD answers that often just mean "HEAD not supported here" - confirm with a ranged GET
+    HEAD_FALLBACK_STATUSES = (403, 405, 406, 501)
+    
+    def __init__(self, cache_manager: CacheManager, max_concurrency: int = 20, per_host_limit: int = 4,
+                 timeout: float = 10.0):
         self.cache = cache_manager
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+        self.timeout = ClientTimeout(total=timeout)
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        }
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._session_loop = None
         self.recovery_strategies = [
             self._try_wayback_machine,
             self._try_alternative_domains,
             self._try_similar_urls,
         ]
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Long-lived session for the running event loop.
+        
+        The connector keeps connections alive between checks and caps sockets
+        globally and per host. Sessions are bound to a loop, so a new one is
+        created when called from a different loop and the old one is closed.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            stale_session, stale_loop = self._session, self._session_loop
+            connector = aiohttp.TCPConnector(
+                limit=self.max_concurrency,
+                limit_per_host=self.per_host_limit,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._session_loop = loop
+            if stale_session is not None and not stale_session.closed:
+                await self._close_stale_session(stale_session, stale_loop)
+        return self._session
+    
+    async def _close_stale_session(self, session: aiohttp.ClientSession, loop) -> None:
+        """Close a session bound to a previous event loop on that loop where it can still run."""
+        logger.debug("Closing linkrot session bound to a previous event loop")
+        try:
+            if loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(session.close(), loop))
+            elif not loop.is_closed():
+                await asyncio.to_thread(loop.run_until_complete, session.close())
+            else:
+                # The loop is gone: release the pool, its sockets are freed with their transports
+                await session.close()
+        except Exception as e:
+            logger.warning(f"Failed to close previous linkrot session: {e}")
+    
+    async def close(self):
+        """Close the shared session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
+    def _cached_status(self, url: str) -> Optional[Dict[str, Any]]:
+        cached_status = self.cache.get_url_status(url)
+        if not cached_status:
+            return None
+        return {
+            'status': cached_status['status'],
+            'accessible': cached_status['status'] == 'accessible',
+            'status_code': cached_status['status_code'],
+            'last_checked': cached_status['last_checked']
+        }
+    
+    async def _probe(self, url: str) -> int:
+        """HTTP status for a URL: HEAD first, then a one-byte ranged GET if HEAD is refused."""
+        session = await self._get_session()
+        try:
+            async with session.head(url, allow_redirects=True) as response:
+                if response.status not in self.HEAD_FALLBACK_STATUSES:
+                    return response.status
+        except asyncio.TimeoutError:
+            raise
+        except aiohttp.ClientError as e:
+            logger.debug(f"HEAD failed for {url}, retrying with ranged GET: {e}")
+        
+        async with session.get(url, headers={'Range': 'bytes=0-0'}, allow_redirects=True) as response:
+            return response.status
+    
+    async def _check_uncached(self, url: str) -> Dict[str, Any]:
+        await self._get_session()
+        async with self._semaphore:
+            try:
+                status_code = await self._probe(url)
+            except Exception as e:
+                self.cache.set_url_status(url, 'linkrot', None)
+                return {
+                    'status': 'linkrot',
+                    'accessible': False,
+                    'error': str(e) or type(e).__name__,
+                    'last_checked': datetime.now()
+                }
+        
+        if status_code < 400:
+            status = 'accessible'
+        elif status_code == 403:
+            status = 'paywall'
+        else:
+            status = 'linkrot'
+        self.cache.set_url_status(url, status, status_code)
+        return {
+            'status': status,
+            'accessible': status == 'accessible',
+            'status_code': status_code,
+            'last_checked': datetime.now()
+        }
+    
     async def check_url_status(self, url: str) -> Dict[str, Any]:
         """Check URL accessibility with caching."""
         if not url:
             return {'status': 'invalid', 'accessible': False}
         
-        cached_status = self.cache.get_url_status(url)
+        cached_status = self._cached_status(url)
         if cached_status:
-            return {
-                'status': cached_status['status'],
-                'accessible': cached_status['status'] == 'accessible',
-                'status_code': cached_status['status_code'],
-                'last_checked': cached_status['last_checked']
-            }
+            return cached_status
+        return await self._check_uncached(url)
+    
+    async def check_urls(self, urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Check many URLs with one shared session.
         
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                timeout = ClientTimeout(total=10)
-                async with session.head(url, headers=headers, timeout=timeout, allow_redirects=True) as response:
-                    if response.status < 400:
-                        status = 'accessible'
-                        accessible = True
-                    elif response.status == 403:
-                        status = 'paywall'
-                        accessible = False
-                    else:
-                        status = 'linkrot'
-                        accessible = False
-                    
-                    self.cache.set_url_status(url, status, response.status)
-                    
-                    return {
-                        'status': status,
-                        'accessible': accessible,
-                        'status_code': response.status,
-                        'last_checked': datetime.now()
-                    }
+        Identical URLs are checked once, cached statuses are reused, and at most
+        ``max_concurrency`` checks (``per_host_limit`` per host) run at a time.
         
-        except Exception as e:
-            status = 'linkrot'
-            self.cache.set_url_status(url, status, None)
-            
-            return {
-                'status': status,
-                'accessible': False,
-                'error': str(e),
-                'last_checked': datetime.now()
-            }
+        Returns:
+            Mapping of each distinct URL to its status
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            if not url:
+                results[url] = {'status': 'invalid', 'accessible': False}
+                continue
+            cached_status = self._cached_status(url)
+            if cached_status:
+                results[url] = cached_status
+            else:
+                pending.append(url)
+        
+        if pending:
+            checked = await asyncio.gather(*(self._check_uncached(url) for url in pending), return_exceptions=True)
+            for url, status in zip(pending, checked):
+                if isinstance(status, dict):
+                    results[url] = status
+                else:
+                    results[url] = {'status': 'unknown', 'accessible': False, 'error': str(status)}
+        
+        return results
     
     async def recover_dead_link(self, url: str, metadata: Optional[Dict[str, Any]] = None) -> List[str]:
         """Attempt to recover a dead link using various strategies."""
@@ -102,14 +204,13 @@ class EnhancedLinkrotDetector:
         try:
             api_url = f"http://archive.org/wayback/available?url={quote(url)}"
             
-            async with aiohttp.ClientSession() as session:
-                timeout = ClientTimeout(total=10)
-                async with session.get(api_url, timeout=timeout) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('archived_snapshots', {}).get('closest', {}).get('available'):
-                            wayback_url = data['archived_snapshots']['closest']['url']
-                            wayback_urls.append(wayback_url)
+            session = await self._get_session()
+            async with session.get(api_url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get('archived_snapshots', {}).get('closest', {}).get('available'):
+                        wayback_url = data['archived_snapshots']['closest']['url']
+                        wayback_urls.append(wayback_url)
         
         except Exception as e:
             logger.warning(f"Wayback Machine recovery failed: {str(e)}")
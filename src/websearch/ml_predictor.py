@@ -10,6 +10,7 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 from .cache import CacheManager
+from .source_telemetry import get_source_telemetry
 
 
 class AdvancedMLPredictor:
@@ -202,8 +203,20 @@ class AdvancedMLPredictor:
         
         return source_scores
     
+    def rank_sources_by_expected_time(self, citation: str, case_name: Optional[str] = None,
+                                      sources: Optional[List[str]] = None) -> List[str]:
+        """Rank sources by learned expected time-to-verify, using predicted rates as priors."""
+        priors = dict(self.predict_optimal_sources(citation, case_name))
+        candidates = sources if sources is not None else list(priors.keys())
+        return get_source_telemetry().rank_sources(citation, candidates, priors=priors)
+    
     def update_success_rate(self, source: str, court_type: str, success: bool):
-        """Update historical success rates based on actual results."""
+        """
+        Update historical success rates based on actual results.
+        
+        Telemetry is fed once per attempt by AdvancedAnalytics.record_search_attempt,
+        so attempts are not recorded here.
+        """
         cache_key = f"success_rate_{source}_{court_type}"
         
         current_data = self.cache.get(cache_key) or {'successes': 0, 'total': 0}
@@ -0,0 +1,390 @@
+"""
+Source Telemetry Module
+Persistent per-source verification telemetry and bandit-based source ranking.
+
+Each (source, bucket) pair keeps attempt/success counts and a fixed-size latency
+histogram, where the bucket is the citation's reporter (e.g. ``Wn.2d``) or the
+global ``*`` bucket. Sources are ranked by expected time-to-verify: the sampled
+success probability from a Beta posterior (Thompson sampling) divided into the
+median latency. Slow or rarely successful sources sink to the end of the order.
+"""
+
+import atexit
+import json
+import logging
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from src.config import DATABASE_FILE
+from src.metrics import record_verification
+
+logger = logging.getLogger(__name__)
+
+# Upper edges (seconds) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0)
+
+GLOBAL_BUCKET = '*'
+
+_REPORTER_PATTERNS = [
+    (r'\bWn\.?\s*App\.?\s*2d\b|\bWash\.?\s*App\.?\s*2d\b', 'Wn.App.2d'),
+    (r'\bWn\.?\s*App\.?\b|\bWash\.?\s*App\.?\b', 'Wn.App.'),
+    (r'\bWn\.?\s*2d\b|\bWash\.?\s*2d\b', 'Wn.2d'),
+    (r'\bWn\.?\s*3d\b|\bWash\.?\s*3d\b', 'Wn.3d'),
+    (r'\bU\.\s*S\.', 'U.S.'),
+    (r'\bS\.\s*Ct\.', 'S.Ct.'),
+    (r'\bL\.\s*Ed\.', 'L.Ed.'),
+    (r'\bF\.\s*Supp\.', 'F.Supp.'),
+    (r'\bF\.\s*(?:2d|3d|4th)\b', 'F.'),
+    (r'\bP\.\s*(?:2d|3d)\b', 'P.'),
+    (r'\bA\.\s*(?:2d|3d)\b', 'A.'),
+    (r'\bN\.\s*E\.', 'N.E.'),
+    (r'\bN\.\s*W\.', 'N.W.'),
+    (r'\bS\.\s*E\.', 'S.E.'),
+    (r'\bS\.\s*W\.', 'S.W.'),
+    (r'\bSo\.\s*(?:2d|3d)\b', 'So.'),
+    (r'\bCal\.', 'Cal.'),
+    (r'\bN\.\s*Y\.', 'N.Y.'),
+]
+
+
+def citation_bucket(citation: Optional[str]) -> str:
+    """Map a citation to its reporter bucket, or the global bucket if unknown."""
+    if not citation:
+        return GLOBAL_BUCKET
+    for pattern, bucket in _REPORTER_PATTERNS:
+        if re.search(pattern, citation, re.IGNORECASE):
+            return bucket
+    return GLOBAL_BUCKET
+
+
+class _SourceStats:
+    """Aggregated telemetry for one (source, bucket) pair."""
+
+    __slots__ = ('attempts', 'successes', 'latency_hist', 'latency_total')
+
+    def __init__(self, attempts: int = 0, successes: int = 0,
+                 latency_hist: Optional[List[int]] = None, latency_total: float = 0.0):
+        self.attempts = attempts
+        self.successes = successes
+        self.latency_hist = latency_hist or [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_total = latency_total
+
+    def merge(self, other: '_SourceStats'):
+        self.attempts += other.attempts
+        self.successes += other.successes
+        self.latency_total += other.latency_total
+        self.latency_hist = [a + b for a, b in zip(self.latency_hist, other.latency_hist)]
+
+    def copy(self) -> '_SourceStats':
+        return _SourceStats(self.attempts, self.successes, list(self.latency_hist), self.latency_total)
+
+    def record(self, success: bool, latency: float):
+        self.attempts += 1
+        if success:
+            self.successes += 1
+        self.latency_total += latency
+        for i, edge in enumerate(LATENCY_BUCKETS):
+            if latency <= edge:
+                self.latency_hist[i] += 1
+                break
+        else:
+            self.latency_hist[-1] += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Approximate latency percentile from the histogram (upper bucket edge)."""
+        total = sum(self.latency_hist)
+        if total == 0:
+            return None
+        threshold = q * total
+        cumulative = 0
+        for i, count in enumerate(self.latency_hist):
+            cumulative += count
+            if cumulative >= threshold:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1] * 2
+        return LATENCY_BUCKETS[-1] * 2
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'attempts': self.attempts,
+            'successes': self.successes,
+            'success_rate': self.successes / self.attempts if self.attempts else 0.0,
+            'avg_latency': self.latency_total / self.attempts if self.attempts else 0.0,
+            'p50_latency': self.percentile(0.5),
+            'p95_latency': self.percentile(0.95),
+        }
+
+
+def _default_db_file() -> str:
+    """Keep the telemetry store next to the main citations database."""
+    return os.path.join(os.path.dirname(os.path.abspath(DATABASE_FILE)), "source_telemetry.db")
+
+
+class SourceTelemetry:
+    """
+    Per-source, per-reporter success and latency telemetry backed by SQLite.
+
+    Several workers share one store, so each process only persists the counts
+    it recorded since its last flush and SQLite adds them to the stored row.
+    """
+
+    def __init__(self, db_file: Optional[str] = None, min_bucket_attempts: int = 5,
+                 default_latency: float = 2.0, prior_strength: float = 2.0,
+                 flush_every: int = 20, flush_interval: float = 30.0):
+        self.db_file = db_file or _default_db_file()
+        self.min_bucket_attempts = min_bucket_attempts
+        self.default_latency = default_latency
+        self.prior_strength = prior_strength
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self._lock = threading.Lock()
+        self._stats: Dict[tuple, _SourceStats] = {}
+        # Counts recorded since the last successful flush
+        self._deltas: Dict[tuple, _SourceStats] = {}
+        self._last_flush = time.time()
+
+        self._init_db()
+        self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return sqlite3.connect(self.db_file, timeout=5.0)
+
+    def _init_db(self):
+        """Initialize the telemetry table."""
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS source_stats (
+                        source TEXT NOT NULL,
+                        bucket TEXT NOT NULL,
+                        attempts INTEGER NOT NULL,
+                        successes INTEGER NOT NULL,
+                        latency_hist TEXT NOT NULL,
+                        latency_total REAL NOT NULL,
+                        updated_at REAL NOT NULL,
+                        PRIMARY KEY (source, bucket)
+                    )
+                ''')
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Source telemetry store unavailable ({self.db_file}): {e}")
+
+    def _load(self):
+        """Load persisted telemetry into memory."""
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    'SELECT source, bucket, attempts, successes, latency_hist, latency_total FROM source_stats'
+                ).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to load source telemetry: {e}")
+            return
+
+        for source, bucket, attempts, successes, hist_json, latency_total in rows:
+            try:
+                hist = json.loads(hist_json)
+            except (TypeError, ValueError):
+                hist = None
+            if not isinstance(hist, list) or len(hist) != len(LATENCY_BUCKETS) + 1:
+                hist = None
+            self._stats[(source, bucket)] = _SourceStats(attempts, successes, hist, latency_total)
+
+    def record(self, source: str, success: bool, latency: float, citation: Optional[str] = None):
+        """
+        Record one verification attempt against a source.
+
+        The attempt is counted in both the citation's reporter bucket and the
+        global bucket so sparse reporters can fall back to global behaviour.
+        """
+        if not source:
+            return
+        latency = max(float(latency or 0.0), 0.0)
+        record_verification(source, success, latency)
+        buckets = {GLOBAL_BUCKET, citation_bucket(citation)}
+
+        with self._lock:
+            for bucket in buckets:
+                key = (source, bucket)
+                for table in (self._stats, self._deltas):
+                    stats = table.get(key)
+                    if stats is None:
+                        stats = table[key] = _SourceStats()
+                    stats.record(success, latency)
+            should_flush = (len(self._deltas) >= self.flush_every or
+                            time.time() - self._last_flush >= self.flush_interval)
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Add the counts recorded since the last flush to the stored rows.
+
+        Counters are incremented in SQL so concurrent writers never overwrite
+        each other. The histogram is merged inside the same write transaction,
+        and the merged rows become this process's view of those keys.
+        """
+        with self._lock:
+            deltas = self._deltas
+            self._deltas = {}
+            self._last_flush = time.time()
+        if not deltas:
+            return
+
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                merged = {}
+                for (source, bucket), delta in deltas.items():
+                    row = conn.execute(
+                        'SELECT attempts, successes, latency_hist, latency_total FROM source_stats '
+                        'WHERE source = ? AND bucket = ?', (source, bucket)
+                    ).fetchone()
+                    stored = _SourceStats()
+                    if row is not None:
+                        try:
+                            hist = json.loads(row[2])
+                        except (TypeError, ValueError):
+                            hist = None
+                        if isinstance(hist, list) and len(hist) == len(LATENCY_BUCKETS) + 1:
+                            stored.latency_hist = hist
+                        stored.attempts, stored.successes, stored.latency_total = row[0], row[1], row[3]
+                    stored.merge(delta)
+                    merged[(source, bucket)] = stored
+                    conn.execute(
+                        'INSERT INTO source_stats '
+                        '(source, bucket, attempts, successes, latency_hist, latency_total, updated_at) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?) '
+                        'ON CONFLICT (source, bucket) DO UPDATE SET '
+                        'attempts = attempts + excluded.attempts, '
+                        'successes = successes + excluded.successes, '
+                        'latency_total = latency_total + excluded.latency_total, '
+                        'latency_hist = ?, '
+                        'updated_at = excluded.updated_at',
+                        (source, bucket, delta.attempts, delta.successes, json.dumps(delta.latency_hist),
+                         delta.latency_total, now, json.dumps(stored.latency_hist))
+                    )
+                conn.commit()
+            except sqlite3.Error:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to persist source telemetry: {e}")
+            # Keep the unsaved counts for the next flush
+            with self._lock:
+                for key, delta in deltas.items():
+                    pending = self._deltas.get(key)
+                    if pending is None:
+                        self._deltas[key] = delta
+                    else:
+                        pending.merge(delta)
+            return
+
+        with self._lock:
+            for key, stats in merged.items():
+                # Fold in anything recorded while the write was in flight
+                stats = stats.copy()
+                pending = self._deltas.get(key)
+                if pending is not None:
+                    stats.merge(pending)
+                self._stats[key] = stats
+
+    def _stats_for(self, source: str, bucket: str) -> Optional[_SourceStats]:
+        """Use the reporter bucket once it has enough data, else the global bucket."""
+        stats = self._stats.get((source, bucket))
+        if stats is not None and stats.attempts >= self.min_bucket_attempts:
+            return stats
+        return self._stats.get((source, GLOBAL_BUCKET)) or stats
+
+    def get_source_stats(self, source: str, citation: Optional[str] = None) -> Dict[str, float]:
+        """Get success rate and p50/p95 latency for a source (optionally per reporter)."""
+        with self._lock:
+            stats = self._stats_for(source, citation_bucket(citation))
+            return stats.to_dict() if stats else _SourceStats().to_dict()
+
+    def expected_time_to_verify(self, source: str, citation: Optional[str] = None,
+                                prior: float = 0.5, explore: bool = True) -> float:
+        """
+        Expected seconds until this source verifies the citation.
+
+        With ``explore`` the success probability is drawn from the Beta
+        posterior (Thompson sampling); otherwise the posterior mean is used.
+        """
+        prior = min(max(prior, 0.01), 0.99)
+        alpha = 1.0 + prior * self.prior_strength
+        beta = 1.0 + (1.0 - prior) * self.prior_strength
+        latency = self.default_latency
+
+        with self._lock:
+            stats = self._stats_for(source, citation_bucket(citation))
+            if stats is not None and stats.attempts:
+                alpha += stats.successes
+                beta += stats.attempts - stats.successes
+                latency = stats.percentile(0.5) or latency
+
+        if explore:
+            p_success = random.betavariate(alpha, beta)
+        else:
+            p_success = alpha / (alpha + beta)
+        return latency / max(p_success, 1e-3)
+
+    def rank_sources(self, citation: Optional[str], sources: Sequence[str],
+                     priors: Optional[Dict[str, float]] = None, explore: bool = True) -> List[str]:
+        """
+        Order sources by expected time-to-verify (lowest first).
+
+        Args:
+            citation: Citation being verified (selects the reporter bucket)
+            sources: Candidate source names
+            priors: Optional prior success probabilities, e.g. from
+                AdvancedMLPredictor.predict_optimal_sources
+            explore: Use Thompson sampling instead of the posterior mean
+        """
+        priors = priors or {}
+        scored = [
+            (self.expected_time_to_verify(source, citation, priors.get(source, 0.5), explore), index, source)
+            for index, source in enumerate(sources)
+        ]
+        scored.sort()
+        return [source for _ettv, _index, source in scored]
+
+    def get_all_stats(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Get telemetry for every source grouped by bucket."""
+        with self._lock:
+            result: Dict[str, Dict[str, Dict[str, float]]] = {}
+            for (source, bucket), stats in self._stats.items():
+                result.setdefault(source, {})[bucket] = stats.to_dict()
+            return result
+
+
+_source_telemetry = None
+_source_telemetry_lock = threading.Lock()
+
+
+def get_source_telemetry() -> SourceTelemetry:
+    """Get the process-wide source telemetry instance."""
+    global _source_telemetry
+    if _source_telemetry is None:
+        with _source_telemetry_lock:
+            if _source_telemetry is None:
+                _source_telemetry = SourceTelemetry()
+                atexit.register(_source_telemetry.flush)
+    return _source_telemetry
@@ -0,0 +1,109 @@
+"""
+Unit tests for the batched parallel-citation reprocessing job
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+background_tasks = pytest.importorskip("src.background_tasks")
+master_module = pytest.importorskip("src.unified_verification_master")
+database_module = pytest.importorskip("src.database_manager")
+
+
+class _FakeVerifier:
+    """CourtListener batch lookup: volume 999 is not found, volume 500 fails in transport."""
+
+    def __init__(self):
+        self.rate_limits = {master_module.VerificationSource.COURTLISTENER_LOOKUP: {'calls_per_minute': 180}}
+        self.batches = []
+
+    async def verify_citations_batch(self, citations, batch_size=50):
+        raise AssertionError("the reprocess job must not run the fallback scrapers")
+
+    async def _verify_with_courtlistener_lookup_batch(self, citations, extracted_case_names=None,
+                                                      extracted_dates=None, fallback_on_rate_limit=True):
+        assert fallback_on_rate_limit is False
+        self.batches.append(list(citations))
+        results = []
+        for citation in citations:
+            volume = citation.split()[0]
+            if volume == '999':
+                results.append(master_module.VerificationResult(
+                    citation=citation, method=background_tasks.LOOKUP_METHOD, error='Citation not found'))
+            elif volume == '500':
+                results.append(master_module.VerificationResult(citation=citation, error='Read timed out'))
+            else:
+                cluster = {'citations': [{'volume': volume, 'reporter': 'U.S.', 'page': '1'},
+                                         {'volume': volume, 'reporter': 'S. Ct.', 'page': '2'}]}
+                results.append(master_module.VerificationResult(
+                    citation=citation, verified=True, source='courtlistener_lookup_batch',
+                    method=background_tasks.LOOKUP_METHOD, raw_data=cluster))
+        return results
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    manager = database_module.DatabaseManager(str(tmp_path / 'citations.db'), backup_enabled=False)
+    monkeypatch.setattr(background_tasks, 'get_database_manager', lambda: manager)
+    return manager
+
+
+def test_pages_follow_spare_budget_and_write_back_in_batches(db, monkeypatch):
+    texts = [f"{n} U.S. 1" for n in range(1, 60)] + ["999 U.S. 1"]
+    db.execute_many("INSERT INTO citations (citation_text) VALUES (?)", [(t,) for t in texts])
+    verifier = _FakeVerifier()
+    monkeypatch.setattr(master_module, 'get_master_verifier', lambda: verifier)
+    # Interactive traffic leaves one lookup call above the reserve: 50 citations per page
+    limit = 180
+    monkeypatch.setattr(master_module, 'remaining_call_budget',
+                        lambda source, calls_per_minute: limit * background_tasks.REPROCESS_RESERVED_SHARE + 1)
+    executed = []
+    execute_many = db.execute_many
+    monkeypatch.setattr(db, 'execute_many', lambda query, params: (executed.append(len(params)),
+                                                                   execute_many(query, params)))
+
+    background_tasks.reprocess_parallel_citations(batch_size=100, sleep_time=0)
+
+    assert [len(batch) for batch in verifier.batches] == [50, 10]
+    assert executed == [50, 10]
+    rows = {r['citation_text']: r for r in db.execute_query(
+        "SELECT citation_text, parallel_citations, error_count FROM citations")}
+    assert json.loads(rows['7 U.S. 1']['parallel_citations']) == ['7 S. Ct. 2']
+    assert rows['999 U.S. 1']['parallel_citations'] is None
+    assert rows['999 U.S. 1']['error_count'] == 1
+
+    # The unverified row is retried on the next run, until REPROCESS_MAX_ATTEMPTS
+    verifier.batches.clear()
+    for _ in range(background_tasks.REPROCESS_MAX_ATTEMPTS):
+        background_tasks.reprocess_parallel_citations(batch_size=100, sleep_time=0)
+    assert verifier.batches == [['999 U.S. 1']] * (background_tasks.REPROCESS_MAX_ATTEMPTS - 1)
+
+
+def test_unanswered_rows_keep_their_attempts(db, monkeypatch):
+    db.execute_many("INSERT INTO citations (citation_text) VALUES (?)", [("500 U.S. 1",), ("7 U.S. 1",)])
+    verifier = _FakeVerifier()
+    monkeypatch.setattr(master_module, 'get_master_verifier', lambda: verifier)
+    monkeypatch.setattr(master_module, 'remaining_call_budget', lambda source, calls_per_minute: calls_per_minute)
+
+    for _ in range(background_tasks.REPROCESS_MAX_ATTEMPTS + 1):
+        background_tasks.reprocess_parallel_citations(batch_size=100, sleep_time=0)
+
+    rows = {r['citation_text']: r for r in db.execute_query(
+        "SELECT citation_text, parallel_citations, error_count FROM citations")}
+    # A transport failure is not an attempt: the row stays NULL and is looked up on every run
+    assert rows['500 U.S. 1']['parallel_citations'] is None
+    assert not rows['500 U.S. 1']['error_count']
+    assert verifier.batches[-1] == ['500 U.S. 1']
+    assert json.loads(rows['7 U.S. 1']['parallel_citations']) == ['7 S. Ct. 2']
+
+
+def test_parallels_exclude_the_citation_itself():
+    result = SimpleNamespace(verified=True, method=background_tasks.LOOKUP_METHOD, raw_data={'citations': [
+        {'volume': '410', 'reporter': 'U.S.', 'page': '113'}, {'volume': '93', 'reporter': 'S. Ct.', 'page': '705'},
+        {'volume': '35', 'reporter': 'L. Ed. 2d', 'page': None}]})
+    assert background_tasks._parallels_from('410  U.S. 113', result) == ['93 S. Ct. 705']
+    assert background_tasks._parallels_from('410 U.S. 113', SimpleNamespace(verified=False)) is None
+    # A fallback scraper match has no CourtListener cluster to take parallels from
+    scraped = SimpleNamespace(verified=True, method='fallback', raw_data={})
+    assert background_tasks._parallels_from('410 U.S. 113', scraped) is None
@@ -0,0 +1,119 @@
+"""
+Unit tests for bulk corpus processing
+"""
+import asyncio
+import json
+
+import pytest
+
+bulk = pytest.importorskip("src.bulk_processing")
+master_module = pytest.importorskip("src.unified_verification_master")
+cache_module = pytest.importorskip("src.websearch.cache")
+
+
+def test_manifest_accepts_paths_and_inline_text(tmp_path):
+    (tmp_path / 'one.txt').write_text('text')
+    manifest = tmp_path / 'manifest.jsonl'
+    manifest.write_text('# corpus\none.txt\n{"id": "inline", "text": "410 U.S. 113"}\n')
+
+    documents = list(bulk.iter_documents(str(manifest)))
+
+    assert [d.doc_id for d in documents] == ['one.txt', 'inline']
+    assert documents[0].path == str(tmp_path / 'one.txt')
+    assert documents[1].text == '410 U.S. 113'
+
+
+def test_checkpoint_drops_a_torn_last_record(tmp_path):
+    results = tmp_path / bulk.RESULTS_FILE
+    records = [{'id': 'a', 'status': 'ok'}, {'id': 'b', 'status': 'error'}]
+    results.write_text(''.join(json.dumps(r) + '\n' for r in records) + '{"id": "c", "sta')
+
+    assert bulk.completed_ids(str(results)) == {'a'}
+    assert bulk.completed_ids(str(results), include_failed=True) == {'a', 'b'}
+    assert results.read_text().endswith('"error"}\n')
+
+
+def test_shared_store_verifies_each_citation_once(tmp_path, monkeypatch):
+    VerificationResult = master_module.VerificationResult
+    calls = []
+
+    async def fake_uncached(self, citations, names=None, dates=None, batch_size=50, timeout=10.0):
+        calls.append(list(citations))
+        return [VerificationResult(citation=c, verified=True, canonical_name=n) for c, n in zip(citations, names)]
+
+    monkeypatch.setattr(master_module.UnifiedVerificationMaster, '_verify_citations_batch_uncached', fake_uncached)
+    store = cache_module.CacheManager(cache_file=str(tmp_path / 'store.db'))
+    master_module.set_verification_result_store(store)
+    try:
+        verifier = master_module.UnifiedVerificationMaster.__new__(master_module.UnifiedVerificationMaster)
+        first = asyncio.run(verifier.verify_citations_batch(['410 U.S. 113', '410 U.S. 113'], ['Roe', 'Roe']))
+        store._memory.clear()
+        second = asyncio.run(verifier.verify_citations_batch(['410 U.S. 113', '347 U.S. 483'], ['Roe', 'Brown']))
+    finally:
+        master_module.set_verification_result_store(None)
+        store.close()
+
+    assert calls == [['410 U.S. 113'], ['347 U.S. 483']]
+    assert [r.canonical_name for r in first] == ['Roe', 'Roe']
+    assert [r.canonical_name for r in second] == ['Roe', 'Brown']
+
+
+def test_two_phase_verifies_unique_citations_once_and_joins_back(tmp_path, monkeypatch):
+    VerificationResult = master_module.VerificationResult
+    calls = []
+
+    async def fake_uncached(self, citations, names=None, dates=None, batch_size=50, timeout=10.0):
+        calls.append((list(citations), batch_size))
+        return [VerificationResult(citation=c, verified=c == '150 Wn.2d 100', canonical_name='State v. Smith')
+                for c in citations]
+
+    monkeypatch.setattr(master_module.UnifiedVerificationMaster, '_verify_citations_batch_uncached', fake_uncached)
+
+    def record(doc_id):
+        citations = [{'citation': '150 Wn.2d 100', 'cluster_id': 'cluster_1'},
+                     {'citation': '90  P.3d 1', 'cluster_id': 'cluster_1'}]
+        cluster = {'cluster_id': 'cluster_1', 'citations': [{'text': '150 Wn.2d 100'}, {'text': '90  P.3d 1'}]}
+        return {'id': doc_id, 'status': 'ok', 'citations': citations, 'clusters': [cluster],
+                'verification': bulk.VERIFICATION_PENDING}
+
+    processor = bulk.BulkProcessor(str(tmp_path), workers=1, two_phase=True)
+    with open(processor.results_path, 'w') as f:
+        for doc_id in ('a', 'b'):
+            f.write(json.dumps(record(doc_id)) + '\n')
+
+    assert processor.verify_corpus() == (2, 1)
+    assert processor.verify_corpus() == (0, 0)  # nothing pending on rerun
+
+    assert calls == [(['150 Wn.2d 100', '90 P.3d 1'], bulk.CORPUS_VERIFY_BATCH_SIZE)]
+    records = list(bulk._read_records(processor.results_path))
+    for joined in records:
+        assert joined['verification'] == bulk.VERIFICATION_APPLIED
+        assert [c['verified'] for c in joined['citations']] == [True, False]
+        assert joined['citations'][1]['true_by_parallel']
+        assert joined['clusters'][0]['verified']
+        assert joined['clusters'][0]['canonical_name'] == 'State v. Smith'
+
+
+def test_errored_results_are_not_stored(tmp_path, monkeypatch):
+    VerificationResult = master_module.VerificationResult
+    calls = []
+
+    async def fake_uncached(self, citations, names=None, dates=None, batch_size=50, timeout=10.0):
+        calls.append(list(citations))
+        if len(calls) == 1:
+            return [VerificationResult(citation=c, error="CourtListener rate limited") for c in citations]
+        return [VerificationResult(citation=c, verified=True) for c in citations]
+
+    monkeypatch.setattr(master_module.UnifiedVerificationMaster, '_verify_citations_batch_uncached', fake_uncached)
+    store = cache_module.CacheManager(cache_file=str(tmp_path / 'store.db'))
+    master_module.set_verification_result_store(store)
+    try:
+        verifier = master_module.UnifiedVerificationMaster.__new__(master_module.UnifiedVerificationMaster)
+        first = asyncio.run(verifier.verify_citations_batch(['410 U.S. 113']))
+        second = asyncio.run(verifier.verify_citations_batch(['410 U.S. 113']))
+    finally:
+        master_module.set_verification_result_store(None)
+        store.close()
+
+    assert calls == [['410 U.S. 113'], ['410 U.S. 113']]
+    assert first[0].error and second[0].verified
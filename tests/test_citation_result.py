@@ -0,0 +1,64 @@
+"""
+Unit tests for the slotted CitationResult
+"""
+import copy
+import pickle
+
+import pytest
+
+models = pytest.importorskip("src.models")
+
+CitationResult = models.CitationResult
+
+
+def test_collections_are_lazy_but_read_as_empty():
+    citation = CitationResult('410 U.S. 113', extracted_case_name='Roe v. Wade')
+
+    assert citation._parallel_citations is None and citation._metadata is None
+    assert citation.to_dict()['parallel_citations'] == []
+    assert citation._parallel_citations is None  # serialization does not allocate
+    citation.parallel_citations.append('93 S. Ct. 705')
+    assert citation.parallel_citations == ['93 S. Ct. 705']
+    assert getattr(citation, 'metadata', None) == {}
+
+
+def test_ad_hoc_attributes_and_getattr_defaults_still_work():
+    citation = CitationResult('410 U.S. 113')
+    citation.cluster_case_name = 'Roe v. Wade'
+    citation.metadata['block_year'] = '1973'
+
+    assert getattr(citation, 'verification_status', 'missing') == 'missing'
+    assert hasattr(citation, '__dict__')
+    assert citation.to_dict()['cluster_case_name'] == 'Roe v. Wade'
+    with pytest.raises(AttributeError):
+        citation.not_an_attribute
+
+
+def test_copy_and_pickle_round_trip():
+    citation = CitationResult('410 U.S. 113', canonical_name='Roe v. Wade', parallel_citations=['93 S. Ct. 705'])
+    citation.cluster_case_name = 'Roe v. Wade'
+
+    for clone in (copy.copy(citation), copy.deepcopy(citation), pickle.loads(pickle.dumps(citation))):
+        assert clone == citation
+        assert clone.cluster_case_name == 'Roe v. Wade'
+        assert clone.to_dict() == citation.to_dict()
+    assert copy.copy(citation).parallel_citations is citation.parallel_citations
+    assert CitationResult('1 U.S. 1') != CitationResult('2 U.S. 2')
+
+
+def test_to_dict_round_trips_every_field_and_ad_hoc_attribute():
+    values = {name: f'{name}-value' for name in models._CITATION_FIELD_NAMES}
+    values.update(verified=True, confidence=0.9, start_index=3, end_index=15, is_parallel=True,
+                  is_cluster=True, true_by_parallel=True, is_pinpoint=True,
+                  parallel_citations=['93 S. Ct. 705'], cluster_members=['a'], pinpoint_pages=['116'],
+                  docket_numbers=['70-18'], case_history=['aff\'d'], metadata={'block_year': '1973'})
+    citation = CitationResult(**values)
+    citation.verification_status = 'deferred'
+    citation.original_case_name = 'Roe'
+
+    data = citation.to_dict()
+
+    assert CitationResult(**{name: data[name] for name in models._CITATION_FIELD_NAMES}) == citation
+    assert data['verification_status'] == 'deferred'
+    assert data['original_case_name'] == 'Roe'
+    assert data['is_verified'] is True
@@ -0,0 +1,97 @@
+"""
+Unit tests for the corpus benchmark harness
+"""
+import asyncio
+
+import pytest
+
+corpus_benchmark = pytest.importorskip("src.performance.corpus_benchmark")
+
+
+def _totals(**overrides):
+    totals = {
+        'citations': 100, 'clusters': 40, 'total_seconds': 10.0, 'citations_per_second': 10.0,
+        'peak_rss_mb': 200.0,
+        'stages': {stage: 2.0 for stage in corpus_benchmark.STAGES},
+    }
+    totals.update(overrides)
+    return {'totals': totals}
+
+
+def test_baseline_comparison_flags_only_real_regressions():
+    baseline = _totals()
+    stages = dict(baseline['totals']['stages'], clustering=3.0, serialization=2.04)
+    current = _totals(stages=stages, citations=99, citations_per_second=9.5)
+
+    regressions = corpus_benchmark.compare_to_baseline(current, baseline, tolerance=0.2)
+
+    assert {r['metric'] for r in regressions} == {'stages.clustering', 'citations'}
+
+
+def _run(*documents):
+    names = [name for name, _ in documents]
+    per_document = [{'name': name, 'citations': citations, 'clusters': 10, 'total_seconds': 1.0,
+                     'stages': {stage: 0.2 for stage in corpus_benchmark.STAGES}}
+                    for name, citations in documents]
+    return {'totals': {'citations': sum(d['citations'] for d in per_document), 'peak_rss_mb': 200.0 * len(names)},
+            'documents': per_document}
+
+
+def test_partial_run_is_compared_on_shared_documents():
+    baseline = _run(('a.txt', 30), ('b.txt', 40), ('c.txt', 50))
+
+    assert corpus_benchmark.compare_to_baseline(_run(('a.txt', 30), ('b.txt', 40)), baseline) == []
+
+    regressions = corpus_benchmark.compare_to_baseline(_run(('a.txt', 30), ('b.txt', 41)), baseline)
+    assert [r['metric'] for r in regressions] == ['b.txt.citations']
+
+
+def test_stage_timer_maps_progress_steps_to_stages():
+    timer = corpus_benchmark.StageTimer()
+    for step in ('Extracting', 'Enhancing', 'Filtering', 'Clustering', 'Complete'):
+        timer(0, step, '')
+    timer.finish()
+
+    assert timer.durations['extraction'] > 0
+    assert timer.durations['case_name_enrichment'] > 0
+    assert timer.durations['verification'] == 0
+
+
+def test_recorded_verifier_answers_without_network():
+    from src.unified_verification_master import UnifiedVerificationMaster
+
+    recorded = corpus_benchmark.RecordedVerifier({
+        '410 U.S. 113': {'verified': True, 'canonical_name': 'Roe v. Wade', 'canonical_date': '1973',
+                         'canonical_url': 'https://www.courtlistener.com/opinion/108713/roe-v-wade/'},
+    })
+    original = UnifiedVerificationMaster.__dict__['verify_citations_batch']
+
+    with recorded.installed():
+        master = UnifiedVerificationMaster.__new__(UnifiedVerificationMaster)
+        results = asyncio.run(master.verify_citations_batch(['410 U.S. 113', '1 Wn.2d 1']))
+
+    assert [r.verified for r in results] == [True, False]
+    assert results[0].canonical_name == 'Roe v. Wade'
+    assert recorded.calls == 1
+    assert UnifiedVerificationMaster.__dict__['verify_citations_batch'] is original
+
+
+def test_processor_batch_step_replays_recordings(monkeypatch):
+    from src.models import CitationResult
+    from src.unified_citation_processor_v2 import UnifiedCitationProcessorV2
+
+    monkeypatch.setattr('src.verification_scheduler.get_verification_scheduler', lambda: None)
+    recorded = corpus_benchmark.RecordedVerifier({'410 U.S. 113': {'verified': True, 'canonical_name': 'Roe v. Wade'}})
+    processor = UnifiedCitationProcessorV2.__new__(UnifiedCitationProcessorV2)
+    citations = [CitationResult(citation='410 U.S. 113'), CitationResult(citation='1 Wn.2d 1')]
+
+    async def inside_event_loop():
+        # process_text runs the batch step synchronously from inside its event loop
+        return processor._verify_citations_sync(citations)
+
+    with recorded.installed():
+        results = asyncio.run(inside_event_loop())
+
+    assert [c.verification_status for c in results] == ['verified', 'not_found']
+    assert results[0].canonical_name == 'Roe v. Wade'
+    assert recorded.calls == 1
@@ -0,0 +1,66 @@
+"""
+Unit tests for online database backup and maintenance
+"""
+import gzip
+import sqlite3
+import threading
+
+import pytest
+
+database_module = pytest.importorskip("src.database_manager")
+
+
+@pytest.fixture
+def manager(tmp_path):
+    db = database_module.DatabaseManager(str(tmp_path / 'citations.db'), backup_enabled=False)
+    db.execute_many("INSERT INTO citations (citation_text, case_name) VALUES (?, ?)",
+                    [(f"{n} U.S. {n}", 'x' * 500) for n in range(2000)])
+    yield db
+    db.close()
+
+
+def test_backup_is_a_consistent_snapshot_taken_in_steps(manager, tmp_path):
+    stop = threading.Event()
+
+    def writer():
+        n = 10_000
+        while not stop.is_set():
+            manager.execute_query("INSERT INTO citations (citation_text) VALUES (?)", (f"{n} F.3d 1",))
+            n += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        path = manager.backup_database(str(tmp_path / 'backup.db.gz'), pages_per_step=50, step_sleep=0.001)
+    finally:
+        stop.set()
+        thread.join()
+
+    restored = tmp_path / 'restored.db'
+    with gzip.open(path, 'rb') as f_in:
+        restored.write_bytes(f_in.read())
+    conn = sqlite3.connect(restored)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == 'ok'
+    assert conn.execute("SELECT COUNT(*) FROM citations WHERE citation_text LIKE '% U.S. %'").fetchone()[0] == 2000
+    conn.close()
+
+    assert manager.stats['last_backup_steps'] > 1
+    assert manager.stats['last_backup_seconds'] is not None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['backup.db.gz', 'citations.db', 'citations.db-shm',
+                                                          'citations.db-wal', 'restored.db']
+
+
+def test_maintenance_releases_free_pages_in_steps(manager):
+    def freelist_count():
+        with manager.get_connection() as conn:
+            return conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    manager.execute_query("DELETE FROM citations")
+    free_pages = freelist_count()
+    assert free_pages > 16
+
+    assert manager.maintain_database(pages_per_step=16, step_sleep=0)
+
+    assert freelist_count() == 0
+    assert manager.stats['vacuumed_pages'] == free_pages
+    assert 0 < manager.stats['write_stall_max_seconds'] <= manager.stats['write_stall_seconds']
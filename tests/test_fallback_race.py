@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+from src.enhanced_fallback_verifier import EnhancedFallbackVerifier
+
+
+def test_domain_slot_held_until_timed_out_scraper_returns(monkeypatch):
+    verifier = EnhancedFallbackVerifier()
+    verifier.per_domain_limit = 1
+    release = threading.Event()
+    started = []
+
+    def slow_scraper(*args):
+        started.append(threading.current_thread().name)
+        release.wait(5)
+        return {'verified': False}
+
+    monkeypatch.setattr(verifier, '_get_race_sources', lambda: {'slow': (slow_scraper, 'slow.test', 10)})
+    monkeypatch.setattr(verifier, '_record_source_outcome', lambda *args: None)
+
+    async def scenario():
+        assert await verifier._run_race_source('slow', '1 U.S. 1', {}, None, None, 'q', 0.05) is None
+        second = asyncio.ensure_future(verifier._run_race_source('slow', '1 U.S. 1', {}, None, None, 'q', 1))
+        await asyncio.sleep(0.1)
+        # The first thread is still running, so the second racer must wait
+        assert len(started) == 1
+        release.set()
+        await second
+        assert len(started) == 2
+
+    asyncio.run(scenario())
+    assert all(name.startswith('fallback-scraper') for name in started)
+
+
+def test_scraper_threads_get_their_own_session_and_spaced_sends(monkeypatch):
+    verifier = EnhancedFallbackVerifier()
+    verifier.min_delay = 0.05
+    sleeps, sessions = [], []
+    monkeypatch.setattr('src.enhanced_fallback_verifier.time.sleep', sleeps.append)
+
+    def scrape():
+        verifier._rate_limit('justia.com')
+        sessions.append(verifier.session)
+
+    threads = [threading.Thread(target=scrape) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(session) for session in sessions}) == 3
+    assert sessions[0].headers['User-Agent'].startswith('CaseStrainer')
+    assert sorted(round(delay, 2) for delay in sleeps) == [0.05, 0.1]
+
+
+def test_cached_verification_skips_the_race(monkeypatch):
+    verifier = EnhancedFallbackVerifier()
+    calls = []
+
+    def scraper(*args):
+        calls.append(args[0])
+        return {'verified': True, 'canonical_name': 'Roe v. Wade', 'url': 'https://example.test/roe'}
+
+    monkeypatch.setattr(verifier, '_get_race_sources', lambda: {'fast': (scraper, 'fast.test', 5)})
+    monkeypatch.setattr(verifier, '_rank_race_sources', lambda *args: ['fast'])
+    monkeypatch.setattr(verifier, '_record_source_outcome', lambda *args: None)
+    monkeypatch.setattr(verifier, '_calculate_verification_score', lambda *args: 1.0)
+
+    first = asyncio.run(verifier._race_citation('410 U.S. 113', 'Roe v. Wade', '1973'))
+    second = asyncio.run(verifier._race_citation('410 U.S. 113', 'Roe v. Wade', '1973'))
+
+    assert first['race_source'] == 'fast' and second == first
+    assert calls == ['410 U.S. 113']
+
+
+def test_domain_semaphores_are_kept_per_event_loop():
+    verifier = EnhancedFallbackVerifier()
+    barrier = threading.Barrier(2)
+    seen = {}
+
+    async def take(name):
+        first = verifier._get_domain_semaphore('justia.com')
+        barrier.wait(5)  # both loops are alive at once
+        seen[name] = (first, verifier._get_domain_semaphore('justia.com'))
+
+    threads = [threading.Thread(target=asyncio.run, args=(take(name),)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen['a'][0] is seen['a'][1] and seen['b'][0] is seen['b'][1]
+    assert seen['a'][0] is not seen['b'][0]
@@ -0,0 +1,54 @@
+"""
+Unit tests for the pluggable HTML parsing layer
+"""
+import pytest
+
+html_parsing = pytest.importorskip("src.utils.html_parsing")
+
+PAGE = """
+<html><head><title>Smith v. Jones | Justia</title><style>.x{}</style></head>
+<body>
+  <div class="nav"><h1>Opinion</h1></div>
+  <div class="case-title main">Smith <b>v.</b> Jones</div>
+  <span class="court-name">Supreme Court of Washington</span>
+  <script>var court = "nope";</script>
+  <p class="decision-date">2017</p>
+</body></html>
+"""
+
+
+@pytest.fixture(params=["streaming", "default"])
+def backend(request, monkeypatch):
+    if request.param == "streaming":
+        monkeypatch.setattr(html_parsing, "SELECTOLAX_AVAILABLE", False)
+        monkeypatch.setattr(html_parsing, "LXML_AVAILABLE", False)
+    return request.param
+
+
+def test_extract_fields_matches_select_one(backend):
+    fields = html_parsing.extract_fields(PAGE, {
+        'title': '.case-title, h1',
+        'court': '.court-name, .jurisdiction',
+        'date': '.decision-date, .date',
+        'page_title': ['title', 'h1'],
+        'missing': '.does-not-exist',
+    })
+    assert fields == {
+        'title': 'Opinion',  # first match in document order, like select_one
+        'court': 'Supreme Court of Washington',
+        'date': '2017',
+        'page_title': 'Smith v. Jones | Justia',
+        'missing': '',
+    }
+
+
+def test_html_to_text_drops_script_and_style(backend):
+    text = html_parsing.html_to_text(PAGE)
+    assert 'Supreme Court of Washington' in text
+    assert 'nope' not in text
+    assert '.x{}' not in text
+
+
+def test_body_size_cap():
+    assert html_parsing.cap_html("<p>abcdef</p>", max_bytes=5) == "<p>ab"
+    assert html_parsing.cap_html(b"<p>abcdef</p>", max_bytes=5) == b"<p>ab"
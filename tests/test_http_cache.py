@@ -0,0 +1,201 @@
+"""
+Unit tests for the conditional-GET HTTP cache
+"""
+import pytest
+
+http_cache = pytest.importorskip("src.http_cache")
+
+HTTPCache = http_cache.HTTPCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None, url='https://example.com/opinion'):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = body
+        self.url = url
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None, stream=False, **kwargs):
+        self.requests.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+URL = 'https://example.com/opinion'
+
+
+def test_fresh_entry_served_without_request():
+    session = FakeSession([FakeResponse(200, b'<h1>Roe v. Wade</h1>', {'Content-Type': 'text/html; charset=utf-8'})])
+    cache = HTTPCache()
+
+    first = cache.get(URL, session=session)
+    second = cache.get(URL, session=session)
+
+    assert not first.from_cache
+    assert second.from_cache
+    assert second.text == '<h1>Roe v. Wade</h1>'
+    assert len(session.requests) == 1
+
+
+def test_stale_entry_revalidates_with_validators():
+    session = FakeSession([
+        FakeResponse(200, b'opinion text', {'Cache-Control': 'no-cache', 'ETag': '"v1"',
+                                            'Last-Modified': 'Mon, 02 Jan 2023 00:00:00 GMT'}),
+        FakeResponse(304, headers={'ETag': '"v1"'}),
+    ])
+    cache = HTTPCache()
+
+    cache.get(URL, session=session)
+    revalidated = cache.get(URL, session=session)
+
+    assert session.requests[1]['If-None-Match'] == '"v1"'
+    assert session.requests[1]['If-Modified-Since'] == 'Mon, 02 Jan 2023 00:00:00 GMT'
+    assert revalidated.revalidated
+    assert revalidated.content == b'opinion text'
+
+
+def test_cache_control_and_kind_ttls():
+    cache = HTTPCache(search_ttl=60, opinion_ttl=3600)
+
+    assert cache.freshness_lifetime({}, 'search') == 60
+    assert cache.freshness_lifetime({}, 'opinion') == 3600
+    assert cache.freshness_lifetime({'Cache-Control': 'max-age=120'}, 'opinion') == 120
+    assert cache.freshness_lifetime({'Cache-Control': 'max-age=120'}, 'search') == 60
+    assert cache.freshness_lifetime({'Cache-Control': 'no-store'}, 'opinion') is None
+
+    session = FakeSession([
+        FakeResponse(200, b'a', {'Cache-Control': 'no-store'}),
+        FakeResponse(200, b'b', {'Cache-Control': 'no-store'}),
+    ])
+    assert cache.get(URL, session=session).content == b'a'
+    assert cache.get(URL, session=session).content == b'b'
+
+
+def test_identical_bodies_share_one_blob():
+    cache = HTTPCache()
+    session = FakeSession([FakeResponse(200, b'same body'), FakeResponse(200, b'same body')])
+
+    cache.get('https://example.com/a', session=session)
+    cache.get('https://example.com/b', session=session)
+
+    assert len(cache._memory._bodies) == 1
+
+
+def test_repeated_revalidation_keeps_serving_the_cached_body():
+    session = FakeSession([
+        FakeResponse(200, b'opinion text', {'Cache-Control': 'no-cache', 'ETag': '"v1"'}),
+        FakeResponse(304, headers={'ETag': '"v1"'}),
+        FakeResponse(304, headers={'ETag': '"v1"'}),
+    ])
+    cache = HTTPCache()
+
+    cache.get(URL, session=session)
+    first = cache.get(URL, session=session)
+    second = cache.get(URL, session=session)
+
+    assert [r.get('If-None-Match') for r in session.requests] == [None, '"v1"', '"v1"']
+    assert first.status_code == second.status_code == 200
+    assert second.revalidated
+    assert second.content == b'opinion text'
+
+
+def test_bodies_over_the_cache_limit_are_returned_whole_but_not_stored():
+    body = b'x' * 200_000
+    session = FakeSession([FakeResponse(200, body), FakeResponse(200, body), FakeResponse(200, body)])
+    cache = HTTPCache(max_body_bytes=100_000)
+
+    response = cache.get(URL, session=session)
+    assert response.content == body and not response.truncated
+    assert not cache.get(URL, session=session).from_cache
+
+    capped = cache.get(URL, session=session, max_bytes=1000)
+    assert capped.truncated and len(capped.content) > 1000
+
+
+def test_lookup_and_store_share_the_url_entries():
+    cache = HTTPCache()
+    assert cache.lookup(URL) is None
+
+    cache.store(URL, b'stored elsewhere', ttl=60)
+    assert cache.lookup(URL) == b'stored elsewhere'
+    assert cache.get(URL, session=FakeSession([])).content == b'stored elsewhere'
+
+
+def test_authorization_and_accept_select_separate_entries():
+    session = FakeSession([
+        FakeResponse(200, b'{"plain_text": "api"}', {'Content-Type': 'application/json'}),
+        FakeResponse(200, b'<p>html</p>', {'Content-Type': 'text/html'}),
+    ])
+    cache = HTTPCache()
+    api_headers = {'Authorization': 'Token secret', 'Accept': 'application/json'}
+
+    assert cache.get(URL, session=session, headers=api_headers).content == b'{"plain_text": "api"}'
+    assert cache.get(URL, session=session, headers={'Accept': 'text/html'}).content == b'<p>html</p>'
+    assert cache.get(URL, session=session, headers=api_headers).from_cache
+    assert len(session.requests) == 2
+    stored = [entry['vary']['authorization'] for entry in cache._memory._entries.values()]
+    assert 'Token secret' not in stored
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def ttl(self, key):
+        if key not in self.values:
+            return -2
+        return self.ttls.get(key, -1)
+
+    def pipeline(self):
+        return self
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+        self.ttls[key] = ttl
+
+    def expire(self, key, ttl):
+        if key in self.values:
+            self.ttls[key] = ttl
+
+    def execute(self):
+        pass
+
+
+def test_redis_body_ttl_is_only_extended():
+    client = FakeRedis()
+    store = http_cache._RedisStore(client)
+    body_key = 'casestrainer:http:body:abc'
+
+    store.set('long', {'body_hash': 'abc'}, b'shared', 1000)
+    store.set('short', {'body_hash': 'abc'}, b'shared', 10)
+    assert client.ttls[body_key] == 1000
+
+    store.set('longer', {'body_hash': 'abc'}, None, 5000)
+    assert client.ttls[body_key] == 5000
+
+
+def test_fetch_url_content_rejects_bodies_over_the_upload_limit(monkeypatch):
+    progress_manager = pytest.importorskip("src.progress_manager")
+    body = b'x' * 5000
+    cache = HTTPCache()
+    monkeypatch.setattr(progress_manager, 'MAX_CONTENT_LENGTH', 1000)
+    monkeypatch.setattr(progress_manager, 'get_http_cache', lambda: cache)
+    monkeypatch.setattr(http_cache.requests, 'get',
+                        lambda url, **kwargs: FakeResponse(200, body, {'Content-Type': 'text/plain'}))
+
+    with pytest.raises(Exception, match='larger than'):
+        progress_manager.fetch_url_content('https://example.com/huge.txt')
+    assert cache.lookup('https://example.com/huge.txt') is None
@@ -0,0 +1,61 @@
+"""
+Import-time budget for the web process
+
+The web tier should import routing and validation only. Extraction,
+verification, websearch and PDF engines load on first use or in workers.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+WEB_ENTRYPOINT = 'src.app_final_vue'
+# Cumulative import time of the entrypoint under -X importtime; override on slow runners
+IMPORT_BUDGET_MS = float(os.environ.get('WEB_IMPORT_BUDGET_MS', 1000))
+WORKER_ONLY_MODULES = (
+    'src.rq_worker',
+    'src.redis_distributed_processor',
+    'src.case_name_extraction_core',
+    'src.unified_citation_processor_v2',
+    'src.unified_verification_master',
+    'src.websearch',
+    'eyecite',
+    'sklearn',
+    'pdfplumber',
+    'PyPDF2',
+    'fitz',
+)
+
+
+def _importtime(module):
+    """{module: cumulative microseconds} for a cold import of ``module``."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                          cwd=REPO_ROOT, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+        pytest.fail(f"{module} failed to import:\n" + '\n'.join(errors), pytrace=False)
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+@pytest.fixture(scope='module')
+def web_imports():
+    return _importtime(WEB_ENTRYPOINT)
+
+
+def test_web_process_does_not_import_worker_engines(web_imports):
+    loaded = sorted(name for name in web_imports
+                    if any(name == m or name.startswith(m + '.') for m in WORKER_ONLY_MODULES))
+    assert loaded == []
+
+
+def test_web_process_import_stays_within_budget(web_imports):
+    assert web_imports[WEB_ENTRYPOINT] / 1000 <= IMPORT_BUDGET_MS
@@ -0,0 +1,157 @@
+"""
+Unit tests for incremental re-analysis of edited documents
+"""
+import re
+
+import pytest
+
+incremental = pytest.importorskip("src.incremental_analysis")
+pytest.importorskip("fast_diff_match_patch")
+master_module = pytest.importorskip("src.unified_verification_master")
+cache_module = pytest.importorskip("src.websearch.cache")
+result_store = pytest.importorskip("src.result_store")
+
+CITATION = re.compile(r'\d+ U\.S\. \d+')
+
+PARAGRAPHS = (["Roe v. Wade, 410 U.S. 113 (1973)."]
+              + [f"Filler paragraph {i}." for i in range(1, 13)]
+              + ["Brown v. Board, 347 U.S. 483 (1954)."])
+
+
+def _fake_process(processed):
+    """Stand-in for the pipeline: one citation per match, one cluster per citation."""
+    def process(text, window=False):
+        processed.append(text)
+        citations, clusters = [], []
+        for i, match in enumerate(CITATION.finditer(text)):
+            cluster_id = f"cluster_{i + 1}"
+            citations.append({'citation': match.group(), 'start_index': match.start(), 'end_index': match.end(),
+                              'cluster_id': cluster_id, 'verified': False})
+            clusters.append({'cluster_id': cluster_id, 'citations': [{'text': match.group()}]})
+        return {'citations': citations, 'clusters': clusters}
+    return process
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    store = cache_module.CacheManager(cache_file=str(tmp_path / 'snapshots.db'))
+    yield incremental.IncrementalAnalyzer(store=store, enable_verification=False)
+    store.close()
+
+
+def test_paragraph_spans_cover_the_text():
+    text = "one\n\ntwo\n \nthree"
+    spans = incremental.paragraph_spans(text)
+    assert [text[s:e] for s, e in spans] == ["one\n\n", "two\n \n", "three"]
+
+
+def test_only_dirty_paragraphs_are_reprocessed(analyzer, monkeypatch):
+    processed = []
+    monkeypatch.setattr(analyzer, '_process', _fake_process(processed))
+    original = "\n\n".join(PARAGRAPHS)
+    analyzer.analyze('brief', original)
+
+    edited = original.replace("Filler paragraph 12.", "Filler 12, citing 505 U.S. 833.")
+    result = analyzer.analyze('brief', edited)
+
+    stats = result['metadata']['incremental']
+    assert stats['mode'] == 'incremental'
+    assert stats['reused_citations'] == 1
+    # Only the edited paragraph and its neighbours are re-extracted
+    assert processed[-1] == "Filler paragraph 11.\n\nFiller 12, citing 505 U.S. 833.\n\n" + PARAGRAPHS[-1]
+    for citation in result['citations']:
+        assert edited[citation['start_index']:citation['end_index']] == citation['citation']
+    assert [c['citation'] for c in result['citations']] == ['410 U.S. 113', '505 U.S. 833', '347 U.S. 483']
+    cluster_ids = [c['cluster_id'] for c in result['clusters']]
+    assert len(set(cluster_ids)) == 3
+    assert {c['cluster_id'] for c in result['citations']} == set(cluster_ids)
+
+    assert analyzer.analyze('brief', edited)['metadata']['incremental']['mode'] == 'unchanged'
+
+
+def test_verification_is_reused_for_known_citations(analyzer, monkeypatch):
+    VerificationResult = master_module.VerificationResult
+    calls = []
+
+    async def fake_batch(citations, names=None, dates=None, batch_size=50, timeout=10.0):
+        calls.append(list(citations))
+        return [VerificationResult(citation=c, verified=True, canonical_name='Casey', canonical_date='1992',
+                                   canonical_url='https://example.test', source='fake') for c in citations]
+
+    verifier = master_module.UnifiedVerificationMaster.__new__(master_module.UnifiedVerificationMaster)
+    monkeypatch.setattr(verifier, 'verify_citations_batch', fake_batch, raising=False)
+    monkeypatch.setattr(master_module, '_master_verifier', verifier)
+    monkeypatch.setattr(analyzer, '_process', _fake_process([]))
+    analyzer.enable_verification = True
+
+    original = "\n\n".join(PARAGRAPHS)
+    snapshot = analyzer._process(original)
+    snapshot['citations'][0].update({'verified': True, 'canonical_name': 'Roe v. Wade', 'canonical_date': '1973',
+                                     'canonical_url': 'https://example.test/roe', 'verification_source': 'fake'})
+    analyzer.save_snapshot('brief', original, snapshot)
+
+    # Roe moves into the dirty window; its verification comes from the snapshot
+    edited = original.replace("Roe v. Wade", "Roe v. Wade, as applied") + "\n\nCasey, 505 U.S. 833."
+    result = analyzer.analyze('brief', edited)
+
+    assert result['metadata']['incremental']['mode'] == 'incremental'
+    assert calls == [['505 U.S. 833']]
+    by_text = {c['citation']: c for c in result['citations']}
+    assert by_text['410 U.S. 113']['canonical_name'] == 'Roe v. Wade'
+    assert by_text['505 U.S. 833']['verified']
+    assert not by_text['347 U.S. 483']['verified']
+
+
+def test_snapshots_are_namespaced_per_client(analyzer, monkeypatch):
+    monkeypatch.setattr(analyzer, '_process', _fake_process([]))
+    text = "\n\n".join(PARAGRAPHS)
+    analyzer.analyze('brief', text, owner='10.0.0.1')
+
+    assert analyzer.plan('brief', text, owner='10.0.0.1') == {'mode': 'unchanged', 'reprocessed_chars': 0}
+    assert analyzer.plan('brief', text, owner='10.0.0.2') == {'mode': 'full', 'reprocessed_chars': len(text)}
+    edited = text.replace("Filler paragraph 6.", "Filler paragraph six.")
+    plan = analyzer.plan('brief', edited, owner='10.0.0.1')
+    assert plan['mode'] == 'incremental' and plan['reprocessed_chars'] < len(edited) / 4
+
+
+def test_endpoint_queues_full_runs_and_inlines_small_edits(analyzer, monkeypatch, tmp_path):
+    from flask import Flask
+    from src import vue_api_endpoints_updated as endpoints
+    from src.api.services.citation_service import CitationService
+    from src.job_queues import JobScheduler
+
+    app = Flask(__name__)
+    app.register_blueprint(endpoints.vue_api)
+    client = app.test_client()
+    processed, enqueued = [], []
+    monkeypatch.setattr(analyzer, '_process', _fake_process(processed))
+    monkeypatch.setattr(incremental, 'get_incremental_analyzer', lambda: analyzer)
+    monkeypatch.setattr(JobScheduler, 'enqueue', lambda self, f, **kwargs: enqueued.append((f, kwargs)))
+    monkeypatch.setattr(CitationService, 'SYNC_THRESHOLD', 100)
+    text = "\n\n".join(PARAGRAPHS)
+    body = {'type': 'text', 'text': text, 'incremental': True, 'document_id': 'brief'}
+
+    # First submission: nothing to diff against, so it is sized like any other document
+    first = client.post('/analyze', json=body).get_json()
+    assert first['metadata']['processing_mode'] == 'queued'
+    assert enqueued[0][0] == 'src.incremental_analysis.analyze_document_task'
+    _, document_id, queued_text, owner, diff = enqueued[0][1]['args']
+    assert (document_id, queued_text, owner, diff) == ('brief', text, '127.0.0.1', None)
+    assert processed == []
+
+    # The worker keeps only a pointer in RQ; the payload goes to the result store
+    store = result_store.ResultStore(spill_dir=str(tmp_path / 'results'))
+    monkeypatch.setattr(result_store, '_result_store', store)
+    pointer = incremental.analyze_document_task('job', document_id, queued_text, owner)
+    assert 'citations' not in pointer and pointer['result_ref']['citation_count'] == 2
+    assert len(store.load('job')['citations']) == 2
+
+    # The inline edit reuses the diff computed while planning
+    diffs = []
+    text_diff = incremental.TextDiff
+    monkeypatch.setattr(incremental, 'TextDiff', lambda old, new: diffs.append(1) or text_diff(old, new))
+    edited = text.replace("Filler paragraph 6.", "Filler paragraph six.")
+    second = client.post('/analyze', json=dict(body, text=edited)).get_json()
+    assert second['metadata']['processing_mode'] == 'incremental'
+    assert len(enqueued) == 1
+    assert len(diffs) == 1
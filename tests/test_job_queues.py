@@ -0,0 +1,126 @@
+"""
+Unit tests for the priority job queues
+"""
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+job_queues = pytest.importorskip("src.job_queues")
+
+
+class _SortedSetRedis:
+    """Just enough of the redis-py sorted-set API for client tracking."""
+
+    def __init__(self):
+        self.sets = {}
+
+    def zrange(self, key, start, end):
+        members = self.sets.get(key, {})
+        return [m.encode() for m in sorted(members, key=members.get)]
+
+    def zrem(self, key, *members):
+        for member in members:
+            self.sets.get(key, {}).pop(member, None)
+
+    def pipeline(self):
+        return self
+
+    def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update(mapping)
+
+    def expire(self, key, ttl):
+        pass
+
+    def execute(self):
+        pass
+
+
+class _RecordingQueue:
+    def __init__(self, name, enqueued):
+        self.name = name
+        self.enqueued = enqueued
+
+    def enqueue(self, f, *args, **kwargs):
+        job = SimpleNamespace(id=f"job-{len(self.enqueued) + 1}", origin=self.name)
+        self.enqueued.append((self.name, kwargs))
+        return job
+
+
+def test_job_class_follows_size_and_pages():
+    service_module = pytest.importorskip("src.api.services.citation_service")
+    service = service_module.CitationService.__new__(service_module.CitationService)
+
+    assert service.determine_job_class(text_length=6 * 1024) == job_queues.INTERACTIVE
+    assert service.determine_job_class(text_length=2 * 1024 * 1024) == job_queues.BULK
+    assert service.determine_job_class(text_length=20_000, page_count=120) == job_queues.BULK
+    assert service.determine_job_class(file_size=4 * 1024 * 1024) == job_queues.BULK
+
+
+def _weighted_worker(queues):
+    worker = job_queues.WeightedPriorityWorker.__new__(job_queues.WeightedPriorityWorker)
+    worker._queue_weights = {q.name: job_queues.QUEUE_WEIGHTS[job_queues.job_class_of(q.name)] for q in queues}
+    worker._queue_credit = {q.name: 0 for q in queues}
+    worker._ordered_queues = list(queues)
+    return worker
+
+
+def test_worker_drains_busy_queues_by_weight():
+    queues = [SimpleNamespace(name=name, count=50) for name in job_queues.QUEUE_NAMES.values()]
+    worker = _weighted_worker(queues)
+
+    served = Counter()
+    for _ in range(100):
+        queue = worker._ordered_queues[0]  # every queue has work: the first one polled wins
+        served[job_queues.job_class_of(queue.name)] += 1
+        worker.reorder_queues(queue)
+
+    total = sum(job_queues.QUEUE_WEIGHTS.values())
+    for job_class, weight in job_queues.QUEUE_WEIGHTS.items():
+        assert served[job_class] == 100 * weight // total
+
+
+def test_idle_queues_do_not_bank_credit():
+    queues = {job_class: SimpleNamespace(name=name, count=0) for job_class, name in job_queues.QUEUE_NAMES.items()}
+    worker = _weighted_worker(list(queues.values()))
+
+    # A quiet period with only interactive work...
+    for _ in range(1000):
+        worker.reorder_queues(queues[job_queues.INTERACTIVE])
+
+    # ...then every class gets busy: interactive keeps its share from the first dequeue
+    for queue in queues.values():
+        queue.count = 50
+    served = []
+    for _ in range(10):
+        queue = worker._ordered_queues[0]
+        served.append(job_queues.job_class_of(queue.name))
+        worker.reorder_queues(queue)
+
+    assert served[0] == job_queues.INTERACTIVE
+    assert Counter(served) == Counter({job_queues.INTERACTIVE: 6, job_queues.BULK: 3, job_queues.MAINTENANCE: 1})
+
+
+def test_client_over_its_share_is_demoted_then_deferred(monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(job_queues, 'queue_for', lambda job_class, connection: _RecordingQueue(
+        job_queues.QUEUE_NAMES[job_class], enqueued))
+    monkeypatch.setattr(job_queues.Job, 'fetch_many', staticmethod(lambda ids, connection: [
+        SimpleNamespace(id=i, get_status=lambda refresh=False: 'queued') for i in ids]))
+    scheduler = job_queues.JobScheduler(_SortedSetRedis())
+
+    limits = job_queues.CLIENT_ACTIVE_LIMITS
+    jobs = limits[job_queues.INTERACTIVE] + limits[job_queues.BULK] + 1
+    for _ in range(jobs):
+        scheduler.enqueue('task', client_id='10.0.0.1')
+    scheduler.enqueue('task', client_id='10.0.0.2')
+
+    queues = [name for name, _ in enqueued]
+    interactive, bulk = job_queues.QUEUE_NAMES[job_queues.INTERACTIVE], job_queues.QUEUE_NAMES[job_queues.BULK]
+    assert queues == [interactive] * limits[job_queues.INTERACTIVE] + [bulk] * (jobs - limits[job_queues.INTERACTIVE]) \
+        + [interactive]
+    dependencies = [kwargs['depends_on'] for _, kwargs in enqueued]
+    assert dependencies[:-2] == [None] * (jobs - 1)
+    assert dependencies[-2].dependencies == [f"job-{jobs - 1}"]
+    assert dependencies[-1] is None
+    assert enqueued[-1][1]['meta'] == {'job_class': job_queues.INTERACTIVE, 'client_id': '10.0.0.2'}
@@ -0,0 +1,85 @@
+"""
+Unit tests for batched link-rot checking
+"""
+import asyncio
+
+import pytest
+
+aiohttp_web = pytest.importorskip("aiohttp.web")
+linkrot = pytest.importorskip("src.websearch.linkrot")
+cache_module = pytest.importorskip("src.websearch.cache")
+
+
+async def _serve(hits):
+    async def handler(request):
+        hits.append((request.method, request.path, request.headers.get('Range')))
+        if request.path == '/nohead' and request.method == 'HEAD':
+            return aiohttp_web.Response(status=405)
+        if request.path == '/gone':
+            return aiohttp_web.Response(status=404)
+        return aiohttp_web.Response(text='opinion')
+
+    app = aiohttp_web.Application()
+    app.router.add_route('*', '/{tail:.*}', handler)
+    runner = aiohttp_web.AppRunner(app)
+    await runner.setup()
+    site = aiohttp_web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+
+def test_batch_dedupes_and_falls_back_to_ranged_get(tmp_path):
+    cache = cache_module.CacheManager(cache_file=str(tmp_path / 'cache.db'))
+    detector = linkrot.EnhancedLinkrotDetector(cache, max_concurrency=2, per_host_limit=1)
+    hits = []
+
+    async def run():
+        runner, base = await _serve(hits)
+        try:
+            urls = [f'{base}/ok', f'{base}/ok', f'{base}/nohead', f'{base}/gone']
+            statuses = await detector.check_urls(urls)
+            again = await detector.check_urls([f'{base}/ok'])
+        finally:
+            await detector.close()
+            await runner.cleanup()
+        return base, statuses, again
+
+    base, statuses, again = asyncio.run(run())
+
+    assert len(statuses) == 3
+    assert statuses[f'{base}/ok']['accessible']
+    assert statuses[f'{base}/nohead']['accessible']
+    assert statuses[f'{base}/gone']['status'] == 'linkrot'
+    assert again[f'{base}/ok']['accessible']  # served from the cache
+    assert hits.count(('HEAD', '/ok', None)) == 1
+    assert ('GET', '/nohead', 'bytes=0-0') in hits
+    cache.close()
+
+
+def test_session_from_previous_loop_is_closed(tmp_path):
+    cache = cache_module.CacheManager(cache_file=str(tmp_path / 'cache.db'))
+    detector = linkrot.EnhancedLinkrotDetector(cache)
+    first_loop = asyncio.new_event_loop()
+    hits = []
+
+    async def first_run():
+        runner, base = await _serve(hits)
+        await detector.check_urls([f'{base}/ok'])
+        return runner, detector._session
+
+    runner, first_session = first_loop.run_until_complete(first_run())
+    assert not first_session.closed
+
+    async def second_run():
+        session = await detector._get_session()
+        await detector.close()
+        return session
+
+    second_session = asyncio.run(second_run())
+
+    assert first_session.closed
+    assert second_session is not first_session and second_session.closed
+    first_loop.run_until_complete(runner.cleanup())
+    first_loop.close()
+    cache.close()
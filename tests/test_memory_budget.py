@@ -0,0 +1,66 @@
+"""
+Unit tests for per-job memory budgets, streaming mode and worker backpressure
+"""
+import time
+
+import pytest
+
+memory_monitor = pytest.importorskip("src.memory_monitor")
+
+
+def test_large_documents_switch_to_streaming_mode():
+    brief = 60 * 3000  # a 60-page brief
+    record = 5000 * 3000  # a 5,000-page record
+
+    assert memory_monitor.choose_memory_mode(brief, budget_mb=1024) == memory_monitor.MEMORY_MODE_FULL
+    assert memory_monitor.choose_memory_mode(record, budget_mb=1024) == memory_monitor.MEMORY_MODE_STREAMING
+    assert memory_monitor.choose_memory_mode(brief, budget_mb=100) == memory_monitor.MEMORY_MODE_STREAMING
+
+
+def test_job_budget_records_peak_rss():
+    with memory_monitor.JobMemoryBudget(budget_mb=1, sample_interval=0.01) as budget:
+        block = bytearray(64 * 1024 * 1024)
+        block[::4096] = b'x' * len(block[::4096])
+        # Hold the block until the sampler thread has seen it
+        deadline = time.time() + 5
+        while budget.peak_rss_mb < budget.start_rss_mb + 32 and time.time() < deadline:
+            time.sleep(0.01)
+        del block
+
+    meta = budget.as_meta()
+    assert meta['peak_rss_mb'] >= meta['start_rss_mb'] + 32
+    assert meta['over_memory_budget'] is True
+    assert meta['memory_budget_mb'] == 1
+
+
+def test_worker_waits_for_memory_headroom(monkeypatch):
+    rq_worker = pytest.importorskip("src.rq_worker")
+    worker = rq_worker.RobustWorker.__new__(rq_worker.RobustWorker)
+    worker.max_memory_mb = 10 ** 6
+    worker._stop_requested = False
+    heartbeats = []
+    worker.heartbeat = lambda: heartbeats.append(1)
+    readings = iter([0.97, 0.9, 0.6])
+    monkeypatch.setattr(rq_worker, 'memory_pressure', lambda: next(readings))
+    monkeypatch.setattr(rq_worker.time, 'sleep', lambda seconds: None)
+
+    assert worker._wait_for_memory_headroom() is True
+    assert len(heartbeats) == 2
+
+    worker.max_memory_mb = 0
+    assert worker._wait_for_memory_headroom() is False
+    assert worker._stop_requested
+
+
+def test_container_usage_excludes_inactive_page_cache(tmp_path, monkeypatch):
+    mb = 1024 * 1024
+    (tmp_path / 'memory.current').write_text(f"{900 * mb}\n")
+    (tmp_path / 'memory.max').write_text(f"{1024 * mb}\n")
+    (tmp_path / 'memory.stat').write_text(f"anon {300 * mb}\nactive_file {100 * mb}\ninactive_file {500 * mb}\n")
+    monkeypatch.setattr(memory_monitor, '_CGROUP_FILES', (
+        (str(tmp_path / 'memory.current'), str(tmp_path / 'memory.max'), str(tmp_path / 'memory.stat'),
+         'inactive_file'),
+    ))
+
+    assert memory_monitor.container_memory_mb() == (400, 1024)
+    assert memory_monitor.memory_pressure() == 400 / 1024
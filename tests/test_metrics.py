@@ -0,0 +1,116 @@
+"""
+Unit tests for process-shared metrics
+"""
+import pytest
+
+metrics = pytest.importorskip("src.metrics")
+
+
+class _HashRedis:
+    """Just enough of the redis-py hash API for metric samples."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def pipeline(self, transaction=True):
+        return _HashPipeline(self)
+
+    def hincrbyfloat(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field.encode()] = fields.get(field.encode(), 0.0) + amount
+
+    def hgetall(self, key):
+        return {k: str(v).encode() for k, v in self.hashes.get(key, {}).items()}
+
+
+class _HashPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def hincrbyfloat(self, key, field, amount):
+        self.calls.append((key, field, amount))
+
+    def execute(self):
+        for call in self.calls:
+            self.client.hincrbyfloat(*call)
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics.MetricsRegistry(flush_interval=60)
+    monkeypatch.setattr(metrics, '_registry', registry)
+    return registry
+
+
+def test_samples_from_several_processes_are_summed(monkeypatch):
+    client = _HashRedis()
+    web, worker = metrics.MetricsRegistry(client, flush_interval=60), metrics.MetricsRegistry(client, flush_interval=60)
+
+    monkeypatch.setattr(metrics, '_registry', worker)
+    metrics.record_verification('justia', True, 0.3)
+    metrics.STAGE_SECONDS.observe(2.0, stage='clustering')
+    assert client.hashes == {}  # buffered until the flush
+    worker.flush()
+
+    monkeypatch.setattr(metrics, '_registry', web)
+    metrics.record_verification('justia', False, 4.0)
+
+    samples = web.samples()
+    assert samples['casestrainer_verifications_total{source="justia",outcome="verified"}'] == 1
+    assert samples['casestrainer_verifications_total{source="justia",outcome="unverified"}'] == 1
+    assert samples['casestrainer_verification_seconds_count{source="justia"}'] == 2
+    assert samples['casestrainer_verification_seconds_bucket{source="justia",le="0.5"}'] == 1
+    assert samples['casestrainer_verification_seconds_bucket{source="justia",le="+Inf"}'] == 2
+    assert samples['casestrainer_stage_seconds_sum{stage="clustering"}'] == 2.0
+
+
+def test_render_is_prometheus_text(registry):
+    metrics.HTTP_REQUEST_SECONDS.observe(0.02, endpoint='vue_api.analyze', method='POST', status=200)
+
+    text = registry.render()
+
+    assert '# TYPE casestrainer_http_request_seconds histogram' in text
+    lines = [line for line in text.splitlines() if line.startswith('casestrainer_http_request_seconds_bucket')]
+    edges = [line.split('le="')[1].split('"')[0] for line in lines]
+    assert edges == [repr(edge) for edge in metrics.DEFAULT_BUCKETS] + ['+Inf']
+    assert lines[0] == \
+        'casestrainer_http_request_seconds_bucket{endpoint="vue_api.analyze",method="POST",status="200",le="0.005"} 0'
+    assert lines[-1].endswith(' 1')
+    assert 'casestrainer_http_request_seconds_count{endpoint="vue_api.analyze",method="POST",status="200"} 1' in text
+    with pytest.raises(ValueError):
+        metrics.STAGE_SECONDS.observe(1.0, step='Extracting')
+
+
+def test_stage_clock_times_the_stage_each_progress_step_starts(registry):
+    clock = metrics.StageClock()
+    for step in ('Extracting', 'Enhancing', 'Filtering', 'Clustering', 'Complete'):
+        clock.step(step)
+
+    counts = {s: v for s, v in registry.samples().items() if s.startswith('casestrainer_stage_seconds_count')}
+    assert counts == {'casestrainer_stage_seconds_count{stage="extraction"}': 1,
+                      'casestrainer_stage_seconds_count{stage="case_name_enrichment"}': 2,
+                      'casestrainer_stage_seconds_count{stage="clustering"}': 1}
+
+
+def test_legacy_trackers_record_into_the_registry(registry, tmp_path):
+    monitoring = pytest.importorskip("src.monitoring")
+    performance_monitor = pytest.importorskip("src.performance_monitor")
+    profiler = pytest.importorskip("src.performance.profiler")
+    analytics = pytest.importorskip("src.websearch.analytics")
+
+    monitoring.get_monitor().record_request('vue_api.analyze', 0.2, 500, error='boom', method='POST')
+    monitor = performance_monitor.PerformanceMonitor(str(tmp_path))
+    monitor.start_operation('op-1', 'brief.pdf', 1024)
+    monitor.end_operation('op-1', citations_found=3)
+    profiler.PerformanceProfiler().profile_sync('extract_citations')(lambda: ['a', 'b'])()
+    tracker = analytics.AdvancedAnalytics(cache_manager=None)
+    tracker.record_cache_operation(hit=True)
+    tracker.record_recovery_attempt(success=False)
+
+    samples = registry.samples()
+    assert samples['casestrainer_http_request_seconds_count{endpoint="vue_api.analyze",method="POST",status="500"}'] == 1
+    assert samples['casestrainer_operation_seconds_count{operation="file_processing"}'] == 1
+    assert samples['casestrainer_operation_seconds_count{operation="extract_citations"}'] == 1
+    assert samples['casestrainer_cache_lookups_total{cache="websearch",outcome="hit"}'] == 1
+    assert samples['casestrainer_recovery_attempts_total{outcome="failure"}'] == 1
@@ -0,0 +1,74 @@
+"""
+Unit tests for out-of-band task result storage
+"""
+import json
+
+import pytest
+
+result_store = pytest.importorskip("src.result_store")
+
+
+class _BytesRedis:
+    """Just enough of the redis-py string API for result blobs."""
+
+    def __init__(self):
+        self.values = {}
+
+    def setex(self, key, ttl, value):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+
+def _result(count):
+    citations = [{'citation': f'{i} U.S. {i}', 'verified': i % 2 == 0} for i in range(count)]
+    return {'status': 'completed', 'citations': citations, 'clusters': [{'cluster_id': 'cluster_1'}],
+            'statistics': {'total_citations': count}, 'metadata': {'input_type': 'text'}, 'progress_data': {}}
+
+
+def test_small_results_live_in_redis_and_large_ones_spill(tmp_path):
+    redis_client = _BytesRedis()
+    store = result_store.ResultStore(redis_client=redis_client, spill_dir=str(tmp_path), redis_max_bytes=2048)
+
+    small = result_store.offload_task_result('small', _result(3), store=store)
+    large = result_store.offload_task_result('large', _result(5000), store=store)
+
+    assert small['result_ref']['backend'] == 'redis'
+    assert large['result_ref']['backend'] == 'disk'
+    assert list(tmp_path.iterdir()) == [tmp_path / 'large.csr']
+    assert large == {'status': 'completed', 'success': True, 'task_id': 'large', 'result_ref': large['result_ref']}
+    assert large['result_ref']['citation_count'] == 5000
+
+    loaded = store.load('large')
+    assert set(loaded) == set(result_store.RESULT_SECTIONS)
+    assert loaded['citations'] == _result(5000)['citations']
+    assert store.load('small')['statistics'] == {'total_citations': 3}
+    assert store.load('missing') is None
+
+
+def test_nested_and_failed_results():
+    store = result_store.ResultStore(redis_client=_BytesRedis())
+    nested = {'success': True, 'task_id': 't', 'status': 'completed', 'result': _result(2)}
+    assert 'result_ref' in result_store.offload_task_result('t', nested, store=store)
+    assert len(store.load('t')['citations']) == 2
+
+    failed = {'status': 'failed', 'error': 'boom'}
+    assert result_store.offload_task_result('f', failed, store=store) is failed
+    assert store.load('f') is None
+
+
+def test_streamed_envelope_is_the_merged_json(tmp_path):
+    store = result_store.ResultStore(spill_dir=str(tmp_path))
+    store.put('t', {section: _result(2000)[section] for section in result_store.RESULT_SECTIONS})
+    envelope = {'status': 'completed', 'task_id': 't', 'is_finished': True, 'success': True}
+
+    chunks = list(result_store.with_envelope(envelope, result_store.iter_blob_json(store.get_blob('t'), 256)))
+    assert len(chunks) > 1
+    assert json.loads(b''.join(chunks)) == {**envelope, **store.load('t')}
+
+
+def test_unknown_blob_version_is_rejected():
+    blob = result_store.encode_blob({'citations': []})
+    with pytest.raises(ValueError):
+        result_store.decode_blob(blob[:3] + bytes([result_store.RESULT_FORMAT_VERSION + 1]) + blob[4:])
@@ -0,0 +1,204 @@
+"""
+Unit tests for incremental result streaming and cursor pagination
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+result_stream = pytest.importorskip("src.result_stream")
+
+ResultStream = result_stream.ResultStream
+paginate_result = result_stream.paginate_result
+
+
+def test_cursor_pagination_walks_every_item():
+    result = {'citations': [{'citation': f'{n} Wn.2d {n}'} for n in range(250)], 'clusters': []}
+
+    seen = []
+    page = paginate_result(result, limit=100)
+    while True:
+        seen.extend(c['citation'] for c in page['citations'])
+        if not page['next_cursor']:
+            break
+        page = paginate_result(result, cursor=page['next_cursor'], limit=100)
+
+    assert len(seen) == 250
+    assert seen[-1] == '249 Wn.2d 249'
+    assert page['total'] == 250
+
+
+def test_invalid_cursor_rejected():
+    with pytest.raises(ValueError):
+        paginate_result({'citations': []}, cursor='not-a-cursor')
+
+
+def test_events_stream_as_ndjson_until_complete():
+    stream = ResultStream(batch_size=2)
+    stream.publish('req', 'started')
+    stream.publish_citations('req', [{'citation': 'a'}, {'citation': 'b'}, {'citation': 'c'}])
+    stream.publish('req', 'complete', citation_count=3)
+    stream.publish('req', 'started')  # never reached: the stream ends at 'complete'
+
+    lines = [json.loads(line) for line in stream.iter_events('req', timeout=1)]
+
+    assert [event['type'] for event in lines] == ['started', 'citations', 'citations', 'complete']
+    assert lines[1]['citations'] == [{'citation': 'a'}, {'citation': 'b'}]
+    assert lines[2]['offset'] == 2
+
+
+def test_sse_resume_from_event_index():
+    stream = ResultStream()
+    stream.publish('req', 'started')
+    stream.publish('req', 'clusters', clusters=[])
+    stream.publish('req', 'complete')
+
+    frames = list(stream.iter_events('req', start=1, fmt='sse', timeout=1))
+
+    assert frames[0].startswith('id: 1\nevent: clusters\n')
+    assert len(frames) == 2
+
+
+def test_worker_publishes_citations_window_by_window(monkeypatch):
+    import re
+    import redis
+    from src import rq_worker
+    from src.models import CitationResult
+
+    def fake_extract(text):
+        return [CitationResult(citation=m.group(0), start_index=m.start(), end_index=m.end())
+                for m in re.finditer(r'\d+ U\.S\. \d+', text)]
+
+    monkeypatch.setattr('src.clean_extraction_pipeline.extract_citations_clean', fake_extract)
+    monkeypatch.setattr(redis, 'from_url', lambda url: SimpleNamespace(ping=lambda: True))
+    monkeypatch.setattr('src.result_store.offload_task_result', lambda task_id, result: result)
+    filler = 'x' * 250_000
+    text = f'See 410 U.S. 113. {filler} Cf. 5 U.S. 137 and 410 U.S. 113. {filler} Also 93 U.S. 705.'
+    events = []
+
+    result = rq_worker.process_citation_task_direct(
+        'task-1', 'text', {'text': text}, event_callback=lambda kind, payload: events.append((kind, payload)))
+
+    assert result['status'] == 'completed'
+    assert [(kind, [c['citation'] for c in payload.get('citations', [])]) for kind, payload in events] == [
+        ('citations', ['410 U.S. 113']),
+        ('citations', ['5 U.S. 137']),
+        ('citations', ['93 U.S. 705']),
+        ('clusters', []),
+        ('complete', []),
+    ]
+    assert events[-1][1]['citation_count'] == 3
+
+
+def test_stream_endpoint_bounds_inline_work_and_queues_large_documents_and_urls(monkeypatch):
+    import threading
+    from flask import Flask
+    from src import vue_api_endpoints_updated as endpoints
+    from src.job_queues import JobScheduler
+
+    app = Flask(__name__)
+    app.register_blueprint(endpoints.vue_api)
+    client = app.test_client()
+    text = {'text': 'The court in Roe v. Wade, 410 U.S. 113 (1973), held otherwise.'}
+
+    monkeypatch.setattr(endpoints.citation_service, 'should_process_immediately', lambda data: True)
+    monkeypatch.setattr(endpoints, '_stream_slots', threading.BoundedSemaphore(1))
+    endpoints._stream_slots.acquire()
+    busy = client.post('/analyze/stream', json=text)
+    assert busy.status_code == 503
+    assert busy.headers['Retry-After'] == '5'
+
+    enqueued = []
+    monkeypatch.setattr(endpoints.citation_service, 'should_process_immediately', lambda data: False)
+    monkeypatch.setattr(JobScheduler, 'enqueue', lambda self, f, **kwargs: enqueued.append((f, kwargs)))
+    queued = client.post('/analyze/stream', json=text, buffered=False)
+    first = json.loads(next(queued.response))
+    queued.close()
+
+    assert first['type'] == 'started' and first['processing_mode'] == 'queued'
+    assert enqueued[0][0] == endpoints.PROCESS_CITATION_TASK
+    assert enqueued[0][1]['job_id'] == queued.headers['X-Request-ID']
+
+    def no_fetch(url):
+        raise AssertionError('the web process must not fetch stream URLs')
+
+    monkeypatch.setattr('src.progress_manager.fetch_url_content', no_fetch)
+    url_response = client.post('/analyze/stream', json={'url': 'https://www.courtlistener.com/opinion/1/roe/'},
+                               buffered=False)
+    first = json.loads(next(url_response.response))
+    url_response.close()
+
+    assert first['processing_mode'] == 'queued' and first['source'] == 'url'
+    assert enqueued[1][1]['args'] == (url_response.headers['X-Request-ID'], 'url',
+                                      {'url': 'https://www.courtlistener.com/opinion/1/roe/'})
+
+
+def test_worker_startup_failure_emits_an_error_event(monkeypatch):
+    import redis
+    from src import rq_worker
+
+    def broken_service():
+        raise RuntimeError('model files missing')
+
+    monkeypatch.setattr(redis, 'from_url', lambda url: SimpleNamespace(ping=lambda: True))
+    monkeypatch.setattr('src.api.services.citation_service.CitationService', broken_service)
+    events = []
+
+    result = rq_worker.process_citation_task_direct(
+        'task-1', 'text', {'text': 'See 410 U.S. 113.'}, event_callback=lambda kind, payload: events.append((kind, payload)))
+
+    assert result['diagnostic'] == 'startup_failure'
+    assert events == [('error', {'error': 'Worker startup failed: model files missing'})]
+
+
+class _FlakyRedis:
+    """A Redis list store whose writes fail while ``down`` is set."""
+
+    def __init__(self):
+        self.lists = {}
+        self.down = False
+
+    def pipeline(self):
+        return _FlakyPipeline(self)
+
+    def lrange(self, key, start, end):
+        return self.lists.get(key, [])[start:]
+
+
+class _FlakyPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.pushed = []
+
+    def rpush(self, key, value):
+        self.pushed.append((key, value))
+
+    def expire(self, key, ttl):
+        pass
+
+    def execute(self):
+        if self.client.down:
+            raise ConnectionError('redis down')
+        for key, value in self.pushed:
+            self.client.lists.setdefault(key, []).append(value)
+
+
+def test_each_request_keeps_the_store_of_its_first_event():
+    client = _FlakyRedis()
+    stream = ResultStream(redis_client=client)
+
+    client.down = True
+    stream.publish('local-req', 'started')  # Redis down on the first write: in-process for good
+    client.down = False
+    stream.publish('local-req', 'complete')
+    stream.publish('redis-req', 'started')
+    client.down = True
+    stream.publish('redis-req', 'clusters', clusters=[])  # dropped, not split into the in-process log
+    client.down = False
+    stream.publish('redis-req', 'complete')
+
+    assert [e['type'] for e in stream.read('local-req')] == ['started', 'complete']
+    assert client.lists.get('casestrainer:stream:local-req:events') is None
+    assert [e['type'] for e in stream.read('redis-req')] == ['started', 'complete']
+    assert 'redis-req' not in stream._events
+    assert [e['type'] for e in ResultStream(redis_client=client).read('redis-req')] == ['started', 'complete']
@@ -0,0 +1,61 @@
+"""
+Unit tests for the on-demand sampling profiler
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+sampling_profiler = pytest.importorskip("src.sampling_profiler")
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = sampling_profiler.ProfileStore()
+    monkeypatch.setattr(sampling_profiler, '_profile_store', store)
+    return store
+
+
+def _busy_clustering(seconds):
+    sampling_profiler.set_thread_tag('stage', 'clustering')
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(200))
+
+
+def test_profiled_block_yields_tagged_folded_stacks(store):
+    with sampling_profiler.profile('job-1', request='job-1') as session:
+        _busy_clustering(0.3)
+
+    assert session.samples > 5
+    assert not sampling_profiler.get_profiler().active
+    folded = store.folded('job-1')
+    heaviest, count = folded.splitlines()[0].rsplit(' ', 1)
+    assert heaviest.startswith('request:job-1;stage:clustering;')
+    assert 'test_sampling_profiler:_busy_clustering' in heaviest
+    assert int(count) > 0
+    assert store.load('job-1')['meta']['samples'] == session.samples
+    assert store.load('missing') is None
+
+
+def test_sampler_backs_off_when_over_its_cpu_budget():
+    profiler = sampling_profiler.SamplingProfiler(interval=0.001, max_overhead=0.0)
+    session = profiler.start('p')
+    time.sleep(0.1)
+    profiler.stop(session)
+
+    assert profiler.interval > 0.001
+    assert session.seconds > 0 and session.sampler_cpu_seconds > 0
+
+
+def test_jobs_are_profiled_when_flagged_or_inside_a_worker_window(store):
+    flagged = SimpleNamespace(id='a', meta={'profile': True})
+    plain = SimpleNamespace(id='b', meta={})
+    assert sampling_profiler.job_profile_id(flagged) == 'a'
+    assert sampling_profiler.job_profile_id(plain) is None
+
+    store.publish_window('window-1', 60, 'workers')
+    assert sampling_profiler.job_profile_id(plain) == 'window-1'
+    assert store.active_window('web') is None
+    with pytest.raises(ValueError):
+        sampling_profiler.start_window(10, scope='everything')
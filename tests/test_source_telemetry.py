@@ -0,0 +1,72 @@
+"""
+Unit tests for websearch source telemetry and expected time-to-verify ranking
+"""
+import os
+
+import pytest
+
+source_telemetry = pytest.importorskip("src.websearch.source_telemetry")
+
+SourceTelemetry = source_telemetry.SourceTelemetry
+citation_bucket = source_telemetry.citation_bucket
+GLOBAL_BUCKET = source_telemetry.GLOBAL_BUCKET
+
+
+@pytest.fixture
+def telemetry(tmp_path):
+    return SourceTelemetry(db_file=str(tmp_path / "telemetry.db"), flush_every=1)
+
+
+def test_citation_bucket():
+    assert citation_bucket("188 Wn.2d 114") == "Wn.2d"
+    assert citation_bucket("410 U.S. 113") == "U.S."
+    assert citation_bucket("123 F.3d 456") == "F."
+    assert citation_bucket("nothing here") == GLOBAL_BUCKET
+
+
+def test_slow_unreliable_source_ranks_last(telemetry):
+    for _ in range(20):
+        telemetry.record("fast", True, 0.4, "188 Wn.2d 114")
+        telemetry.record("slow", False, 9.0, "188 Wn.2d 114")
+
+    ranked = telemetry.rank_sources("190 Wn.2d 1", ["slow", "fast"], explore=False)
+    assert ranked == ["fast", "slow"]
+
+    stats = telemetry.get_source_stats("slow", "190 Wn.2d 1")
+    assert stats["success_rate"] == 0.0
+    assert stats["p50_latency"] == 13.0
+
+
+def test_telemetry_persists_across_instances(telemetry):
+    telemetry.record("justia", True, 1.2, "410 U.S. 113")
+    telemetry.flush()
+
+    reloaded = SourceTelemetry(db_file=telemetry.db_file)
+    stats = reloaded.get_source_stats("justia", "410 U.S. 113")
+    assert stats["attempts"] == 1
+    assert stats["successes"] == 1
+
+
+def test_concurrent_writers_add_their_counts(telemetry):
+    other = SourceTelemetry(db_file=telemetry.db_file, flush_every=1000)
+    telemetry.flush_every = 1000
+    for _ in range(3):
+        telemetry.record("justia", True, 0.3, "410 U.S. 113")
+    for _ in range(2):
+        other.record("justia", False, 4.0, "410 U.S. 113")
+    telemetry.flush()
+    other.flush()
+    # Nothing new since the last flush, so flushing again must not double count
+    telemetry.flush()
+
+    stats = SourceTelemetry(db_file=telemetry.db_file).get_source_stats("justia")
+    assert stats["attempts"] == 5
+    assert stats["successes"] == 3
+    assert other.get_source_stats("justia")["attempts"] == 5
+
+
+def test_default_store_lives_next_to_the_citations_db():
+    from src.config import DATABASE_FILE
+
+    assert source_telemetry._default_db_file() == os.path.join(
+        os.path.dirname(os.path.abspath(DATABASE_FILE)), "source_telemetry.db")
@@ -0,0 +1,68 @@
+"""
+Unit tests for windowed streaming extraction and overlap stitching
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+streaming_extraction = pytest.importorskip("src.streaming_extraction")
+from src.models import CitationResult  # noqa: E402
+
+# Either a full "Name v. Name, 1 U.S. 1" span or a bare citation, like the
+# real pipeline, whose span depends on how much look-back context it sees
+CITATION = re.compile(r'[A-Z]\w+ v\. \w+, \d+ U\.S\. \d+|\d+ U\.S\. \d+')
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    reads = []
+
+    def fake_extract(text):
+        reads.append(len(text))
+        return [CitationResult(citation=m.group(0), start_index=m.start(), end_index=m.end())
+                for m in CITATION.finditer(text)]
+
+    monkeypatch.setattr('src.clean_extraction_pipeline.extract_citations_clean', fake_extract)
+    return reads
+
+
+def _spans(citations):
+    return [(c.citation, c.start_index, c.end_index) for c in citations]
+
+
+def test_boundary_citations_are_kept_once_with_document_offsets(reads):
+    # Window 0 reads to 114 and sees the full match at 85. Window 1 reads from 86,
+    # sees only "mith v. Jones, 410 U.S. 113" and matches the bare citation at 101,
+    # which it owns but which overlaps the match window 0 already emitted
+    text = 'x' * 85 + 'Smith v. Jones, 410 U.S. 113' + 'x' * 80 + '93 U.S. 705' + 'y' * 60 + '5 U.S. 137'
+    extractor = streaming_extraction.StreamingCitationExtractor(window_chars=100, overlap_chars=14)
+
+    citations = extractor.extract(text)
+
+    assert [text[start:end] for _, start, end in _spans(citations)] == [
+        'Smith v. Jones, 410 U.S. 113', '93 U.S. 705', '5 U.S. 137']
+    assert max(reads) <= 100 + 2 * 14
+
+
+def test_page_stream_matches_whole_text_in_bounded_reads(reads):
+    pages = [f'Page {n}. See Roe v. Wade, {n} U.S. {n + 7} (1973). ' + 'z' * 97 for n in range(300)]
+    text = ''.join(pages)
+    extractor = streaming_extraction.StreamingCitationExtractor(window_chars=500, overlap_chars=40)
+
+    whole = _spans(extractor.extract(text))
+    reads.clear()
+    streamed = _spans(extractor.extract(iter(pages)))
+
+    assert streamed == whole
+    assert len(whole) == 300
+    assert max(reads) <= 500 + 2 * 40
+
+
+def test_parallel_windows_stitch_like_sequential(reads):
+    text = ''.join(f'Doe v. Roe, {n} U.S. {n} ' + 'q' * (n % 37) for n in range(400))
+    sequential = streaming_extraction.StreamingCitationExtractor(window_chars=333, overlap_chars=30)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        parallel = streaming_extraction.StreamingCitationExtractor(
+            window_chars=333, overlap_chars=30, executor=pool, max_in_flight=3)
+        assert _spans(parallel.extract(text)) == _spans(sequential.extract(text))
@@ -0,0 +1,62 @@
+"""
+Unit tests for the per-document boundary index
+"""
+import random
+import re
+
+import pytest
+
+boundaries = pytest.importorskip("src.utils.text_boundaries")
+
+TEXT = ("State v. M.Y.G., 199 Wn.2d 528, 509 P.3d 818 (2022) (quoting Am. Legion, 116 Wn.2d 1 (1991)). "
+        "See also Roe v. Wade, 410 U.S. 113; Doe v. Bolton, 410 U.S. 179 (1973).")
+
+
+def _scan_separated(text, start, end):
+    """The character scan the index replaces."""
+    depth = 0
+    for char in text[start:end]:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth < 0:
+                return True
+    return depth != 0
+
+
+def test_parenthetical_queries():
+    index = boundaries.TextBoundaryIndex(TEXT)
+    outer, inner = TEXT.index('509 P.3d'), TEXT.index('116 Wn.2d')
+
+    assert index.parenthetical_boundary_between(outer, inner)
+    assert not index.parenthetical_boundary_between(TEXT.index('199 Wn.2d'), outer)
+    assert index.enclosing_parenthetical_start(inner) == TEXT.index('(quoting')
+    assert index.enclosing_parenthetical_start(outer) is None
+
+
+def test_spans_match_windowed_finditer():
+    index = boundaries.TextBoundaryIndex(TEXT)
+    start, end = 0, TEXT.index('Doe v.')
+
+    last = list(re.finditer(r'\((19|20)\d{2}\)', TEXT[:end]))[-1]
+    assert index.year_parentheticals.last_within(start, end) == (last.start(), last.end())
+    assert index.sentences.first_within(TEXT.index('(1991)'), end)[0] == TEXT.index('. See')
+    assert index.semicolons.any_within(start, end)
+    assert index.signal_words.first_within(0)[0] == TEXT.index('quoting')
+    assert index.has_boundary_between(TEXT.index('Roe'), TEXT.index('Doe'))
+
+
+def test_parenthetical_boundary_agrees_with_scan_on_random_text():
+    rnd = random.Random(7)
+    text = ''.join(rnd.choice('ab ()(.;') for _ in range(2000))
+    index = boundaries.TextBoundaryIndex(text)
+
+    for _ in range(2000):
+        a, b = sorted((rnd.randrange(len(text)), rnd.randrange(len(text))))
+        assert index.parenthetical_boundary_between(a, b) == _scan_separated(text, a, b)
+
+
+def test_index_is_built_once_per_document():
+    text = TEXT * 3
+    assert boundaries.get_boundary_index(text) is boundaries.get_boundary_index(text)
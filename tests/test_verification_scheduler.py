@@ -0,0 +1,111 @@
+"""
+Unit tests for batched ML classification and verification triage
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+pytest.importorskip("sklearn")
+classifier_module = pytest.importorskip("src.ml_citation_classifier")
+scheduler_module = pytest.importorskip("src.verification_scheduler")
+
+VALID = ['410 U.S. 113 (1973)', '347 U.S. 483 (1954)', '183 Wn.2d 649 (2015)', '159 Wn.2d 700 (2007)',
+         '355 P.3d 258 (2015)', '153 P.3d 846 (2007)', '975 P.2d 1229 (1999)', '521 U.S. 811 (1997)',
+         '137 Wn.2d 712 (1999)', '578 U.S. 330 (2016)']
+INVALID = ['see id. at', 'supra note', 'Section A', 'Exhibit B', 'RCW chapter', 'page footnote',
+           'Id. ibid.', 'cf. generally', 'Appendix C', 'infra part']
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    db_path = tmp_path / 'citations.db'
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE citations (citation_text TEXT, found BOOLEAN, is_verified BOOLEAN)')
+    conn.executemany('INSERT INTO citations VALUES (?, ?, ?)',
+                     [(c, 0, 1) for c in VALID * 3] + [(c, 0, 0) for c in INVALID * 3])
+    conn.commit()
+    conn.close()
+
+    model = classifier_module.CitationClassifier(db_path=str(db_path), model_dir=str(tmp_path / 'models'))
+    assert model.train(force=True)
+    return model
+
+
+def test_batch_classify_makes_one_model_call(classifier):
+    calls = []
+    predict_proba = classifier.model.predict_proba
+    classifier.model.predict_proba = lambda X: calls.append(X.shape[0]) or predict_proba(X)
+
+    results = classifier.batch_classify(['410 U.S. 113 (1973)', 'see id. at', '183 Wn.2d 649 (2015)'])
+
+    assert calls == [3]
+    assert [r['citation'] for r in results] == ['410 U.S. 113 (1973)', 'see id. at', '183 Wn.2d 649 (2015)']
+    assert results[0]['confidence'] > results[1]['confidence']
+    assert results[0]['confidence'] == pytest.approx(classifier.predict('410 U.S. 113 (1973)'))
+
+
+def test_plan_orders_likely_valid_first_and_skips_junk(classifier):
+    scheduler = scheduler_module.VerificationScheduler(classifier, skip_below=0.2, defer_below=0.5)
+
+    plan = scheduler.plan(['Exhibit B', '347 U.S. 483 (1954)', 'supra note', '975 P.2d 1229 (1999)'])
+
+    assert plan.model_used
+    assert {item.text for item in plan.verify} == {'347 U.S. 483 (1954)', '975 P.2d 1229 (1999)'}
+    assert {item.text for item in plan.skipped} == {'Exhibit B', 'supra note'}
+
+
+def test_time_budget_leaves_lowest_priority_unverified():
+    scheduler = scheduler_module.VerificationScheduler(classifier=False, seconds_per_citation=10)
+    plan = scheduler.plan(['1 U.S. 1', '2 Wn.2d 2', 'junk'])
+    verified = []
+
+    leftover = scheduler.run(plan, verified.extend, batch_size=1, time_budget=5)
+
+    assert not plan.model_used and not plan.skipped
+    assert len(verified) == 1 and leftover[-1] == 'junk'
+
+
+class _LookupResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def test_processor_triage_verifies_through_the_batch_lookup(monkeypatch):
+    master_module = pytest.importorskip("src.unified_verification_master")
+    processor_module = pytest.importorskip("src.unified_citation_processor_v2")
+    from src.models import CitationResult
+
+    lookups = []
+
+    def fake_post(session, url, json=None, timeout=None):
+        lookups.append(json['text'])
+        return _LookupResponse([
+            {'citation': c, 'status': 200,
+             'clusters': [{'caseName': f'Case {c}', 'dateFiled': '1990-01-01', 'absolute_url': '/opinion/1/'}]}
+            for c in VALID[:3]
+        ])
+
+    monkeypatch.setattr(master_module, 'COURTLISTENER_API_KEY', 'test-key')
+    monkeypatch.setattr(master_module.requests.Session, 'post', fake_post)
+    monkeypatch.setattr(scheduler_module, 'get_verification_scheduler',
+                        lambda: scheduler_module.VerificationScheduler(classifier=False))
+    processor = processor_module.UnifiedCitationProcessorV2.__new__(processor_module.UnifiedCitationProcessorV2)
+    citations = [CitationResult(citation=c, extracted_case_name='N/A', extracted_date='1990') for c in VALID[:3]]
+
+    async def verify_inside_running_loop():
+        return processor._verify_citations_sync(citations)
+
+    verified = asyncio.run(verify_inside_running_loop())
+
+    assert len(lookups) == 1
+    assert [c.verification_status for c in verified] == ['verified'] * 3
+    assert verified[0].canonical_name == f'Case {VALID[0]}'
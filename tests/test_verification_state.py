@@ -0,0 +1,211 @@
+"""
+Unit tests for shared verification job state
+"""
+import pytest
+
+verification_manager = pytest.importorskip("src.verification_manager")
+
+VerificationStateStore = verification_manager.VerificationStateStore
+VerificationStatus = verification_manager.VerificationStatus
+
+
+class _RecordingRedis:
+    """Just enough of the redis-py hash API to count round trips."""
+
+    def __init__(self):
+        self.hashes = {}
+        self.strings = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return _RecordingPipeline(self)
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update(
+            {k.encode(): v.encode() for k, v in mapping.items()})
+
+    def expire(self, key, ttl):
+        pass
+
+    def hgetall(self, key):
+        self.round_trips += 1
+        return dict(self.hashes.get(key, {}))
+
+    def setex(self, key, ttl, value):
+        self.round_trips += 1
+        self.strings[key] = value
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.strings.get(key)
+
+
+class _RecordingPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def hset(self, key, mapping):
+        self.calls.append(('hset', key, mapping))
+
+    def expire(self, key, ttl):
+        self.calls.append(('expire', key, ttl))
+
+    def execute(self):
+        self.client.round_trips += 1
+        for name, key, arg in self.calls:
+            if name == 'hset':
+                self.client.hset(key, mapping=arg)
+
+
+def test_progress_writes_are_batched_until_status_changes():
+    client = _RecordingRedis()
+    store = VerificationStateStore(client, flush_interval=60)
+
+    store.update('req', status=VerificationStatus.RUNNING, citations_count=3)
+    for n in range(1, 4):
+        store.update_method_progress('req', 'citation_lookup_v4', n, 3, citations_processed=n)
+    assert client.round_trips == 1  # only the status change was written
+
+    worker_view = VerificationStateStore(client)
+    status = worker_view.get('req')
+    assert 'citations_processed' not in status  # progress still buffered in the worker
+
+    store.flush()
+    status = worker_view.get('req')
+    assert status['status'] == 'running'
+    assert status['citations_processed'] == 3
+    assert status['method_progress'] == {'citation_lookup_v4': {'processed': 3, 'total': 3}}
+
+
+def test_results_blob_is_visible_to_another_store():
+    client = _RecordingRedis()
+    worker = VerificationStateStore(client)
+    web = VerificationStateStore(client)
+
+    worker.store_results('req', {'status': 'completed', 'citations': {'521 U.S. 811': {'verified': True}}},
+                         status=VerificationStatus.COMPLETED, progress=100.0)
+
+    assert web.get('req')['results_key'].endswith(':req:results')
+    assert web.get_results('req')['citations']['521 U.S. 811']['verified'] is True
+
+
+def test_in_process_fallback_expires_entries():
+    store = VerificationStateStore(ttl=0)
+
+    store.update('req', status=VerificationStatus.QUEUED)
+
+    assert store.get('req') is None
+    assert store.get_results('req') is None
+
+
+def test_deferred_verification_patches_clusters_as_they_settle(monkeypatch):
+    master_module = pytest.importorskip("src.unified_verification_master")
+    VerificationResult = master_module.VerificationResult
+    batches = []
+
+    async def fake_batch(citations, names=None, dates=None, batch_size=50, timeout=10.0):
+        batches.append(list(citations))
+        return [VerificationResult(citation=c, verified=c != '999 P.3d 1', canonical_name=f'Case {c}',
+                                   canonical_date='2001', canonical_url='https://example.test', source='fake')
+                for c in citations]
+
+    verifier = master_module.UnifiedVerificationMaster.__new__(master_module.UnifiedVerificationMaster)
+    monkeypatch.setattr(verifier, 'verify_citations_batch', fake_batch, raising=False)
+    monkeypatch.setattr(master_module, '_master_verifier', verifier)
+    monkeypatch.setattr(verification_manager, 'DEFERRED_VERIFICATION_BATCH', 2)
+
+    manager = verification_manager.VerificationManager.__new__(verification_manager.VerificationManager)
+    manager.state = VerificationStateStore()
+    # cluster_1 is settled by the first batch; cluster_2 needs the second
+    citations = [{'citation': '410 U.S. 113', 'cluster_id': 'cluster_1'},
+                 {'citation': '93 S. Ct. 705', 'cluster_id': 'cluster_1'},
+                 {'citation': '999 P.3d 1', 'cluster_id': 'cluster_2'},
+                 {'citation': '12 P.3d 4', 'cluster_id': 'cluster_2'}]
+    clusters = [{'cluster_id': 'cluster_1', 'citations': [{'text': '410 U.S. 113'}, {'text': '93 S. Ct. 705'}]},
+                {'cluster_id': 'cluster_2', 'citations': [{'text': '999 P.3d 1'}, {'text': '12 P.3d 4'}]}]
+
+    summary = verification_manager.run_deferred_verification('req', citations, clusters, manager=manager)
+
+    assert batches == [['410 U.S. 113', '93 S. Ct. 705'], ['999 P.3d 1', '12 P.3d 4']]
+    patches = manager.state.get_patches('req')
+    assert [[c['cluster_id'] for c in p['clusters']] for p in patches] == [['cluster_1'], ['cluster_2']]
+    assert patches[1]['clusters'][0]['verified'] and patches[1]['clusters'][0]['canonical_name'] == 'Case 12 P.3d 4'
+    assert [c['true_by_parallel'] for c in patches[1]['citations']] == [True, False]
+    assert manager.state.get_patches('req', start=1) == patches[1:]
+
+    assert summary['verified_citations'] == 3
+    assert manager.state.get('req')['status'] == 'completed'
+    assert manager.state.get_results('req')['clusters'][0]['verified'] is True
+
+
+def test_start_verification_enqueues_an_interactive_job(monkeypatch):
+    from src.job_queues import INTERACTIVE, JobScheduler
+    enqueued = []
+
+    class _Job:
+        id = 'job-1'
+
+    def fake_enqueue(self, f, *args, **kwargs):
+        enqueued.append((f, args, kwargs))
+        return _Job()
+
+    monkeypatch.setattr(JobScheduler, 'enqueue', fake_enqueue)
+    manager = verification_manager.VerificationManager.__new__(verification_manager.VerificationManager)
+    manager.redis_conn = None
+    manager.state = VerificationStateStore()
+
+    assert manager.start_verification('req', ['410 U.S. 113'], []) == 'job-1'
+    f, args, kwargs = enqueued[0]
+    assert f == manager._verify_citations_async
+    assert args == ('req', ['410 U.S. 113'], [])
+    assert kwargs['job_class'] == INTERACTIVE
+    assert manager.state.get('req')['job_id'] == 'job-1'
+
+
+@pytest.mark.parametrize('lost', ['expired', 'status_missing'])
+def test_stale_status_with_a_lost_job_is_failed(monkeypatch, lost):
+    from rq.exceptions import InvalidJobOperation, NoSuchJobError
+
+    class _LostJob:
+        def get_status(self):
+            raise InvalidJobOperation('no status')
+
+    def fetch(job_id, connection=None):
+        if lost == 'expired':
+            raise NoSuchJobError(job_id)
+        return _LostJob()
+
+    monkeypatch.setattr(verification_manager.Job, 'fetch', staticmethod(fetch))
+    manager = verification_manager.VerificationManager.__new__(verification_manager.VerificationManager)
+    manager.redis_conn = None
+    manager.state = VerificationStateStore()
+    manager.stale_after = -1  # every status is stale
+    manager.state.update('req', status=VerificationStatus.RUNNING, job_id='job-1')
+
+    status = manager.get_verification_status('req')
+
+    assert status['status'] == 'failed'
+    assert 'job-1' in status['error_message']
+
+
+def test_start_deferred_verification_records_the_job(monkeypatch):
+    from src.job_queues import INTERACTIVE, JobScheduler
+    enqueued = []
+
+    class _Job:
+        id = 'job-2'
+
+    def fake_enqueue(self, f, *args, **kwargs):
+        enqueued.append((f, kwargs['job_class']))
+        return _Job()
+
+    monkeypatch.setattr(JobScheduler, 'enqueue', fake_enqueue)
+    manager = verification_manager.VerificationManager.__new__(verification_manager.VerificationManager)
+    manager.redis_conn = None
+    manager.state = VerificationStateStore()
+
+    assert manager.start_deferred_verification('req', [{'citation': '410 U.S. 113'}], []) == 'job-2'
+    assert enqueued == [('src.verification_manager.run_deferred_verification', INTERACTIVE)]
+    assert manager.state.get('req')['status'] == 'queued'
+    assert manager.state.get('req')['job_id'] == 'job-2'
@@ -0,0 +1,129 @@
+"""
+Unit tests for the websearch SQLite cache
+"""
+import gc
+import sqlite3
+import threading
+import time
+
+import pytest
+
+cache_module = pytest.importorskip("src.websearch.cache")
+
+CacheManager = cache_module.CacheManager
+
+
+@pytest.fixture
+def cache(tmp_path):
+    manager = CacheManager(cache_file=str(tmp_path / "cache.db"), memory_items=4)
+    yield manager
+    manager.close()
+
+
+def test_set_then_get_uses_the_same_key(cache):
+    cache.set('search', 'justia', '410 U.S. 113', value=[{'title': 'Roe v. Wade'}])
+
+    assert cache.get('search', 'justia', '410 U.S. 113') == [{'title': 'Roe v. Wade'}]
+    assert cache.get('search', 'bing', '410 U.S. 113') is None
+
+
+def test_batch_get_reads_through_memory_evictions(cache):
+    items = {f'key{n}': {'n': n, 'payload': 'x' * 2000} for n in range(10)}
+    cache.set_many(items)
+
+    found = cache.get_many(list(items) + ['absent'])
+
+    assert found == items  # large values round-trip through the compressed serializer
+
+
+def test_expired_entries_are_not_served(cache):
+    cache.set('stale', value='old', ttl_hours=1)
+    cache._memory.clear()
+    with cache._get_connection() as conn:
+        conn.execute('UPDATE cache_entries SET expires_at = ?', (int(time.time()) - 1,))
+
+    assert cache.get('stale') is None
+    cache.cleanup_expired()
+    assert cache._get_connection().execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0] == 0
+
+
+def test_threads_share_entries_via_their_own_connections(cache):
+    errors = []
+
+    def worker(n):
+        try:
+            cache.set('thread', n, value=n)
+            assert cache.get('thread', n) == n
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    cache._memory.clear()
+    assert cache.get_many([('thread', n) for n in range(8)]) == {('thread', n): n for n in range(8)}
+
+
+def test_thread_connections_close_when_threads_exit(cache):
+    opened = []
+
+    def worker():
+        cache.set('exiting', value=1)
+        opened.append(cache._get_connection())
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    del thread
+    gc.collect()
+
+    assert opened[0] not in cache._connections
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute('SELECT 1')
+    assert cache.get('exiting') == 1
+
+
+def test_zero_ttl_expires_immediately(cache):
+    cache.set('now', value='gone', ttl_hours=0)
+    cache._memory.clear()
+
+    assert cache.get('now') is None
+
+
+def test_url_status_round_trip(cache):
+    cache.set_url_status('https://example.com', 'accessible', 200)
+
+    status = cache.get_url_status('https://example.com')
+
+    assert status['status'] == 'accessible'
+    assert status['status_code'] == 200
+
+
+def test_legacy_tables_are_dropped_once(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE search_cache (key TEXT PRIMARY KEY, value TEXT, timestamp TEXT, ttl_hours INTEGER)')
+        conn.execute('CREATE TABLE url_status (url TEXT PRIMARY KEY, status TEXT, status_code INTEGER, '
+                     'last_checked TEXT, content_hash TEXT)')
+        conn.execute("INSERT INTO search_cache VALUES ('k', '[]', '2024-01-01T00:00:00', 24)")
+    conn.close()
+
+    manager = CacheManager(cache_file=path)
+    tables = {row[0] for row in manager._get_connection().execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    version = manager._get_connection().execute('PRAGMA user_version').fetchone()[0]
+    manager.close()
+
+    assert tables == {'cache_entries', 'url_status_entries'}
+    assert version == cache_module.SCHEMA_VERSION
+
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE search_cache (key TEXT)')
+    conn.close()
+    reopened = CacheManager(cache_file=path)
+    assert reopened._get_connection().execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'search_cache'").fetchone()[0] == 1
+    reopened.close()